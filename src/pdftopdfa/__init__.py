@@ -11,6 +11,9 @@ from .converter import (
     convert_directory,
     convert_files,
     convert_to_pdfa,
+    convert_to_pdfa_bytes,
+    iter_convert_directory,
+    iter_convert_files,
 )
 from .exceptions import (
     ConversionError,
@@ -21,6 +24,7 @@ from .exceptions import (
     ValidationError,
     VeraPDFError,
 )
+from .sanitizers import EmbeddedPdfLimits, embedded_pdf_limits
 
 try:
     __version__ = version("pdftopdfa")
@@ -30,8 +34,13 @@ except PackageNotFoundError:
 __all__ = [
     "__version__",
     "convert_to_pdfa",
+    "convert_to_pdfa_bytes",
     "convert_files",
     "convert_directory",
+    "iter_convert_files",
+    "iter_convert_directory",
+    "embedded_pdf_limits",
+    "EmbeddedPdfLimits",
     "ConversionResult",
     "PDFToPDFAError",
     "ConversionError",
@@ -0,0 +1,312 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Process pool for batch conversion.
+
+:func:`run_in_workers` runs a task function over an iterable of tasks in
+separate worker processes.  Unlike :class:`concurrent.futures.ProcessPoolExecutor`
+every worker gets its own pipe and is supervised individually, so
+
+- a worker that crashes (segfault in QPDF, ``os._exit``, out of memory)
+  fails only the task it was running and is replaced;
+- a task that exceeds the per-task timeout is stopped by terminating its
+  worker, again without affecting the other workers;
+- workers are recycled after a fixed number of tasks, which bounds the
+  memory that pikepdf/QPDF and the caches keep per process;
+- with a CPU budget, workers share its token pool with the OCR jobs they
+  start (see :mod:`pdftopdfa.cpu_budget`); the tokens of a worker that is
+  killed are returned to the pool when it is retired.
+
+Tasks are dispatched in input order and results are yielded as they
+complete, tagged with the index of their task.
+"""
+
+import itertools
+import logging
+import multiprocessing
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from typing import Any
+
+from . import cpu_budget
+from .utils import LOG_FORMAT
+
+logger = logging.getLogger(__name__)
+
+# Number of tasks a worker process handles before it is replaced.
+DEFAULT_MAX_TASKS_PER_WORKER = 50
+
+# Seconds a worker gets to exit after being asked to stop.
+_SHUTDOWN_GRACE = 5.0
+
+
+def parent_log_level() -> int | None:
+    """Returns the level for worker logs, or None if logging is not set up."""
+    pdftopdfa_logger = logging.getLogger("pdftopdfa")
+    if not pdftopdfa_logger.handlers:
+        return None
+    return pdftopdfa_logger.getEffectiveLevel()
+
+
+def init_worker_process(
+    log_level: int | None, cpu_pool: Any = None, cpu_held: Any = None
+) -> None:
+    """Sets up logging and the CPU budget in a new worker process.
+
+    Args:
+        log_level: Level from :func:`parent_log_level` in the parent, or
+            None to leave logging unconfigured.
+        cpu_pool: Optional token pool of a shared CPU budget.
+        cpu_held: Optional shared counter of the tokens the worker holds
+            (see :func:`pdftopdfa.cpu_budget.reclaim`).
+    """
+    if log_level is not None:
+        pdftopdfa_logger = logging.getLogger("pdftopdfa")
+        pdftopdfa_logger.setLevel(log_level)
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setLevel(log_level)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        pdftopdfa_logger.addHandler(handler)
+    if cpu_pool is not None:
+        cpu_budget.use_shared_pool(cpu_pool, cpu_held)
+
+
+def _worker_main(
+    conn: Connection,
+    func: Callable[[Any], Any],
+    max_tasks: int | None,
+    log_level: int | None,
+    cpu_pool: Any = None,
+    cpu_held: Any = None,
+) -> None:
+    """Entry point of a worker process: run tasks received on *conn*."""
+    init_worker_process(log_level, cpu_pool, cpu_held)
+
+    done = 0
+    while max_tasks is None or done < max_tasks:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+        index, task = message
+        try:
+            with cpu_budget.task_token():
+                # Acknowledge the task: its timeout starts now
+                conn.send(index)
+                result = func(task)
+            conn.send((index, True, result))
+        except Exception as e:
+            conn.send((index, False, f"{type(e).__name__}: {e}"))
+        done += 1
+
+
+@dataclass
+class _Worker:
+    process: Any
+    conn: Connection
+    # Tokens of the CPU budget the worker holds, if there is a budget
+    cpu_held: Any = None
+    tasks_done: int = 0
+    index: int | None = None
+    task: Any = None
+    # When the worker picked up its task; None until it acknowledges it
+    started: float | None = None
+
+
+def run_in_workers[T, R](
+    func: Callable[[T], R],
+    tasks: Iterable[T],
+    *,
+    workers: int,
+    on_failure: Callable[[T, str], R],
+    timeout: float | None = None,
+    max_tasks_per_worker: int | None = DEFAULT_MAX_TASKS_PER_WORKER,
+    on_start: Callable[[int, T], None] | None = None,
+    cancel_event: threading.Event | None = None,
+    cpu_tokens: int | None = None,
+) -> Iterator[tuple[int, R]]:
+    """Run *func* over *tasks* in a pool of worker processes.
+
+    Args:
+        func: Module-level (picklable) function run in the workers.
+        tasks: Picklable task arguments, consumed lazily in order.
+        workers: Maximum number of worker processes.
+        on_failure: Builds the result of a task that raised, crashed its
+            worker or timed out, from the task and an error message.
+        timeout: Optional per-task wall-clock limit in seconds, counted
+            from when a worker picks the task up (after it has started
+            and holds a CPU token).
+        max_tasks_per_worker: Tasks after which a worker is replaced, or
+            None to keep workers for the whole run.
+        on_start: Optional callback(index, task) called in this process
+            when a task has been dispatched.
+        cancel_event: Optional threading.Event; when set, no further tasks
+            are dispatched and the running ones are allowed to finish.
+        cpu_tokens: Optional CPU budget shared by the workers; every task
+            holds one token and its OCR jobs may take the free ones.  At
+            most this many workers are started.
+
+    Yields:
+        ``(index, result)`` tuples in completion order.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+
+    ctx = multiprocessing.get_context("spawn")
+    cpu_pool = None
+    if cpu_tokens is not None:
+        if workers > cpu_tokens:
+            logger.info(
+                "Limiting %d workers to the CPU budget of %d", workers, cpu_tokens
+            )
+            workers = cpu_tokens
+        cpu_pool = ctx.BoundedSemaphore(cpu_tokens)
+    log_level = parent_log_level()
+    pending: Iterator[tuple[int, T]] = iter(enumerate(tasks))
+    exhausted = False
+    pool: list[_Worker] = []
+
+    def start_worker() -> _Worker:
+        parent_conn, child_conn = ctx.Pipe()
+        cpu_held = ctx.Value("i", 0) if cpu_pool is not None else None
+        process = ctx.Process(
+            target=_worker_main,
+            args=(
+                child_conn,
+                func,
+                max_tasks_per_worker,
+                log_level,
+                cpu_pool,
+                cpu_held,
+            ),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn, cpu_held)
+
+    def retire(worker: _Worker, *, kill: bool = False) -> None:
+        pool.remove(worker)
+        if kill:
+            worker.process.terminate()
+        worker.process.join(_SHUTDOWN_GRACE)
+        if worker.process.is_alive():
+            worker.process.kill()
+            worker.process.join()
+        worker.conn.close()
+        if worker.cpu_held is not None:
+            # A killed worker could not release its tokens
+            cpu_budget.reclaim(cpu_pool, worker.cpu_held)
+
+    def fail(worker: _Worker, message: str) -> tuple[int, R]:
+        index, task = worker.index, worker.task
+        worker.index = worker.task = None
+        logger.error("Task %d failed: %s", index, message)
+        return index, on_failure(task, message)
+
+    def crashed(worker: _Worker) -> tuple[int, R]:
+        retire(worker, kill=True)
+        return fail(
+            worker,
+            f"worker process exited unexpectedly (exit code {worker.process.exitcode})",
+        )
+
+    try:
+        while True:
+            # Dispatch tasks to idle workers, starting workers as needed
+            while not exhausted:
+                if cancel_event is not None and cancel_event.is_set():
+                    logger.info("Conversion cancelled")
+                    exhausted = True
+                    break
+                idle = next((w for w in pool if w.index is None), None)
+                if idle is not None and not idle.process.is_alive():
+                    retire(idle)
+                    continue
+                if idle is None and len(pool) >= workers:
+                    break
+                try:
+                    index, task = next(pending)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if idle is None:
+                    idle = start_worker()
+                    pool.append(idle)
+                try:
+                    idle.conn.send((index, task))
+                except (EOFError, OSError):
+                    # The worker died between tasks: replace it and retry
+                    retire(idle, kill=True)
+                    pending = itertools.chain([(index, task)], pending)
+                    continue
+                if on_start is not None:
+                    on_start(index, task)
+                idle.index, idle.task = index, task
+                idle.started = None
+
+            busy = [w for w in pool if w.index is not None]
+            if not busy:
+                break
+
+            wait_timeout = None
+            running = [w.started for w in busy if w.started is not None]
+            if timeout is not None and running:
+                now = time.monotonic()
+                wait_timeout = max(0.0, min(running) + timeout - now)
+
+            ready = set(
+                wait(
+                    [w.conn for w in busy] + [w.process.sentinel for w in busy],
+                    wait_timeout,
+                )
+            )
+
+            for worker in busy:
+                if worker.conn in ready:
+                    try:
+                        message = worker.conn.recv()
+                    except (EOFError, OSError):
+                        yield crashed(worker)
+                        continue
+                    if not isinstance(message, tuple):
+                        worker.started = time.monotonic()
+                        continue
+                    index, ok, payload = message
+                    task = worker.task
+                    worker.index = worker.task = None
+                    worker.tasks_done += 1
+                    if (
+                        max_tasks_per_worker is not None
+                        and worker.tasks_done >= max_tasks_per_worker
+                    ):
+                        retire(worker)
+                    if ok:
+                        yield index, payload
+                    else:
+                        logger.error("Task %d failed: %s", index, payload)
+                        yield index, on_failure(task, payload)
+                elif worker.process.sentinel in ready:
+                    yield crashed(worker)
+                elif (
+                    timeout is not None
+                    and worker.started is not None
+                    and time.monotonic() - worker.started >= timeout
+                ):
+                    retire(worker, kill=True)
+                    yield fail(worker, f"timed out after {timeout:g}s")
+    finally:
+        for worker in list(pool):
+            if worker.index is None:
+                try:
+                    worker.conn.send(None)
+                except OSError:
+                    pass
+            retire(worker, kill=worker.index is not None)
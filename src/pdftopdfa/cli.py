@@ -9,10 +9,11 @@ converting PDF files to the PDF/A format.
 """
 
 # Standard Library
+import json
 import logging
 import sys
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, TextIO
 
 # Third Party
 import click
@@ -20,12 +21,14 @@ from colorama import Fore, Style, init
 
 # Local
 from . import __version__
+from .compression import CompressionProfile
 from .converter import (
     ConversionResult,
-    convert_directory,
     convert_to_pdfa,
     generate_output_path,
+    iter_convert_directory,
 )
+from .cpu_budget import get_cpu_limit
 from .exceptions import (
     ConversionError,
     FontEmbeddingError,
@@ -34,11 +37,15 @@ from .exceptions import (
     ValidationError,
     VeraPDFError,
 )
+from .journal import ConversionJournal
+from .result_cache import DEFAULT_CACHE_SIZE, ResultCache
+from .sanitizers import EmbeddedPdfLimits
+from .sanitizers.files import DEFAULT_EMBEDDED_MAX_DEPTH
 from .utils import setup_logging
 from .verapdf import VeraPDFResult, validate_with_verapdf
 
 if TYPE_CHECKING:
-    from .ocr import OcrQuality
+    from .ocr import OcrPreprocess, OcrQuality
 
 # Exit codes as per CLAUDE.md
 EXIT_SUCCESS = 0
@@ -48,6 +55,9 @@ EXIT_CONVERSION_FAILED = 3
 EXIT_VALIDATION_FAILED = 4
 EXIT_PERMISSION_ERROR = 5
 
+# Journal file used by --resume when --journal is not given
+DEFAULT_JOURNAL_NAME = ".pdftopdfa-journal.sqlite"
+
 logger = logging.getLogger(__name__)
 
 
@@ -98,6 +108,18 @@ def _print_result(result: ConversionResult, quiet: bool) -> None:
         print_error(f"{result.input_path.name}: {result.error}")
 
 
+def _write_jsonl(jsonl: TextIO | None, result: ConversionResult) -> None:
+    """Writes one result as a JSON Lines record, if requested.
+
+    Args:
+        jsonl: Open JSON Lines output, or None.
+        result: The conversion result.
+    """
+    if jsonl is not None:
+        jsonl.write(json.dumps(result.to_dict()) + "\n")
+        jsonl.flush()
+
+
 def _print_validation_result(
     result: VeraPDFResult,
     file_path: Path,
@@ -194,11 +216,111 @@ def _print_validation_result(
     "fast=minimal processing, default=best quality without visual changes, "
     "best=best quality (may alter document visually and increase file size).",
 )
+@click.option(
+    "--ocr-preprocess",
+    "ocr_preprocess",
+    type=click.Choice(["none", "median", "nlmeans", "auto"]),
+    default=None,
+    help="OpenCV preprocessing of page images before OCR "
+    "(default: auto, none for --ocr-quality fast). "
+    "median=cheap denoising, nlmeans=slow denoising for noisy scans, "
+    "auto=denoise only as much as the estimated noise requires.",
+)
 @click.option(
     "--convert-calibrated/--no-convert-calibrated",
     default=True,
     help="Convert CalGray/CalRGB color spaces to ICCBased (default: enabled)",
 )
+@click.option(
+    "--object-streams",
+    "object_streams",
+    type=click.Choice(["preserve", "generate"]),
+    default="preserve",
+    help="Object stream handling on save (default: preserve). "
+    "generate=compress objects into object streams with a cross-reference "
+    "stream, for smaller outputs.",
+)
+@click.option(
+    "--compression",
+    type=click.Choice([p.value for p in CompressionProfile]),
+    default="balanced",
+    help="Compression profile (default: balanced). "
+    "fast=Flate level 1 for faster saves, "
+    "balanced=zlib's default level, "
+    "max-compression=Flate level 9 and existing streams recompressed, "
+    "for smaller but slower outputs.",
+)
+@click.option(
+    "--embedded-max-depth",
+    type=click.IntRange(min=0),
+    default=DEFAULT_EMBEDDED_MAX_DEPTH,
+    help="Nesting depth up to which embedded PDFs are converted to PDF/A-2b "
+    f"for PDF/A-2 (default: {DEFAULT_EMBEDDED_MAX_DEPTH}, 0 = remove "
+    "non-compliant embedded PDFs).",
+)
+@click.option(
+    "--embedded-time-budget",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Seconds all embedded PDF conversions of one document may take; "
+    "attachments left over are removed (default: no limit).",
+)
+@click.option(
+    "--embedded-jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Worker processes for converting the embedded PDFs of a document "
+    "(default: 1; batch workers with -j or --timeout convert them "
+    "one by one).",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=0),
+    default=1,
+    help="Number of files to convert in parallel in directory mode "
+    "(default: 1, 0 = one per CPU).",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Per-file time limit in seconds in directory mode; files that "
+    "exceed it are reported as failed.",
+)
+@click.option(
+    "--jsonl",
+    type=click.File("w", encoding="utf-8"),
+    default=None,
+    help="Write one JSON record per converted file to this file as results "
+    "arrive ('-' for stdout; combine with -q).",
+)
+@click.option(
+    "--journal",
+    "journal_path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Record the outcome of every file in this SQLite journal (directory mode).",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Skip files the journal records as converted and retry failures "
+    "(default journal: .pdftopdfa-journal.sqlite in the output directory).",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Cache converted outputs in this directory; inputs converted before "
+    "with the same options are copied from it.",
+)
+@click.option(
+    "--cache-size",
+    type=click.IntRange(min=1),
+    default=DEFAULT_CACHE_SIZE // 2**20,
+    help="Size limit of the --cache-dir cache in MiB (default: 1024).",
+)
 @click.version_option(version=__version__)
 def main(
     input_path: str | None,
@@ -213,7 +335,20 @@ def main(
     ocr_force: bool,
     ocr_lang: str,
     ocr_quality: str,
+    ocr_preprocess: str | None,
     convert_calibrated: bool,
+    object_streams: str,
+    compression: str,
+    embedded_max_depth: int,
+    embedded_time_budget: float | None,
+    embedded_jobs: int,
+    jobs: int,
+    timeout: float | None,
+    jsonl: TextIO | None,
+    journal_path: str | None,
+    resume: bool,
+    cache_dir: str | None,
+    cache_size: int,
 ) -> None:
     """Converts PDF files to the archival PDF/A format.
 
@@ -255,10 +390,23 @@ def main(
         # Convert OCR quality string to enum (lazy import to avoid requiring
         # ocrmypdf when OCR is not used)
         ocr_quality_enum = None
+        ocr_preprocess_enum = None
         if ocr_enabled:
-            from .ocr import OcrQuality
+            from .ocr import OcrPreprocess, OcrQuality
 
             ocr_quality_enum = OcrQuality(ocr_quality)
+            if ocr_preprocess is not None:
+                ocr_preprocess_enum = OcrPreprocess(ocr_preprocess)
+
+        embedded_limits = EmbeddedPdfLimits(
+            max_depth=embedded_max_depth,
+            time_budget=embedded_time_budget,
+            workers=embedded_jobs,
+        )
+
+        cache = None
+        if cache_dir is not None:
+            cache = ResultCache(Path(cache_dir), cache_size * 2**20)
 
         if input_path_obj.is_file():
             # Convert single file
@@ -271,8 +419,14 @@ def main(
                 quiet,
                 ocr_languages=ocr_languages,
                 ocr_quality=ocr_quality_enum,
+                ocr_preprocess=ocr_preprocess_enum,
                 ocr_force=ocr_force,
                 convert_calibrated=convert_calibrated,
+                compress_structure=object_streams == "generate",
+                compression=CompressionProfile(compression),
+                embedded_limits=embedded_limits,
+                jsonl=jsonl,
+                cache=cache,
             )
         elif input_path_obj.is_dir():
             # Convert directory
@@ -286,8 +440,18 @@ def main(
                 quiet,
                 ocr_languages=ocr_languages,
                 ocr_quality=ocr_quality_enum,
+                ocr_preprocess=ocr_preprocess_enum,
                 ocr_force=ocr_force,
                 convert_calibrated=convert_calibrated,
+                compress_structure=object_streams == "generate",
+                compression=CompressionProfile(compression),
+                embedded_limits=embedded_limits,
+                workers=jobs or get_cpu_limit(),
+                timeout=timeout,
+                jsonl=jsonl,
+                journal_path=Path(journal_path) if journal_path else None,
+                resume=resume,
+                cache=cache,
             )
         else:
             print_error(f"Invalid path: {input_path}")
@@ -329,8 +493,14 @@ def _convert_single_file(
     *,
     ocr_languages: list[str] | None = None,
     ocr_quality: "OcrQuality | None" = None,
+    ocr_preprocess: "OcrPreprocess | None" = None,
     ocr_force: bool = False,
     convert_calibrated: bool = True,
+    compress_structure: bool = False,
+    compression: CompressionProfile | None = None,
+    embedded_limits: EmbeddedPdfLimits | None = None,
+    jsonl: TextIO | None = None,
+    cache: ResultCache | None = None,
 ) -> int:
     """Converts a single PDF file.
 
@@ -344,8 +514,14 @@ def _convert_single_file(
         ocr_languages: Optional list of Tesseract language codes
             (e.g., ``["deu", "eng"]``).
         ocr_quality: OCR quality preset.
+        ocr_preprocess: OpenCV preprocessing mode for OCR.
         ocr_force: If True, force OCR even on pages with existing text.
         convert_calibrated: If True, convert CalGray/CalRGB to ICCBased.
+        compress_structure: If True, write compressed object streams.
+        compression: Compression profile.
+        embedded_limits: Limits for converting embedded PDFs.
+        jsonl: Optional open JSON Lines output for the result.
+        cache: Optional result cache.
 
     Returns:
         Exit code.
@@ -374,11 +550,17 @@ def _convert_single_file(
         validate=False,  # Validate manually later
         ocr_languages=ocr_languages,
         ocr_quality=ocr_quality,
+        ocr_preprocess=ocr_preprocess,
         ocr_force=ocr_force,
         convert_calibrated=convert_calibrated,
+        compress_structure=compress_structure,
+        compression=compression,
+        embedded_limits=embedded_limits,
+        cache=cache,
     )
 
     _print_result(result, quiet)
+    _write_jsonl(jsonl, result)
 
     if not result.success:
         return EXIT_CONVERSION_FAILED
@@ -427,8 +609,18 @@ def _convert_directory(
     *,
     ocr_languages: list[str] | None = None,
     ocr_quality: "OcrQuality | None" = None,
+    ocr_preprocess: "OcrPreprocess | None" = None,
     ocr_force: bool = False,
     convert_calibrated: bool = True,
+    compress_structure: bool = False,
+    compression: CompressionProfile | None = None,
+    embedded_limits: EmbeddedPdfLimits | None = None,
+    workers: int = 1,
+    timeout: float | None = None,
+    jsonl: TextIO | None = None,
+    journal_path: Path | None = None,
+    resume: bool = False,
+    cache: ResultCache | None = None,
 ) -> int:
     """Converts all PDFs in a directory.
 
@@ -443,41 +635,76 @@ def _convert_directory(
         ocr_languages: Optional list of Tesseract language codes
             (e.g., ``["deu", "eng"]``).
         ocr_quality: OCR quality preset.
+        ocr_preprocess: OpenCV preprocessing mode for OCR.
         ocr_force: If True, force OCR even on pages with existing text.
         convert_calibrated: If True, convert CalGray/CalRGB to ICCBased.
+        compress_structure: If True, write compressed object streams.
+        compression: Compression profile.
+        embedded_limits: Limits for converting embedded PDFs.
+        workers: Number of worker processes.
+        timeout: Optional per-file time limit in seconds.
+        jsonl: Optional open JSON Lines output; each result is written as
+            soon as its file is done.
+        journal_path: Optional SQLite journal recording every outcome.
+        resume: Whether to skip files the journal records as converted.
+        cache: Optional result cache shared by the worker processes.
 
     Returns:
         Exit code.
     """
     output_dir = Path(output) if output else None
+    if resume and journal_path is None:
+        journal_path = (output_dir or input_dir) / DEFAULT_JOURNAL_NAME
 
     if not quiet:
         mode = "recursive" if recursive else "non-recursive"
         click.echo(f"Converting directory {input_dir} ({mode}) -> PDF/A-{level}...")
 
-    results = convert_directory(
-        input_dir=input_dir,
-        output_dir=output_dir,
-        level=level,
-        recursive=recursive,
-        validate=do_validate,
-        show_progress=not quiet,
-        ocr_languages=ocr_languages,
-        ocr_quality=ocr_quality,
-        ocr_force=ocr_force,
-        force_overwrite=force,
-        convert_calibrated=convert_calibrated,
-    )
+    # Stream results, keeping only what the summary needs
+    successful = 0
+    failed: list[ConversionResult] = []
+    validation_failures: list[ConversionResult] = []
+    journal = ConversionJournal(journal_path) if journal_path else None
+    try:
+        results = iter_convert_directory(
+            input_dir=input_dir,
+            output_dir=output_dir,
+            level=level,
+            recursive=recursive,
+            validate=do_validate,
+            show_progress=not quiet,
+            ocr_languages=ocr_languages,
+            ocr_quality=ocr_quality,
+            ocr_preprocess=ocr_preprocess,
+            ocr_force=ocr_force,
+            force_overwrite=force,
+            convert_calibrated=convert_calibrated,
+            compress_structure=compress_structure,
+            compression=compression,
+            embedded_limits=embedded_limits,
+            workers=workers,
+            timeout=timeout,
+            journal=journal,
+            resume=resume,
+            cache=cache,
+        )
+        for result in results:
+            _write_jsonl(jsonl, result)
+            if not result.success:
+                failed.append(result)
+                continue
+            successful += 1
+            if result.validation_failed:
+                validation_failures.append(result)
+    finally:
+        if journal is not None:
+            journal.close()
 
     # Output summary
-    successful = [r for r in results if r.success]
-    failed = [r for r in results if not r.success]
-    validation_failures = [r for r in successful if r.validation_failed]
-
     if not quiet:
         click.echo()
         click.echo("Summary:")
-        print_success(f"{len(successful)} file(s) successfully converted")
+        print_success(f"{successful} file(s) successfully converted")
         if failed:
             print_error(f"{len(failed)} file(s) failed")
             for result in failed:
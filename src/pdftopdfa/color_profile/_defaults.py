@@ -8,7 +8,8 @@ import logging
 
 from pikepdf import Array, Dictionary, Name, Pdf, Stream
 
-from ..utils import iter_type3_fonts as _iter_type3_fonts
+from ..resource_graph import APPEARANCE, FORM, ResourceNode, walk_from
+from ..resource_graph import get_resource_graph as _get_resource_graph
 from ..utils import resolve_indirect as _resolve_indirect
 from ._profiles import _create_icc_colorspace
 from ._types import _DEFAULT_CS_NAMES, _DEVICE_CS_NAMES, ColorSpaceType
@@ -55,6 +56,40 @@ def _add_default_colorspaces(
     return added
 
 
+def _replace_device_colorspace(
+    owner,
+    non_dominant: set[ColorSpaceType],
+    icc_arrays: dict[ColorSpaceType, Array],
+) -> int:
+    """Replace a bare Device ``/ColorSpace`` (or Indexed base) on *owner*.
+
+    Only bare Device color space names are replaced.  Separation and
+    DeviceN arrays are intentionally left untouched: their alternate spaces
+    are resolved by the PDF viewer, and they are PDF/A-conformant with an
+    OutputIntent (ISO 19005-2, 6.2.4.4).
+
+    Returns:
+        1 if the color space was replaced, else 0.
+    """
+    cs = owner.get(Name.ColorSpace)
+    if cs is None:
+        return 0
+    cs = _resolve_indirect(cs)
+    if isinstance(cs, Name):
+        for cs_type in non_dominant:
+            if cs == _DEVICE_CS_NAMES[cs_type]:
+                owner[Name.ColorSpace] = icc_arrays[cs_type]
+                return 1
+    elif isinstance(cs, Array) and len(cs) >= 2 and cs[0] == Name.Indexed:
+        base = cs[1]
+        if isinstance(base, Name):
+            for cs_type in non_dominant:
+                if base == _DEVICE_CS_NAMES[cs_type]:
+                    cs[1] = icc_arrays[cs_type]
+                    return 1
+    return 0
+
+
 def _replace_device_colorspace_in_images(
     xobjects,
     non_dominant: set[ColorSpaceType],
@@ -64,8 +99,8 @@ def _replace_device_colorspace_in_images(
     """Replace Device color spaces in Image XObjects with ICCBased.
 
     Default color spaces do NOT apply to Image XObjects (PDF spec 8.6.5.6),
-    so images must be fixed individually.  Form XObjects are recursed into:
-    their resources get Default entries and nested images are replaced.
+    so images must be fixed individually.  Form XObjects are separate
+    nodes of the resource graph and are skipped here.
 
     Args:
         xobjects: ``/XObject`` Dictionary from resources.
@@ -80,70 +115,24 @@ def _replace_device_colorspace_in_images(
         return 0
 
     replaced = 0
+    xobjects = _resolve_indirect(xobjects)
 
     for name in xobjects.keys():
-        xobj = _resolve_indirect(xobjects[name])
-
-        # Cycle detection using objgen (safe for pikepdf, see MEMORY.md)
-        objgen = xobj.objgen
-        if objgen != (0, 0):
-            if objgen in visited:
+        try:
+            xobj = _resolve_indirect(xobjects[name])
+            if xobj.get(Name.Subtype) != Name.Image:
                 continue
-            visited.add(objgen)
 
-        subtype = xobj.get(Name.Subtype)
-
-        if subtype == Name.Image:
-            # Only replace bare Device color space names (e.g. /DeviceRGB).
-            # Separation and DeviceN arrays are intentionally left untouched:
-            # their alternate spaces are resolved by the PDF viewer, and they
-            # are PDF/A-conformant with an OutputIntent (ISO 19005-2, 6.2.4.4).
-            cs = xobj.get(Name.ColorSpace)
-            if isinstance(cs, Name):
-                for cs_type in non_dominant:
-                    if cs == _DEVICE_CS_NAMES[cs_type]:
-                        xobj[Name.ColorSpace] = icc_arrays[cs_type]
-                        replaced += 1
-                        break
-            elif isinstance(cs, Array) and len(cs) >= 2:
-                if cs[0] == Name.Indexed:
-                    base = cs[1]
-                    if isinstance(base, Name):
-                        for cs_type in non_dominant:
-                            if base == _DEVICE_CS_NAMES[cs_type]:
-                                cs[1] = icc_arrays[cs_type]
-                                replaced += 1
-                                break
-
-        elif subtype == Name.Form:
-            form_resources = xobj.get(Name.Resources)
-            if form_resources is not None:
-                form_resources = _resolve_indirect(form_resources)
-                # Add Default color spaces to form resources
-                _add_default_colorspaces(form_resources, non_dominant, icc_arrays)
-                # Recurse into nested XObjects
-                nested = form_resources.get(Name.XObject)
-                if nested:
-                    replaced += _replace_device_colorspace_in_images(
-                        nested, non_dominant, icc_arrays, visited
-                    )
-                # Process patterns in form resources
-                form_patterns = form_resources.get("/Pattern")
-                if form_patterns:
-                    _d, _r = _apply_defaults_to_patterns(
-                        form_patterns, non_dominant, icc_arrays, visited
-                    )
-                    replaced += _r
-                # Process shadings in form resources
-                form_shadings = form_resources.get("/Shading")
-                if form_shadings:
-                    replaced += _replace_device_colorspace_in_shadings(
-                        form_shadings, non_dominant, icc_arrays, visited
-                    )
-                # Process Type3 font resources in form
-                replaced += _apply_defaults_to_type3_fonts(
-                    form_resources, non_dominant, icc_arrays, visited
-                )
+            # Cycle detection using objgen (safe for pikepdf, see MEMORY.md)
+            objgen = xobj.objgen
+            if objgen != (0, 0):
+                if objgen in visited:
+                    continue
+                visited.add(objgen)
+
+            replaced += _replace_device_colorspace(xobj, non_dominant, icc_arrays)
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            logger.debug("Error replacing colorspace in image %s: %s", name, e)
 
     return replaced
 
@@ -160,10 +149,6 @@ def _replace_device_colorspace_in_shadings(
     in Shading dictionaries (PDF Spec 8.6.5.6), so non-dominant Device
     color spaces must be replaced directly with ICCBased arrays.
 
-    Separation/DeviceN arrays are naturally skipped by the
-    ``isinstance(cs, Name)`` check - they are PDF/A-conformant when an
-    OutputIntent is present (ISO 19005-2, 6.2.4.4).
-
     Args:
         shadings: ``/Shading`` Dictionary from resources.
         non_dominant: Device color space types to replace.
@@ -190,113 +175,81 @@ def _replace_device_colorspace_in_shadings(
                     continue
                 visited.add(objgen)
 
-            cs = shading.get(Name.ColorSpace)
-            if cs is not None:
-                cs = _resolve_indirect(cs)
-                if isinstance(cs, Name):
-                    for cs_type in non_dominant:
-                        if cs == _DEVICE_CS_NAMES[cs_type]:
-                            shading[Name.ColorSpace] = icc_arrays[cs_type]
-                            replaced += 1
-                            break
-                elif isinstance(cs, Array) and len(cs) >= 2:
-                    if cs[0] == Name.Indexed:
-                        base = cs[1]
-                        if isinstance(base, Name):
-                            for cs_type in non_dominant:
-                                if base == _DEVICE_CS_NAMES[cs_type]:
-                                    cs[1] = icc_arrays[cs_type]
-                                    replaced += 1
-                                    break
+            replaced += _replace_device_colorspace(shading, non_dominant, icc_arrays)
         except (AttributeError, KeyError, TypeError, ValueError) as e:
             logger.debug("Error replacing colorspace in shading %s: %s", name, e)
 
     return replaced
 
 
-def _apply_defaults_to_type3_fonts(
-    resources,
+def _replace_device_colorspace_in_shading_patterns(
+    patterns,
     non_dominant: set[ColorSpaceType],
     icc_arrays: dict[ColorSpaceType, Array],
     visited: set[tuple[int, int]],
 ) -> int:
-    """Apply default color spaces to Type3 font resources.
-
-    Creates ``/Resources`` on the font if missing, inserts DefaultGray/
-    DefaultRGB/DefaultCMYK, and replaces Device color spaces in Image
-    XObjects, Shading dictionaries, and Patterns within the font
-    resources.
+    """Replace bare Device color spaces in the shadings of shading patterns.
 
-    Defaults do **not** apply to explicit ``/ColorSpace`` entries in
-    Shading dictionaries (PDF Spec 8.6.5.6) or to Tiling-Pattern
-    resources (which don't inherit parent defaults), so these must be
-    replaced directly.
+    PatternType=2 (Shading) patterns have their ``/Shading/ColorSpace``
+    replaced directly - Defaults do not apply to explicit ``/ColorSpace``
+    entries in shadings.  Tiling patterns are separate nodes of the
+    resource graph and are skipped here.
 
     Args:
-        resources: A resolved Resources dictionary (page or form).
+        patterns: ``/Pattern`` Dictionary from resources.
         non_dominant: Device spaces not covered by the OutputIntent.
         icc_arrays: Pre-built ``[/ICCBased <stream>]`` arrays.
-        visited: Set of ``(obj_num, gen)`` tuples for cycle detection.
+        visited: Set of ``(obj_num, gen)`` pairs for cycle detection.
 
     Returns:
-        Number of replaced color space entries.
+        Number of shadings whose color space was replaced.
     """
+    if patterns is None:
+        return 0
+
     replaced = 0
+    patterns = _resolve_indirect(patterns)
 
-    for _font_name, font in _iter_type3_fonts(resources, visited):
-        font_resources = font.get("/Resources")
-        if font_resources is None:
-            font_resources = Dictionary()
-            font[Name("/Resources")] = font_resources
-        else:
-            font_resources = _resolve_indirect(font_resources)
-
-        _add_default_colorspaces(font_resources, non_dominant, icc_arrays)
-
-        # Replace Device color spaces in Image XObjects
-        font_xobjects = font_resources.get(Name.XObject)
-        if font_xobjects:
-            replaced += _replace_device_colorspace_in_images(
-                font_xobjects, non_dominant, icc_arrays, visited
-            )
+    for name in patterns.keys():
+        try:
+            pattern = _resolve_indirect(patterns[name])
+            if pattern.get("/PatternType") != 2:
+                continue
+            shading = pattern.get("/Shading")
+            if shading is None:
+                continue
+            shading = _resolve_indirect(shading)
 
-        # Replace Device color spaces in Shading dictionaries
-        font_shadings = font_resources.get("/Shading")
-        if font_shadings:
-            replaced += _replace_device_colorspace_in_shadings(
-                font_shadings, non_dominant, icc_arrays, visited
-            )
+            # Cycle detection using objgen (safe for pikepdf, see MEMORY.md)
+            objgen = shading.objgen
+            if objgen != (0, 0):
+                if objgen in visited:
+                    continue
+                visited.add(objgen)
 
-        # Replace Device color spaces in Patterns
-        font_patterns = font_resources.get("/Pattern")
-        if font_patterns:
-            d, r = _apply_defaults_to_patterns(
-                font_patterns, non_dominant, icc_arrays, visited
-            )
-            replaced += d + r
+            replaced += _replace_device_colorspace(shading, non_dominant, icc_arrays)
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            logger.debug("Error replacing colorspace in pattern %s: %s", name, e)
 
     return replaced
 
 
-def _apply_defaults_to_patterns(
-    patterns,
+def _apply_defaults_to_node(
+    node: ResourceNode,
     non_dominant: set[ColorSpaceType],
     icc_arrays: dict[ColorSpaceType, Array],
     visited: set[tuple[int, int]],
 ) -> tuple[int, int]:
-    """Apply default color spaces and ICC replacements to patterns.
+    """Apply default color spaces and ICC replacements to one graph node.
 
-    Tiling patterns (PatternType=1) have their own ``/Resources`` and do
-    NOT inherit Default color space entries from their parent page or
-    Form XObject.  This function adds the necessary Default entries and
-    recurses into nested XObjects, patterns, and shadings.
-
-    PatternType=2 (Shading) patterns have their ``/Shading/ColorSpace``
-    replaced directly when it is a bare Device color space - Defaults do
-    not apply to explicit ``/ColorSpace`` entries in shadings.
+    Pages, tiling patterns, Type3 fonts and appearance streams get
+    ``/Resources`` if missing: tiling patterns and appearance streams do
+    not inherit Default entries from the content they are drawn from.  A
+    Form XObject without ``/Resources`` uses the resources of its parent,
+    which get the Defaults themselves.
 
     Args:
-        patterns: ``/Pattern`` Dictionary from resources.
+        node: A node of the resource graph.
         non_dominant: Device spaces not covered by the OutputIntent.
         icc_arrays: Pre-built ``[/ICCBased <stream>]`` arrays.
         visited: Set of ``(obj_num, gen)`` pairs for cycle detection.
@@ -304,92 +257,56 @@ def _apply_defaults_to_patterns(
     Returns:
         ``(defaults_added, images_replaced)`` counts.
     """
-    patterns = _resolve_indirect(patterns)
+    resources = node.own_resources
+    if resources is None:
+        if node.kind == FORM:
+            return 0, 0
+        resources = Dictionary()
+        node.owner[Name.Resources] = resources
+
+    defaults_added = _add_default_colorspaces(resources, non_dominant, icc_arrays)
+    images_replaced = _replace_device_colorspace_in_images(
+        resources.get(Name.XObject), non_dominant, icc_arrays, visited
+    )
+    images_replaced += _replace_device_colorspace_in_shading_patterns(
+        resources.get("/Pattern"), non_dominant, icc_arrays, visited
+    )
+    images_replaced += _replace_device_colorspace_in_shadings(
+        resources.get("/Shading"), non_dominant, icc_arrays, visited
+    )
+    return defaults_added, images_replaced
 
-    defaults_added = 0
-    images_replaced = 0
 
-    for name in patterns.keys():
-        try:
-            pattern = _resolve_indirect(patterns[name])
+def _apply_defaults_to_walk(
+    root: Stream,
+    kind: str,
+    non_dominant: set[ColorSpaceType],
+    icc_arrays: dict[ColorSpaceType, Array],
+    visited: set[tuple[int, int]],
+) -> tuple[int, int]:
+    """Apply defaults to *root* and the nodes reachable from it.
 
-            # Cycle detection using objgen (safe for pikepdf, see MEMORY.md)
-            obj_key = pattern.objgen
-            if obj_key != (0, 0):
-                if obj_key in visited:
-                    continue
-                visited.add(obj_key)
-
-            pattern_type = pattern.get("/PatternType")
-
-            if pattern_type == 1:
-                # Tiling pattern: has content stream and own resources
-                pat_resources = pattern.get("/Resources")
-                if pat_resources is None:
-                    pat_resources = Dictionary()
-                    pattern[Name.Resources] = pat_resources
-                else:
-                    pat_resources = _resolve_indirect(pat_resources)
-                defaults_added += _add_default_colorspaces(
-                    pat_resources, non_dominant, icc_arrays
-                )
-                # Recurse into nested XObjects
-                nested = pat_resources.get(Name.XObject)
-                if nested:
-                    images_replaced += _replace_device_colorspace_in_images(
-                        nested, non_dominant, icc_arrays, visited
-                    )
-                # Recurse into nested patterns
-                nested_patterns = pat_resources.get("/Pattern")
-                if nested_patterns:
-                    d, r = _apply_defaults_to_patterns(
-                        nested_patterns,
-                        non_dominant,
-                        icc_arrays,
-                        visited,
-                    )
-                    defaults_added += d
-                    images_replaced += r
-                # Process shadings in tiling pattern resources
-                pat_shadings = pat_resources.get("/Shading")
-                if pat_shadings:
-                    images_replaced += _replace_device_colorspace_in_shadings(
-                        pat_shadings, non_dominant, icc_arrays, visited
-                    )
-
-            elif pattern_type == 2:
-                # Shading pattern: replace Device color space in the
-                # shading's /ColorSpace directly (Defaults don't apply).
-                shading = pattern.get("/Shading")
-                if shading is not None:
-                    shading = _resolve_indirect(shading)
-                    sh_objgen = shading.objgen
-                    if sh_objgen != (0, 0):
-                        if sh_objgen in visited:
-                            continue
-                        visited.add(sh_objgen)
-                    cs = shading.get(Name.ColorSpace)
-                    if cs is not None:
-                        cs = _resolve_indirect(cs)
-                        if isinstance(cs, Name):
-                            for cs_type in non_dominant:
-                                if cs == _DEVICE_CS_NAMES[cs_type]:
-                                    shading[Name.ColorSpace] = icc_arrays[cs_type]
-                                    images_replaced += 1
-                                    break
-                        elif isinstance(cs, Array) and len(cs) >= 2:
-                            if cs[0] == Name.Indexed:
-                                base = cs[1]
-                                if isinstance(base, Name):
-                                    for cs_type in non_dominant:
-                                        if base == _DEVICE_CS_NAMES[cs_type]:
-                                            cs[1] = icc_arrays[cs_type]
-                                            images_replaced += 1
-                                            break
+    For content outside the page structure of the resource graph.  Nodes
+    already handled (recorded in *visited*) are skipped; *root* always
+    gets ``/Resources``.
 
-        except (AttributeError, KeyError, TypeError, ValueError) as e:
-            logger.debug("Error applying defaults to pattern %s: %s", name, e)
+    Returns:
+        ``(defaults_added, images_replaced)`` counts.
+    """
+    if root.get(Name.Resources) is None:
+        root[Name.Resources] = Dictionary()
 
+    defaults_added = 0
+    images_replaced = 0
+    for node in walk_from(root, kind):
+        objgen = node.owner.objgen
+        if node.owner is not root and objgen != (0, 0):
+            if objgen in visited:
+                continue
+            visited.add(objgen)
+        d, r = _apply_defaults_to_node(node, non_dominant, icc_arrays, visited)
+        defaults_added += d
+        images_replaced += r
     return defaults_added, images_replaced
 
 
@@ -413,91 +330,30 @@ def _apply_defaults_to_ap_entry(
     Returns:
         ``(defaults_added, images_replaced)`` counts.
     """
-    defaults_added = 0
-    images_replaced = 0
     ap_value = _resolve_indirect(ap_value)
-
     if isinstance(ap_value, Stream):
-        objgen = ap_value.objgen
+        streams = [ap_value]
+    elif isinstance(ap_value, Dictionary):
+        # Sub-state dictionary (e.g. /Yes, /Off): each value is a stream
+        streams = [_resolve_indirect(ap_value[key]) for key in ap_value.keys()]
+    else:
+        return 0, 0
+
+    defaults_added = 0
+    images_replaced = 0
+    for stream in streams:
+        if not isinstance(stream, Stream):
+            continue
+        objgen = stream.objgen
         if objgen != (0, 0):
             if objgen in visited:
-                return 0, 0
+                continue
             visited.add(objgen)
-
-        ap_resources = ap_value.get(Name.Resources)
-        if ap_resources is None:
-            ap_resources = Dictionary()
-            ap_value[Name.Resources] = ap_resources
-        else:
-            ap_resources = _resolve_indirect(ap_resources)
-        defaults_added += _add_default_colorspaces(
-            ap_resources, non_dominant, icc_arrays
-        )
-        nested = ap_resources.get(Name.XObject)
-        if nested:
-            images_replaced += _replace_device_colorspace_in_images(
-                nested, non_dominant, icc_arrays, visited
-            )
-        ap_patterns = ap_resources.get("/Pattern")
-        if ap_patterns:
-            d, r = _apply_defaults_to_patterns(
-                ap_patterns, non_dominant, icc_arrays, visited
-            )
-            defaults_added += d
-            images_replaced += r
-        ap_shadings = ap_resources.get("/Shading")
-        if ap_shadings:
-            images_replaced += _replace_device_colorspace_in_shadings(
-                ap_shadings, non_dominant, icc_arrays, visited
-            )
-        images_replaced += _apply_defaults_to_type3_fonts(
-            ap_resources, non_dominant, icc_arrays, visited
+        d, r = _apply_defaults_to_walk(
+            stream, APPEARANCE, non_dominant, icc_arrays, visited
         )
-
-    elif isinstance(ap_value, Dictionary):
-        # Sub-state dictionary (e.g. /Yes, /Off): each value is a stream
-        for key in ap_value.keys():
-            sub_stream = _resolve_indirect(ap_value[key])
-            if isinstance(sub_stream, Stream):
-                objgen = sub_stream.objgen
-                if objgen != (0, 0):
-                    if objgen in visited:
-                        continue
-                    visited.add(objgen)
-
-                sub_resources = sub_stream.get(Name.Resources)
-                if sub_resources is None:
-                    sub_resources = Dictionary()
-                    sub_stream[Name.Resources] = sub_resources
-                else:
-                    sub_resources = _resolve_indirect(sub_resources)
-                defaults_added += _add_default_colorspaces(
-                    sub_resources, non_dominant, icc_arrays
-                )
-                nested = sub_resources.get(Name.XObject)
-                if nested:
-                    images_replaced += _replace_device_colorspace_in_images(
-                        nested, non_dominant, icc_arrays, visited
-                    )
-                sub_patterns = sub_resources.get("/Pattern")
-                if sub_patterns:
-                    d, r = _apply_defaults_to_patterns(
-                        sub_patterns,
-                        non_dominant,
-                        icc_arrays,
-                        visited,
-                    )
-                    defaults_added += d
-                    images_replaced += r
-                sub_shadings = sub_resources.get("/Shading")
-                if sub_shadings:
-                    images_replaced += _replace_device_colorspace_in_shadings(
-                        sub_shadings, non_dominant, icc_arrays, visited
-                    )
-                images_replaced += _apply_defaults_to_type3_fonts(
-                    sub_resources, non_dominant, icc_arrays, visited
-                )
-
+        defaults_added += d
+        images_replaced += r
     return defaults_added, images_replaced
 
 
@@ -511,7 +367,8 @@ def _apply_defaults_to_smask_groups(
 
     ExtGState entries may reference an SMask dict whose ``/G`` value is
     a Form XObject (transparency group).  Default color spaces do not
-    propagate into these groups automatically, so we must add them.
+    propagate into these groups automatically, so we must add them.  The
+    groups are not part of the resource graph and are walked separately.
 
     Args:
         resources: A resolved Resources dictionary.
@@ -556,40 +413,11 @@ def _apply_defaults_to_smask_groups(
                     continue
                 visited.add(objgen)
 
-            form_resources = g_form.get(Name.Resources)
-            if form_resources is None:
-                form_resources = Dictionary()
-                g_form[Name.Resources] = form_resources
-            else:
-                form_resources = _resolve_indirect(form_resources)
-
-            defaults_added += _add_default_colorspaces(
-                form_resources, non_dominant, icc_arrays
-            )
-
-            nested = form_resources.get(Name.XObject)
-            if nested:
-                images_replaced += _replace_device_colorspace_in_images(
-                    nested, non_dominant, icc_arrays, visited
-                )
-
-            nested_patterns = form_resources.get("/Pattern")
-            if nested_patterns:
-                d, r = _apply_defaults_to_patterns(
-                    nested_patterns, non_dominant, icc_arrays, visited
-                )
-                defaults_added += d
-                images_replaced += r
-
-            nested_shadings = form_resources.get("/Shading")
-            if nested_shadings:
-                images_replaced += _replace_device_colorspace_in_shadings(
-                    nested_shadings, non_dominant, icc_arrays, visited
-                )
-
-            images_replaced += _apply_defaults_to_type3_fonts(
-                form_resources, non_dominant, icc_arrays, visited
+            d, r = _apply_defaults_to_walk(
+                g_form, FORM, non_dominant, icc_arrays, visited
             )
+            defaults_added += d
+            images_replaced += r
         except (AttributeError, KeyError, TypeError, ValueError) as e:
             logger.debug(
                 "Error applying defaults to SMask /G for %s: %s",
@@ -608,13 +436,17 @@ def _apply_default_colorspaces(
     """Cover non-dominant Device color spaces for PDF/A compliance.
 
     For each non-dominant Device space:
-    * Page and Form XObject resources get a ``DefaultXxx`` entry that maps
-      Device color operators to an ICCBased profile.
+    * Resources of pages, Form XObjects, tiling patterns, Type3 fonts,
+      appearance streams and soft-mask groups get a ``DefaultXxx`` entry
+      that maps Device color operators to an ICCBased profile.
     * Image XObjects get their ``/ColorSpace`` replaced with
       ``[/ICCBased <stream>]`` because Defaults do not apply to images.
     * Shading dictionaries get their ``/ColorSpace`` replaced directly
       because Defaults do not apply to explicit entries in shadings.
 
+    The content-bearing objects are taken from the document's
+    :class:`~pdftopdfa.resource_graph.ResourceGraph`.
+
     Args:
         pdf: The document being converted.
         non_dominant: Device spaces not covered by the OutputIntent.
@@ -632,72 +464,26 @@ def _apply_default_colorspaces(
     images_replaced = 0
     visited: set[tuple[int, int]] = set()
 
-    for page in pdf.pages:
-        resources = page.get(Name.Resources)
-        if resources is None:
-            resources = Dictionary()
-            page[Name.Resources] = resources
-        else:
-            resources = _resolve_indirect(resources)
-
-        defaults_added += _add_default_colorspaces(resources, non_dominant, icc_arrays)
-
-        xobjects = resources.get(Name.XObject)
-        if xobjects:
-            images_replaced += _replace_device_colorspace_in_images(
-                xobjects, non_dominant, icc_arrays, visited
-            )
-
-        patterns = resources.get("/Pattern")
-        if patterns:
-            d, r = _apply_defaults_to_patterns(
-                patterns, non_dominant, icc_arrays, visited
-            )
+    for node in _get_resource_graph(pdf).iter_nodes():
+        objgen = node.owner.objgen
+        if objgen != (0, 0):
+            if objgen in visited:
+                # Already reached as part of a soft-mask group
+                continue
+            visited.add(objgen)
+        try:
+            d, r = _apply_defaults_to_node(node, non_dominant, icc_arrays, visited)
             defaults_added += d
             images_replaced += r
-
-        shadings = resources.get("/Shading")
-        if shadings:
-            images_replaced += _replace_device_colorspace_in_shadings(
-                shadings, non_dominant, icc_arrays, visited
-            )
-
-        # Process Type3 font resources
-        images_replaced += _apply_defaults_to_type3_fonts(
-            resources, non_dominant, icc_arrays, visited
-        )
-
-        # Process SMask /G Form XObjects in ExtGState
-        d, r = _apply_defaults_to_smask_groups(
-            resources, non_dominant, icc_arrays, visited
-        )
-        defaults_added += d
-        images_replaced += r
-
-        # Process annotation appearance streams
-        annots = page.get(Name.Annots)
-        if annots is not None:
-            annots = _resolve_indirect(annots)
-            for i in range(len(annots)):
-                try:
-                    annot = _resolve_indirect(annots[i])
-                    ap = annot.get(Name.AP)
-                    if ap is None:
-                        continue
-                    ap = _resolve_indirect(ap)
-                    for ap_key in (Name.N, Name.R, Name.D):
-                        ap_entry = ap.get(ap_key)
-                        if ap_entry is not None:
-                            d, r = _apply_defaults_to_ap_entry(
-                                ap_entry,
-                                non_dominant,
-                                icc_arrays,
-                                visited,
-                            )
-                            defaults_added += d
-                            images_replaced += r
-                except (AttributeError, KeyError, TypeError, ValueError) as e:
-                    logger.debug("Error processing annotation AP defaults: %s", e)
+            resources = node.own_resources
+            if resources is not None:
+                d, r = _apply_defaults_to_smask_groups(
+                    resources, non_dominant, icc_arrays, visited
+                )
+                defaults_added += d
+                images_replaced += r
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            logger.debug("Error applying defaults to %s resources: %s", node.kind, e)
 
     logger.debug(
         "Default color spaces: %d added, %d images replaced",
@@ -9,6 +9,7 @@ import logging
 import pikepdf
 from pikepdf import Array, Dictionary, Name, Pdf, Stream
 
+from ..content_cache import get_content_stream_cache
 from ..utils import iter_type3_fonts as _iter_type3_fonts
 from ..utils import resolve_indirect as _resolve_indirect
 from ._types import (
@@ -298,7 +299,8 @@ def _detect_colors_in_content_stream(
         analysis: ColorSpaceAnalysis to update with detected color spaces.
     """
     try:
-        for operands, operator in pikepdf.parse_content_stream(stream_or_page):
+        cache = get_content_stream_cache(stream_or_page)
+        for operands, operator in cache.instructions(stream_or_page):
             op_name = str(operator)
 
             if op_name in _GRAY_OPERATORS:
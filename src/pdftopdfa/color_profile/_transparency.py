@@ -9,6 +9,7 @@ import logging
 import pikepdf
 from pikepdf import Array, Dictionary, Name, Pdf, Stream
 
+from ..content_cache import get_content_stream_cache
 from ..utils import resolve_indirect as _resolve_indirect
 from ._profiles import _create_icc_colorspace
 from ._types import (
@@ -237,7 +238,7 @@ def _detect_page_dominant_cs(page) -> ColorSpaceType:
 
     # Parse content stream for color operators
     try:
-        for _operands, operator in pikepdf.parse_content_stream(page):
+        for _operands, operator in get_content_stream_cache(page).instructions(page):
             op_name = str(operator)
             if op_name in _CMYK_OPERATORS:
                 has_cmyk = True
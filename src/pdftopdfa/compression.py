@@ -0,0 +1,131 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Compression profiles for conversion output.
+
+A :class:`CompressionProfile` selects the speed/size trade-off of a
+conversion: the zlib level used for every stream that is compressed
+(streams rewritten by the sanitizers and streams QPDF encodes on save),
+and whether streams that were not modified are decoded and recompressed
+on save.
+
+Output streams are always compressed, and QPDF then decodes at least the
+generalized filters (ASCIIHex, ASCII85, LZW) of unmodified streams and
+writes them as Flate; profiles only choose whether existing Flate
+streams are recompressed as well.
+
+The level of a conversion is kept per context by
+:func:`compression_profile`, so conversions running in threads of one
+process do not see each other's level.  QPDF's own level is
+process-wide and cannot be passed per save, so :func:`qpdf_flate_level`
+sets it only around a save, one save at a time.
+"""
+
+import contextlib
+import enum
+import threading
+from collections.abc import Iterator
+from contextvars import ContextVar
+
+from pikepdf import settings as pikepdf_settings
+
+# zlib's default level, which is also QPDF's default.
+DEFAULT_FLATE_LEVEL = -1
+
+
+class CompressionProfile(enum.Enum):
+    """Compression presets controlling the speed/size trade-off.
+
+    Attributes:
+        FAST: Flate level 1; unmodified Flate streams are copied as they
+            are.
+        BALANCED: zlib's default level; unmodified Flate streams are
+            copied as they are (the default behavior).
+        MAX_COMPRESSION: Flate level 9; unmodified Flate streams are
+            decompressed and recompressed on save.
+    """
+
+    FAST = "fast"
+    BALANCED = "balanced"
+    MAX_COMPRESSION = "max-compression"
+
+
+COMPRESSION_SETTINGS: dict[CompressionProfile, dict] = {
+    CompressionProfile.FAST: {
+        "flate_level": 1,
+        "recompress_flate": False,
+    },
+    CompressionProfile.BALANCED: {
+        "flate_level": DEFAULT_FLATE_LEVEL,
+        "recompress_flate": False,
+    },
+    CompressionProfile.MAX_COMPRESSION: {
+        "flate_level": 9,
+        "recompress_flate": True,
+    },
+}
+
+_flate_level: ContextVar[int] = ContextVar("_flate_level", default=DEFAULT_FLATE_LEVEL)
+
+# Serializes saves that set QPDF's process-wide Flate level.
+_qpdf_level_lock = threading.Lock()
+
+
+def flate_level() -> int:
+    """Returns the zlib level of the active compression profile."""
+    return _flate_level.get()
+
+
+def _profile_level(profile: CompressionProfile | None) -> int:
+    return COMPRESSION_SETTINGS[profile or CompressionProfile.BALANCED]["flate_level"]
+
+
+def save_options(profile: CompressionProfile | None) -> dict:
+    """Returns the ``Pdf.save()`` keyword arguments of *profile*.
+
+    Args:
+        profile: Compression profile. If None, uses
+            CompressionProfile.BALANCED.
+    """
+    settings = COMPRESSION_SETTINGS[profile or CompressionProfile.BALANCED]
+    return {"recompress_flate": settings["recompress_flate"]}
+
+
+@contextlib.contextmanager
+def compression_profile(profile: CompressionProfile | None) -> Iterator[None]:
+    """Applies the Flate level of *profile* until the block exits.
+
+    The level is returned by :func:`flate_level` in this context (thread)
+    only.  Saves take the level from :func:`qpdf_flate_level`.
+
+    Args:
+        profile: Compression profile. If None, uses
+            CompressionProfile.BALANCED.
+    """
+    token = _flate_level.set(_profile_level(profile))
+    try:
+        yield
+    finally:
+        _flate_level.reset(token)
+
+
+@contextlib.contextmanager
+def qpdf_flate_level(profile: CompressionProfile | None) -> Iterator[None]:
+    """Sets QPDF's Flate level to that of *profile* for a save (thread-safe).
+
+    QPDF's level is process-wide and pikepdf cannot pass one per save, so
+    a lock serializes the blocks of concurrent threads.  Keep the block to
+    the ``Pdf.save()`` call itself.
+
+    Args:
+        profile: Compression profile. If None, uses
+            CompressionProfile.BALANCED.
+    """
+    level = _profile_level(profile)
+    with _qpdf_level_lock:
+        pikepdf_settings.set_flate_compression_level(level)
+        try:
+            yield
+        finally:
+            pikepdf_settings.set_flate_compression_level(DEFAULT_FLATE_LEVEL)
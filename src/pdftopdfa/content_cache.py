@@ -0,0 +1,383 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Shared cache of parsed content streams.
+
+A dozen sanitizers and analysis passes tokenize the same page and form
+XObject content streams with ``pikepdf.parse_content_stream``.  On
+text-heavy documents that tokenization dominates the run time.
+:class:`ContentStreamCache` parses every stream once, keyed by its objgen,
+and hands out the instruction list to all consumers.
+
+Entries are validated against a fingerprint of the stream's raw bytes and
+filter chain, so any ``write()`` that bypasses the cache invalidates the
+entry automatically.  Rewriters store new instructions with
+:meth:`ContentStreamCache.set_instructions`; inside an active scope the
+stream is serialized with ``unparse_content_stream`` only once, when the
+cache is flushed (at the latest when the scope ends).  Code that needs the
+decoded bytes of a content stream must go through
+:meth:`ContentStreamCache.read_bytes` / :meth:`ContentStreamCache.write_bytes`
+so that pending edits are not lost.
+
+Whether a stream shows text at all is answered by
+:meth:`ContentStreamCache.has_text` without parsing it (see
+:mod:`pdftopdfa.text_scan`).  Those answers are remembered per process,
+keyed by the stream fingerprint, so the OCR check before a conversion
+and the font passes during it scan each stream only once.
+
+During a conversion the cache is activated with :func:`content_stream_cache`;
+:func:`get_content_stream_cache` then returns the shared instance.  Outside
+an active scope it returns a write-through cache, so calling a sanitizer on
+its own behaves exactly as before.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+
+import pikepdf
+from pikepdf import Array, Dictionary, Object, Pdf, Stream
+
+from .text_scan import has_text_operators
+from .utils import PdfScopedRegistry, resolve_indirect, stream_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on clean (unmodified) entries kept in memory.  Entries with
+# pending edits are never evicted.
+DEFAULT_MAX_ENTRIES = 4096
+
+# Text scan results by stream fingerprint, shared by all documents.
+_MAX_TEXT_SCANS = 16384
+_text_scans: OrderedDict[tuple, bool] = OrderedDict()
+_text_scans_lock = threading.Lock()
+
+_TEXT_OPERATORS = frozenset(pikepdf.Operator(op) for op in ("Tj", "TJ", "'", '"'))
+
+
+@dataclass
+class _Entry:
+    """Cached parse result for one stream or multi-stream page."""
+
+    fingerprint: tuple
+    instructions: list
+    dirty: bool = False
+
+
+def _stream_has_text(stream: Stream) -> bool:
+    """Scan the decoded bytes of *stream* for text operators, memoized."""
+    fingerprint = stream_fingerprint(stream)
+    with _text_scans_lock:
+        found = _text_scans.get(fingerprint)
+        if found is not None:
+            _text_scans.move_to_end(fingerprint)
+            return found
+    found = has_text_operators(stream.read_bytes())
+    with _text_scans_lock:
+        _text_scans[fingerprint] = found
+        if len(_text_scans) > _MAX_TEXT_SCANS:
+            _text_scans.popitem(last=False)
+    return found
+
+
+def _cache_key(obj) -> tuple[int, int] | None:
+    """Return the objgen of an indirect object, or None for direct ones."""
+    objgen = getattr(obj, "objgen", (0, 0))
+    if objgen == (0, 0):
+        return None
+    return objgen
+
+
+class ContentStreamCache:
+    """Per-document cache of parsed content stream instructions.
+
+    Args:
+        pdf: Opened pikepdf PDF object, or None for a detached cache.
+        deferred: When True, :meth:`set_instructions` only records the new
+            instructions and serializes them on :meth:`flush`.  When False
+            every edit is written through immediately.
+        max_entries: Maximum number of clean entries to keep.
+    """
+
+    def __init__(
+        self,
+        pdf: Pdf | None,
+        *,
+        deferred: bool = False,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self._pdf = pdf
+        self._deferred = deferred
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[int, int], _Entry] = OrderedDict()
+        self._streams: dict[tuple[int, int], Stream] = {}
+        self.parses = 0
+        self.hits = 0
+        self.writes = 0
+
+    @property
+    def pdf(self) -> Pdf | None:
+        """The PDF this cache belongs to."""
+        return self._pdf
+
+    @property
+    def deferred(self) -> bool:
+        """Whether edits are serialized lazily on :meth:`flush`."""
+        return self._deferred
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def _lookup(self, key: tuple[int, int], fingerprint: tuple) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.fingerprint != fingerprint:
+            if entry.dirty:
+                logger.warning(
+                    "Content stream %s was rewritten directly; "
+                    "discarding pending cached edits",
+                    key,
+                )
+                self._streams.pop(key, None)
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def _store(self, key: tuple[int, int], entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) <= self._max_entries:
+            return
+        for old_key in list(self._entries):
+            if len(self._entries) <= self._max_entries:
+                break
+            if not self._entries[old_key].dirty:
+                del self._entries[old_key]
+
+    def _parse(self, owner) -> list:
+        self.parses += 1
+        return list(pikepdf.parse_content_stream(owner))
+
+    def _stream_instructions(self, stream: Stream) -> list:
+        key = _cache_key(stream)
+        if key is None:
+            return self._parse(stream)
+        fingerprint = stream_fingerprint(stream)
+        entry = self._lookup(key, fingerprint)
+        if entry is None:
+            entry = _Entry(fingerprint, self._parse(stream))
+            self._store(key, entry)
+        return entry.instructions
+
+    def _page_instructions(self, page_obj: Dictionary, contents: Array) -> list:
+        members = [resolve_indirect(item) for item in contents]
+        for member in members:
+            if isinstance(member, Stream):
+                self.flush(member)
+        key = _cache_key(page_obj)
+        if key is None:
+            return self._parse(page_obj)
+        fingerprint = tuple(
+            (_cache_key(member), stream_fingerprint(member))
+            for member in members
+            if isinstance(member, Stream)
+        )
+        entry = self._lookup(key, fingerprint)
+        if entry is None:
+            entry = _Entry(fingerprint, self._parse(page_obj))
+            self._store(key, entry)
+        return entry.instructions
+
+    def instructions(self, owner) -> list:
+        """Return the parsed instructions of a content stream owner.
+
+        *owner* may be a content stream, a ``pikepdf.Page`` or a page
+        dictionary.  Pages whose ``/Contents`` is an array are parsed as
+        one concatenated stream, exactly like ``parse_content_stream``.
+
+        The returned list is a copy and may be modified freely; the
+        instruction objects themselves are shared, so callers that rewrite
+        operands must store the result with :meth:`set_instructions`.
+
+        Raises:
+            pikepdf.PdfError: If the content stream cannot be parsed.
+        """
+        if isinstance(owner, pikepdf.Page):
+            owner = owner.obj
+        if isinstance(owner, Stream):
+            return list(self._stream_instructions(owner))
+        contents = owner.get("/Contents") if isinstance(owner, Dictionary) else None
+        contents = resolve_indirect(contents)
+        if isinstance(contents, Stream):
+            return list(self._stream_instructions(contents))
+        if isinstance(contents, Array):
+            return list(self._page_instructions(owner, contents))
+        return self._parse(owner)
+
+    def has_text(self, owner) -> bool:
+        """Return True if the content of *owner* shows text.
+
+        *owner* may be a content stream, a ``pikepdf.Page`` or a page
+        dictionary.  Streams with pending edits are judged by their cached
+        instructions; all others are scanned without being parsed.
+
+        Raises:
+            pikepdf.PdfError: If a content stream cannot be decoded.
+        """
+        if isinstance(owner, pikepdf.Page):
+            owner = owner.obj
+        if isinstance(owner, Stream):
+            streams = [owner]
+        else:
+            contents = resolve_indirect(owner.get("/Contents"))
+            if isinstance(contents, Stream):
+                streams = [contents]
+            elif isinstance(contents, Array):
+                streams = [resolve_indirect(item) for item in contents]
+            else:
+                return False
+
+        for stream in streams:
+            if not isinstance(stream, Stream):
+                continue
+            key = _cache_key(stream)
+            if key is not None and key in self._streams:
+                entry = self._entries.get(key)
+                if entry is not None and any(
+                    operator in _TEXT_OPERATORS
+                    for _operands, operator in entry.instructions
+                ):
+                    return True
+                continue
+            if _stream_has_text(stream):
+                return True
+        return False
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def set_instructions(self, stream: Stream, instructions: list) -> None:
+        """Replace the content of *stream* with *instructions*.
+
+        In deferred mode the stream is serialized on the next
+        :meth:`flush`; otherwise it is written immediately.
+        """
+        key = _cache_key(stream)
+        instructions = list(instructions)
+        if key is None or not self._deferred:
+            self._write(stream, pikepdf.unparse_content_stream(instructions))
+            if key is not None:
+                self._store(key, _Entry(stream_fingerprint(stream), instructions))
+            return
+        self._store(key, _Entry(stream_fingerprint(stream), instructions, dirty=True))
+        self._streams[key] = stream
+
+    def read_bytes(self, stream: Stream) -> bytes:
+        """Return the decoded bytes of *stream*, including pending edits."""
+        self.flush(stream)
+        return stream.read_bytes()
+
+    def write_bytes(self, stream: Stream, data: bytes) -> None:
+        """Write *data* to *stream* and drop its cached instructions."""
+        key = _cache_key(stream)
+        if key is not None:
+            self._entries.pop(key, None)
+            self._streams.pop(key, None)
+        self._write(stream, data)
+
+    def note_reencoded(self, stream: Stream) -> None:
+        """Refresh the fingerprint after *stream* was re-encoded in place.
+
+        Use this when the encoded bytes changed but the decoded content did
+        not (e.g. after dropping a filter), so the parsed instructions stay
+        valid.
+        """
+        key = _cache_key(stream)
+        entry = self._entries.get(key) if key is not None else None
+        if entry is not None and not entry.dirty:
+            entry.fingerprint = stream_fingerprint(stream)
+
+    def _write(self, stream: Stream, data: bytes) -> None:
+        self.writes += 1
+        stream.write(data)
+
+    def flush(self, stream: Stream | None = None) -> int:
+        """Serialize pending edits.
+
+        Args:
+            stream: Flush only this stream.  Flushes every pending edit
+                when None.
+
+        Returns:
+            Number of streams written.
+        """
+        if stream is not None:
+            key = _cache_key(stream)
+            keys = [key] if key in self._streams else []
+        else:
+            keys = list(self._streams)
+
+        written = 0
+        for key in keys:
+            target = self._streams.pop(key)
+            entry = self._entries.get(key)
+            if entry is None or not entry.dirty:
+                continue
+            self._write(target, pikepdf.unparse_content_stream(entry.instructions))
+            entry.fingerprint = stream_fingerprint(target)
+            entry.dirty = False
+            written += 1
+        return written
+
+
+_registry: PdfScopedRegistry[ContentStreamCache] = PdfScopedRegistry(
+    lambda pdf: ContentStreamCache(pdf, deferred=True),
+    on_exit=ContentStreamCache.flush,
+)
+
+
+def content_stream_cache(pdf: Pdf) -> AbstractContextManager[ContentStreamCache]:
+    """Activate a shared :class:`ContentStreamCache` for *pdf*.
+
+    Nested scopes for the same PDF reuse the outer cache.  Pending edits
+    are flushed when the outermost scope ends without an exception.
+
+    Args:
+        pdf: Opened pikepdf PDF object.
+
+    Returns:
+        Context manager yielding the active cache.
+    """
+    return _registry.activate(pdf)
+
+
+def get_content_stream_cache(owner: Pdf | Object) -> ContentStreamCache:
+    """Return the active cache for a PDF, or a write-through one.
+
+    Args:
+        owner: Opened pikepdf PDF object, or any object owned by it (e.g.
+            the content stream itself) for helpers that have no ``Pdf``
+            at hand.
+
+    Returns:
+        A :class:`ContentStreamCache` for the owning PDF.
+    """
+    if isinstance(owner, Pdf):
+        return _registry.get(owner)
+    if isinstance(owner, pikepdf.Page):
+        owner = owner.obj
+    cache = _registry.lookup_owner(owner)
+    if cache is not None:
+        return cache
+    return ContentStreamCache(None)
@@ -7,21 +7,37 @@
 # Standard Library
 import logging
 import os
+import re
+import secrets
 import shutil
 import tempfile
 import threading
 import time
-from collections.abc import Callable
-from dataclasses import dataclass, field
+from collections.abc import Callable, Iterable, Iterator, Sized
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from io import BytesIO
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, BinaryIO
 
 # Third Party
 import pikepdf
 from tqdm import tqdm
 
 # Local
+from .batch import DEFAULT_MAX_TASKS_PER_WORKER, run_in_workers
 from .color_profile import embed_color_profiles
+from .compression import (
+    CompressionProfile,
+    compression_profile,
+    qpdf_flate_level,
+    save_options,
+)
+from .content_cache import content_stream_cache
+from .cpu_budget import get_cpu_limit
+from .dedup import deduplicate_streams
+from .document_index import document_index
 from .exceptions import (
     ConversionError,
     FontEmbeddingError,
@@ -31,14 +47,23 @@ from .exceptions import (
 )
 from .extensions import add_extensions_if_needed
 from .fonts import check_font_compliance
+from .fonts.program_cache import font_program_cache
 from .metadata import sync_metadata
-from .sanitizers import sanitize_for_pdfa, sanitize_structure_limits
+from .resource_graph import resource_graph
+from .sanitizers import (
+    EmbeddedPdfLimits,
+    embedded_pdf_limits,
+    sanitize_for_pdfa,
+    sanitize_structure_limits,
+)
 from .utils import get_required_pdf_version, is_pdf_encrypted, validate_pdfa_level
 from .validator import detect_iso_standards, detect_pdfa_level
-from .verapdf import validate_with_verapdf
+from .verapdf import is_verapdf_available, validate_with_verapdf
 
 if TYPE_CHECKING:
-    from .ocr import OcrQuality
+    from .journal import ConversionJournal
+    from .ocr import OcrPreprocess, OcrQuality
+    from .result_cache import ResultCache
 
 logger = logging.getLogger(__name__)
 
@@ -179,8 +204,9 @@ class ConversionResult:
 
     Attributes:
         success: True if the conversion was successful.
-        input_path: Path to the input PDF.
-        output_path: Path to the output PDF/A.
+        input_path: Path to the input PDF (None for in-memory conversions).
+        output_path: Path to the output PDF/A (None for in-memory
+            conversions).
         level: PDF/A conformance level used.
         warnings: List of warnings during conversion.
         processing_time: Processing time in seconds.
@@ -189,14 +215,22 @@ class ConversionResult:
     """
 
     success: bool
-    input_path: Path
-    output_path: Path
+    input_path: Path | None
+    output_path: Path | None
     level: str
     warnings: list[str] = field(default_factory=list)
     processing_time: float = 0.0
     error: str | None = None
     validation_failed: bool = False
 
+    def to_dict(self) -> dict:
+        """Returns the result as a JSON-serializable dictionary."""
+        data = asdict(self)
+        for key in ("input_path", "output_path"):
+            if data[key] is not None:
+                data[key] = str(data[key])
+        return data
+
 
 def generate_output_path(
     input_path: Path,
@@ -217,29 +251,125 @@ def generate_output_path(
     return input_path.parent / output_name
 
 
-def _truncate_trailing_data(output_path: Path) -> bool:
-    """Remove data after the last ``%%EOF`` marker (ISO 19005-2, 6.1.3).
+def _make_temp_output_path(output_path: Path) -> Path:
+    """Creates an empty temporary file next to *output_path*.
 
-    PDF/A requires that no data follows the final ``%%EOF`` marker apart
-    from an optional single end-of-line sequence.
+    The file lives in the same directory so that it can be moved into
+    place with an atomic ``os.replace()``.  Unlike ``tempfile.mkstemp()``
+    it is created with the default (umask) permissions, which the final
+    output keeps.
 
     Args:
-        output_path: Path to the saved PDF file.
+        output_path: Final output path.
 
     Returns:
-        ``True`` if the file was modified, ``False`` otherwise.
+        Path of the temporary file.
+    """
+    while True:
+        temp_path = output_path.with_name(
+            f".{output_path.stem}_{secrets.token_hex(6)}.tmp"
+        )
+        try:
+            with temp_path.open("xb"):
+                return temp_path
+        except FileExistsError:
+            continue
+
+
+def _result_cache_key(
+    cache: "ResultCache",
+    input_path: Path,
+    level: str,
+    *,
+    validate: bool,
+    ocr_languages: list[str] | None,
+    ocr_quality: "OcrQuality | None",
+    ocr_preprocess: "OcrPreprocess | None",
+    ocr_force: bool,
+    convert_calibrated: bool,
+    compress_structure: bool,
+    compression: CompressionProfile | None,
+    embedded_limits: EmbeddedPdfLimits | None = None,
+) -> str:
+    """Computes the result cache key of a convert_to_pdfa() call.
+
+    OCR settings only take part in the key when OCR is enabled, and an
+    unset quality, preprocessing mode or compression profile is keyed as
+    the setting it resolves to.  Of the embedded PDF limits, the worker
+    count does not affect the output and is not keyed.
     """
+    embedded = embedded_limits or EmbeddedPdfLimits()
+    ocr_options = None
+    if ocr_languages is not None:
+        from .ocr import OcrQuality, get_ocr_preprocess
+
+        quality = ocr_quality if ocr_quality is not None else OcrQuality.DEFAULT
+        if ocr_preprocess is None:
+            ocr_preprocess = get_ocr_preprocess(quality)
+        ocr_options = {
+            "languages": list(ocr_languages),
+            "quality": quality.value,
+            "preprocess": ocr_preprocess.value,
+            "force": ocr_force,
+        }
+    return cache.key(
+        input_path,
+        level,
+        validate=validate,
+        ocr=ocr_options,
+        convert_calibrated=convert_calibrated,
+        compress_structure=compress_structure,
+        compression=(compression or CompressionProfile.BALANCED).value,
+        embedded={
+            "max_depth": embedded.max_depth,
+            "time_budget": embedded.time_budget,
+        },
+    )
+
+
+def _store_result(
+    cache: "ResultCache", key: str, result: ConversionResult
+) -> ConversionResult:
+    """Adds a successful result to *cache*; failures to store are logged."""
+    metadata = {
+        "level": result.level,
+        "warnings": result.warnings,
+        "validation_failed": result.validation_failed,
+    }
     try:
-        data = output_path.read_bytes()
-    except Exception as e:
-        logger.warning("Could not read file for %%%%EOF check: %s", e)
-        return False
+        cache.store(key, result.output_path, metadata)
+    except OSError as e:
+        logger.warning("Could not store result in cache: %s", e)
+    return result
+
+
+# Bytes of a saved file inspected by the post-save checks: the header
+# (with the binary comment line) and the tail (with %%EOF and startxref).
+_HEADER_PROBE_SIZE = 64
+_TAIL_PROBE_SIZE = 1024
+
+# Binary comment bytes written by QPDF, reused when patching a header.
+_BINARY_COMMENT = b"\xbf\xf7\xa2\xfe"
+
+_STARTXREF_RE = re.compile(rb"startxref\s+(\d+)")
+_PDF_STRING = rb"(?:<[0-9A-Fa-f\s]*>|\((?:\\.|[^\\)])*\))"
+_TRAILER_ID_RE = re.compile(rb"/ID\s*\[\s*" + _PDF_STRING + rb"\s*" + _PDF_STRING)
+
 
+def _eof_cut(data: bytes) -> int | None:
+    """Returns the offset just after the last ``%%EOF`` and its EOL.
+
+    Args:
+        data: File contents (or a tail of them).
+
+    Returns:
+        Offset in *data* where trailing data starts, or None if *data*
+        contains no ``%%EOF`` marker.
+    """
     eof_marker = b"%%EOF"
     last_eof = data.rfind(eof_marker)
     if last_eof == -1:
-        logger.warning("No %%%%EOF marker found in output file")
-        return False
+        return None
 
     # Allow %%EOF + optional single EOL
     cut = last_eof + len(eof_marker)
@@ -248,49 +378,88 @@ def _truncate_trailing_data(output_path: Path) -> bool:
             cut += 2
         elif data[cut : cut + 1] in (b"\n", b"\r"):
             cut += 1
+    return cut
 
-    if cut >= len(data):
-        return False  # No trailing data
 
-    trailing = len(data) - cut
-    logger.debug("Truncating %d byte(s) after %%%%EOF (ISO 19005-2, 6.1.3)", trailing)
-    try:
-        output_path.write_bytes(data[:cut])
-    except Exception as e:
-        logger.warning("Could not truncate trailing data: %s", e)
-        return False
+def _read_tail(f: BinaryIO, size: int) -> tuple[bytes, int]:
+    """Reads the end of a file, enough to contain its last ``%%EOF``.
 
-    return True
+    Returns:
+        ``(tail, tail_start)``; the whole file is read if the last
+        :data:`_TAIL_PROBE_SIZE` bytes hold no ``%%EOF`` marker.
+    """
+    tail_start = max(0, size - _TAIL_PROBE_SIZE)
+    f.seek(tail_start)
+    tail = f.read()
+    if tail_start > 0 and _eof_cut(tail) is None:
+        f.seek(0)
+        return f.read(), 0
+    return tail, tail_start
 
 
-def _ensure_binary_comment(output_path: Path, required_version: str) -> bool:
-    """Ensure the PDF header includes a binary comment line (ISO 19005-2, 6.1.2).
+def _truncate_tail(f: BinaryIO, tail: bytes, tail_start: int) -> bytes:
+    """Truncates data after the last ``%%EOF`` (ISO 19005-2, 6.1.3).
+
+    Args:
+        f: File opened for reading and writing.
+        tail: End of the file as returned by :func:`_read_tail`.
+        tail_start: Offset of *tail* in the file.
+
+    Returns:
+        The tail without the removed bytes.
+    """
+    cut = _eof_cut(tail)
+    if cut is None:
+        logger.warning("No %%%%EOF marker found in output file")
+        return tail
+    if cut < len(tail):
+        logger.debug(
+            "Truncating %d byte(s) after %%%%EOF (ISO 19005-2, 6.1.3)",
+            len(tail) - cut,
+        )
+        f.truncate(tail_start + cut)
+    return tail[:cut]
 
-    The PDF/A specification requires a comment containing at least four
-    bytes with values > 127 to signal that the file is binary.  If the
-    comment is missing, the file is re-saved through pikepdf (which always
-    produces a valid binary comment via QPDF).
+
+def _truncate_trailing_data(output_path: Path) -> bool:
+    """Remove data after the last ``%%EOF`` marker (ISO 19005-2, 6.1.3).
+
+    PDF/A requires that no data follows the final ``%%EOF`` marker apart
+    from an optional single end-of-line sequence.  Only the end of the
+    file is read, and the file is truncated in place.
 
     Args:
         output_path: Path to the saved PDF file.
-        required_version: PDF version string for re-save (e.g. ``"1.7"``).
 
     Returns:
         ``True`` if the file was modified, ``False`` otherwise.
     """
     try:
-        with open(output_path, "rb") as f:
-            header = f.read(64)
+        with open(output_path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            tail, tail_start = _read_tail(f, size)
+            return len(_truncate_tail(f, tail, tail_start)) < len(tail)
     except Exception as e:
-        logger.warning("Could not read header for binary comment check: %s", e)
+        logger.warning("Could not truncate trailing data: %s", e)
         return False
 
+
+def _has_binary_comment(header: bytes) -> bool:
+    """Checks for a binary comment on the second line (ISO 19005-2, 6.1.2).
+
+    Args:
+        header: First bytes of the file.
+
+    Returns:
+        ``True`` if the comment has at least four bytes above 127.
+    """
     # Locate end of first line (%PDF-x.y)
     nl = header.find(b"\n")
     if nl == -1:
         nl = header.find(b"\r")
     if nl == -1:
-        return False
+        # Not a PDF header; nothing a re-save could fix
+        return True
 
     after = nl + 1
     if after < len(header) and header[after : after + 1] == b"%":
@@ -302,7 +471,70 @@ def _ensure_binary_comment(output_path: Path, required_version: str) -> bool:
         if comment_line.endswith(b"\r"):
             comment_line = comment_line[:-1]
         if sum(1 for b in comment_line if b > 127) >= 4:
-            return False  # Already has valid binary comment
+            return True
+    return False
+
+
+def _patch_binary_comment(f: BinaryIO, header: bytes) -> bytes | None:
+    """Makes the comment on the second line binary, in place.
+
+    A comment line of at least four bytes is given four bytes above 127
+    by overwriting its first bytes, which changes no offsets in the file.
+
+    Args:
+        f: Saved PDF, opened for reading and writing.
+        header: First bytes of the file.
+
+    Returns:
+        The patched header, or None if the file has no comment line long
+        enough and must be re-saved.
+    """
+    nl = header.find(b"\n")
+    if nl == -1:
+        nl = header.find(b"\r")
+    comment_start = nl + 2
+    if nl == -1 or header[nl + 1 : comment_start] != b"%":
+        return None
+    comment = header[comment_start : comment_start + len(_BINARY_COMMENT)]
+    if len(comment) < len(_BINARY_COMMENT) or b"\n" in comment or b"\r" in comment:
+        return None
+
+    logger.debug("Patching binary comment in place (ISO 19005-2, 6.1.2)")
+    f.seek(comment_start)
+    f.write(_BINARY_COMMENT)
+    return (
+        header[:comment_start]
+        + _BINARY_COMMENT
+        + header[comment_start + len(_BINARY_COMMENT) :]
+    )
+
+
+def _ensure_binary_comment(output_path: Path, required_version: str) -> bool:
+    """Ensure the PDF header includes a binary comment line (ISO 19005-2, 6.1.2).
+
+    The PDF/A specification requires a comment containing at least four
+    bytes with values > 127 to signal that the file is binary.  An
+    existing comment line is patched in place; only if the file has none
+    is it re-saved through pikepdf (which always produces a valid binary
+    comment via QPDF).
+
+    Args:
+        output_path: Path to the saved PDF file.
+        required_version: PDF version string for re-save (e.g. ``"1.7"``).
+
+    Returns:
+        ``True`` if the file was modified, ``False`` otherwise.
+    """
+    try:
+        with open(output_path, "r+b") as f:
+            header = f.read(_HEADER_PROBE_SIZE)
+            if _has_binary_comment(header):
+                return False
+            if _patch_binary_comment(f, header) is not None:
+                return True
+    except Exception as e:
+        logger.warning("Could not read header for binary comment check: %s", e)
+        return False
 
     # Re-save through pikepdf — QPDF always writes a binary comment.
     logger.debug("Re-saving to add binary comment (ISO 19005-2, 6.1.2)")
@@ -329,24 +561,35 @@ def _ensure_binary_comment(output_path: Path, required_version: str) -> bool:
     return True
 
 
-def _verify_file_structure(output_path: Path, required_version: str) -> None:
-    """Lightweight post-save verification of PDF file structure.
-
-    Checks that the output file has the expected PDF header and a /ID
-    array in the trailer.  Logs warnings on failure but does not
-    raise — the file may still be valid.
+def _read_xref_section(f: BinaryIO, tail: bytes, tail_start: int) -> bytes | None:
+    """Reads the last cross-reference section and trailer of a file.
 
     Args:
-        output_path: Path to the saved PDF file.
-        required_version: Expected PDF version string (e.g. ``"1.7"``).
-    """
-    try:
-        with open(output_path, "rb") as f:
-            header = f.read(20)
-    except Exception as e:
-        logger.warning("Post-save verification: could not read file: %s", e)
-        return
+        f: Open file.
+        tail: End of the file as returned by :func:`_read_tail`.
+        tail_start: Offset of *tail* in the file.
 
+    Returns:
+        The bytes from the offset named by the last ``startxref`` to the
+        end of the file, or None if there is no usable ``startxref``.
+    """
+    matches = list(_STARTXREF_RE.finditer(tail))
+    if not matches:
+        return None
+    offset = int(matches[-1].group(1))
+    if offset >= tail_start:
+        return tail[offset - tail_start :]
+    f.seek(offset)
+    return f.read()
+
+
+def _check_file_structure(
+    header: bytes, xref_section: bytes | None, required_version: str
+) -> None:
+    """Checks the header version and trailer /ID of saved file bytes.
+
+    Logs warnings on failure but does not raise.
+    """
     # 1. Check header starts with %PDF-<version>
     expected_header = f"%PDF-{required_version}".encode("ascii")
     if not header.startswith(expected_header):
@@ -358,30 +601,123 @@ def _verify_file_structure(output_path: Path, required_version: str) -> None:
             expected_header.decode("ascii"),
         )
 
-    # 2. Check trailer /ID
+    # 2. Check trailer /ID (in the trailer dictionary, or in the
+    # dictionary of a cross-reference stream)
+    if xref_section is None:
+        logger.warning("Post-save verification: startxref not found")
+        return
+    if not xref_section.startswith(b"xref"):
+        stream_start = xref_section.find(b"stream")
+        if stream_start != -1:
+            xref_section = xref_section[:stream_start]
+    if _TRAILER_ID_RE.search(xref_section) is None:
+        logger.warning(
+            "Post-save verification: trailer /ID missing or does not have 2 elements"
+        )
+
+
+def _verify_file_structure(output_path: Path, required_version: str) -> None:
+    """Lightweight post-save verification of PDF file structure.
+
+    Checks that the output file has the expected PDF header and a /ID
+    array in the trailer.  Only the header and the last cross-reference
+    section are read.  Logs warnings on failure but does not raise — the
+    file may still be valid.
+
+    Args:
+        output_path: Path to the saved PDF file.
+        required_version: Expected PDF version string (e.g. ``"1.7"``).
+    """
     try:
-        with pikepdf.open(output_path) as check_pdf:
-            id_array = check_pdf.trailer.get("/ID")
-            if id_array is None or len(id_array) != 2:
-                logger.warning(
-                    "Post-save verification: trailer /ID missing or "
-                    "does not have 2 elements"
-                )
+        with open(output_path, "rb") as f:
+            header = f.read(_HEADER_PROBE_SIZE)
+            size = f.seek(0, os.SEEK_END)
+            tail, tail_start = _read_tail(f, size)
+            xref_section = _read_xref_section(f, tail, tail_start)
     except Exception as e:
-        logger.warning("Post-save verification: could not reopen file: %s", e)
+        logger.warning("Post-save verification: could not read file: %s", e)
+        return
+
+    _check_file_structure(header, xref_section, required_version)
+
+
+def _harden_saved_stream(f: BinaryIO, required_version: str, *, verify: bool) -> bool:
+    """Post-save file structure hardening (ISO 19005-2, 6.1.2/6.1.3).
+
+    Combines the checks of :func:`_ensure_binary_comment`,
+    :func:`_truncate_trailing_data` and, if *verify* is set,
+    :func:`_verify_file_structure` on one open file or buffer: the header
+    and the tail of the bytes just written are read once, and a missing
+    binary comment is patched and trailing data truncated in place.
+
+    Args:
+        f: Saved PDF, opened for reading and writing.
+        required_version: PDF version string (e.g. ``"1.7"``).
+        verify: If True, also run the post-save structure verification.
+
+    Returns:
+        ``False`` if the binary comment is missing and cannot be patched
+        in place, in which case nothing was done and the file must be
+        re-saved; ``True`` otherwise.
+    """
+    f.seek(0)
+    header = f.read(_HEADER_PROBE_SIZE)
+    if not _has_binary_comment(header):
+        header = _patch_binary_comment(f, header)
+        if header is None:
+            return False
+    size = f.seek(0, os.SEEK_END)
+    tail, tail_start = _read_tail(f, size)
+    tail = _truncate_tail(f, tail, tail_start)
+    if verify:
+        xref_section = _read_xref_section(f, tail, tail_start)
+        _check_file_structure(header, xref_section, required_version)
+    return True
+
+
+def _harden_saved_file(
+    output_path: Path, required_version: str, *, verify: bool
+) -> None:
+    """Runs :func:`_harden_saved_stream` on a saved file.
+
+    Args:
+        output_path: Path to the saved PDF file.
+        required_version: PDF version string (e.g. ``"1.7"``).
+        verify: If True, also run the post-save structure verification.
+    """
+    with open(output_path, "r+b") as f:
+        if _harden_saved_stream(f, required_version, verify=verify):
+            return
 
+    # Rare: the writer omitted the binary comment; re-save, then check
+    # the new file.
+    _ensure_binary_comment(output_path, required_version)
+    _truncate_trailing_data(output_path)
+    if verify:
+        _verify_file_structure(output_path, required_version)
 
-def _has_annotations(pdf_path: Path) -> bool:
+
+@contextmanager
+def _opened(source: pikepdf.Pdf | Path) -> Iterator[pikepdf.Pdf]:
+    """Yields *source* if it is an open Pdf, else opens (and closes) it."""
+    if isinstance(source, pikepdf.Pdf):
+        yield source
+    else:
+        with pikepdf.open(source) as pdf:
+            yield pdf
+
+
+def _has_annotations(source: pikepdf.Pdf | Path) -> bool:
     """Check whether any page in the PDF contains annotations.
 
     Args:
-        pdf_path: Path to the PDF file.
+        source: Open PDF or path to the PDF file.
 
     Returns:
         ``True`` if at least one page has a non-empty ``/Annots`` array.
     """
     try:
-        with pikepdf.open(pdf_path) as pdf:
+        with _opened(source) as pdf:
             for page in pdf.pages:
                 try:
                     annots = page.get("/Annots")
@@ -394,45 +730,50 @@ def _has_annotations(pdf_path: Path) -> bool:
     return False
 
 
-def _strip_annotations_for_ocr(input_path: Path, clean_path: Path) -> bool:
+def _strip_annotations_for_ocr(source: pikepdf.Pdf | Path, clean_path: Path) -> bool:
     """Remove all annotations from a PDF for clean OCR processing.
 
     Strips ``/Annots`` from every page and ``/AcroForm`` from the document
     root so that annotation appearance streams are not rasterized into page
-    images during OCR.
+    images during OCR.  An open *source* is left unchanged: the entries
+    are put back after the cleaned copy has been saved.
 
     Args:
-        input_path: Path to the original PDF.
+        source: Open original PDF or path to it.
         clean_path: Path where the cleaned PDF will be saved.
 
     Returns:
         ``True`` if any annotations were removed, ``False`` otherwise.
     """
     try:
-        removed = False
-        with pikepdf.open(input_path) as pdf:
-            for page in pdf.pages:
-                try:
-                    annots = page.get("/Annots")
-                    if annots is not None and len(annots) > 0:
-                        del page["/Annots"]
-                        removed = True
-                except Exception:
-                    continue
-
-            if "/AcroForm" in pdf.Root:
-                del pdf.Root["/AcroForm"]
-                removed = True
-
-            pdf.save(clean_path)
-        return removed
+        with _opened(source) as pdf:
+            stripped: list[tuple[pikepdf.Dictionary, str, object]] = []
+            try:
+                for page in pdf.pages:
+                    try:
+                        annots = page.obj.get("/Annots")
+                        if annots is not None and len(annots) > 0:
+                            stripped.append((page.obj, "/Annots", annots))
+                            del page.obj["/Annots"]
+                    except Exception:
+                        continue
+
+                if "/AcroForm" in pdf.Root:
+                    stripped.append((pdf.Root, "/AcroForm", pdf.Root.AcroForm))
+                    del pdf.Root["/AcroForm"]
+
+                pdf.save(clean_path)
+            finally:
+                for dictionary, key, value in stripped:
+                    dictionary[key] = value
+        return bool(stripped)
     except Exception as exc:
         logger.warning("Could not strip annotations for OCR: %s", exc)
         return False
 
 
 def _restore_annotations_after_ocr(
-    original_path: Path, ocr_path: Path, output_path: Path
+    original: pikepdf.Pdf | Path, ocr_path: Path, output_path: Path
 ) -> int:
     """Re-inject original annotations into an OCR-processed PDF.
 
@@ -441,7 +782,8 @@ def _restore_annotations_after_ocr(
     OCR output via ``copy_foreign``.  Also restores ``/AcroForm`` if present.
 
     Args:
-        original_path: Path to the original PDF (with annotations).
+        original: Open original PDF (with annotations) or path to it.  An
+            open PDF is not closed.
         ocr_path: Path to the OCR-processed PDF (without annotations).
         output_path: Path where the merged result will be saved.
 
@@ -451,7 +793,10 @@ def _restore_annotations_after_ocr(
     original_pdf = None
     ocr_pdf = None
     try:
-        original_pdf = pikepdf.open(original_path)
+        if isinstance(original, pikepdf.Pdf):
+            original_pdf = original
+        else:
+            original_pdf = pikepdf.open(original)
         ocr_pdf = pikepdf.open(ocr_path)
 
         if len(original_pdf.pages) != len(ocr_pdf.pages):
@@ -502,7 +847,7 @@ def _restore_annotations_after_ocr(
         logger.warning("Could not restore annotations after OCR: %s", exc)
         return 0
     finally:
-        if original_pdf is not None:
+        if original_pdf is not None and original_pdf is not original:
             try:
                 original_pdf.close()
             except Exception:
@@ -514,289 +859,376 @@ def _restore_annotations_after_ocr(
                 pass
 
 
-def convert_to_pdfa(
-    input_path: Path,
-    output_path: Path,
-    level: str = "3b",
-    *,
-    validate: bool = False,
-    ocr_languages: list[str] | None = None,
-    ocr_quality: "OcrQuality | None" = None,
-    ocr_force: bool = False,
-    convert_calibrated: bool = True,
-) -> ConversionResult:
-    """Converts a PDF file to the PDF/A format.
+@contextmanager
+def _conversion_errors() -> Iterator[None]:
+    """Maps unexpected errors of a conversion to ConversionError."""
+    try:
+        yield
+    except pikepdf.PdfError as e:
+        error_msg = f"PDF processing error: {e}"
+        logger.error(error_msg)
+        raise ConversionError(error_msg) from e
+
+    except (UnsupportedPDFError, FontEmbeddingError, OCRError):
+        # Re-raise specific errors unchanged
+        raise
+
+    except ConversionError:
+        # Re-raise ConversionError unchanged
+        raise
+
+    except Exception as e:
+        error_msg = f"Unexpected error during conversion: {e}"
+        logger.error(error_msg)
+        raise ConversionError(error_msg) from e
+
+
+def _embedded_limits_scope(
+    limits: EmbeddedPdfLimits | None,
+) -> AbstractContextManager[None]:
+    """Applies *limits* to embedded PDF conversions; None keeps the active ones."""
+    if limits is None:
+        return nullcontext()
+    return embedded_pdf_limits(**asdict(limits))
+
+
+def _claimed_pdfa_level(pdf: pikepdf.Pdf, level: str, label: object) -> str | None:
+    """Rejects encrypted inputs and detects a claimed PDF/A level.
 
     Args:
-        input_path: Path to the input PDF.
-        output_path: Path for the output PDF/A.
-        level: PDF/A conformance level ('2b' or '3b').
-        validate: If True, the result is validated.
-        ocr_languages: Optional list of Tesseract language codes
-            (e.g., ``["deu", "eng"]``).  If specified, OCR is applied to
-            image-based pages.
-        ocr_quality: OCR quality preset. If None, uses OcrQuality.DEFAULT.
-        ocr_force: If True, force OCR even on pages that already contain
-            text by using ocrmypdf's ``redo_ocr`` mode.
+        pdf: The open input.
+        level: Target PDF/A level.
+        label: Input name for error messages.
 
     Returns:
-        ConversionResult with status and details.
+        The PDF/A level the input claims if it is the same as or higher
+        than *level*, else None.
 
     Raises:
-        ConversionError: If conversion fails.
-        UnsupportedPDFError: If the PDF is not supported.
-        FontEmbeddingError: If fonts cannot be embedded.
+        UnsupportedPDFError: If the PDF is encrypted.
     """
-    level = validate_pdfa_level(level)
-    start_time = time.perf_counter()
-    warnings: list[str] = []
-    ocr_temp_file: Path | None = None
-    pdf: pikepdf.Pdf | None = None
-
-    logger.info(
-        "Starting conversion: %s -> %s (PDF/A-%s)",
-        input_path,
-        output_path,
+    if is_pdf_encrypted(pdf):
+        raise UnsupportedPDFError(f"PDF is encrypted and cannot be converted: {label}")
+
+    detected_level = detect_pdfa_level(pdf)
+    if detected_level is None:
+        return None
+    if _compare_pdfa_levels(detected_level, level) >= 0:  # Same or higher level
+        return detected_level
+    logger.debug(
+        "PDF is PDF/A-%s, converting to PDF/A-%s",
+        detected_level,
         level,
     )
+    return None
 
-    try:
-        # 0. Check if PDF is already PDF/A compliant (before OCR)
-        with pikepdf.open(input_path) as check_pdf:
-            if is_pdf_encrypted(check_pdf):
-                raise UnsupportedPDFError(
-                    f"PDF is encrypted and cannot be converted: {input_path}"
-                )
-            detected_level = detect_pdfa_level(check_pdf)
 
-        if detected_level is not None:
-            level_cmp = _compare_pdfa_levels(detected_level, level)
+def _verapdf_confirms(path: Path, detected_level: str) -> bool:
+    """Checks with veraPDF that an input claiming PDF/A is valid.
 
-            if level_cmp >= 0:  # Same or higher level
-                try:
-                    verapdf_result = validate_with_verapdf(
-                        input_path, flavour=detected_level
-                    )
-                except VeraPDFError:
-                    logger.debug("veraPDF not available, skipping pre-check")
-                    verapdf_result = None
+    Returns:
+        True if veraPDF is available and reports the file as compliant.
+    """
+    try:
+        verapdf_result = validate_with_verapdf(path, flavour=detected_level)
+    except VeraPDFError:
+        logger.debug("veraPDF not available, skipping pre-check")
+        return False
 
-                if verapdf_result is not None and verapdf_result.compliant:
-                    processing_time = time.perf_counter() - start_time
-                    logger.info(
-                        "Skipping conversion: PDF is already valid PDF/A-%s",
-                        detected_level,
-                    )
-                    if input_path.resolve() != output_path.resolve():
-                        output_path.parent.mkdir(parents=True, exist_ok=True)
-                        if output_path.exists():
-                            raise ConversionError(
-                                f"Output file already exists: {output_path}"
-                            )
-                        shutil.copy2(str(input_path), str(output_path))
-                    return ConversionResult(
-                        success=True,
-                        input_path=input_path,
-                        output_path=output_path,
-                        level=detected_level,
-                        warnings=["Conversion skipped: PDF already valid PDF/A"],
-                        processing_time=processing_time,
-                    )
-                elif verapdf_result is not None:
-                    logger.info(
-                        "PDF claims PDF/A-%s but validation failed, converting",
-                        detected_level,
-                    )
-            else:
-                logger.debug(
-                    "PDF is PDF/A-%s, converting to PDF/A-%s",
-                    detected_level,
-                    level,
-                )
+    if verapdf_result.compliant:
+        logger.info(
+            "Skipping conversion: PDF is already valid PDF/A-%s", detected_level
+        )
+        return True
+    logger.info(
+        "PDF claims PDF/A-%s but validation failed, converting",
+        detected_level,
+    )
+    return False
 
-        # 1. Optional: Perform OCR
-        actual_input = input_path
-        if ocr_languages is not None:
-            from .ocr import OcrQuality, apply_ocr, is_ocr_available, needs_ocr
 
-            if not is_ocr_available():
-                warnings.append("OCR not available - pip install pdftopdfa[ocr]")
-            else:
-                if ocr_force:
-                    do_ocr = True
-                else:
-                    with pikepdf.open(input_path) as check_pdf:
-                        do_ocr = needs_ocr(check_pdf)
+def _make_temp_file(stem: str, kind: str) -> Path:
+    fd, tmp_path = tempfile.mkstemp(suffix=".pdf", prefix=f".{stem}_{kind}_")
+    os.close(fd)
+    return Path(tmp_path)
 
-                if do_ocr:
-                    fd, tmp_path = tempfile.mkstemp(
-                        suffix=".pdf", prefix=f".{input_path.stem}_ocr_"
-                    )
-                    os.close(fd)
-                    ocr_temp_file = Path(tmp_path)
-                    effective_quality = (
-                        ocr_quality if ocr_quality is not None else OcrQuality.DEFAULT
-                    )
 
-                    # Strip annotations before OCR so they are not
-                    # rasterized into page images.
-                    preserve_annots = _has_annotations(input_path)
-                    clean_temp_file: Path | None = None
-                    ocr_source = input_path
-                    if preserve_annots:
-                        fd2, clean_tmp = tempfile.mkstemp(
-                            suffix=".pdf",
-                            prefix=f".{input_path.stem}_clean_",
-                        )
-                        os.close(fd2)
-                        clean_temp_file = Path(clean_tmp)
-                        if _strip_annotations_for_ocr(input_path, clean_temp_file):
-                            ocr_source = clean_temp_file
-                        else:
-                            preserve_annots = False
-
-                    apply_ocr(
-                        ocr_source,
-                        ocr_temp_file,
-                        ocr_languages,
-                        quality=effective_quality,
-                        force=ocr_force,
-                    )
+def _run_ocr(
+    pdf: pikepdf.Pdf,
+    source: Path | bytes,
+    stem: str,
+    warnings: list[str],
+    *,
+    ocr_languages: list[str],
+    ocr_quality: "OcrQuality | None",
+    ocr_preprocess: "OcrPreprocess | None",
+    ocr_force: bool,
+) -> Path | None:
+    """Performs OCR on the pages of the input that need it.
+
+    Only pages with images and no text are rasterized and recognized,
+    unless *ocr_force* is set; all other pages pass through unchanged.
+    Annotations are stripped before OCR so they are not rasterized into
+    page images, and re-injected into the OCR output afterwards.
 
-                    # Re-inject original annotations into OCR output.
-                    if preserve_annots:
-                        fd3, merged_tmp = tempfile.mkstemp(
-                            suffix=".pdf",
-                            prefix=f".{input_path.stem}_merged_",
-                        )
-                        os.close(fd3)
-                        merged_temp_file = Path(merged_tmp)
-                        count = _restore_annotations_after_ocr(
-                            input_path, ocr_temp_file, merged_temp_file
-                        )
-                        if count > 0:
-                            os.replace(str(merged_temp_file), str(ocr_temp_file))
-                            logger.info("%d annotation(s) preserved through OCR", count)
-                            warnings.append(
-                                f"{count} annotation(s) preserved through OCR"
-                            )
-                        else:
-                            try:
-                                Path(merged_tmp).unlink()
-                            except Exception:
-                                pass
-
-                    # Clean up the stripped copy.
-                    if clean_temp_file is not None:
-                        try:
-                            clean_temp_file.unlink()
-                        except Exception:
-                            pass
+    Args:
+        pdf: The open input.
+        source: Input file, or the input bytes; bytes are written to a
+            temporary file only when ocrmypdf needs them.
+        stem: Name stem for temporary files.
+        warnings: List the OCR warnings are appended to.
+        ocr_languages: Tesseract language codes.
+        ocr_quality: OCR quality preset. If None, uses OcrQuality.DEFAULT.
+        ocr_preprocess: OpenCV preprocessing of the page images. If None,
+            uses the default of the quality preset.
+        ocr_force: If True, OCR even pages that already contain text.
 
-                    actual_input = ocr_temp_file
-                    lang_str = "+".join(ocr_languages)
-                    warnings.append(f"OCR performed (languages: {lang_str})")
-                else:
-                    logger.debug("PDF already contains text, OCR not necessary")
-
-        # Validate that input and output are not the same file
-        if actual_input.resolve() == output_path.resolve():
-            raise ConversionError(f"Input and output paths must differ: {actual_input}")
-
-        # 2. Open PDF
-        logger.debug("Opening PDF: %s", actual_input)
-        pdf = pikepdf.open(actual_input)
-
-        # 2.6. Detect other ISO PDF standards (informational)
-        iso_standards = detect_iso_standards(pdf)
-        if iso_standards:
-            for std in iso_standards:
-                msg = f"ISO standard detected: {std.standard} {std.version}"
-                logger.info(msg)
-                warnings.append(msg)
-
-        # 3. Check font compliance and embed missing fonts
-        from .fonts import FontEmbedder
-
-        logger.debug("Checking font compliance")
-        is_compliant, missing_fonts = check_font_compliance(pdf, raise_on_error=False)
-        if not is_compliant:
-            logger.info(
-                "Attempting to embed missing fonts: %s",
-                ", ".join(missing_fonts),
-            )
-            with FontEmbedder(pdf) as embedder:
-                embed_result = embedder.embed_missing_fonts()
+    Returns:
+        Temporary file holding the OCR output, which the caller deletes,
+        or None if OCR was not performed.
+    """
+    from .ocr import OcrQuality, apply_ocr, is_ocr_available, pages_needing_ocr
+
+    if not is_ocr_available():
+        warnings.append("OCR not available - pip install pdftopdfa[ocr]")
+        return None
+
+    page_count = len(pdf.pages)
+    ocr_pages: list[int] | None = None
+    if not ocr_force:
+        ocr_pages = pages_needing_ocr(pdf)
+        if not ocr_pages:
+            logger.debug("PDF already contains text, OCR not necessary")
+            return None
+        logger.info("OCR needed on %d of %d page(s)", len(ocr_pages), page_count)
+        if len(ocr_pages) == page_count:
+            ocr_pages = None
+
+    ocr_temp_file = _make_temp_file(stem, "ocr")
+    scratch_files: list[Path] = []
+    try:
+        effective_quality = (
+            ocr_quality if ocr_quality is not None else OcrQuality.DEFAULT
+        )
 
-            if embed_result.fonts_embedded:
-                logger.info(
-                    "Fonts embedded: %s",
-                    ", ".join(embed_result.fonts_embedded),
-                )
+        # Strip annotations before OCR so they are not rasterized into
+        # page images.
+        preserve_annots = _has_annotations(pdf)
+        ocr_source: Path | None = None
+        if preserve_annots:
+            clean_temp_file = _make_temp_file(stem, "clean")
+            scratch_files.append(clean_temp_file)
+            if _strip_annotations_for_ocr(pdf, clean_temp_file):
+                ocr_source = clean_temp_file
+            else:
+                preserve_annots = False
+        if ocr_source is None:
+            if isinstance(source, Path):
+                ocr_source = source
+            else:
+                ocr_source = _make_temp_file(stem, "input")
+                scratch_files.append(ocr_source)
+                ocr_source.write_bytes(source)
+
+        apply_ocr(
+            ocr_source,
+            ocr_temp_file,
+            ocr_languages,
+            quality=effective_quality,
+            force=ocr_force,
+            pages=ocr_pages,
+            preprocess=ocr_preprocess,
+        )
+
+        # Re-inject original annotations into OCR output.
+        if preserve_annots:
+            merged_temp_file = _make_temp_file(stem, "merged")
+            scratch_files.append(merged_temp_file)
+            count = _restore_annotations_after_ocr(pdf, ocr_temp_file, merged_temp_file)
+            if count > 0:
+                os.replace(str(merged_temp_file), str(ocr_temp_file))
+                logger.info("%d annotation(s) preserved through OCR", count)
+                warnings.append(f"{count} annotation(s) preserved through OCR")
+    except BaseException:
+        ocr_temp_file.unlink(missing_ok=True)
+        raise
+    finally:
+        for scratch_file in scratch_files:
+            try:
+                scratch_file.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    lang_str = "+".join(ocr_languages)
+    if ocr_pages is None:
+        warnings.append(f"OCR performed (languages: {lang_str})")
+    else:
+        warnings.append(
+            f"OCR performed on {len(ocr_pages)} of {page_count} page(s) "
+            f"(languages: {lang_str})"
+        )
+    return ocr_temp_file
 
-            if embed_result.fonts_failed:
-                raise FontEmbeddingError(
-                    "Could not embed fonts: "
-                    f"{', '.join(embed_result.fonts_failed)}. "
-                    "All fonts must be embedded for PDF/A compliance "
-                    "(ISO 19005, clause 6.3.1)."
-                )
 
-            warnings.extend(embed_result.warnings)
+def _make_pdfa(
+    pdf: pikepdf.Pdf,
+    level: str,
+    warnings: list[str],
+    *,
+    convert_calibrated: bool,
+    deadline: float | None = None,
+) -> str:
+    """Applies the PDF/A conversion stages to an open PDF, in place.
+
+    All stages share one document index and one resource graph, so the
+    object table and the pages' resources are walked once rather than by
+    every font stage and sanitizer.  See :func:`_apply_pdfa_stages` for
+    the arguments.
+    """
+    with document_index(pdf), resource_graph(pdf):
+        return _apply_pdfa_stages(
+            pdf,
+            level,
+            warnings,
+            convert_calibrated=convert_calibrated,
+            deadline=deadline,
+        )
 
-        # 3.5. Unicode compliance — always add ToUnicode to all embedded
-        # fonts (ISO 19005-2/3, rule 6.2.11.7.2).  veraPDF requires
-        # explicit ToUnicode even when Unicode is theoretically derivable.
-        logger.debug("Adding ToUnicode to embedded fonts for PDF/A-%s", level)
+
+def _apply_pdfa_stages(
+    pdf: pikepdf.Pdf,
+    level: str,
+    warnings: list[str],
+    *,
+    convert_calibrated: bool,
+    deadline: float | None = None,
+) -> str:
+    """Runs the PDF/A conversion stages in order.
+
+    Args:
+        pdf: The PDF to convert.
+        level: Target PDF/A level.
+        warnings: List the conversion warnings are appended to.
+        convert_calibrated: If True, convert CalGray/CalRGB to ICCBased.
+        deadline: Optional ``time.monotonic()`` value after which the
+            conversion is abandoned before its next stage.
+
+    Returns:
+        The PDF version the document must be saved with.
+
+    Raises:
+        ConversionError: If a stage cannot make the document compliant,
+            or the deadline has passed.
+        FontEmbeddingError: If fonts cannot be embedded.
+    """
+
+    def check_deadline(stage: str) -> None:
+        if deadline is not None and time.monotonic() >= deadline:
+            raise ConversionError(f"Time limit reached before {stage}")
+
+    # 2.6. Detect other ISO PDF standards (informational)
+    iso_standards = detect_iso_standards(pdf)
+    if iso_standards:
+        for std in iso_standards:
+            msg = f"ISO standard detected: {std.standard} {std.version}"
+            logger.info(msg)
+            warnings.append(msg)
+
+    # 3. Check font compliance and embed missing fonts
+    from .fonts import FontEmbedder
+
+    check_deadline("font embedding")
+    logger.debug("Checking font compliance")
+    is_compliant, missing_fonts = check_font_compliance(pdf, raise_on_error=False)
+    if not is_compliant:
+        logger.info(
+            "Attempting to embed missing fonts: %s",
+            ", ".join(missing_fonts),
+        )
         with FontEmbedder(pdf) as embedder:
-            tounicode_result = embedder.add_tounicode_to_embedded_fonts()
+            embed_result = embedder.embed_missing_fonts()
 
-        if tounicode_result.fonts_embedded:
+        if embed_result.fonts_embedded:
             logger.info(
-                "ToUnicode added to fonts: %s",
-                ", ".join(tounicode_result.fonts_embedded),
+                "Fonts embedded: %s",
+                ", ".join(embed_result.fonts_embedded),
             )
 
-        if tounicode_result.fonts_failed:
-            raise ConversionError(
-                "Could not add ToUnicode mappings to: "
-                f"{', '.join(tounicode_result.fonts_failed)}. "
-                "ToUnicode is required for PDF/A compliance "
-                f"(ISO 19005-2/3, rule 6.2.11.7.2, level {level})."
+        if embed_result.fonts_failed:
+            raise FontEmbeddingError(
+                "Could not embed fonts: "
+                f"{', '.join(embed_result.fonts_failed)}. "
+                "All fonts must be embedded for PDF/A compliance "
+                "(ISO 19005, clause 6.3.1)."
             )
 
-        warnings.extend(tounicode_result.warnings)
+        warnings.extend(embed_result.warnings)
 
-        # 3.7. Subset embedded fonts to reduce file size
-        logger.debug("Subsetting embedded fonts")
-        with FontEmbedder(pdf) as embedder:
-            subset_result = embedder.subset_embedded_fonts()
+    # 3.5. Unicode compliance — always add ToUnicode to all embedded
+    # fonts (ISO 19005-2/3, rule 6.2.11.7.2).  veraPDF requires
+    # explicit ToUnicode even when Unicode is theoretically derivable.
+    check_deadline("ToUnicode mapping")
+    logger.debug("Adding ToUnicode to embedded fonts for PDF/A-%s", level)
+    with FontEmbedder(pdf) as embedder:
+        tounicode_result = embedder.add_tounicode_to_embedded_fonts()
 
-        if subset_result.fonts_subsetted:
-            logger.info(
-                "Fonts subsetted: %s (saved %d bytes)",
-                ", ".join(subset_result.fonts_subsetted),
-                subset_result.bytes_saved,
-            )
+    if tounicode_result.fonts_embedded:
+        logger.info(
+            "ToUnicode added to fonts: %s",
+            ", ".join(tounicode_result.fonts_embedded),
+        )
 
-        if subset_result.warnings:
-            warnings.extend(subset_result.warnings)
+    if tounicode_result.fonts_failed:
+        raise ConversionError(
+            "Could not add ToUnicode mappings to: "
+            f"{', '.join(tounicode_result.fonts_failed)}. "
+            "ToUnicode is required for PDF/A compliance "
+            f"(ISO 19005-2/3, rule 6.2.11.7.2, level {level})."
+        )
 
-        # 3.8. Fix font encoding issues (ISO 19005-2, 6.2.11.6)
-        # Must run AFTER subsetting: symbolic TrueType fonts need their
-        # /Encoding during subsetting for glyph selection; the (3,0) cmap
-        # added here would otherwise be pruned by the subsetter.
-        logger.debug("Fixing font encodings for PDF/A compliance")
-        with FontEmbedder(pdf) as embedder:
-            encoding_fixes = embedder.fix_font_encodings()
+    warnings.extend(tounicode_result.warnings)
 
-        if encoding_fixes:
-            logger.info(
-                "Fixed encoding on %d font(s) (rule 6.2.11.6)",
-                encoding_fixes,
-            )
+    # 3.7. Subset embedded fonts to reduce file size
+    check_deadline("font subsetting")
+    logger.debug("Subsetting embedded fonts")
+    with FontEmbedder(pdf) as embedder:
+        subset_result = embedder.subset_embedded_fonts()
+
+    if subset_result.fonts_subsetted:
+        logger.info(
+            "Fonts subsetted: %s (saved %d bytes)",
+            ", ".join(subset_result.fonts_subsetted),
+            subset_result.bytes_saved,
+        )
+
+    if subset_result.warnings:
+        warnings.extend(subset_result.warnings)
+
+    # 3.8. Fix font encoding issues (ISO 19005-2, 6.2.11.6)
+    # Must run AFTER subsetting: symbolic TrueType fonts need their
+    # /Encoding during subsetting for glyph selection; the (3,0) cmap
+    # added here would otherwise be pruned by the subsetter.
+    check_deadline("font encoding fixes")
+    logger.debug("Fixing font encodings for PDF/A compliance")
+    with FontEmbedder(pdf) as embedder:
+        encoding_fixes = embedder.fix_font_encodings()
+
+    if encoding_fixes:
+        logger.info(
+            "Fixed encoding on %d font(s) (rule 6.2.11.6)",
+            encoding_fixes,
+        )
 
+    # 4.-6. Sanitize, sync metadata and embed color profiles.  These
+    # stages share one cache of parsed content streams and one of parsed
+    # font programs; pending content edits are serialized when the block
+    # ends, before the save.
+    with (
+        content_stream_cache(pdf),
+        font_program_cache(pdf),
+    ):
         # 4. Sanitize PDF for PDF/A
+        check_deadline("sanitizing")
         logger.debug("Sanitizing PDF for PDF/A-%s", level)
         sanitize_result = sanitize_for_pdfa(pdf, level)
 
@@ -824,6 +1256,7 @@ def convert_to_pdfa(
         add_extensions_if_needed(pdf, level)
 
         # 6. Detect color spaces and embed profiles
+        check_deadline("color profile embedding")
         logger.debug("Detecting color spaces and embedding ICC profiles")
         embedded_spaces = embed_color_profiles(
             pdf, level, convert_calibrated=convert_calibrated
@@ -842,117 +1275,854 @@ def convert_to_pdfa(
             if count > 0:
                 warnings.append(f"{count} {message}")
 
-        # 7. Create output directory if needed
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # 8. Save PDF with minimum version.
-        #
-        # Keep output non-linearized because QPDF linearization can still
-        # produce invalid /Length values on generated hint streams
-        # (rule 6.1.7.1) for specific inputs.
-        logger.debug("Saving PDF/A: %s", output_path)
-        required_version = get_required_pdf_version(level)
-        current_version = pdf.pdf_version
-        if current_version != required_version:
-            direction = (
-                "upgraded"
-                if tuple(int(x) for x in current_version.split("."))
-                < tuple(int(x) for x in required_version.split("."))
-                else "downgraded"
-            )
-            warnings.append(
-                f"PDF version {direction} from {current_version} to {required_version}"
-            )
+        # 6.5. Share one copy of identical ICC profiles, font programs and
+        # images; the duplicates are not written on save
+        deduplicate_streams(pdf)
+
+    # 7. Determine the output version
+    required_version = get_required_pdf_version(level)
+    current_version = pdf.pdf_version
+    if current_version != required_version:
+        direction = (
+            "upgraded"
+            if tuple(int(x) for x in current_version.split("."))
+            < tuple(int(x) for x in required_version.split("."))
+            else "downgraded"
+        )
+        warnings.append(
+            f"PDF version {direction} from {current_version} to {required_version}"
+        )
+    return required_version
 
+
+def _save_pdfa(
+    pdf: pikepdf.Pdf,
+    target: Path | BinaryIO,
+    required_version: str,
+    *,
+    compress_structure: bool = False,
+    compression: CompressionProfile | None = None,
+) -> None:
+    # Keep output non-linearized because QPDF linearization can still
+    # produce invalid /Length values on generated hint streams
+    # (rule 6.1.7.1) for specific inputs.
+    with qpdf_flate_level(compression):
         pdf.save(
-            output_path,
+            target,
             linearize=False,
             force_version=required_version,
             deterministic_id=True,
+            object_stream_mode=_object_stream_mode(compress_structure),
+            **save_options(compression),
         )
-        pdf.close()
-        pdf = None
 
-        # 8.2. Post-save file structure hardening (ISO 19005-2, 6.1.2/6.1.3)
-        _ensure_binary_comment(output_path, required_version)
-        _truncate_trailing_data(output_path)
 
-        # 8.5. Post-save file structure verification (only when veraPDF
-        # is NOT enabled — veraPDF would catch these issues anyway).
-        if not validate:
-            _verify_file_structure(output_path, required_version)
+def _object_stream_mode(compress_structure: bool) -> pikepdf.ObjectStreamMode:
+    """Object stream handling on save.
+
+    PDF/A-2 and PDF/A-3 (ISO 19005-2, 6.1.4) permit object streams and
+    cross-reference streams, so *compress_structure* packs all objects
+    that may go into an object stream; otherwise the input's object
+    streams are preserved.
+    """
+    if compress_structure:
+        return pikepdf.ObjectStreamMode.generate
+    return pikepdf.ObjectStreamMode.preserve
+
+
+def _validate_output(path: Path, level: str, warnings: list[str]) -> bool:
+    """Validates a converted file with veraPDF.
+
+    Returns:
+        True if veraPDF reported the file as non-compliant.
+    """
+    logger.debug("Validating output with veraPDF")
+    try:
+        verapdf_result = validate_with_verapdf(path=path, flavour=level)
+    except VeraPDFError as e:
+        logger.warning("veraPDF validation not available: %s", e)
+        warnings.append("Validation skipped: veraPDF not available")
+        return False
+
+    if verapdf_result.compliant:
+        return False
+    for error in verapdf_result.errors:
+        warnings.append(f"Validation: {error}")
+    return True
+
+
+def convert_to_pdfa(
+    input_path: Path,
+    output_path: Path,
+    level: str = "3b",
+    *,
+    validate: bool = False,
+    ocr_languages: list[str] | None = None,
+    ocr_quality: "OcrQuality | None" = None,
+    ocr_preprocess: "OcrPreprocess | None" = None,
+    ocr_force: bool = False,
+    convert_calibrated: bool = True,
+    compress_structure: bool = False,
+    compression: CompressionProfile | None = None,
+    embedded_limits: EmbeddedPdfLimits | None = None,
+    cache: "ResultCache | None" = None,
+) -> ConversionResult:
+    """Converts a PDF file to the PDF/A format.
+
+    Args:
+        input_path: Path to the input PDF.
+        output_path: Path for the output PDF/A.
+        level: PDF/A conformance level ('2b' or '3b').
+        validate: If True, the result is validated.
+        ocr_languages: Optional list of Tesseract language codes
+            (e.g., ``["deu", "eng"]``).  If specified, OCR is applied to
+            image-based pages.
+        ocr_quality: OCR quality preset. If None, uses OcrQuality.DEFAULT.
+        ocr_preprocess: OpenCV preprocessing of the page images. If None,
+            uses the default of the quality preset.
+        ocr_force: If True, force OCR even on pages that already contain
+            text by using ocrmypdf's ``redo_ocr`` mode.
+        convert_calibrated: If True, convert CalGray/CalRGB to ICCBased.
+        compress_structure: If True, write the output with compressed
+            object streams and a cross-reference stream.
+        compression: Compression profile. If None, uses
+            CompressionProfile.BALANCED.
+        embedded_limits: Limits for converting embedded PDFs (PDF/A-2).
+            If None, the limits of the enclosing
+            :func:`~pdftopdfa.sanitizers.embedded_pdf_limits` block apply.
+        cache: Optional ResultCache.  If it holds the output of an earlier
+            conversion of the same input bytes with the same options, that
+            output is copied to *output_path* instead of converting again;
+            otherwise the new output is added to it.
+
+    Returns:
+        ConversionResult with status and details.
+
+    Raises:
+        ConversionError: If conversion fails.
+        UnsupportedPDFError: If the PDF is not supported.
+        FontEmbeddingError: If fonts cannot be embedded.
+    """
+    level = validate_pdfa_level(level)
+    start_time = time.perf_counter()
+    warnings: list[str] = []
+    ocr_temp_file: Path | None = None
+    temp_output: Path | None = None
+    pdf: pikepdf.Pdf | None = None
+    cache_key: str | None = None
+
+    logger.info(
+        "Starting conversion: %s -> %s (PDF/A-%s)",
+        input_path,
+        output_path,
+        level,
+    )
+
+    try:
+        with (
+            _conversion_errors(),
+            compression_profile(compression),
+            _embedded_limits_scope(embedded_limits),
+        ):
+            # 0. Open the input once and reject encrypted or unreadable
+            # files, also when the cache holds an output for them.  The
+            # pre-checks below share this handle, and so does the
+            # conversion itself unless OCR replaces the input.
+            pdf = pikepdf.open(input_path)
+            detected_level = _claimed_pdfa_level(pdf, level, input_path)
+
+            # 0.2. Serve repeated inputs from the result cache
+            if cache is not None and input_path.resolve() != output_path.resolve():
+                cache_key = _result_cache_key(
+                    cache,
+                    input_path,
+                    level,
+                    validate=validate,
+                    ocr_languages=ocr_languages,
+                    ocr_quality=ocr_quality,
+                    ocr_preprocess=ocr_preprocess,
+                    ocr_force=ocr_force,
+                    convert_calibrated=convert_calibrated,
+                    compress_structure=compress_structure,
+                    compression=compression,
+                    embedded_limits=embedded_limits,
+                )
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                temp_output = _make_temp_output_path(output_path)
+                cached = cache.fetch(cache_key, temp_output)
+                if cached is not None:
+                    os.replace(temp_output, output_path)
+                    temp_output = None
+                    processing_time = time.perf_counter() - start_time
+                    logger.info(
+                        "Conversion served from cache: %s (%.2f seconds)",
+                        output_path,
+                        processing_time,
+                    )
+                    return ConversionResult(
+                        success=True,
+                        input_path=input_path,
+                        output_path=output_path,
+                        level=cached["level"],
+                        warnings=cached["warnings"],
+                        processing_time=processing_time,
+                        validation_failed=cached["validation_failed"],
+                    )
+                temp_output.unlink()
+                temp_output = None
+
+            # 0.5. Check if PDF is already PDF/A compliant (before OCR)
+            if detected_level is not None and _verapdf_confirms(
+                input_path, detected_level
+            ):
+                processing_time = time.perf_counter() - start_time
+                if input_path.resolve() != output_path.resolve():
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
+                    if output_path.exists():
+                        raise ConversionError(
+                            f"Output file already exists: {output_path}"
+                        )
+                    temp_output = _make_temp_output_path(output_path)
+                    shutil.copy2(str(input_path), str(temp_output))
+                    os.replace(temp_output, output_path)
+                    temp_output = None
+                result = ConversionResult(
+                    success=True,
+                    input_path=input_path,
+                    output_path=output_path,
+                    level=detected_level,
+                    warnings=["Conversion skipped: PDF already valid PDF/A"],
+                    processing_time=processing_time,
+                )
+                if cache_key is not None:
+                    _store_result(cache, cache_key, result)
+                return result
+
+            # 1. Optional: Perform OCR; the conversion continues on its
+            # output
+            actual_input = input_path
+            if ocr_languages is not None:
+                ocr_temp_file = _run_ocr(
+                    pdf,
+                    input_path,
+                    input_path.stem,
+                    warnings,
+                    ocr_languages=ocr_languages,
+                    ocr_quality=ocr_quality,
+                    ocr_preprocess=ocr_preprocess,
+                    ocr_force=ocr_force,
+                )
+                if ocr_temp_file is not None:
+                    pdf.close()
+                    pdf = None
+                    actual_input = ocr_temp_file
 
-        processing_time = time.perf_counter() - start_time
+            # Validate that input and output are not the same file
+            if actual_input.resolve() == output_path.resolve():
+                raise ConversionError(
+                    f"Input and output paths must differ: {actual_input}"
+                )
 
-        # 9. Optional: Validate
-        validation_failed = False
-        if validate:
-            logger.debug("Validating output with veraPDF")
+            # 2. Open the OCR output (the original input is already open)
+            if pdf is None:
+                logger.debug("Opening PDF: %s", actual_input)
+                pdf = pikepdf.open(actual_input)
+
+            # 3.-7. Convert
+            required_version = _make_pdfa(
+                pdf, level, warnings, convert_calibrated=convert_calibrated
+            )
+
+            # 8. Save PDF with minimum version.  The file is written and
+            # hardened under a temporary name and renamed into place only
+            # once it is complete, so a crash never leaves a truncated
+            # output.
+            logger.debug("Saving PDF/A: %s", output_path)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_output = _make_temp_output_path(output_path)
+            _save_pdfa(
+                pdf,
+                temp_output,
+                required_version,
+                compress_structure=compress_structure,
+                compression=compression,
+            )
+            pdf.close()
+            pdf = None
+
+            # 8.2. Post-save file structure hardening (ISO 19005-2,
+            # 6.1.2/6.1.3) and verification (only when veraPDF is NOT
+            # enabled — veraPDF would catch these issues anyway), from the
+            # bytes just written.
+            _harden_saved_file(temp_output, required_version, verify=not validate)
+
+            os.replace(temp_output, output_path)
+            temp_output = None
+
+            processing_time = time.perf_counter() - start_time
+
+            # 9. Optional: Validate
+            validation_failed = validate and _validate_output(
+                output_path, level, warnings
+            )
+
+            logger.info(
+                "Conversion successful: %s (%.2f seconds)",
+                output_path,
+                processing_time,
+            )
+
+            result = ConversionResult(
+                success=True,
+                input_path=input_path,
+                output_path=output_path,
+                level=level,
+                warnings=warnings,
+                processing_time=processing_time,
+                validation_failed=validation_failed,
+            )
+            if cache_key is not None:
+                _store_result(cache, cache_key, result)
+            return result
+
+    finally:
+        # Cleanup: Close PDF if still open (e.g. after an exception)
+        if pdf is not None:
             try:
-                verapdf_result = validate_with_verapdf(path=output_path, flavour=level)
-            except VeraPDFError as e:
-                logger.warning("veraPDF validation not available: %s", e)
-                warnings.append("Validation skipped: veraPDF not available")
-                verapdf_result = None
+                pdf.close()
+            except Exception:
+                pass
 
-            if verapdf_result is not None and not verapdf_result.compliant:
-                validation_failed = True
-                for error in verapdf_result.errors:
-                    warnings.append(f"Validation: {error}")
+        # Cleanup: Delete an incomplete output
+        if temp_output is not None:
+            try:
+                temp_output.unlink(missing_ok=True)
+            except OSError:
+                pass
 
-        logger.info(
-            "Conversion successful: %s (%.2f seconds)",
-            output_path,
-            processing_time,
+        # Cleanup: Delete OCR temporary file
+        _remove_ocr_temp_file(ocr_temp_file)
+
+
+def _remove_ocr_temp_file(ocr_temp_file: Path | None) -> None:
+    if ocr_temp_file is not None and ocr_temp_file.exists():
+        try:
+            ocr_temp_file.unlink()
+            logger.debug("OCR temporary file deleted: %s", ocr_temp_file)
+        except Exception as cleanup_error:
+            logger.warning(
+                "Could not delete OCR temporary file: %s (%s)",
+                ocr_temp_file,
+                cleanup_error,
+            )
+
+
+def _save_pdfa_bytes(
+    pdf: pikepdf.Pdf,
+    required_version: str,
+    *,
+    verify: bool,
+    compress_structure: bool = False,
+    compression: CompressionProfile | None = None,
+) -> bytes:
+    """Saves *pdf* to memory and hardens the saved bytes.
+
+    Returns:
+        The PDF/A file contents.
+    """
+    buffer = BytesIO()
+    _save_pdfa(
+        pdf,
+        buffer,
+        required_version,
+        compress_structure=compress_structure,
+        compression=compression,
+    )
+    if not _harden_saved_stream(buffer, required_version, verify=verify):
+        # Rare: the writer omitted the binary comment; re-save
+        logger.debug("Re-saving to add binary comment (ISO 19005-2, 6.1.2)")
+        with pikepdf.open(BytesIO(buffer.getvalue())) as resaved:
+            buffer = BytesIO()
+            _save_pdfa(
+                resaved,
+                buffer,
+                required_version,
+                compress_structure=compress_structure,
+                compression=compression,
+            )
+        _harden_saved_stream(buffer, required_version, verify=verify)
+    return buffer.getvalue()
+
+
+def _convert_embedded_pdf(
+    data: bytes, level: str = "2b", *, deadline: float | None = None
+) -> bytes:
+    """Converts the bytes of an embedded PDF to PDF/A, in memory.
+
+    Used by the embedded file sanitizer for attachments it has already
+    found non-compliant, so unlike :func:`convert_to_pdfa_bytes` there is
+    no veraPDF pre-check and no OCR; fonts and ICC profiles come from the
+    process-wide caches shared with the enclosing conversion.
+
+    Args:
+        data: Raw bytes of the embedded PDF.
+        level: PDF/A conformance level.
+        deadline: Optional ``time.monotonic()`` value after which the
+            conversion is abandoned before its next stage or the save.
+
+    Returns:
+        The PDF/A file contents.
+
+    Raises:
+        ConversionError: If conversion fails or the deadline has passed.
+        UnsupportedPDFError: If the PDF is encrypted.
+        FontEmbeddingError: If fonts cannot be embedded.
+    """
+    with _conversion_errors(), pikepdf.open(BytesIO(data)) as pdf:
+        if is_pdf_encrypted(pdf):
+            raise UnsupportedPDFError("Embedded PDF is encrypted")
+        required_version = _make_pdfa(
+            pdf, level, [], convert_calibrated=True, deadline=deadline
         )
+        if deadline is not None and time.monotonic() >= deadline:
+            raise ConversionError("Time limit reached before saving")
+        return _save_pdfa_bytes(pdf, required_version, verify=True)
 
-        return ConversionResult(
+
+def convert_to_pdfa_bytes(
+    source: bytes | memoryview | BinaryIO,
+    level: str = "3b",
+    *,
+    validate: bool = False,
+    ocr_languages: list[str] | None = None,
+    ocr_quality: "OcrQuality | None" = None,
+    ocr_preprocess: "OcrPreprocess | None" = None,
+    ocr_force: bool = False,
+    convert_calibrated: bool = True,
+    compress_structure: bool = False,
+    compression: CompressionProfile | None = None,
+    embedded_limits: EmbeddedPdfLimits | None = None,
+) -> tuple[bytes, ConversionResult]:
+    """Converts an in-memory PDF to the PDF/A format.
+
+    The input is read from memory and the output is returned as bytes.
+    Temporary files are only written for the external tools that need
+    them: ocrmypdf when OCR is performed, and veraPDF (if installed) for
+    *validate* or to confirm an input that already claims the target
+    PDF/A level.
+
+    Args:
+        source: PDF as bytes, memoryview, or a binary file object that is
+            read to the end.
+        level: PDF/A conformance level ('2b' or '3b').
+        validate: If True, the result is validated.
+        ocr_languages: Optional list of Tesseract language codes.  If
+            specified, OCR is applied to image-based pages.
+        ocr_quality: OCR quality preset. If None, uses OcrQuality.DEFAULT.
+        ocr_preprocess: OpenCV preprocessing of the page images. If None,
+            uses the default of the quality preset.
+        ocr_force: If True, force OCR even on pages that already contain
+            text.
+        convert_calibrated: If True, convert CalGray/CalRGB to ICCBased.
+        compress_structure: If True, write the output with compressed
+            object streams and a cross-reference stream.
+        compression: Compression profile. If None, uses
+            CompressionProfile.BALANCED.
+        embedded_limits: Limits for converting embedded PDFs (PDF/A-2).
+            If None, the limits of the enclosing
+            :func:`~pdftopdfa.sanitizers.embedded_pdf_limits` block apply.
+
+    Returns:
+        Tuple of the PDF/A bytes and a ConversionResult whose
+        ``input_path`` and ``output_path`` are None.
+
+    Raises:
+        ConversionError: If conversion fails.
+        UnsupportedPDFError: If the PDF is not supported.
+        FontEmbeddingError: If fonts cannot be embedded.
+    """
+    level = validate_pdfa_level(level)
+    start_time = time.perf_counter()
+    warnings: list[str] = []
+    ocr_temp_file: Path | None = None
+    pdf: pikepdf.Pdf | None = None
+
+    if isinstance(source, bytes):
+        data = source
+    elif isinstance(source, (bytearray, memoryview)):
+        data = bytes(source)
+    else:
+        data = source.read()
+
+    logger.info("Starting in-memory conversion (%d bytes, PDF/A-%s)", len(data), level)
+
+    def _result(
+        out: bytes, result_level: str, **kwargs
+    ) -> tuple[bytes, ConversionResult]:
+        return out, ConversionResult(
             success=True,
-            input_path=input_path,
-            output_path=output_path,
-            level=level,
+            input_path=None,
+            output_path=None,
+            level=result_level,
             warnings=warnings,
-            processing_time=processing_time,
-            validation_failed=validation_failed,
+            processing_time=time.perf_counter() - start_time,
+            **kwargs,
         )
 
-    except pikepdf.PdfError as e:
-        error_msg = f"PDF processing error: {e}"
-        logger.error(error_msg)
-        raise ConversionError(error_msg) from e
+    try:
+        with (
+            _conversion_errors(),
+            compression_profile(compression),
+            _embedded_limits_scope(embedded_limits),
+        ):
+            # 0. Open the input and check if it is already PDF/A compliant
+            pdf = pikepdf.open(BytesIO(data))
+            detected_level = _claimed_pdfa_level(pdf, level, "<memory>")
+            if detected_level is not None and is_verapdf_available():
+                with _spooled_file(data, "input") as path:
+                    already_valid = _verapdf_confirms(path, detected_level)
+                if already_valid:
+                    warnings.append("Conversion skipped: PDF already valid PDF/A")
+                    return _result(data, detected_level)
+
+            # 1. Optional: Perform OCR
+            if ocr_languages is not None:
+                ocr_temp_file = _run_ocr(
+                    pdf,
+                    data,
+                    "memory",
+                    warnings,
+                    ocr_languages=ocr_languages,
+                    ocr_quality=ocr_quality,
+                    ocr_preprocess=ocr_preprocess,
+                    ocr_force=ocr_force,
+                )
+                if ocr_temp_file is not None:
+                    pdf.close()
+                    pdf = pikepdf.open(BytesIO(ocr_temp_file.read_bytes()))
+                    _remove_ocr_temp_file(ocr_temp_file)
+                    ocr_temp_file = None
+
+            # 3.-7. Convert
+            required_version = _make_pdfa(
+                pdf, level, warnings, convert_calibrated=convert_calibrated
+            )
 
-    except (UnsupportedPDFError, FontEmbeddingError, OCRError):
-        # Re-raise specific errors unchanged
-        raise
+            # 8. Save and harden in memory
+            output = _save_pdfa_bytes(
+                pdf,
+                required_version,
+                verify=not validate,
+                compress_structure=compress_structure,
+                compression=compression,
+            )
+            pdf.close()
+            pdf = None
 
-    except ConversionError:
-        # Re-raise ConversionError unchanged
-        raise
+            # 9. Optional: Validate
+            validation_failed = False
+            if validate:
+                with _spooled_file(output, "output") as path:
+                    validation_failed = _validate_output(path, level, warnings)
 
-    except Exception as e:
-        error_msg = f"Unexpected error during conversion: {e}"
-        logger.error(error_msg)
-        raise ConversionError(error_msg) from e
+            logger.info(
+                "In-memory conversion successful (%.2f seconds)",
+                time.perf_counter() - start_time,
+            )
+            return _result(output, level, validation_failed=validation_failed)
 
     finally:
-        # Cleanup: Close PDF if still open (e.g. after an exception)
         if pdf is not None:
             try:
                 pdf.close()
             except Exception:
                 pass
+        _remove_ocr_temp_file(ocr_temp_file)
 
-        # Cleanup: Delete OCR temporary file
-        if ocr_temp_file is not None and ocr_temp_file.exists():
-            try:
-                ocr_temp_file.unlink()
-                logger.debug("OCR temporary file deleted: %s", ocr_temp_file)
-            except Exception as cleanup_error:
-                logger.warning(
-                    "Could not delete OCR temporary file: %s (%s)",
-                    ocr_temp_file,
-                    cleanup_error,
-                )
+
+@contextmanager
+def _spooled_file(data: bytes, kind: str) -> Iterator[Path]:
+    """Writes *data* to a temporary file for an external tool."""
+    path = _make_temp_file("memory", kind)
+    try:
+        path.write_bytes(data)
+        yield path
+    finally:
+        path.unlink(missing_ok=True)
+
+
+def _convert_file_pair(
+    file_pair: tuple[Path, Path],
+    *,
+    level: str,
+    force_overwrite: bool,
+    **options,
+) -> ConversionResult:
+    """Converts one (input, output) pair for convert_files().
+
+    Existing outputs are skipped unless *force_overwrite* is set, and
+    conversion errors are turned into failed results.
+
+    Args:
+        file_pair: Tuple of (input_path, output_path).
+        level: PDF/A conformance level.
+        force_overwrite: If True, an existing output file is overwritten.
+        **options: Further keyword arguments for convert_to_pdfa().
+
+    Returns:
+        ConversionResult for the file.
+    """
+    input_path, output_path = file_pair
+
+    # Overwrite protection
+    if output_path.exists() and not force_overwrite:
+        logger.warning(
+            "Skipping %s: Output file already exists (%s)",
+            input_path.name,
+            output_path,
+        )
+        return ConversionResult(
+            success=False,
+            input_path=input_path,
+            output_path=output_path,
+            level=level,
+            error="Output file already exists",
+        )
+
+    try:
+        return convert_to_pdfa(
+            input_path=input_path,
+            output_path=output_path,
+            level=level,
+            **options,
+        )
+    except (
+        ConversionError,
+        UnsupportedPDFError,
+        FontEmbeddingError,
+        OCRError,
+    ) as e:
+        logger.error("Error for %s: %s", input_path.name, e)
+        return ConversionResult(
+            success=False,
+            input_path=input_path,
+            output_path=output_path,
+            level=level,
+            error=str(e),
+            processing_time=0.0,
+        )
+
+
+def _iter_indexed_conversions(
+    file_pairs: Iterable[tuple[Path, Path]],
+    level: str,
+    *,
+    validate: bool,
+    ocr_languages: list[str] | None,
+    ocr_quality: "OcrQuality | None",
+    ocr_preprocess: "OcrPreprocess | None",
+    ocr_force: bool,
+    force_overwrite: bool,
+    on_progress: Callable[[int, int, str], None] | None,
+    cancel_event: threading.Event | None,
+    convert_calibrated: bool,
+    compress_structure: bool,
+    compression: CompressionProfile | None,
+    embedded_limits: EmbeddedPdfLimits | None,
+    workers: int,
+    timeout: float | None,
+    max_files_per_worker: int | None,
+    journal: "ConversionJournal | None" = None,
+    resume: bool = False,
+    cache: "ResultCache | None" = None,
+) -> Iterator[tuple[int, ConversionResult]]:
+    """Converts *file_pairs* and yields ``(index, result)`` as files finish.
+
+    See convert_files() for the arguments.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    if resume and journal is None:
+        raise ValueError("resume requires a journal")
+
+    if resume:
+        file_pairs = _skip_journaled(file_pairs, journal, level)
+    total = len(file_pairs) if isinstance(file_pairs, Sized) else 0
+    convert = partial(
+        _convert_file_pair,
+        level=level,
+        force_overwrite=force_overwrite,
+        validate=validate,
+        ocr_languages=ocr_languages,
+        ocr_quality=ocr_quality,
+        ocr_preprocess=ocr_preprocess,
+        ocr_force=ocr_force,
+        convert_calibrated=convert_calibrated,
+        compress_structure=compress_structure,
+        compression=compression,
+        embedded_limits=embedded_limits,
+        cache=cache,
+    )
+
+    def _generate() -> Iterator[tuple[int, ConversionResult]]:
+        for idx, result in _convert_all():
+            if journal is not None:
+                journal.record(result, level)
+            yield idx, result
+
+    def _convert_all() -> Iterator[tuple[int, ConversionResult]]:
+        if workers == 1 and timeout is None:
+            for idx, file_pair in enumerate(file_pairs):
+                if cancel_event is not None and cancel_event.is_set():
+                    logger.info("Conversion cancelled")
+                    break
+
+                if on_progress is not None:
+                    on_progress(idx, total, file_pair[0].name)
+
+                yield idx, convert(file_pair)
+            return
+
+        def _on_start(idx: int, file_pair: tuple[Path, Path]) -> None:
+            if on_progress is not None:
+                on_progress(idx, total, file_pair[0].name)
+
+        def _on_failure(file_pair: tuple[Path, Path], error: str) -> ConversionResult:
+            return ConversionResult(
+                success=False,
+                input_path=file_pair[0],
+                output_path=file_pair[1],
+                level=level,
+                error=error,
+            )
+
+        yield from run_in_workers(
+            convert,
+            file_pairs,
+            workers=min(workers, total) if total else workers,
+            on_failure=_on_failure,
+            timeout=timeout,
+            max_tasks_per_worker=max_files_per_worker,
+            on_start=_on_start,
+            cancel_event=cancel_event,
+            cpu_tokens=get_cpu_limit(),
+        )
+
+    return _generate()
+
+
+def _skip_journaled(
+    file_pairs: Iterable[tuple[Path, Path]],
+    journal: "ConversionJournal",
+    level: str,
+) -> Iterable[tuple[Path, Path]]:
+    """Drops the pairs *journal* records as already converted."""
+
+    def _pending() -> Iterator[tuple[Path, Path]]:
+        for input_path, output_path in file_pairs:
+            if journal.is_done(input_path, output_path, level):
+                logger.info("Skipping %s: already converted", input_path.name)
+                continue
+            yield input_path, output_path
+
+    if isinstance(file_pairs, Sized):
+        return list(_pending())
+    return _pending()
+
+
+def iter_convert_files(
+    file_pairs: Iterable[tuple[Path, Path]],
+    level: str = "3b",
+    *,
+    validate: bool = False,
+    ocr_languages: list[str] | None = None,
+    ocr_quality: "OcrQuality | None" = None,
+    ocr_preprocess: "OcrPreprocess | None" = None,
+    ocr_force: bool = False,
+    force_overwrite: bool = False,
+    on_progress: Callable[[int, int, str], None] | None = None,
+    cancel_event: threading.Event | None = None,
+    convert_calibrated: bool = True,
+    compress_structure: bool = False,
+    compression: CompressionProfile | None = None,
+    embedded_limits: EmbeddedPdfLimits | None = None,
+    workers: int = 1,
+    timeout: float | None = None,
+    max_files_per_worker: int | None = DEFAULT_MAX_TASKS_PER_WORKER,
+    journal: "ConversionJournal | None" = None,
+    resume: bool = False,
+    cache: "ResultCache | None" = None,
+) -> Iterator[ConversionResult]:
+    """Converts PDF files to PDF/A, yielding each result as it completes.
+
+    Unlike convert_files(), *file_pairs* may be any iterable (it is
+    consumed lazily) and no result is kept after it has been yielded.
+    With ``workers > 1`` results arrive in completion order, not input
+    order.  Closing the generator stops the batch.
+
+    Args:
+        file_pairs: Iterable of (input_path, output_path) tuples.
+        level: PDF/A conformance level (e.g. '2b', '3b').
+        validate: If True, results are validated.
+        ocr_languages: Optional list of Tesseract language codes.
+        ocr_quality: OCR quality preset.
+        ocr_preprocess: OpenCV preprocessing of the page images. If None,
+            uses the default of the quality preset.
+        ocr_force: If True, force OCR even on pages that already contain
+            text.
+        force_overwrite: If True, existing output files are overwritten.
+        on_progress: Optional callback(current_idx, total, filename) called
+            before each file; total is 0 if *file_pairs* has no length.
+        cancel_event: Optional threading.Event; when set, iteration stops.
+        convert_calibrated: If True, convert CalGray/CalRGB to ICCBased.
+        compress_structure: If True, write the output with compressed
+            object streams and a cross-reference stream.
+        compression: Compression profile. If None, uses
+            CompressionProfile.BALANCED.
+        embedded_limits: Limits for converting embedded PDFs (PDF/A-2).
+            If None, the limits of the enclosing
+            :func:`~pdftopdfa.sanitizers.embedded_pdf_limits` block apply.
+        workers: Number of worker processes; 1 converts in this process.
+        timeout: Optional per-file time limit in seconds.
+        max_files_per_worker: Files after which a worker process is
+            replaced; None keeps workers alive.
+        journal: Optional ConversionJournal in which the outcome of every
+            file is recorded.
+        resume: If True, files the journal records as already converted
+            are skipped; failed files are retried.
+        cache: Optional ResultCache shared by all files (see
+            convert_to_pdfa()).
+
+    Yields:
+        ConversionResult for each processed file.
+
+    Raises:
+        ValueError: If *workers* is less than 1, or *resume* is set without
+            a *journal*.
+    """
+    conversions = _iter_indexed_conversions(
+        file_pairs,
+        level,
+        validate=validate,
+        ocr_languages=ocr_languages,
+        ocr_quality=ocr_quality,
+        ocr_preprocess=ocr_preprocess,
+        ocr_force=ocr_force,
+        force_overwrite=force_overwrite,
+        on_progress=on_progress,
+        cancel_event=cancel_event,
+        convert_calibrated=convert_calibrated,
+        compress_structure=compress_structure,
+        compression=compression,
+        embedded_limits=embedded_limits,
+        workers=workers,
+        timeout=timeout,
+        max_files_per_worker=max_files_per_worker,
+        journal=journal,
+        resume=resume,
+        cache=cache,
+    )
+    return (result for _idx, result in conversions)
 
 
 def convert_files(
@@ -962,16 +2132,30 @@ def convert_files(
     validate: bool = False,
     ocr_languages: list[str] | None = None,
     ocr_quality: "OcrQuality | None" = None,
+    ocr_preprocess: "OcrPreprocess | None" = None,
     ocr_force: bool = False,
     force_overwrite: bool = False,
     on_progress: Callable[[int, int, str], None] | None = None,
     cancel_event: threading.Event | None = None,
     convert_calibrated: bool = True,
+    compress_structure: bool = False,
+    compression: CompressionProfile | None = None,
+    embedded_limits: EmbeddedPdfLimits | None = None,
+    workers: int = 1,
+    timeout: float | None = None,
+    max_files_per_worker: int | None = DEFAULT_MAX_TASKS_PER_WORKER,
+    journal: "ConversionJournal | None" = None,
+    resume: bool = False,
+    cache: "ResultCache | None" = None,
 ) -> list[ConversionResult]:
     """Converts a list of PDF files to PDF/A.
 
     Shared base for convert_directory().
 
+    With ``workers > 1`` (or a *timeout*) the files are converted in a pool
+    of worker processes.  A file whose worker crashes or exceeds the
+    timeout gets a failed result; the rest of the batch continues.
+
     Args:
         file_pairs: List of (input_path, output_path) tuples.
         level: PDF/A conformance level (e.g. '2b', '3b').
@@ -979,6 +2163,8 @@ def convert_files(
         ocr_languages: Optional list of Tesseract language codes
             (e.g., ``["deu", "eng"]``).
         ocr_quality: OCR quality preset.
+        ocr_preprocess: OpenCV preprocessing of the page images. If None,
+            uses the default of the quality preset.
         ocr_force: If True, force OCR even on pages that already contain
             text.
         force_overwrite: If True, existing output files are overwritten.
@@ -986,71 +2172,237 @@ def convert_files(
         on_progress: Optional callback(current_idx, total, filename) called
             before each file.
         cancel_event: Optional threading.Event; when set, iteration stops.
+            Files already being converted by a worker are finished.
+        compress_structure: If True, write the outputs with compressed
+            object streams and a cross-reference stream.
+        compression: Compression profile. If None, uses
+            CompressionProfile.BALANCED.
+        embedded_limits: Limits for converting embedded PDFs (PDF/A-2).
+            If None, the limits of the enclosing
+            :func:`~pdftopdfa.sanitizers.embedded_pdf_limits` block apply.
+        workers: Number of worker processes; 1 converts in this process.
+        timeout: Optional per-file time limit in seconds (uses a worker
+            process even with ``workers=1``).
+        max_files_per_worker: Files after which a worker process is
+            replaced, to bound its memory use; None keeps workers alive.
+        journal: Optional ConversionJournal in which the outcome of every
+            file is recorded.
+        resume: If True, files the journal records as already converted
+            are skipped; failed files are retried.
+        cache: Optional ResultCache shared by all files and workers (see
+            convert_to_pdfa()).
 
     Returns:
-        List of ConversionResult for all processed files.
+        List of ConversionResult for all processed files, in input order.
+
+    Raises:
+        ValueError: If *workers* is less than 1, or *resume* is set without
+            a *journal*.
     """
-    results: list[ConversionResult] = []
-    total = len(file_pairs)
+    completed = dict(
+        _iter_indexed_conversions(
+            file_pairs,
+            level,
+            validate=validate,
+            ocr_languages=ocr_languages,
+            ocr_quality=ocr_quality,
+            ocr_preprocess=ocr_preprocess,
+            ocr_force=ocr_force,
+            force_overwrite=force_overwrite,
+            on_progress=on_progress,
+            cancel_event=cancel_event,
+            convert_calibrated=convert_calibrated,
+            compress_structure=compress_structure,
+            compression=compression,
+            embedded_limits=embedded_limits,
+            workers=workers,
+            timeout=timeout,
+            max_files_per_worker=max_files_per_worker,
+            journal=journal,
+            resume=resume,
+            cache=cache,
+        )
+    )
+    return [completed[idx] for idx in sorted(completed)]
 
-    for idx, (input_path, output_path) in enumerate(file_pairs):
-        if cancel_event is not None and cancel_event.is_set():
-            logger.info("Conversion cancelled")
-            break
 
-        if on_progress is not None:
-            on_progress(idx, total, input_path.name)
+def _iter_pdf_files(directory: Path, recursive: bool) -> Iterator[Path]:
+    """Yields the PDF files in *directory* lazily, in sorted path order.
 
-        # Overwrite protection
-        if output_path.exists() and not force_overwrite:
-            logger.warning(
-                "Skipping %s: Output file already exists (%s)",
-                input_path.name,
-                output_path,
-            )
-            results.append(
-                ConversionResult(
-                    success=False,
-                    input_path=input_path,
-                    output_path=output_path,
-                    level=level,
-                    error="Output file already exists",
-                )
-            )
-            continue
+    Only one directory listing is held at a time; symlinked directories are
+    not followed.
+    """
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError as e:
+        logger.warning("Cannot read directory %s: %s", directory, e)
+        return
+
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if recursive:
+                yield from _iter_pdf_files(Path(entry.path), recursive)
+        elif entry.name.endswith(".pdf") and entry.is_file():
+            yield Path(entry.path)
+
+
+def _iter_directory_conversions(
+    input_dir: Path,
+    output_dir: Path | None,
+    level: str,
+    *,
+    recursive: bool,
+    show_progress: bool,
+    **options,
+) -> Iterator[tuple[int, ConversionResult]]:
+    """Discovers and converts the PDFs of a directory, yielding as they finish.
+
+    See convert_directory() for the arguments.
+
+    Raises:
+        ConversionError: If the input directory does not exist.
+    """
+    if not input_dir.is_dir():
+        raise ConversionError(f"Directory does not exist: {input_dir}")
+
+    # Create output directory
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
 
+    def _file_pairs() -> Iterator[tuple[Path, Path]]:
+        for pdf_file in _iter_pdf_files(input_dir, recursive):
+            if output_dir is not None:
+                if recursive:
+                    rel_path = pdf_file.relative_to(input_dir)
+                    out_subdir = output_dir / rel_path.parent
+                    out_subdir.mkdir(parents=True, exist_ok=True)
+                    out_path = out_subdir / f"{pdf_file.stem}_pdfa.pdf"
+                else:
+                    out_path = generate_output_path(pdf_file, output_dir)
+            else:
+                # Exclude previous conversion outputs in the same directory
+                if pdf_file.stem.endswith("_pdfa"):
+                    continue
+                out_path = generate_output_path(pdf_file)
+            yield pdf_file, out_path
+
+    logger.info(
+        "Converting PDF files in %s%s",
+        input_dir,
+        " (recursive)" if recursive else "",
+    )
+
+    def _generate() -> Iterator[tuple[int, ConversionResult]]:
+        # tqdm progress wrapper (total unknown: files are discovered lazily)
+        progress_bar = None
+        if show_progress:
+            progress_bar = tqdm(desc="Converting", unit="file", ncols=80)
+
+        def _on_progress(current_idx: int, total: int, filename: str) -> None:
+            if progress_bar is not None:
+                progress_bar.update(1)
+                progress_bar.set_postfix_str(filename)
+
+        successful = failed = 0
         try:
-            result = convert_to_pdfa(
-                input_path=input_path,
-                output_path=output_path,
-                level=level,
-                validate=validate,
-                ocr_languages=ocr_languages,
-                ocr_quality=ocr_quality,
-                ocr_force=ocr_force,
-                convert_calibrated=convert_calibrated,
-            )
-            results.append(result)
-
-        except (
-            ConversionError,
-            UnsupportedPDFError,
-            FontEmbeddingError,
-            OCRError,
-        ) as e:
-            logger.error("Error for %s: %s", input_path.name, e)
-            results.append(
-                ConversionResult(
-                    success=False,
-                    input_path=input_path,
-                    output_path=output_path,
-                    level=level,
-                    error=str(e),
-                    processing_time=0.0,
-                )
-            )
+            for idx, result in _iter_indexed_conversions(
+                _file_pairs(),
+                level,
+                on_progress=_on_progress if show_progress else None,
+                **options,
+            ):
+                if result.success:
+                    successful += 1
+                else:
+                    failed += 1
+                yield idx, result
+        finally:
+            if progress_bar is not None:
+                progress_bar.close()
+
+        if successful + failed == 0:
+            logger.warning("No PDF files found in: %s", input_dir)
+            return
+
+        # Log summary
+        logger.info(
+            "Directory conversion completed: %d successful, %d failed",
+            successful,
+            failed,
+        )
+
+    return _generate()
+
+
+def iter_convert_directory(
+    input_dir: Path,
+    output_dir: Path | None = None,
+    level: str = "3b",
+    *,
+    recursive: bool = False,
+    validate: bool = False,
+    show_progress: bool = True,
+    ocr_languages: list[str] | None = None,
+    ocr_quality: "OcrQuality | None" = None,
+    ocr_preprocess: "OcrPreprocess | None" = None,
+    ocr_force: bool = False,
+    force_overwrite: bool = False,
+    convert_calibrated: bool = True,
+    compress_structure: bool = False,
+    compression: CompressionProfile | None = None,
+    embedded_limits: EmbeddedPdfLimits | None = None,
+    workers: int = 1,
+    timeout: float | None = None,
+    cancel_event: threading.Event | None = None,
+    journal: "ConversionJournal | None" = None,
+    resume: bool = False,
+    cache: "ResultCache | None" = None,
+) -> Iterator[ConversionResult]:
+    """Converts all PDFs in a directory, yielding each result as it completes.
+
+    Files are discovered lazily while the batch runs.  See
+    convert_directory() for the arguments and iter_convert_files() for
+    the ordering of results.
+
+    Args:
+        cancel_event: Optional threading.Event; when set, no further files
+            are started.
+        journal: Optional ConversionJournal (see convert_files()).
+        resume: If True, skip files the journal records as converted.
+        cache: Optional ResultCache (see convert_to_pdfa()).
+
+    Yields:
+        ConversionResult for each processed file.
 
-    return results
+    Raises:
+        ConversionError: If the input directory does not exist.
+    """
+    conversions = _iter_directory_conversions(
+        input_dir,
+        output_dir,
+        level,
+        recursive=recursive,
+        show_progress=show_progress,
+        validate=validate,
+        ocr_languages=ocr_languages,
+        ocr_quality=ocr_quality,
+        ocr_preprocess=ocr_preprocess,
+        ocr_force=ocr_force,
+        force_overwrite=force_overwrite,
+        cancel_event=cancel_event,
+        convert_calibrated=convert_calibrated,
+        compress_structure=compress_structure,
+        compression=compression,
+        embedded_limits=embedded_limits,
+        workers=workers,
+        timeout=timeout,
+        max_files_per_worker=DEFAULT_MAX_TASKS_PER_WORKER,
+        journal=journal,
+        resume=resume,
+        cache=cache,
+    )
+    return (result for _idx, result in conversions)
 
 
 def convert_directory(
@@ -1063,9 +2415,18 @@ def convert_directory(
     show_progress: bool = True,
     ocr_languages: list[str] | None = None,
     ocr_quality: "OcrQuality | None" = None,
+    ocr_preprocess: "OcrPreprocess | None" = None,
     ocr_force: bool = False,
     force_overwrite: bool = False,
     convert_calibrated: bool = True,
+    compress_structure: bool = False,
+    compression: CompressionProfile | None = None,
+    embedded_limits: EmbeddedPdfLimits | None = None,
+    workers: int = 1,
+    timeout: float | None = None,
+    journal: "ConversionJournal | None" = None,
+    resume: bool = False,
+    cache: "ResultCache | None" = None,
 ) -> list[ConversionResult]:
     """Converts all PDFs in a directory to PDF/A.
 
@@ -1081,94 +2442,54 @@ def convert_directory(
             (e.g., ``["deu", "eng"]``).
             If specified, OCR is applied to image-based pages.
         ocr_quality: OCR quality preset.
+        ocr_preprocess: OpenCV preprocessing of the page images. If None,
+            uses the default of the quality preset.
         ocr_force: If True, force OCR even on pages that already contain
             text.
         force_overwrite: If True, existing output files are overwritten.
+        compress_structure: If True, write the outputs with compressed
+            object streams and a cross-reference stream.
+        compression: Compression profile. If None, uses
+            CompressionProfile.BALANCED.
+        embedded_limits: Limits for converting embedded PDFs (PDF/A-2).
+            If None, the limits of the enclosing
+            :func:`~pdftopdfa.sanitizers.embedded_pdf_limits` block apply.
+        workers: Number of worker processes (see convert_files()).
+        timeout: Optional per-file time limit in seconds.
+        journal: Optional ConversionJournal (see convert_files()).
+        resume: If True, skip files the journal records as converted.
+        cache: Optional ResultCache (see convert_to_pdfa()).
 
     Returns:
-        List of ConversionResult for all processed files.
+        List of ConversionResult for all processed files, in path order.
 
     Raises:
         ConversionError: If the input directory does not exist.
     """
-    if not input_dir.is_dir():
-        raise ConversionError(f"Directory does not exist: {input_dir}")
-
-    # Find all PDFs
-    pattern = "**/*.pdf" if recursive else "*.pdf"
-    pdf_files = sorted(input_dir.glob(pattern))
-
-    # When output goes to the same directory, exclude previous conversion outputs
-    if output_dir is None:
-        pdf_files = [p for p in pdf_files if not p.stem.endswith("_pdfa")]
-
-    if not pdf_files:
-        logger.warning("No PDF files found in: %s", input_dir)
-        return []
-
-    logger.info(
-        "Found: %d PDF file(s) in %s%s",
-        len(pdf_files),
-        input_dir,
-        " (recursive)" if recursive else "",
-    )
-
-    # Create output directory
-    if output_dir is not None:
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-    # Compute file pairs (input, output)
-    file_pairs: list[tuple[Path, Path]] = []
-    for pdf_file in pdf_files:
-        if output_dir is not None:
-            if recursive:
-                rel_path = pdf_file.relative_to(input_dir)
-                out_subdir = output_dir / rel_path.parent
-                out_subdir.mkdir(parents=True, exist_ok=True)
-                out_path = out_subdir / f"{pdf_file.stem}_pdfa.pdf"
-            else:
-                out_path = generate_output_path(pdf_file, output_dir)
-        else:
-            out_path = generate_output_path(pdf_file)
-        file_pairs.append((pdf_file, out_path))
-
-    # tqdm progress wrapper
-    progress_bar = None
-    if show_progress:
-        progress_bar = tqdm(
-            total=len(file_pairs),
-            desc="Converting",
-            unit="file",
-            ncols=80,
+    completed = dict(
+        _iter_directory_conversions(
+            input_dir,
+            output_dir,
+            level,
+            recursive=recursive,
+            show_progress=show_progress,
+            validate=validate,
+            ocr_languages=ocr_languages,
+            ocr_quality=ocr_quality,
+            ocr_preprocess=ocr_preprocess,
+            ocr_force=ocr_force,
+            force_overwrite=force_overwrite,
+            cancel_event=None,
+            convert_calibrated=convert_calibrated,
+            compress_structure=compress_structure,
+            compression=compression,
+            embedded_limits=embedded_limits,
+            workers=workers,
+            timeout=timeout,
+            max_files_per_worker=DEFAULT_MAX_TASKS_PER_WORKER,
+            journal=journal,
+            resume=resume,
+            cache=cache,
         )
-
-    def _on_progress(current_idx: int, total: int, filename: str) -> None:
-        if progress_bar is not None:
-            progress_bar.update(1)
-            progress_bar.set_postfix_str(filename)
-
-    results = convert_files(
-        file_pairs=file_pairs,
-        level=level,
-        validate=validate,
-        ocr_languages=ocr_languages,
-        ocr_quality=ocr_quality,
-        ocr_force=ocr_force,
-        force_overwrite=force_overwrite,
-        on_progress=_on_progress if show_progress else None,
-        convert_calibrated=convert_calibrated,
     )
-
-    if progress_bar is not None:
-        progress_bar.close()
-
-    # Log summary
-    successful = sum(1 for r in results if r.success)
-    failed = len(results) - successful
-    logger.info(
-        "Directory conversion completed: %d successful, %d failed",
-        successful,
-        failed,
-    )
-
-    return results
+    return [completed[idx] for idx in sorted(completed)]
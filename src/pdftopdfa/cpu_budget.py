@@ -0,0 +1,229 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""CPU budget shared by batch workers and OCR jobs.
+
+The budget is a pool of tokens, one per CPU that conversions may keep
+busy.  A file being converted holds one token; OCR takes as many more as
+are free and runs that many Tesseract processes (ocrmypdf ``jobs``), each
+limited to one thread.  Total concurrency therefore never exceeds the
+budget, however many files are converted in parallel.
+
+:func:`~pdftopdfa.batch.run_in_workers` creates the pool and hands it to
+its worker processes, which install it with :func:`use_shared_pool` and
+run every task inside :func:`task_token`.  Conversions in a single
+process share a pool that is created on first use.
+
+A worker process that is killed cannot release its tokens, so every
+worker also gets a shared counter of the tokens it holds.  The counter is
+changed together with the pool, with termination deferred in between,
+and the parent hands the recorded tokens back with :func:`reclaim` once
+the worker is gone.
+
+The budget defaults to the number of CPUs.  It can be set with the
+``PDFTOPDFA_CPU_LIMIT`` environment variable or for a block of code with
+:func:`cpu_limit`.
+"""
+
+import contextlib
+import logging
+import os
+import signal
+import threading
+from collections.abc import Iterator
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Environment variable overriding the number of CPUs.
+CPU_LIMIT_ENV = "PDFTOPDFA_CPU_LIMIT"
+
+_cpu_limit: int | None = None
+
+# Pool installed by a batch worker process, shared with its siblings, and
+# the counter of the tokens this process holds from it.
+_shared_pool: Any = None
+_held_tokens: Any = None
+
+# Seconds a blocking acquire waits before termination can be handled.
+_ACQUIRE_POLL = 0.5
+
+# Pool of this process when no shared pool is installed, and its size.
+_local_pool: threading.BoundedSemaphore | None = None
+_local_pool_size = 0
+_local_pool_lock = threading.Lock()
+
+# Pool from which the current thread holds the token of a running task.
+_holder = threading.local()
+
+
+def get_cpu_limit() -> int:
+    """Returns the number of CPUs conversions may keep busy."""
+    if _cpu_limit is not None:
+        return _cpu_limit
+    value = os.environ.get(CPU_LIMIT_ENV)
+    if value:
+        try:
+            limit = int(value)
+        except ValueError:
+            limit = 0
+        if limit > 0:
+            return limit
+        logger.warning("Ignoring invalid %s=%r", CPU_LIMIT_ENV, value)
+    return os.cpu_count() or 1
+
+
+@contextlib.contextmanager
+def cpu_limit(limit: int | None) -> Iterator[None]:
+    """Applies a CPU budget until the block exits.
+
+    Args:
+        limit: Number of CPUs. If None, uses the environment variable or
+            the number of CPUs.
+    """
+    global _cpu_limit
+    if limit is not None and limit < 1:
+        raise ValueError(f"CPU limit must be at least 1, got {limit}")
+    previous = _cpu_limit
+    _cpu_limit = limit
+    try:
+        yield
+    finally:
+        _cpu_limit = previous
+
+
+def use_shared_pool(pool: Any, held: Any = None) -> None:
+    """Installs the token pool of a batch run in a worker process.
+
+    Args:
+        pool: Semaphore created by the parent process.
+        held: Optional shared integer (``multiprocessing.Value``) in which
+            the tokens taken by this process are counted, for
+            :func:`reclaim`.
+    """
+    global _shared_pool, _held_tokens
+    _shared_pool = pool
+    _held_tokens = held
+
+
+def reclaim(pool: Any, held: Any) -> int:
+    """Releases the tokens that dead worker processes still held.
+
+    Only call this once every process counting in *held* has exited.
+
+    Args:
+        pool: Semaphore the workers took their tokens from.
+        held: Counter the workers were given with :func:`use_shared_pool`.
+
+    Returns:
+        Number of tokens released.
+    """
+    with held.get_lock():
+        count = held.value
+        held.value = 0
+    for _ in range(count):
+        pool.release()
+    if count:
+        logger.debug("Reclaimed %d CPU token(s) of stopped workers", count)
+    return count
+
+
+@contextlib.contextmanager
+def _termination_deferred() -> Iterator[None]:
+    """Defers SIGTERM so that a token and its count change together."""
+    if not hasattr(signal, "pthread_sigmask"):
+        yield
+        return
+    previous = signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGTERM})
+    try:
+        yield
+    finally:
+        signal.pthread_sigmask(signal.SIG_SETMASK, previous)
+
+
+def _count_held(delta: int) -> None:
+    with _held_tokens.get_lock():
+        _held_tokens.value += delta
+
+
+def _acquire(pool: Any, block: bool = True) -> bool:
+    """Takes a token from *pool*, counting it if the pool is shared."""
+    if pool is not _shared_pool or _held_tokens is None:
+        return pool.acquire(block)
+    while True:
+        with _termination_deferred():
+            if pool.acquire(block, _ACQUIRE_POLL if block else None):
+                _count_held(1)
+                return True
+        if not block:
+            return False
+
+
+def _release(pool: Any, count: int = 1) -> None:
+    """Returns *count* tokens to *pool*, counting them if it is shared."""
+    if pool is not _shared_pool or _held_tokens is None:
+        for _ in range(count):
+            pool.release()
+        return
+    with _termination_deferred():
+        for _ in range(count):
+            pool.release()
+            _count_held(-1)
+
+
+def _pool() -> Any:
+    """Returns the shared pool, or this process's own pool."""
+    global _local_pool, _local_pool_size
+    if _shared_pool is not None:
+        return _shared_pool
+    limit = get_cpu_limit()
+    with _local_pool_lock:
+        if _local_pool is None or _local_pool_size != limit:
+            _local_pool = threading.BoundedSemaphore(limit)
+            _local_pool_size = limit
+        return _local_pool
+
+
+@contextlib.contextmanager
+def task_token() -> Iterator[None]:
+    """Holds one token while the current thread runs a task.
+
+    Blocks until a token is free.
+    """
+    if getattr(_holder, "pool", None) is not None:
+        yield
+        return
+    pool = _pool()
+    _acquire(pool)
+    _holder.pool = pool
+    try:
+        yield
+    finally:
+        _holder.pool = None
+        _release(pool)
+
+
+@contextlib.contextmanager
+def reserve(wanted: int) -> Iterator[int]:
+    """Reserves up to *wanted* CPUs for a parallel job.
+
+    The token of the running task counts towards the reservation; further
+    tokens are only taken if they are free, so a job never waits for
+    another one.  Outside a task, one token is waited for first.
+
+    Args:
+        wanted: Number of CPUs the job could use.
+
+    Yields:
+        Number of CPUs reserved (at least 1).
+    """
+    with task_token():
+        pool = _holder.pool
+        extra = 0
+        while 1 + extra < wanted and _acquire(pool, block=False):
+            extra += 1
+        try:
+            yield 1 + extra
+        finally:
+            _release(pool, extra)
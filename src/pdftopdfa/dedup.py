@@ -0,0 +1,187 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Deduplication of identical streams before saving.
+
+Embedding ICC profiles, fonts and default color spaces creates a new stream
+at every site that needs one, and merged documents often carry the same
+font program or image many times.  :func:`deduplicate_streams` finds
+streams with identical dictionaries and identical encoded data among ICC
+profiles, embedded font programs and images, points every reference at one
+canonical copy and leaves the others unreferenced, so QPDF does not write
+them when the document is saved.
+
+Candidates are first grouped by their stream dictionary and the length of
+their encoded data; only streams that share a group are hashed.
+"""
+
+import hashlib
+import logging
+from collections.abc import Iterator
+
+from pikepdf import Array, Dictionary, Pdf, Stream
+
+from .document_index import DocumentIndex, get_document_index
+from .utils import resolve_indirect
+
+logger = logging.getLogger(__name__)
+
+_FONT_FILE_KEYS = ("/FontFile", "/FontFile2", "/FontFile3")
+
+# Keys that mark streams which are neither ICC profiles nor font programs
+# although they may carry an /N entry (functions, shadings, XObjects).
+_NON_ICC_KEYS = frozenset(
+    {"/Type", "/Subtype", "/FunctionType", "/ShadingType", "/Length1"}
+)
+
+# Nesting depth up to which direct arrays and dictionaries are searched for
+# references.
+_MAX_DIRECT_DEPTH = 64
+
+# Upper bound on merge rounds; each round can only make dictionaries that
+# reference merged streams equal.
+_MAX_ROUNDS = 4
+
+
+def _iter_font_programs(index: DocumentIndex) -> Iterator[Stream]:
+    """Yield the embedded font program streams of all fonts."""
+    for font in index.iter_fonts():
+        descriptor = resolve_indirect(font.get("/FontDescriptor"))
+        if not isinstance(descriptor, Dictionary):
+            continue
+        for key in _FONT_FILE_KEYS:
+            program = descriptor.get(key)
+            if isinstance(program, Stream):
+                yield program
+
+
+def _iter_icc_profiles(index: DocumentIndex) -> Iterator[Stream]:
+    """Yield streams shaped like ICC profiles (an /N entry and no type)."""
+    for stream in index.iter_streams():
+        keys = set(stream.keys())
+        if "/N" in keys and keys.isdisjoint(_NON_ICC_KEYS):
+            yield stream
+
+
+def _iter_candidates(index: DocumentIndex) -> Iterator[Stream]:
+    yield from _iter_icc_profiles(index)
+    yield from _iter_font_programs(index)
+    yield from index.iter_images()
+
+
+def _dictionary_key(stream: Stream) -> bytes:
+    """Serialize the stream dictionary without /Length."""
+    entries = {key: stream.get(key) for key in stream.keys() if key != "/Length"}
+    return Dictionary(entries).unparse()
+
+
+def _find_duplicates(index: DocumentIndex) -> dict[tuple[int, int], Stream]:
+    """Map the objgen of every duplicate stream to its canonical stream.
+
+    The canonical stream of a set of identical streams is the one with the
+    lowest object number.
+    """
+    groups: dict[tuple[int, bytes], list[Stream]] = {}
+    seen: set[tuple[int, int]] = set()
+    for stream in _iter_candidates(index):
+        objgen = stream.objgen
+        if objgen == (0, 0) or objgen in seen:
+            continue
+        seen.add(objgen)
+        try:
+            key = (len(stream.read_raw_bytes()), _dictionary_key(stream))
+        except Exception as e:
+            logger.debug("Skipping stream %s for deduplication: %s", objgen, e)
+            continue
+        groups.setdefault(key, []).append(stream)
+
+    duplicates: dict[tuple[int, int], Stream] = {}
+    for streams in groups.values():
+        if len(streams) < 2:
+            continue
+        canonical: dict[bytes, Stream] = {}
+        for stream in sorted(streams, key=lambda s: s.objgen):
+            digest = hashlib.sha256(stream.read_raw_bytes()).digest()
+            first = canonical.setdefault(digest, stream)
+            if first is not stream:
+                duplicates[stream.objgen] = first
+    return duplicates
+
+
+def _replace_references(
+    container: object,
+    duplicates: dict[tuple[int, int], Stream],
+    depth: int = 0,
+) -> int:
+    """Point references to duplicates inside *container* at the canonical.
+
+    Recurses into direct arrays and dictionaries; indirect objects are
+    visited separately by the caller.
+
+    Returns:
+        Number of references replaced.
+    """
+    if depth > _MAX_DIRECT_DEPTH:
+        return 0
+    if isinstance(container, Array):
+        items = list(enumerate(container))
+    elif isinstance(container, (Dictionary, Stream)):
+        items = [(key, container.get(key)) for key in container.keys()]
+    else:
+        return 0
+
+    replaced = 0
+    for key, value in items:
+        if not isinstance(value, (Array, Dictionary, Stream)):
+            continue
+        if value.is_indirect:
+            canonical = duplicates.get(value.objgen)
+            if canonical is not None:
+                container[key] = canonical
+                replaced += 1
+        else:
+            replaced += _replace_references(value, duplicates, depth + 1)
+    return replaced
+
+
+def deduplicate_streams(pdf: Pdf) -> int:
+    """Share one copy of identical ICC profiles, font programs and images.
+
+    Streams are identical when their dictionaries (apart from /Length) and
+    their encoded data are equal.  References to duplicates are replaced
+    by references to the canonical copy; the duplicates become
+    unreferenced and are dropped when the document is saved.  Streams
+    whose dictionaries only became equal through this (e.g. images that
+    referenced two copies of one ICC profile) are merged in a further
+    round.
+
+    Args:
+        pdf: Opened pikepdf PDF object (modified in place).
+
+    Returns:
+        Number of duplicate streams removed.
+    """
+    index = get_document_index(pdf)
+    removed = 0
+    replaced = 0
+    for _round in range(_MAX_ROUNDS):
+        duplicates = _find_duplicates(index)
+        if not duplicates:
+            break
+        for obj in index.iter_objects():
+            if obj.objgen in duplicates:
+                continue
+            replaced += _replace_references(obj, duplicates)
+        replaced += _replace_references(pdf.trailer, duplicates)
+        for objgen in duplicates:
+            index.discard(pdf.get_object(objgen))
+        removed += len(duplicates)
+
+    if removed:
+        logger.info(
+            "Deduplicated %d stream(s), %d reference(s) updated",
+            removed,
+            replaced,
+        )
+    return removed
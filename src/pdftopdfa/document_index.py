@@ -0,0 +1,438 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Single-pass object index shared by all sanitizers.
+
+Many sanitizers need to find every object of a particular kind (streams
+with a given filter, signature dictionaries, FileSpecs, ...) regardless of
+where it is referenced from.  Walking ``pdf.objects`` separately in each of
+them dominates the run time on documents with hundreds of thousands of
+objects.  :class:`DocumentIndex` walks the object table once, classifies
+every object, and answers those queries from the classification.
+
+The index is deliberately a *candidate* index: consumers still check the
+exact condition they care about on each returned object, so entries that
+became stale because a sanitizer edited a dictionary are harmless.  Objects
+added after the index was built are picked up incrementally by
+:meth:`DocumentIndex.sync`, which only probes object numbers above the
+highest one seen so far.
+
+During a conversion the index is activated with :func:`document_index`;
+:func:`get_document_index` then returns the shared instance.  Outside an
+active scope it builds a throwaway index, so calling a sanitizer on its own
+behaves exactly as before.
+"""
+
+import logging
+from collections.abc import Iterator
+from contextlib import AbstractContextManager
+
+from pikepdf import Array, Dictionary, Name, Pdf, Stream
+
+from .utils import PdfScopedRegistry, normalize_filter_name, resolve_indirect
+
+logger = logging.getLogger(__name__)
+
+# Object categories recorded by the index.
+STREAMS = "streams"
+CONTENT_STREAMS = "content_streams"
+IMAGES = "images"
+FORMS = "forms"
+FONTS = "fonts"
+ANNOTATIONS = "annotations"
+ANNOTATION_OWNERS = "annotation_owners"
+FILESPECS = "filespecs"
+SIGNATURES = "signatures"
+METADATA_OWNERS = "metadata_owners"
+METADATA_STREAMS = "metadata_streams"
+NONCANONICAL_FILTERS = "noncanonical_filters"
+EXTERNAL_STREAMS = "external_streams"
+
+_CATEGORIES = (
+    STREAMS,
+    CONTENT_STREAMS,
+    IMAGES,
+    FORMS,
+    FONTS,
+    ANNOTATIONS,
+    ANNOTATION_OWNERS,
+    FILESPECS,
+    SIGNATURES,
+    METADATA_OWNERS,
+    METADATA_STREAMS,
+    NONCANONICAL_FILTERS,
+    EXTERNAL_STREAMS,
+)
+
+# Stream dictionary keys that point at external file data
+_EXTERNAL_STREAM_KEYS = frozenset({"/F", "/FFilter", "/FDecodeParms"})
+
+_FONT_SUBTYPES = frozenset(
+    {
+        "/Type0",
+        "/Type1",
+        "/MMType1",
+        "/Type3",
+        "/TrueType",
+        "/CIDFontType0",
+        "/CIDFontType2",
+    }
+)
+
+
+def _filter_chain(stream: Stream) -> tuple[tuple[str, ...], bool]:
+    """Return the normalized filter chain of a stream.
+
+    Returns:
+        Tuple of (normalized filter names, True if any name was not
+        spelled canonically).
+    """
+    filter_obj = resolve_indirect(stream.get("/Filter"))
+    if isinstance(filter_obj, Name):
+        raw = [str(filter_obj)]
+    elif isinstance(filter_obj, Array):
+        raw = [
+            str(entry)
+            for entry in (resolve_indirect(f) for f in filter_obj)
+            if isinstance(entry, Name)
+        ]
+    else:
+        return (), False
+    names = tuple(normalize_filter_name(name) for name in raw)
+    return names, list(names) != raw
+
+
+def _classify(obj) -> tuple[set[str], tuple[str, ...]]:
+    """Classify one object.
+
+    Returns:
+        Tuple of (category names, normalized filter chain).  The filter
+        chain is empty for non-stream objects.
+    """
+    categories: set[str] = set()
+    chain: tuple[str, ...] = ()
+
+    if isinstance(obj, Stream):
+        categories.add(STREAMS)
+        keys = set(obj.keys())
+        chain, noncanonical = _filter_chain(obj)
+        if noncanonical:
+            categories.add(NONCANONICAL_FILTERS)
+
+        subtype = str(obj.get("/Subtype")) if "/Subtype" in keys else None
+        if subtype == "/Image":
+            categories.add(IMAGES)
+        elif subtype == "/Form":
+            categories.update((FORMS, CONTENT_STREAMS))
+        elif subtype is None and "/Type" not in keys and "/Length1" not in keys:
+            # Page content streams carry neither /Subtype nor /Type.
+            categories.add(CONTENT_STREAMS)
+
+        if "/Type" in keys and str(obj.get("/Type")) == "/Metadata":
+            categories.add(METADATA_STREAMS)
+        if "/Annots" in keys:
+            categories.add(ANNOTATION_OWNERS)
+        if not keys.isdisjoint(_EXTERNAL_STREAM_KEYS):
+            categories.add(EXTERNAL_STREAMS)
+        return categories, chain
+
+    if not isinstance(obj, Dictionary):
+        return categories, chain
+
+    keys = set(obj.keys())
+    type_name = str(obj.get("/Type")) if "/Type" in keys else None
+    subtype = str(obj.get("/Subtype")) if "/Subtype" in keys else None
+
+    if type_name == "/Font" or (
+        subtype in _FONT_SUBTYPES and ("/BaseFont" in keys or "/FontDescriptor" in keys)
+    ):
+        categories.add(FONTS)
+    if type_name == "/Annot" or ("/Rect" in keys and subtype is not None):
+        categories.add(ANNOTATIONS)
+    if "/Annots" in keys:
+        categories.add(ANNOTATION_OWNERS)
+    if type_name == "/Filespec" or "/EF" in keys:
+        categories.add(FILESPECS)
+    if (
+        type_name == "/Sig"
+        or "/ByteRange" in keys
+        or ("/Contents" in keys and "/SubFilter" in keys)
+    ):
+        categories.add(SIGNATURES)
+    if "/Metadata" in keys:
+        categories.add(METADATA_OWNERS)
+    return categories, chain
+
+
+class DocumentIndex:
+    """Classification of every indirect object in a PDF.
+
+    Built with a single walk over ``pdf.objects``.  All ``iter_*`` methods
+    first call :meth:`sync` and then yield a snapshot of the matching
+    objects in object-number order, so callers may add objects while
+    iterating (the same semantics as iterating ``pdf.objects``).
+
+    Args:
+        pdf: Opened pikepdf PDF object.
+    """
+
+    def __init__(self, pdf: Pdf) -> None:
+        self._pdf = pdf
+        self._objects: dict[tuple[int, int], object] = {}
+        self._categories: dict[str, set[tuple[int, int]]] = {
+            name: set() for name in _CATEGORIES
+        }
+        self._by_filter: dict[str, set[tuple[int, int]]] = {}
+        self._chains: dict[tuple[int, int], tuple[str, ...]] = {}
+        self._max_objnum = 0
+
+        objects = pdf.objects
+        self._object_count = len(objects)
+        for obj in objects:
+            self._add(obj)
+
+        logger.debug(
+            "Document index built: %d objects, %d streams",
+            len(self._objects),
+            len(self._categories[STREAMS]),
+        )
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    @property
+    def object_count(self) -> int:
+        """Size of the object table, including indirect scalar objects."""
+        return self._object_count
+
+    @property
+    def pdf(self) -> Pdf:
+        """The indexed PDF."""
+        return self._pdf
+
+    @property
+    def max_objnum(self) -> int:
+        """Highest object number seen; call :meth:`sync` first to update."""
+        return self._max_objnum
+
+    def _add(self, obj) -> None:
+        try:
+            objgen = obj.objgen
+        except Exception:
+            return
+        if objgen == (0, 0):
+            return
+
+        self._objects[objgen] = obj
+        self._max_objnum = max(self._max_objnum, objgen[0])
+
+        try:
+            categories, chain = _classify(obj)
+        except Exception as e:
+            logger.debug("Could not classify object %s: %s", objgen, e)
+            return
+
+        for name in categories:
+            self._categories[name].add(objgen)
+        if chain:
+            self._chains[objgen] = chain
+            for filter_name in chain:
+                self._by_filter.setdefault(filter_name, set()).add(objgen)
+
+    def _remove(self, objgen: tuple[int, int]) -> None:
+        self._objects.pop(objgen, None)
+        for members in self._categories.values():
+            members.discard(objgen)
+        for filter_name in self._chains.pop(objgen, ()):
+            self._by_filter.get(filter_name, set()).discard(objgen)
+
+    def sync(self) -> int:
+        """Pick up objects created since the last sync.
+
+        New indirect objects always receive the next free object number,
+        so only object numbers above the highest one seen are probed.
+
+        Returns:
+            Number of objects added to the index.
+        """
+        added = 0
+        objnum = self._max_objnum + 1
+        while True:
+            try:
+                obj = self._pdf.get_object((objnum, 0))
+            except Exception:
+                break
+            if obj is None:
+                break
+            self._add(obj)
+            self._max_objnum = max(self._max_objnum, objnum)
+            self._object_count += 1
+            added += 1
+            objnum += 1
+        return added
+
+    def refresh(self, obj) -> None:
+        """Re-classify an object after a sanitizer changed it.
+
+        Call this after rewriting a stream's filter chain or changing the
+        keys that determine an object's category.
+
+        Args:
+            obj: The modified indirect object.
+        """
+        obj = resolve_indirect(obj)
+        try:
+            objgen = obj.objgen
+        except Exception:
+            return
+        if objgen == (0, 0):
+            return
+        self._remove(objgen)
+        self._add(obj)
+
+    def discard(self, obj) -> None:
+        """Drop an object that a sanitizer has removed from the document.
+
+        Args:
+            obj: The removed indirect object.
+        """
+        obj = resolve_indirect(obj)
+        try:
+            objgen = obj.objgen
+        except Exception:
+            return
+        self._remove(objgen)
+
+    def filter_chain(self, obj) -> tuple[str, ...]:
+        """Return the normalized filter chain recorded for a stream."""
+        try:
+            return self._chains.get(resolve_indirect(obj).objgen, ())
+        except Exception:
+            return ()
+
+    def _iter_objgens(self, objgens) -> Iterator:
+        objects = self._objects
+        for objgen in sorted(objgens):
+            obj = objects.get(objgen)
+            if obj is not None:
+                yield obj
+
+    def _iter_category(self, name: str) -> Iterator:
+        self.sync()
+        return self._iter_objgens(list(self._categories[name]))
+
+    def iter_matching(
+        self, *categories: str, filters: tuple[str, ...] = ()
+    ) -> Iterator:
+        """Yield objects in any of *categories* or using any of *filters*.
+
+        Args:
+            *categories: Category names (module-level constants).
+            filters: Canonical filter names to match in stream filter chains.
+        """
+        self.sync()
+        objgens: set[tuple[int, int]] = set()
+        for name in categories:
+            objgens |= self._categories[name]
+        for filter_name in filters:
+            objgens |= self._by_filter.get(filter_name, set())
+        return self._iter_objgens(objgens)
+
+    def iter_objects(self) -> Iterator:
+        """Yield every indexed object."""
+        self.sync()
+        return iter(list(self._objects.values()))
+
+    def iter_streams(self) -> Iterator[Stream]:
+        """Yield every stream object."""
+        return self._iter_category(STREAMS)
+
+    def iter_streams_with_filter(self, *filter_names: str) -> Iterator[Stream]:
+        """Yield streams whose filter chain contains any of *filter_names*.
+
+        Args:
+            *filter_names: Canonical filter names (e.g. ``"/LZWDecode"``).
+        """
+        return self.iter_matching(filters=filter_names)
+
+    def iter_content_streams(self) -> Iterator[Stream]:
+        """Yield page content streams and Form XObjects.
+
+        These are the only streams that can hold content operators and
+        inline images.
+        """
+        return self._iter_category(CONTENT_STREAMS)
+
+    def iter_noncanonical_filter_streams(self) -> Iterator[Stream]:
+        """Yield streams whose /Filter uses abbreviated or odd-case names."""
+        return self._iter_category(NONCANONICAL_FILTERS)
+
+    def iter_external_streams(self) -> Iterator[Stream]:
+        """Yield streams carrying /F, /FFilter or /FDecodeParms."""
+        return self._iter_category(EXTERNAL_STREAMS)
+
+    def iter_images(self) -> Iterator[Stream]:
+        """Yield Image XObjects."""
+        return self._iter_category(IMAGES)
+
+    def iter_forms(self) -> Iterator[Stream]:
+        """Yield Form XObjects."""
+        return self._iter_category(FORMS)
+
+    def iter_fonts(self) -> Iterator[Dictionary]:
+        """Yield font dictionaries."""
+        return self._iter_category(FONTS)
+
+    def iter_annotations(self) -> Iterator[Dictionary]:
+        """Yield indirect annotation dictionaries."""
+        return self._iter_category(ANNOTATIONS)
+
+    def iter_annotation_owners(self) -> Iterator:
+        """Yield dictionaries and streams that carry an /Annots entry."""
+        return self._iter_category(ANNOTATION_OWNERS)
+
+    def iter_filespecs(self) -> Iterator[Dictionary]:
+        """Yield FileSpec candidates (/Type /Filespec or an /EF entry)."""
+        return self._iter_category(FILESPECS)
+
+    def iter_signature_candidates(self) -> Iterator[Dictionary]:
+        """Yield dictionaries that may be signature dictionaries."""
+        return self._iter_category(SIGNATURES)
+
+    def iter_metadata_owners(self) -> Iterator[Dictionary]:
+        """Yield non-stream dictionaries that carry a /Metadata entry."""
+        return self._iter_category(METADATA_OWNERS)
+
+    def iter_metadata_streams(self) -> Iterator[Stream]:
+        """Yield /Type /Metadata streams."""
+        return self._iter_category(METADATA_STREAMS)
+
+
+_registry: PdfScopedRegistry[DocumentIndex] = PdfScopedRegistry(DocumentIndex)
+
+
+def document_index(pdf: Pdf) -> AbstractContextManager[DocumentIndex]:
+    """Activate a shared :class:`DocumentIndex` for *pdf*.
+
+    Nested scopes for the same PDF reuse the outer index.
+
+    Args:
+        pdf: Opened pikepdf PDF object.
+
+    Returns:
+        Context manager yielding the active index.
+    """
+    return _registry.activate(pdf)
+
+
+def get_document_index(pdf: Pdf) -> DocumentIndex:
+    """Return the active index for *pdf*, or build a throwaway one.
+
+    Args:
+        pdf: Opened pikepdf PDF object.
+
+    Returns:
+        A :class:`DocumentIndex` that reflects the current object table.
+    """
+    return _registry.get(pdf)
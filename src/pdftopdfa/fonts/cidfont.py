@@ -9,6 +9,7 @@ from typing import TYPE_CHECKING
 import pikepdf
 from pikepdf import Array, Dictionary, Name, Stream
 
+from .loader import bundled_font_derived
 from .metrics import FontMetricsExtractor
 from .tounicode import generate_cidfont_tounicode_cmap
 
@@ -67,7 +68,11 @@ class CIDFontBuilder:
             pikepdf Dictionary for the Type0 font.
         """
         # Extract metrics
-        metrics = self._metrics.extract_metrics(tt_font, is_symbol=False)
+        metrics = bundled_font_derived(
+            font_data,
+            ("metrics", False),
+            lambda: self._metrics.extract_metrics(tt_font, is_symbol=False),
+        )
         if metrics is None:
             msg = f"Font '{font_name}' missing head/OS2 tables"
             raise ValueError(msg)
@@ -91,13 +96,16 @@ class CIDFontBuilder:
         )
 
         # W array for character widths
-        w_array = self._metrics.build_cidfont_w_array(tt_font)
+        w_array = bundled_font_derived(
+            font_data,
+            ("cidfont_w_array",),
+            lambda: self._metrics.build_cidfont_w_array(tt_font),
+        )
 
         # Default width (for CIDs not explicitly specified)
-        head = tt_font["head"]
-        hmtx = tt_font["hmtx"]
-        scale = 1000.0 / head.unitsPerEm
-        default_width = int(hmtx.metrics.get(".notdef", (500, 0))[0] * scale)
+        default_width = bundled_font_derived(
+            font_data, ("cidfont_dw",), lambda: self._default_width(tt_font)
+        )
 
         # CIDSystemInfo
         cid_system_info = Dictionary(
@@ -119,7 +127,11 @@ class CIDFontBuilder:
         )
 
         # ToUnicode CMap stream
-        to_unicode_data = self._generate_to_unicode_cmap(tt_font)
+        to_unicode_data = bundled_font_derived(
+            font_data,
+            ("cidfont_tounicode",),
+            lambda: self._generate_to_unicode_cmap(tt_font),
+        )
         to_unicode_stream = Stream(self._pdf, to_unicode_data)
 
         # Type0 (main font) Dictionary
@@ -134,6 +146,14 @@ class CIDFontBuilder:
 
         return type0_font
 
+    @staticmethod
+    def _default_width(tt_font: "TTFont") -> int:
+        """Returns the .notdef advance width scaled to 1000 units."""
+        head = tt_font["head"]
+        hmtx = tt_font["hmtx"]
+        scale = 1000.0 / head.unitsPerEm
+        return int(hmtx.metrics.get(".notdef", (500, 0))[0] * scale)
+
     def _generate_to_unicode_cmap(self, tt_font: "TTFont") -> bytes:
         """Generates ToUnicode CMap for PDF/A text extraction.
 
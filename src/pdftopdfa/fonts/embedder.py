@@ -27,8 +27,9 @@ from .constants import FONT_REPLACEMENTS, SYMBOL_FONTS
 from .constants import UTF16_ENCODING_NAMES as _UTF16_ENCODING_NAMES
 from .encodings import SYMBOL_ENCODING, ZAPFDINGBATS_ENCODING
 from .glyph_mapping import SYMBOL_GLYPH_TO_UNICODE, ZAPFDINGBATS_GLYPH_TO_UNICODE
-from .loader import FontLoader
+from .loader import FontLoader, bundled_font_derived
 from .metrics import FontMetricsExtractor
+from .program_cache import get_font_program_cache
 from .subsetter import FontSubsetter, SubsettingResult
 from .tounicode import (
     build_identity_unicode_mapping,
@@ -534,24 +535,40 @@ class FontEmbedder:
             is_symbol = font_name in SYMBOL_FONTS
 
             # Extract metrics (with correct Flags value)
-            metrics = self._metrics.extract_metrics(tt_font, is_symbol=is_symbol)
+            metrics = bundled_font_derived(
+                font_data,
+                ("metrics", is_symbol),
+                lambda: self._metrics.extract_metrics(tt_font, is_symbol=is_symbol),
+            )
             if metrics is None:
                 logger.error("Font '%s' missing head/OS2 tables", font_name)
                 return False
 
             # Encoding-specific width extraction and encoding object
             if font_name == "Symbol":
-                widths = self._metrics.extract_widths_for_encoding(
-                    tt_font, SYMBOL_ENCODING, SYMBOL_GLYPH_TO_UNICODE
+                widths = bundled_font_derived(
+                    font_data,
+                    ("widths", "Symbol"),
+                    lambda: self._metrics.extract_widths_for_encoding(
+                        tt_font, SYMBOL_ENCODING, SYMBOL_GLYPH_TO_UNICODE
+                    ),
                 )
                 encoding = self._build_encoding_dictionary(SYMBOL_ENCODING)
             elif font_name == "ZapfDingbats":
-                widths = self._metrics.extract_widths_for_encoding(
-                    tt_font, ZAPFDINGBATS_ENCODING, ZAPFDINGBATS_GLYPH_TO_UNICODE
+                widths = bundled_font_derived(
+                    font_data,
+                    ("widths", "ZapfDingbats"),
+                    lambda: self._metrics.extract_widths_for_encoding(
+                        tt_font, ZAPFDINGBATS_ENCODING, ZAPFDINGBATS_GLYPH_TO_UNICODE
+                    ),
                 )
                 encoding = self._build_encoding_dictionary(ZAPFDINGBATS_ENCODING)
             else:
-                widths = self._metrics.extract_widths(tt_font)
+                widths = bundled_font_derived(
+                    font_data,
+                    ("widths", "WinAnsiEncoding"),
+                    lambda: self._metrics.extract_widths(tt_font),
+                )
                 encoding = None  # WinAnsiEncoding as Name
 
             # Create font stream and descriptor
@@ -1279,10 +1296,12 @@ class FontEmbedder:
         font_descriptor = _resolve_indirect(font_descriptor)
 
         # Try to extract font data from FontFile2 (TrueType)
-        font_file = font_descriptor.get("/FontFile2")
+        font_file_key = "/FontFile2"
+        font_file = font_descriptor.get(font_file_key)
         if font_file is None:
             # Try FontFile3 (CFF/OpenType)
-            font_file = font_descriptor.get("/FontFile3")
+            font_file_key = "/FontFile3"
+            font_file = font_descriptor.get(font_file_key)
 
         if font_file is None:
             logger.debug("No embedded font data found for %s", font_name)
@@ -1301,94 +1320,85 @@ class FontEmbedder:
             )
 
         try:
-            # Extract and parse font data
-            from io import BytesIO
+            # Parse the font program through the shared cache; bare CFF
+            # (Type1C) programs are not supported here.
+            program = get_font_program_cache(font_file).load(font_file, font_file_key)
+            if program is None or program.is_bare_cff:
+                logger.debug("Error parsing embedded font %s", font_name)
+                return False
+            tt_font = program.tt_font
 
-            from fontTools.ttLib import TTFont
+            # Get font's best Unicode cmap (None without a cmap table)
+            cmap = program.best_cmap
 
-            font_data = bytes(font_file.read_bytes())
-            tt_font = TTFont(BytesIO(font_data))
-            try:
-                # Get font's cmap table — getBestCmap() raises KeyError
-                # when the cmap table is entirely absent from the font.
-                cmap = None
-                try:
-                    cmap = tt_font.getBestCmap()
-                except KeyError:
-                    pass
-
-                # Fallback: try symbol font cmap (platform 3, encoding 0)
-                if cmap is None and "cmap" in tt_font:
-                    for subtable in tt_font["cmap"].tables:
-                        if subtable.platformID == 3 and subtable.platEncID == 0:
-                            cmap = subtable.cmap
-                            break
-
-                if cmap is not None:
-                    if _is_utf16_encoding(encoding_name):
-                        # UTF-16/UCS-2: character codes ARE Unicode values
-                        code_to_unicode = build_identity_unicode_mapping(cmap)
-                    else:
-                        # Build GID -> Unicode mapping from font's cmap
-                        glyph_order = tt_font.getGlyphOrder()
-                        glyph_name_to_gid = {
-                            name: i for i, name in enumerate(glyph_order)
-                        }
-                        gid_to_unicode: dict[int, int] = {}
-
-                        for unicode_val, glyph_name in cmap.items():
-                            gid = glyph_name_to_gid.get(glyph_name)
-                            if gid is not None:
-                                if gid not in gid_to_unicode:
-                                    gid_to_unicode[gid] = unicode_val
-
-                        # Check CIDToGIDMap on the descendant CIDFont
-                        cidtogidmap = desc_font.get("/CIDToGIDMap")
-                        if cidtogidmap is not None and not isinstance(
-                            cidtogidmap, pikepdf.Name
-                        ):
-                            # Stream-based CIDToGIDMap: CID != GID
-                            cidtogidmap = _resolve_indirect(cidtogidmap)
-                            stream_data = bytes(cidtogidmap.read_bytes())
-                            cid_to_gid = parse_cidtogidmap_stream(stream_data)
-
-                            # Compose CID -> GID -> Unicode
-                            code_to_unicode = {}
-                            for cid, gid in cid_to_gid.items():
-                                if gid in gid_to_unicode:
-                                    code_to_unicode[cid] = gid_to_unicode[gid]
-                        else:
-                            # Identity or absent: CID = GID
-                            code_to_unicode = gid_to_unicode
+            # Fallback: try symbol font cmap (platform 3, encoding 0)
+            if cmap is None and "cmap" in tt_font:
+                for subtable in tt_font["cmap"].tables:
+                    if subtable.platformID == 3 and subtable.platEncID == 0:
+                        cmap = subtable.cmap
+                        break
+
+            if cmap is not None:
+                if _is_utf16_encoding(encoding_name):
+                    # UTF-16/UCS-2: character codes ARE Unicode values
+                    code_to_unicode = build_identity_unicode_mapping(cmap)
                 else:
-                    # No cmap at all — generate PUA-based fallback mapping.
-                    # Each GID gets a unique PUA codepoint.  This satisfies
-                    # the formal ToUnicode requirement even though the
-                    # mappings carry no semantic meaning.
-                    logger.debug(
-                        "No cmap table in font %s, using PUA fallback",
-                        font_name,
-                    )
-                    num_glyphs = len(tt_font.getGlyphOrder())
-                    code_to_unicode = {}
-                    pua = 0xE000
-                    for gid in range(1, num_glyphs):  # skip .notdef at 0
-                        code_to_unicode[gid] = pua
-                        pua += 1
-                        if pua > 0xF8FF:
-                            pua = 0xF0000  # Supplementary PUA-A
-
-                if not code_to_unicode:
-                    return False
+                    # Build GID -> Unicode mapping from font's cmap
+                    glyph_order = program.glyph_order
+                    glyph_name_to_gid = {name: i for i, name in enumerate(glyph_order)}
+                    gid_to_unicode: dict[int, int] = {}
+
+                    for unicode_val, glyph_name in cmap.items():
+                        gid = glyph_name_to_gid.get(glyph_name)
+                        if gid is not None:
+                            if gid not in gid_to_unicode:
+                                gid_to_unicode[gid] = unicode_val
+
+                    # Check CIDToGIDMap on the descendant CIDFont
+                    cidtogidmap = desc_font.get("/CIDToGIDMap")
+                    if cidtogidmap is not None and not isinstance(
+                        cidtogidmap, pikepdf.Name
+                    ):
+                        # Stream-based CIDToGIDMap: CID != GID
+                        cidtogidmap = _resolve_indirect(cidtogidmap)
+                        stream_data = bytes(cidtogidmap.read_bytes())
+                        cid_to_gid = parse_cidtogidmap_stream(stream_data)
+
+                        # Compose CID -> GID -> Unicode
+                        code_to_unicode = {}
+                        for cid, gid in cid_to_gid.items():
+                            if gid in gid_to_unicode:
+                                code_to_unicode[cid] = gid_to_unicode[gid]
+                    else:
+                        # Identity or absent: CID = GID
+                        code_to_unicode = gid_to_unicode
+            else:
+                # No cmap at all — generate PUA-based fallback mapping.
+                # Each GID gets a unique PUA codepoint.  This satisfies
+                # the formal ToUnicode requirement even though the
+                # mappings carry no semantic meaning.
+                logger.debug(
+                    "No cmap table in font %s, using PUA fallback",
+                    font_name,
+                )
+                num_glyphs = len(program.glyph_order)
+                code_to_unicode = {}
+                pua = 0xE000
+                for gid in range(1, num_glyphs):  # skip .notdef at 0
+                    code_to_unicode[gid] = pua
+                    pua += 1
+                    if pua > 0xF8FF:
+                        pua = 0xF0000  # Supplementary PUA-A
+
+            if not code_to_unicode:
+                return False
 
-                # Generate ToUnicode CMap (16-bit for CIDFonts)
-                tounicode_data = generate_cidfont_tounicode_cmap(code_to_unicode)
-                tounicode_stream = Stream(self.pdf, tounicode_data)
-                font_obj[Name.ToUnicode] = self.pdf.make_indirect(tounicode_stream)
+            # Generate ToUnicode CMap (16-bit for CIDFonts)
+            tounicode_data = generate_cidfont_tounicode_cmap(code_to_unicode)
+            tounicode_stream = Stream(self.pdf, tounicode_data)
+            font_obj[Name.ToUnicode] = self.pdf.make_indirect(tounicode_stream)
 
-                return True
-            finally:
-                tt_font.close()
+            return True
 
         except Exception as e:
             logger.debug("Error parsing embedded font %s: %s", font_name, e)
@@ -15,8 +15,9 @@ from collections.abc import Iterator
 
 import pikepdf
 
+from ..content_cache import get_content_stream_cache
+from ..resource_graph import TYPE3_FONT, get_resource_graph
 from ..utils import resolve_indirect as _resolve_indirect
-from .utils import check_visited as _check_visited
 
 logger = logging.getLogger(__name__)
 
@@ -97,8 +98,10 @@ def _iter_content_streams_with_resources(
 ) -> Iterator[tuple[pikepdf.Object, pikepdf.Object]]:
     """Yields (content_stream_owner, resources) for all nested structures on a page.
 
-    Traverses page-level content, Form XObjects, Tiling Patterns,
-    and Annotation Appearance Streams recursively.
+    Covers page-level content, Form XObjects, Tiling Patterns and
+    Annotation Appearance Streams, as recorded by the document's resource
+    graph.  Form XObjects and patterns without their own Resources are
+    paired with the resources they inherit.
 
     Args:
         page: A pikepdf Page object.
@@ -106,140 +109,12 @@ def _iter_content_streams_with_resources(
     Yields:
         Tuples of (stream_owner, resources_dict).
     """
-    visited: set[tuple[int, int]] = set()
-
-    # Page-level
-    resources = page.get("/Resources")
-    if resources is not None:
-        try:
-            resources = _resolve_indirect(resources)
-        except Exception:
-            resources = None
-
-    if resources is not None:
-        yield (page.obj, resources)
-        yield from _iter_nested_streams(resources, visited)
-
-    # Annotation Appearance Streams
-    annots = page.get("/Annots")
-    if annots is None:
-        return
-
-    try:
-        annots = _resolve_indirect(annots)
-    except Exception:
-        return
-
-    for annot_ref in annots:
-        try:
-            annot = _resolve_indirect(annot_ref)
-            ap = annot.get("/AP")
-            if ap is None:
-                continue
-            ap = _resolve_indirect(ap)
-
-            for ap_key in ("/N", "/R", "/D"):
-                ap_entry = ap.get(ap_key)
-                if ap_entry is None:
-                    continue
-
-                try:
-                    ap_entry = _resolve_indirect(ap_entry)
-                except Exception:
-                    continue
-
-                if isinstance(ap_entry, pikepdf.Stream):
-                    _yield_from_form_xobject(ap_entry, visited)
-                    res = ap_entry.get("/Resources")
-                    if res is not None:
-                        res = _resolve_indirect(res)
-                        yield (ap_entry, res)
-                        yield from _iter_nested_streams(res, visited)
-                elif isinstance(ap_entry, pikepdf.Dictionary):
-                    for sub_key in list(ap_entry.keys()):
-                        try:
-                            sub = _resolve_indirect(ap_entry[sub_key])
-                            if isinstance(sub, pikepdf.Stream):
-                                if not _check_visited(sub, visited):
-                                    res = sub.get("/Resources")
-                                    if res is not None:
-                                        res = _resolve_indirect(res)
-                                        yield (sub, res)
-                                        yield from _iter_nested_streams(res, visited)
-                        except Exception:
-                            continue
-        except Exception:
+    for node in get_resource_graph(page).page_nodes(page):
+        if node.kind == TYPE3_FONT:
             continue
-
-
-def _yield_from_form_xobject(
-    xobj: pikepdf.Object,
-    visited: set[tuple[int, int]],
-) -> None:
-    """Mark a form XObject as visited (helper for AP streams)."""
-    _check_visited(xobj, visited)
-
-
-def _iter_nested_streams(
-    resources: pikepdf.Object,
-    visited: set[tuple[int, int]],
-) -> Iterator[tuple[pikepdf.Object, pikepdf.Object]]:
-    """Yields (stream_owner, resources) from nested XObjects and Patterns.
-
-    Args:
-        resources: A PDF Resources dictionary.
-        visited: Set for cycle detection.
-
-    Yields:
-        Tuples of (stream_owner, resources_dict).
-    """
-    # Form XObjects
-    xobject_dict = resources.get("/XObject")
-    if xobject_dict is not None:
-        try:
-            xobject_dict = _resolve_indirect(xobject_dict)
-        except Exception:
-            xobject_dict = None
-
-    if xobject_dict is not None:
-        for xobj_key in list(xobject_dict.keys()):
-            try:
-                xobj = _resolve_indirect(xobject_dict[xobj_key])
-                if _check_visited(xobj, visited):
-                    continue
-                subtype = xobj.get("/Subtype")
-                if subtype is not None and str(subtype) == "/Form":
-                    nested_res = xobj.get("/Resources")
-                    if nested_res is not None:
-                        nested_res = _resolve_indirect(nested_res)
-                        yield (xobj, nested_res)
-                        yield from _iter_nested_streams(nested_res, visited)
-            except Exception:
-                continue
-
-    # Tiling Patterns
-    pattern_dict = resources.get("/Pattern")
-    if pattern_dict is not None:
-        try:
-            pattern_dict = _resolve_indirect(pattern_dict)
-        except Exception:
-            pattern_dict = None
-
-    if pattern_dict is not None:
-        for pat_key in list(pattern_dict.keys()):
-            try:
-                pattern = _resolve_indirect(pattern_dict[pat_key])
-                if _check_visited(pattern, visited):
-                    continue
-                pattern_type = pattern.get("/PatternType")
-                if pattern_type is not None and int(pattern_type) == 1:
-                    nested_res = pattern.get("/Resources")
-                    if nested_res is not None:
-                        nested_res = _resolve_indirect(nested_res)
-                        yield (pattern, nested_res)
-                        yield from _iter_nested_streams(nested_res, visited)
-            except Exception:
-                continue
+        resources = node.resources
+        if resources is not None:
+            yield (node.owner, resources)
 
 
 def _resolve_font_object(
@@ -281,8 +156,8 @@ def collect_font_usage(
     """Collects character codes used with each font across the entire PDF.
 
     Iterates all pages and their nested structures (Form XObjects,
-    Tiling Patterns, Annotation APs), parses content streams, and
-    records which character codes are used with each font.
+    Tiling Patterns, Annotation APs), parses the content streams that
+    show text, and records which character codes are used with each font.
 
     Args:
         pdf: Opened pikepdf PDF object.
@@ -313,8 +188,12 @@ def _process_content_stream(
         resources: Resources dictionary for font resolution.
         usage: Accumulator mapping font objgen -> used character codes.
     """
+    cache = get_content_stream_cache(stream_owner)
     try:
-        instructions = pikepdf.parse_content_stream(stream_owner)
+        # Streams without text operators cannot use any glyphs
+        if not cache.has_text(stream_owner):
+            return
+        instructions = cache.instructions(stream_owner)
     except Exception:
         return
 
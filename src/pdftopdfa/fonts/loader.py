@@ -2,10 +2,25 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
-"""Font loading for PDF/A compliance."""
-
+"""Font loading for PDF/A compliance.
+
+The replacement fonts in ``resources/fonts`` are read once per
+process and kept in a thread-safe LRU cache of :class:`BundledFont`
+entries, shared by every :class:`FontLoader` (and so by every conversion
+stage and every file of a batch).  Each loader gets its own ``TTFont``
+over the cached bytes, so a caller may modify or close it without
+affecting anyone else; opening it only reads the table directory.  Metrics
+derived from a bundled font are memoized on the entry and returned as
+copies.
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
 from importlib import resources
-from typing import TYPE_CHECKING
+from io import BytesIO
+from typing import TYPE_CHECKING, Any
 
 from ..exceptions import FontEmbeddingError
 from .constants import (
@@ -18,12 +33,178 @@ from .constants import (
 if TYPE_CHECKING:
     from fontTools.ttLib import TTFont
 
+# Upper bound on bundled fonts kept in memory (all Standard-14
+# replacements plus a few CJK faces).
+DEFAULT_MAX_BUNDLED_FONTS = 16
+
+
+class BundledFont:
+    """A replacement font loaded from ``resources/fonts``.
+
+    Args:
+        data: The font program bytes (for a TTC, the extracted face).
+    """
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self._derived: dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    def open(self) -> "TTFont":
+        """Return a new ``TTFont`` of this font, owned by the caller.
+
+        Only the table directory is read here; fontTools decompiles each
+        table when it is first accessed.  Since no two callers share an
+        instance, modifying one never affects the others.
+        """
+        from fontTools.ttLib import TTFont
+
+        return TTFont(BytesIO(self.data))
+
+    def derived[T](self, key: Hashable, compute: Callable[[], T]) -> T:
+        """Return a copy of a value computed once from this font.
+
+        *compute* and the copy run outside the entry lock, so threads
+        using different values do not wait for each other.  Threads that
+        need a missing value at the same time may each compute it; the
+        first result is kept.
+
+        Args:
+            key: Identifies the derived value (e.g. ``("widths",)``).
+            compute: Computes the value on first use.
+
+        Returns:
+            A deep copy of the memoized value.
+        """
+        with self._lock:
+            found = key in self._derived
+            value = self._derived.get(key)
+        if not found:
+            value = compute()
+            with self._lock:
+                value = self._derived.setdefault(key, value)
+        return copy.deepcopy(value)
+
+
+class BundledFontCache:
+    """Process-wide LRU cache of bundled replacement fonts.
+
+    Args:
+        max_entries: Maximum number of fonts to keep.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_BUNDLED_FONTS) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[Hashable, BundledFont] = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, load: Callable[[], bytes]) -> BundledFont:
+        """Return the cached font for *key*, loading it on first use.
+
+        Loading happens under the cache lock, so concurrent callers asking
+        for the same font read it only once.
+
+        Args:
+            key: Identifies the resource (file name and collection index).
+            load: Returns the font bytes; may raise FontEmbeddingError.
+
+        Returns:
+            The shared :class:`BundledFont`.
+        """
+        with self._lock:
+            font = self._entries.get(key)
+            if font is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return font
+            self.loads += 1
+            font = BundledFont(load())
+            self._entries[key] = font
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            return font
+
+    def find(self, font_data: bytes) -> BundledFont | None:
+        """Return the cached font whose bytes are *font_data* (by identity)."""
+        with self._lock:
+            for font in self._entries.values():
+                if font.data is font_data:
+                    return font
+        return None
+
+    def clear(self) -> None:
+        """Drop every cached font and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.loads = 0
+            self.hits = 0
+
+
+_bundled_fonts = BundledFontCache()
+
+
+def get_bundled_font_cache() -> BundledFontCache:
+    """Return the process-wide :class:`BundledFontCache`."""
+    return _bundled_fonts
+
+
+def bundled_font_derived[T](
+    font_data: bytes, key: Hashable, compute: Callable[[], T]
+) -> T:
+    """Compute a value from a replacement font, memoized per process.
+
+    Args:
+        font_data: Font bytes as returned by :class:`FontLoader`.
+        key: Identifies the derived value.
+        compute: Computes the value from the font.
+
+    Returns:
+        A copy of the memoized value, or ``compute()`` if *font_data* does
+        not come from the bundled font cache.
+    """
+    font = _bundled_fonts.find(font_data)
+    if font is None:
+        return compute()
+    return font.derived(key, compute)
+
+
+def _read_font_resource(file_name: str, description: str) -> bytes:
+    try:
+        font_ref = resources.files("pdftopdfa") / "resources" / "fonts" / file_name
+        return font_ref.read_bytes()
+    except Exception as e:
+        raise FontEmbeddingError(
+            f"Could not load {description} '{file_name}': {e}"
+        ) from e
+
+
+def _extract_collection_font(font_data: bytes, font_index: int) -> bytes:
+    """Serialize one face of a TrueType Collection for FontFile2."""
+    from fontTools.ttLib import TTCollection
+
+    ttc = TTCollection(BytesIO(font_data))
+    try:
+        if font_index >= len(ttc.fonts):
+            font_index = 0
+        buf = BytesIO()
+        ttc.fonts[font_index].save(buf)
+        return buf.getvalue()
+    finally:
+        ttc.close()
+
 
 class FontLoader:
     """Loads and caches font files.
 
     This helper class handles loading replacement fonts from resources
-    and caching them for reuse.
+    and caching them for reuse.  The font bytes come from the process-wide
+    :class:`BundledFontCache` and are shared read-only; each loader opens
+    its own ``TTFont`` objects, which the owner of *font_cache* closes.
     """
 
     def __init__(self, font_cache: dict[str, tuple[bytes, "TTFont"]]) -> None:
@@ -34,6 +215,16 @@ class FontLoader:
         """
         self._font_cache = font_cache
 
+    def _load(
+        self, cache_key: str, resource_key: Hashable, load: Callable[[], bytes]
+    ) -> tuple[bytes, "TTFont"]:
+        if cache_key in self._font_cache:
+            return self._font_cache[cache_key]
+        font = _bundled_fonts.get(resource_key, load)
+        entry = (font.data, font.open())
+        self._font_cache[cache_key] = entry
+        return entry
+
     def load_standard14_font(self, font_name: str) -> tuple[bytes, "TTFont"]:
         """Loads a replacement font for Standard-14 fonts from resources.
 
@@ -46,8 +237,6 @@ class FontLoader:
         Raises:
             FontEmbeddingError: If the font cannot be loaded.
         """
-        from fontTools.ttLib import TTFont
-
         if font_name in self._font_cache:
             return self._font_cache[font_name]
 
@@ -55,23 +244,11 @@ class FontLoader:
         if replacement_file is None:
             raise FontEmbeddingError(f"No replacement defined for font '{font_name}'")
 
-        # Load font from resources
-        try:
-            font_ref = (
-                resources.files("pdftopdfa") / "resources" / "fonts" / replacement_file
-            )
-            font_data = font_ref.read_bytes()
-        except Exception as e:
-            raise FontEmbeddingError(
-                f"Could not load replacement font '{replacement_file}': {e}"
-            ) from e
-
-        # Parse font with fonttools
-        from io import BytesIO
-
-        tt_font = TTFont(BytesIO(font_data))
-        self._font_cache[font_name] = (font_data, tt_font)
-        return font_data, tt_font
+        return self._load(
+            font_name,
+            replacement_file,
+            lambda: _read_font_resource(replacement_file, "replacement font"),
+        )
 
     def load_fallback_font(self) -> tuple[bytes, "TTFont"]:
         """Loads the fallback font (LiberationSans) for unknown fonts.
@@ -85,27 +262,11 @@ class FontLoader:
         Raises:
             FontEmbeddingError: If the font cannot be loaded.
         """
-        from fontTools.ttLib import TTFont
-
-        cache_key = "__fallback__"
-        if cache_key in self._font_cache:
-            return self._font_cache[cache_key]
-
-        try:
-            font_ref = (
-                resources.files("pdftopdfa") / "resources" / "fonts" / FALLBACK_FONT
-            )
-            font_data = font_ref.read_bytes()
-        except Exception as e:
-            raise FontEmbeddingError(
-                f"Could not load fallback font '{FALLBACK_FONT}': {e}"
-            ) from e
-
-        from io import BytesIO
-
-        tt_font = TTFont(BytesIO(font_data))
-        self._font_cache[cache_key] = (font_data, tt_font)
-        return font_data, tt_font
+        return self._load(
+            "__fallback__",
+            FALLBACK_FONT,
+            lambda: _read_font_resource(FALLBACK_FONT, "fallback font"),
+        )
 
     def load_cidfont_replacement_by_ordering(
         self, ordering: str
@@ -124,45 +285,17 @@ class FontLoader:
         Raises:
             FontEmbeddingError: If the font cannot be loaded.
         """
-        from fontTools.ttLib import TTCollection, TTFont
-
         font_index = CJK_FONT_INDEX.get(ordering, 0)
-        cache_key = f"__cidfont_{font_index}__"
-
-        if cache_key in self._font_cache:
-            return self._font_cache[cache_key]
 
-        # Load font from resources
-        try:
-            font_ref = (
-                resources.files("pdftopdfa")
-                / "resources"
-                / "fonts"
-                / CIDFONT_REPLACEMENT
+        def load() -> bytes:
+            font_data = _read_font_resource(
+                CIDFONT_REPLACEMENT, "CIDFont replacement font"
             )
-            font_data = font_ref.read_bytes()
-        except Exception as e:
-            raise FontEmbeddingError(
-                f"Could not load CIDFont replacement font '{CIDFONT_REPLACEMENT}': {e}"
-            ) from e
-
-        # Parse font with fonttools (TTC = TrueType Collection)
-        from io import BytesIO
-
-        if CIDFONT_REPLACEMENT.endswith(".ttc"):
-            ttc = TTCollection(BytesIO(font_data))
-            try:
-                if font_index >= len(ttc.fonts):
-                    font_index = 0
-                # Serialize the single font for FontFile2
-                buf = BytesIO()
-                ttc.fonts[font_index].save(buf)
-                font_data = buf.getvalue()
-            finally:
-                ttc.close()
-            tt_font = TTFont(BytesIO(font_data))
-        else:
-            tt_font = TTFont(BytesIO(font_data))
-
-        self._font_cache[cache_key] = (font_data, tt_font)
-        return font_data, tt_font
+            # TTC = TrueType Collection: serialize the single font
+            if CIDFONT_REPLACEMENT.endswith(".ttc"):
+                font_data = _extract_collection_font(font_data, font_index)
+            return font_data
+
+        return self._load(
+            f"__cidfont_{font_index}__", (CIDFONT_REPLACEMENT, font_index), load
+        )
@@ -0,0 +1,239 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Per-conversion cache of parsed embedded font programs.
+
+The glyph coverage, width, .notdef and TrueType encoding sanitizers all
+parse the same ``/FontFile``/``/FontFile2``/``/FontFile3`` streams with
+fontTools, and bare CFF programs are wrapped into an OTF container each
+time.  For large CJK fonts that parsing dominates the font sanitizers.
+:class:`FontProgramCache` parses every font stream once, keyed by its
+objgen and validated against a hash of its raw bytes, and also keeps the
+derived data the sanitizers look up most (glyph order, advance widths,
+best cmap).
+
+The cached ``TTFont`` is shared: code that modifies it must call
+:meth:`FontProgramCache.invalidate` first, so later readers re-parse the
+stream instead of seeing the edited font.  A sanitizer writing new bytes
+into the same stream invalidates the entry automatically; one that
+replaces the stream gets a new objgen and therefore a new entry.
+
+During a conversion the cache is activated with :func:`font_program_cache`;
+outside an active scope :func:`get_font_program_cache` returns a cache
+that is not shared, so every call parses the font program as before.
+"""
+
+import io
+import logging
+from collections import OrderedDict
+from contextlib import AbstractContextManager
+from functools import cached_property
+from typing import Any
+
+from pikepdf import Object, Pdf, Stream
+
+from ..utils import PdfScopedRegistry, resolve_indirect, stream_fingerprint
+from .utils import wrap_cff_in_otf
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on parsed font programs kept in memory.
+DEFAULT_MAX_ENTRIES = 64
+
+# Font descriptor keys of embedded font programs, in lookup order.
+FONT_FILE_KEYS = ("/FontFile2", "/FontFile3", "/FontFile")
+
+
+class FontProgram:
+    """A parsed font program and the data derived from it.
+
+    Args:
+        tt_font: The parsed fontTools ``TTFont``.
+        is_bare_cff: True if the stream held bare CFF data that was
+            wrapped in an OTF container before parsing.
+    """
+
+    def __init__(self, tt_font: Any, is_bare_cff: bool = False) -> None:
+        self.tt_font = tt_font
+        self.is_bare_cff = is_bare_cff
+
+    @cached_property
+    def glyph_order(self) -> tuple[str, ...]:
+        """Glyph names in GID order."""
+        return tuple(self.tt_font.getGlyphOrder())
+
+    @cached_property
+    def glyph_names(self) -> frozenset[str]:
+        """Set of all glyph names."""
+        return frozenset(self.glyph_order)
+
+    @cached_property
+    def advance_widths(self) -> dict[str, int]:
+        """Advance width in font units per glyph name (empty without hmtx)."""
+        if "hmtx" not in self.tt_font:
+            return {}
+        return {
+            name: metrics[0] for name, metrics in self.tt_font["hmtx"].metrics.items()
+        }
+
+    @cached_property
+    def best_cmap(self) -> dict[int, str] | None:
+        """Unicode to glyph name mapping, or None if there is none."""
+        try:
+            return self.tt_font.getBestCmap()
+        except KeyError:
+            return None
+
+
+def parse_font_program(data: bytes, font_file_key: str) -> FontProgram | None:
+    """Parses embedded font program bytes with fontTools.
+
+    Bare CFF data in a ``/FontFile3`` stream is wrapped in an OTF
+    container first.  Type 1 programs (``/FontFile``) are not handled.
+
+    Args:
+        data: Decoded font stream bytes.
+        font_file_key: ``/FontFile``, ``/FontFile2`` or ``/FontFile3``.
+
+    Returns:
+        The parsed program, or None if it cannot be parsed.
+    """
+    from fontTools.ttLib import TTFont
+
+    try:
+        return FontProgram(TTFont(io.BytesIO(data)))
+    except Exception:
+        if font_file_key != "/FontFile3":
+            return None
+    try:
+        return FontProgram(TTFont(io.BytesIO(wrap_cff_in_otf(data))), True)
+    except Exception:
+        return None
+
+
+class FontProgramCache:
+    """Per-document cache of parsed font programs.
+
+    Args:
+        pdf: Opened pikepdf PDF object, or None for a detached cache that
+            does not keep anything.
+        max_entries: Maximum number of parsed programs to keep.
+    """
+
+    def __init__(self, pdf: Pdf | None, *, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self._pdf = pdf
+        self._max_entries = max_entries if pdf is not None else 0
+        self._entries: OrderedDict[
+            tuple[int, int], tuple[tuple, FontProgram | None]
+        ] = OrderedDict()
+        self.parses = 0
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self, stream: Stream, font_file_key: str) -> FontProgram | None:
+        """Return the parsed program of a font stream.
+
+        Failed parses are cached as well, so a broken font program is only
+        tried once.
+
+        Args:
+            stream: The ``/FontFile*`` stream.
+            font_file_key: The key *stream* was found under.
+
+        Returns:
+            The shared :class:`FontProgram`, or None if the stream cannot
+            be parsed.  Call :meth:`invalidate` before modifying it.
+        """
+        key = stream.objgen
+        fingerprint: tuple | None = None
+        if key != (0, 0) and self._max_entries > 0:
+            fingerprint = (font_file_key, *stream_fingerprint(stream))
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        self.parses += 1
+        try:
+            data = bytes(stream.read_bytes())
+        except Exception as e:
+            logger.debug("Cannot read font program %s: %s", key, e)
+            program = None
+        else:
+            program = parse_font_program(data, font_file_key)
+
+        if fingerprint is not None:
+            self._entries[key] = (fingerprint, program)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return program
+
+    def invalidate(self, stream: Stream) -> None:
+        """Drop the cached program of *stream* before it is modified."""
+        self._entries.pop(stream.objgen, None)
+
+    def clear(self) -> None:
+        """Drop every cached program."""
+        self._entries.clear()
+
+
+_registry: PdfScopedRegistry[FontProgramCache] = PdfScopedRegistry(
+    FontProgramCache,
+    on_exit=FontProgramCache.clear,
+    detached_factory=lambda pdf: FontProgramCache(None),
+)
+
+
+def font_program_cache(pdf: Pdf) -> AbstractContextManager[FontProgramCache]:
+    """Activate a shared :class:`FontProgramCache` for *pdf*.
+
+    Args:
+        pdf: Opened pikepdf PDF object.
+
+    Returns:
+        Context manager yielding the active cache.
+    """
+    return _registry.activate(pdf)
+
+
+def get_font_program_cache(owner: Pdf | Object) -> FontProgramCache:
+    """Return the active font program cache, or a detached one.
+
+    Args:
+        owner: Opened pikepdf PDF object, or any object owned by it (e.g.
+            a font dictionary or the font stream itself).
+
+    Returns:
+        A :class:`FontProgramCache` for the owning PDF.
+    """
+    if isinstance(owner, Pdf):
+        return _registry.get(owner)
+    cache = _registry.lookup_owner(owner)
+    if cache is not None:
+        return cache
+    return FontProgramCache(None)
+
+
+def load_embedded_font_program(fd: Object) -> FontProgram | None:
+    """Load the font program embedded in a font descriptor.
+
+    The first of ``/FontFile2``, ``/FontFile3`` and ``/FontFile`` that is
+    present is loaded through the active :class:`FontProgramCache`.
+
+    Args:
+        fd: Resolved FontDescriptor dictionary.
+
+    Returns:
+        The parsed program, or None if there is none or it cannot be parsed.
+    """
+    for key in FONT_FILE_KEYS:
+        stream = fd.get(key)
+        if stream is not None:
+            stream = resolve_indirect(stream)
+            return get_font_program_cache(stream).load(stream, key)
+    return None
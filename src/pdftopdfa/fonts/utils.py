@@ -5,6 +5,7 @@
 """Utility functions for font handling."""
 
 import logging
+import struct
 
 import pikepdf
 
@@ -74,6 +75,31 @@ def safe_str(obj: pikepdf.Object, fallback: str = "Unknown") -> str:
             return fallback
 
 
+def wrap_cff_in_otf(cff_data: bytes) -> bytes:
+    """Wraps standalone CFF data in a minimal OTF container.
+
+    fontTools only parses CFF inside an sfnt, so bare ``/FontFile3``
+    programs (``/Type1C``, ``/CIDFontType0C``) are wrapped before parsing.
+
+    Args:
+        cff_data: Raw CFF table data.
+
+    Returns:
+        OpenType font bytes with a single ``CFF `` table.
+    """
+    tag = b"CFF "
+    offset = 12 + 16  # sfnt header (12) + one table record (16)
+    length = len(cff_data)
+    pad_len = (4 - length % 4) % 4
+    padded = cff_data + b"\x00" * pad_len
+    checksum = 0
+    for i in range(0, len(padded), 4):
+        checksum = (checksum + struct.unpack(">I", padded[i : i + 4])[0]) & 0xFFFFFFFF
+    header = struct.pack(">4sHHHH", b"OTTO", 1, 16, 0, 16)
+    table_record = struct.pack(">4sIII", tag, checksum, offset, length)
+    return header + table_record + cff_data
+
+
 # fsType bit masks (OpenType OS/2 table)
 FSTYPE_RESTRICTED_LICENSE = 0x0002
 FSTYPE_PREVIEW_AND_PRINT = 0x0004
@@ -0,0 +1,185 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Persistent job journal for resumable batch conversion.
+
+A :class:`ConversionJournal` is a small SQLite database with one row per
+input file.  Each row records the input's size, modification time and
+SHA-256, and the outcome of its last conversion: status, level, warnings,
+error, processing time, and the output path, size and SHA-256.
+
+When a batch is resumed, a file is skipped only if its last conversion
+succeeded for the same level and output path, the input is unchanged and
+the output still has the recorded size.  Failed files are retried.  The
+input hash is only recomputed when the size matches but the modification
+time differs, so an unchanged tree is checked with ``stat()`` alone.
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+
+from .converter import ConversionResult
+from .utils import file_sha256
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversions (
+    input_path TEXT PRIMARY KEY,
+    input_size INTEGER NOT NULL,
+    input_mtime_ns INTEGER NOT NULL,
+    input_sha256 TEXT NOT NULL,
+    output_path TEXT NOT NULL,
+    output_size INTEGER,
+    output_sha256 TEXT,
+    level TEXT NOT NULL,
+    result_level TEXT NOT NULL,
+    status TEXT NOT NULL,
+    warnings TEXT NOT NULL,
+    error TEXT,
+    processing_time REAL NOT NULL,
+    validation_failed INTEGER NOT NULL,
+    updated REAL NOT NULL
+)
+"""
+
+STATUS_SUCCESS = "success"
+STATUS_FAILED = "failed"
+
+
+def _journal_key(path: Path) -> str:
+    return str(path.resolve())
+
+
+class ConversionJournal:
+    """On-disk record of batch conversion outcomes.
+
+    Args:
+        path: SQLite database file; created if it does not exist.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def __enter__(self) -> "ConversionJournal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def entry(self, input_path: Path) -> dict | None:
+        """Returns the recorded row for *input_path*, or None.
+
+        Args:
+            input_path: Input PDF path.
+
+        Returns:
+            Dictionary of the journal columns (warnings decoded to a list).
+        """
+        cursor = self._conn.execute(
+            "SELECT * FROM conversions WHERE input_path = ?",
+            (_journal_key(input_path),),
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        entry = dict(zip([c[0] for c in cursor.description], row, strict=True))
+        entry["warnings"] = json.loads(entry["warnings"])
+        entry["validation_failed"] = bool(entry["validation_failed"])
+        return entry
+
+    def is_done(self, input_path: Path, output_path: Path, level: str) -> bool:
+        """Checks whether a file was already converted successfully.
+
+        Args:
+            input_path: Input PDF path.
+            output_path: Output path the conversion must have written.
+            level: Requested PDF/A level.
+
+        Returns:
+            True if the recorded conversion is still valid.
+        """
+        entry = self.entry(input_path)
+        if (
+            entry is None
+            or entry["status"] != STATUS_SUCCESS
+            or entry["level"] != level
+            or entry["output_path"] != _journal_key(output_path)
+        ):
+            return False
+
+        try:
+            input_stat = input_path.stat()
+            output_stat = output_path.stat()
+        except OSError:
+            return False
+        if output_stat.st_size != entry["output_size"]:
+            return False
+        if input_stat.st_size != entry["input_size"]:
+            return False
+        if input_stat.st_mtime_ns != entry["input_mtime_ns"]:
+            try:
+                return file_sha256(input_path) == entry["input_sha256"]
+            except OSError:
+                return False
+        return True
+
+    def record(self, result: ConversionResult, level: str) -> None:
+        """Stores the outcome of a conversion.
+
+        Args:
+            result: Result returned for one file of the batch.
+            level: The requested PDF/A level (``result.level`` may differ
+                for inputs that already were PDF/A).
+        """
+        try:
+            input_stat = result.input_path.stat()
+            input_sha256 = file_sha256(result.input_path)
+        except OSError as e:
+            logger.warning("Cannot journal %s: %s", result.input_path, e)
+            return
+
+        output_size = output_sha256 = None
+        if result.success:
+            try:
+                output_size = result.output_path.stat().st_size
+                output_sha256 = file_sha256(result.output_path)
+            except OSError as e:
+                logger.debug("Output %s not readable: %s", result.output_path, e)
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO conversions VALUES "
+            "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                _journal_key(result.input_path),
+                input_stat.st_size,
+                input_stat.st_mtime_ns,
+                input_sha256,
+                _journal_key(result.output_path),
+                output_size,
+                output_sha256,
+                level,
+                result.level,
+                STATUS_SUCCESS if result.success else STATUS_FAILED,
+                json.dumps(result.warnings),
+                result.error,
+                result.processing_time,
+                int(result.validation_failed),
+                time.time(),
+            ),
+        )
+        self._conn.commit()
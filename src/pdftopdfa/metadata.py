@@ -14,6 +14,7 @@ import pikepdf
 from lxml import etree
 from lxml.builder import ElementMaker
 
+from .document_index import get_document_index
 from .exceptions import ConversionError
 from .utils import validate_pdfa_level
 
@@ -2089,7 +2090,7 @@ def _collect_non_catalog_extension_needs(
     root_objgen = pdf.Root.objgen
     ns_rdf = NAMESPACES["rdf"]
 
-    for obj in pdf.objects:
+    for obj in get_document_index(pdf).iter_metadata_owners():
         if not isinstance(obj, pikepdf.Dictionary):
             continue
         try:
@@ -2153,7 +2154,7 @@ def _sanitize_non_catalog_metadata(pdf: pikepdf.Pdf) -> tuple[int, int]:
     removed = 0
     root_objgen = pdf.Root.objgen
 
-    for obj in pdf.objects:
+    for obj in get_document_index(pdf).iter_metadata_owners():
         try:
             obj = obj.get_object()
         except Exception:
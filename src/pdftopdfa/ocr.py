@@ -15,6 +15,7 @@ import logging
 import os
 import shutil
 import threading
+from collections.abc import Iterable
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -54,12 +55,17 @@ if TYPE_CHECKING:
     import pikepdf
 
 # Local
+from . import cpu_budget
 from .exceptions import OCRError
 
 logger = logging.getLogger(__name__)
 
 _path_lock = threading.Lock()
 
+_thread_limit_lock = threading.Lock()
+_thread_limit_users = 0
+_saved_thread_limit: str | None = None
+
 
 @contextlib.contextmanager
 def _temporary_tesseract_path():
@@ -75,6 +81,10 @@ def _temporary_tesseract_path():
         return
     p = Path(tesseract_path)
     tesseract_dir = str(p) if p.is_dir() else str(p.parent)
+    if os.environ.get("PATH", "").startswith(tesseract_dir + os.pathsep):
+        # Already first on PATH (e.g. in an OCR service worker)
+        yield
+        return
     with _path_lock:
         saved = os.environ.get("PATH", "")
         os.environ["PATH"] = tesseract_dir + os.pathsep + saved
@@ -84,6 +94,33 @@ def _temporary_tesseract_path():
             os.environ["PATH"] = saved
 
 
+@contextlib.contextmanager
+def _single_threaded_tesseract():
+    """Limit each Tesseract process to one thread (thread-safe).
+
+    ocrmypdf runs one Tesseract process per job, and Tesseract's OpenMP
+    build would otherwise start one thread per core in each of them.
+    Tesseract reads ``OMP_THREAD_LIMIT`` from the environment it inherits,
+    so the variable is set while any OCR runs and restored afterwards.
+    """
+    global _thread_limit_users, _saved_thread_limit
+    with _thread_limit_lock:
+        if _thread_limit_users == 0:
+            _saved_thread_limit = os.environ.get("OMP_THREAD_LIMIT")
+            os.environ["OMP_THREAD_LIMIT"] = "1"
+        _thread_limit_users += 1
+    try:
+        yield
+    finally:
+        with _thread_limit_lock:
+            _thread_limit_users -= 1
+            if _thread_limit_users == 0:
+                if _saved_thread_limit is None:
+                    os.environ.pop("OMP_THREAD_LIMIT", None)
+                else:
+                    os.environ["OMP_THREAD_LIMIT"] = _saved_thread_limit
+
+
 class OcrQuality(enum.Enum):
     """OCR quality presets controlling the speed/quality trade-off.
 
@@ -135,6 +172,48 @@ OCR_SETTINGS: dict[OcrQuality, dict] = {
 _PREPROCESS_QUALITIES = frozenset({OcrQuality.DEFAULT, OcrQuality.BEST})
 
 
+class OcrPreprocess(enum.Enum):
+    """OpenCV preprocessing of page images before Tesseract.
+
+    Every mode except NONE binarizes the image with an adaptive threshold;
+    they differ in the denoising that runs first.
+
+    Attributes:
+        NONE: No preprocessing; Tesseract sees the rendered page.
+        MEDIAN: 3x3 median filter, cheap and enough for clean scans.
+        NLMEANS: Non-local means denoising, slow but best on noisy scans.
+        AUTO: Estimates the noise on a downsampled image and picks no
+            denoising, MEDIAN or NLMEANS accordingly.
+    """
+
+    NONE = "none"
+    MEDIAN = "median"
+    NLMEANS = "nlmeans"
+    AUTO = "auto"
+
+
+# Environment variable selecting the preprocessing mode.
+OCR_PREPROCESS_ENV = "PDFTOPDFA_OCR_PREPROCESS"
+
+
+def get_ocr_preprocess(quality: OcrQuality = OcrQuality.DEFAULT) -> OcrPreprocess:
+    """Returns the default preprocessing mode for OCR at *quality*.
+
+    A mode set with the environment variable applies to all quality
+    presets.  Otherwise ``fast`` does no preprocessing and the other
+    presets use AUTO.
+    """
+    value = os.environ.get(OCR_PREPROCESS_ENV)
+    if value:
+        try:
+            return OcrPreprocess(value.strip().lower())
+        except ValueError:
+            logger.warning("Ignoring invalid %s=%r", OCR_PREPROCESS_ENV, value)
+    return (
+        OcrPreprocess.AUTO if quality in _PREPROCESS_QUALITIES else OcrPreprocess.NONE
+    )
+
+
 def is_ocr_available() -> bool:
     """Checks if OCR functionality is available.
 
@@ -144,13 +223,31 @@ def is_ocr_available() -> bool:
     return HAS_OCR
 
 
-def needs_ocr(pdf: "pikepdf.Pdf", *, threshold: float = 0.5) -> bool:
-    """Analyzes whether a PDF needs OCR.
+def pages_needing_ocr(pdf: "pikepdf.Pdf") -> list[int]:
+    """Finds the pages of a PDF that need OCR.
 
-    Checks each page for the presence of images without recognizable text.
     A page is considered to need OCR if it contains images but has no
     text operators (Tj/TJ) in the content stream.
 
+    Args:
+        pdf: The pikepdf.Pdf object to analyze.
+
+    Returns:
+        Zero-based indices of the pages that need OCR, in page order.
+    """
+    return [
+        index
+        for index, page in enumerate(pdf.pages)
+        if _page_has_images(page) and not _page_has_text(page)
+    ]
+
+
+def needs_ocr(pdf: "pikepdf.Pdf", *, threshold: float = 0.5) -> bool:
+    """Analyzes whether a PDF needs OCR.
+
+    Checks each page for the presence of images without recognizable text
+    (see :func:`pages_needing_ocr`).
+
     Args:
         pdf: The pikepdf.Pdf object to analyze.
         threshold: Proportion of pages that must need OCR (0.0-1.0).
@@ -162,19 +259,12 @@ def needs_ocr(pdf: "pikepdf.Pdf", *, threshold: float = 0.5) -> bool:
     if len(pdf.pages) == 0:
         return False
 
-    pages_needing_ocr = 0
-
-    for page in pdf.pages:
-        has_images = _page_has_images(page)
-        has_text = _page_has_text(page)
+    pages_needing = len(pages_needing_ocr(pdf))
 
-        if has_images and not has_text:
-            pages_needing_ocr += 1
-
-    ratio = pages_needing_ocr / len(pdf.pages)
+    ratio = pages_needing / len(pdf.pages)
     logger.debug(
         "OCR analysis: %d/%d pages need OCR (%.1f%%, threshold: %.1f%%)",
-        pages_needing_ocr,
+        pages_needing,
         len(pdf.pages),
         ratio * 100,
         threshold * 100,
@@ -221,9 +311,10 @@ def _page_has_images(page: "pikepdf.Page") -> bool:
 def _page_has_text(page: "pikepdf.Page") -> bool:
     """Checks if a page contains text operators.
 
-    Uses pikepdf.parse_content_stream for reliable operator detection
-    instead of raw byte matching (which can false-positive on binary data).
-    Also checks Form XObjects referenced from the page, since text is
+    Scans the decoded content stream with a tokenizer that skips strings,
+    comments and inline image data (see :mod:`pdftopdfa.text_scan`), so
+    binary data cannot produce false positives, and stops at the first
+    text operator.  Also checks Form XObjects referenced from the page, since text is
     commonly rendered inside Form XObjects (e.g. overlaid text, headers/footers,
     or existing OCR layers).
 
@@ -233,14 +324,11 @@ def _page_has_text(page: "pikepdf.Page") -> bool:
     Returns:
         True if the page contains text operators.
     """
-    import pikepdf
-
-    text_operators = frozenset(["Tj", "TJ", "'", '"'])
+    from .content_cache import get_content_stream_cache
 
     try:
-        for _operands, operator in pikepdf.parse_content_stream(page):
-            if str(operator) in text_operators:
-                return True
+        if get_content_stream_cache(page).has_text(page):
+            return True
     except Exception as e:
         logger.debug("Error during text analysis: %s", e)
 
@@ -259,7 +347,7 @@ def _page_has_text(page: "pikepdf.Page") -> bool:
                 xobj = xobjects[name].get_object()
             except (AttributeError, TypeError, ValueError):
                 xobj = xobjects[name]
-            if _form_xobject_has_text(xobj, text_operators, visited):
+            if _form_xobject_has_text(xobj, visited):
                 return True
     except Exception as e:
         logger.debug("Error checking XObjects for text: %s", e)
@@ -269,20 +357,18 @@ def _page_has_text(page: "pikepdf.Page") -> bool:
 
 def _form_xobject_has_text(
     xobj: "pikepdf.Object",
-    text_operators: frozenset[str],
     visited: set[tuple[int, int]],
 ) -> bool:
     """Recursively checks a Form XObject for text operators.
 
     Args:
         xobj: The XObject to check.
-        text_operators: Set of PDF text operator names.
         visited: Set of already-visited object IDs to prevent cycles.
 
     Returns:
         True if the Form XObject (or nested Form XObjects) contains text.
     """
-    import pikepdf
+    from .content_cache import get_content_stream_cache
 
     try:
         subtype = xobj.get("/Subtype")
@@ -301,11 +387,10 @@ def _form_xobject_has_text(
         visited.add(objgen)
 
     try:
-        for _operands, operator in pikepdf.parse_content_stream(xobj):
-            if str(operator) in text_operators:
-                return True
+        if get_content_stream_cache(xobj).has_text(xobj):
+            return True
     except Exception as e:
-        logger.debug("Error parsing Form XObject content stream: %s", e)
+        logger.debug("Error scanning Form XObject content stream: %s", e)
         return False
 
     # Check nested Form XObjects
@@ -322,7 +407,7 @@ def _form_xobject_has_text(
                 nested = nested_xobjects[name].get_object()
             except (AttributeError, TypeError, ValueError):
                 nested = nested_xobjects[name]
-            if _form_xobject_has_text(nested, text_operators, visited):
+            if _form_xobject_has_text(nested, visited):
                 return True
     except Exception as e:
         logger.debug("Error checking nested XObjects: %s", e)
@@ -330,6 +415,22 @@ def _form_xobject_has_text(
     return False
 
 
+def _format_page_ranges(pages: Iterable[int]) -> str:
+    """Formats zero-based page indices as ocrmypdf's one-based page ranges.
+
+    Example: ``[0, 1, 2, 6]`` becomes ``"1-3,7"``.
+    """
+    ranges: list[str] = []
+    ordered = sorted(set(pages))
+    start = 0
+    for i in range(1, len(ordered) + 1):
+        if i == len(ordered) or ordered[i] != ordered[i - 1] + 1:
+            first, last = ordered[start] + 1, ordered[i - 1] + 1
+            ranges.append(str(first) if first == last else f"{first}-{last}")
+            start = i
+    return ",".join(ranges)
+
+
 def apply_ocr(
     input_path: Path,
     output_path: Path,
@@ -337,11 +438,21 @@ def apply_ocr(
     *,
     quality: OcrQuality = OcrQuality.DEFAULT,
     force: bool = False,
+    pages: Iterable[int] | None = None,
+    preprocess: OcrPreprocess | None = None,
 ) -> Path:
     """Performs OCR on a PDF.
 
     Uses ocrmypdf for text recognition. Pages that already contain text
-    are skipped unless ``force=True``.
+    are skipped unless ``force=True``.  If *pages* is given, only those
+    pages are rasterized and recognized; ocrmypdf grafts their text layer
+    onto the original pages and passes all other pages through unchanged.
+
+    The number of parallel Tesseract processes is taken from the CPU
+    budget (see :mod:`pdftopdfa.cpu_budget`), so OCR started by several
+    batch workers at once does not oversubscribe the machine.  While an
+    :class:`~pdftopdfa.ocr_service.OcrService` is open, the file is
+    processed by one of its warm workers instead.
 
     Args:
         input_path: Path to the input PDF.
@@ -351,6 +462,10 @@ def apply_ocr(
         quality: OCR quality preset (default: OcrQuality.DEFAULT).
         force: If True, use ocrmypdf's ``redo_ocr`` mode to remove the
             existing OCR layer and re-apply OCR (default: False).
+        pages: Zero-based indices of the pages to OCR. If None, all pages
+            are considered.
+        preprocess: OpenCV preprocessing of the page images. If None, uses
+            :func:`get_ocr_preprocess`.
 
     Returns:
         Path to the OCR-processed PDF.
@@ -365,6 +480,23 @@ def apply_ocr(
             "OCR not available. Install the OCR dependency: pip install pdftopdfa[ocr]"
         )
 
+    from .ocr_service import get_ocr_service
+
+    service = get_ocr_service()
+    if service is not None:
+        return service.ocr(
+            input_path,
+            output_path,
+            languages,
+            quality=quality,
+            force=force,
+            pages=pages,
+            preprocess=preprocess,
+        )
+
+    if preprocess is None:
+        preprocess = get_ocr_preprocess(quality)
+
     logger.info(
         "Starting OCR for %s (languages: %s, quality: %s, force: %s)",
         input_path,
@@ -380,23 +512,40 @@ def apply_ocr(
             ocr_kwargs.pop("skip_text", None)
             ocr_kwargs["redo_ocr"] = True
 
-        if quality in _PREPROCESS_QUALITIES:
+        wanted_jobs = cpu_budget.get_cpu_limit()
+        if pages is not None:
+            pages = set(pages)
+            wanted_jobs = min(wanted_jobs, max(len(pages), 1))
+            ocr_kwargs["pages"] = _format_page_ranges(pages)
+            logger.debug("OCR limited to pages %s", ocr_kwargs["pages"])
+
+        if preprocess is not OcrPreprocess.NONE:
             if HAS_OPENCV:
                 ocr_kwargs["plugins"] = ["pdftopdfa.ocr_preprocess"]
-                logger.debug("OpenCV preprocessing plugin enabled")
+                # Option added by the plugin, passed on to its workers
+                ocr_kwargs["pdftopdfa_preprocess"] = preprocess.value
+                logger.debug(
+                    "OpenCV preprocessing plugin enabled (%s)", preprocess.value
+                )
             else:
                 logger.warning(
                     "OpenCV not available; skipping image preprocessing. "
                     "Install opencv-python-headless for better OCR quality."
                 )
 
-        with _temporary_tesseract_path():
+        with (
+            cpu_budget.reserve(wanted_jobs) as jobs,
+            _single_threaded_tesseract(),
+            _temporary_tesseract_path(),
+        ):
+            logger.debug("Running OCR with %d job(s)", jobs)
             ocrmypdf.ocr(
                 input_path,
                 output_path,
                 language=languages,
                 output_type="pdf",
                 rasterizer="pypdfium",
+                jobs=jobs,
                 **ocr_kwargs,
             )
         logger.info("OCR completed successfully: %s", output_path)
@@ -6,9 +6,17 @@
 
 This plugin implements the ``filter_ocr_image`` hook to denoise and
 binarize page images before they are sent to Tesseract.
+
+Non-local means denoising of a 300 dpi page often takes longer than
+recognizing it, and clean office scans do not need it.  The plugin adds
+a ``pdftopdfa_preprocess`` option (see :class:`~pdftopdfa.ocr.OcrPreprocess`)
+that selects a cheap median filter, non-local means, or ``auto``, which
+estimates the noise of the page first and only denoises as much as
+needed.
 """
 
 import logging
+import time
 
 import numpy as np
 import ocrmypdf
@@ -16,13 +24,81 @@ from PIL import Image
 
 logger = logging.getLogger(__name__)
 
+_MODES = ("median", "nlmeans", "auto")
+
+# Longest side of the image the noise is estimated on.
+NOISE_SAMPLE_SIZE = 1024
+
+# Estimated noise (standard deviation in gray levels) from which ``auto``
+# uses the median filter, and from which it uses non-local means.
+MEDIAN_NOISE = 2.0
+NLMEANS_NOISE = 5.0
+
+# Second-difference kernel: flat areas and straight edges cancel out, and
+# Gaussian noise of standard deviation s leaves a residual with deviation 6s.
+_NOISE_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+
 
 @ocrmypdf.hookimpl
-def filter_ocr_image(page, image):  # noqa: ARG001 – page required by hook spec
+def add_options(parser):
+    """Adds the ``--pdftopdfa-preprocess`` option."""
+    parser.add_argument(
+        "--pdftopdfa-preprocess",
+        choices=_MODES,
+        default="auto",
+        help="Denoising before binarization (pdftopdfa).",
+    )
+
+
+def estimate_noise(gray: np.ndarray) -> float:
+    """Estimates the noise of a grayscale image.
+
+    Every n-th pixel is sampled, which keeps the per-pixel noise of the
+    full image (unlike averaging).  The median of the residual is robust
+    against text and line edges, which only cover a small part of a page.
+
+    Args:
+        gray: 8-bit grayscale image.
+
+    Returns:
+        Estimated noise standard deviation in gray levels.
+    """
+    import cv2
+
+    step = max(1, -(-max(gray.shape) // NOISE_SAMPLE_SIZE))
+    sample = gray[::step, ::step]
+    residual = cv2.filter2D(sample, cv2.CV_32F, _NOISE_KERNEL)
+    # median(|N(0, 6s)|) = 0.6745 * 6s
+    return float(np.median(np.abs(residual))) / (0.6745 * 6)
+
+
+def _denoise(gray: np.ndarray, mode: str) -> tuple[np.ndarray, str]:
+    """Denoises according to *mode*; returns the image and the filter used."""
+    import cv2
+
+    if mode == "auto":
+        noise = estimate_noise(gray)
+        if noise >= NLMEANS_NOISE:
+            mode = "nlmeans"
+        elif noise >= MEDIAN_NOISE:
+            mode = "median"
+        else:
+            return gray, f"none, noise {noise:.1f}"
+        label = f"{mode}, noise {noise:.1f}"
+    else:
+        label = mode
+
+    if mode == "nlmeans":
+        return cv2.fastNlMeansDenoising(gray, h=10), label
+    return cv2.medianBlur(gray, 3), label
+
+
+@ocrmypdf.hookimpl
+def filter_ocr_image(page, image):
     """Preprocess the OCR image using OpenCV denoising and adaptive thresholding.
 
     Args:
-        page: ocrmypdf page context (unused).
+        page: ocrmypdf page context, or None (then ``auto`` is used).
         image: PIL Image of the rendered page.
 
     Returns:
@@ -30,6 +106,10 @@ def filter_ocr_image(page, image):  # noqa: ARG001 – page required by hook spe
     """
     import cv2
 
+    start = time.perf_counter()
+    options = getattr(page, "options", None)
+    mode = getattr(options, "pdftopdfa_preprocess", None) or "auto"
+
     img = np.array(image)
 
     # Convert to grayscale if needed
@@ -38,8 +118,7 @@ def filter_ocr_image(page, image):  # noqa: ARG001 – page required by hook spe
     else:
         gray = img
 
-    # Denoise
-    denoised = cv2.fastNlMeansDenoising(gray, h=10)
+    denoised, label = _denoise(gray, mode)
 
     # Adaptive thresholding
     binary = cv2.adaptiveThreshold(
@@ -53,4 +132,10 @@ def filter_ocr_image(page, image):  # noqa: ARG001 – page required by hook spe
 
     result = Image.fromarray(binary)
     result.info = image.info.copy()
+    logger.debug(
+        "Preprocessed page %s in %.0f ms (%s)",
+        page.pageno + 1 if page is not None else "?",
+        (time.perf_counter() - start) * 1000,
+        label,
+    )
     return result
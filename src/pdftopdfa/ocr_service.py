@@ -0,0 +1,296 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Long-lived pool of warm OCR worker processes.
+
+Every :func:`~pdftopdfa.ocr.apply_ocr` call pays a fixed start-up cost
+before the first page is recognized: ocrmypdf and OpenCV are imported,
+ocrmypdf builds its plugin manager and loads the preprocessing plugin,
+and Tesseract is located and version-checked.  For batches of one- or
+two-page scans that cost is most of the runtime.
+
+:class:`OcrService` keeps worker processes alive between files, one pool
+per language set.  Each worker runs a throw-away OCR job on a blank page
+when it starts, so the imports, the plugin and the language models in
+the OS file cache are warm before the first real file arrives.  Tesseract
+itself still runs as one process per page (ocrmypdf starts it through its
+command-line interface), so its models are read again for every page,
+but from the file cache.
+
+While a service is open as a context manager, :func:`apply_ocr` in this
+process, and therefore :func:`~pdftopdfa.converter.convert_to_pdfa`,
+hands its files to the service::
+
+    with OcrService(workers=2) as service:
+        service.start(["deu"])  # optional: warm up before the first file
+        for path in paths:
+            convert_to_pdfa(path, out_dir / path.name, ocr_languages=["deu"])
+
+The workers share a CPU budget (see :mod:`pdftopdfa.cpu_budget`), so the
+Tesseract processes of all of them together stay within it.  When a
+worker dies, its pool is replaced and the tokens its workers held are
+returned to the budget.  Batch
+conversions with ``workers > 1`` convert in separate processes, which do
+not see a service opened in the parent.
+"""
+
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections.abc import Iterable
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any
+
+from . import cpu_budget
+from .batch import DEFAULT_MAX_TASKS_PER_WORKER, init_worker_process, parent_log_level
+from .exceptions import OCRError
+from .ocr import OcrPreprocess, OcrQuality, apply_ocr, get_ocr_preprocess
+
+logger = logging.getLogger(__name__)
+
+# Services opened as context managers, innermost last.
+_active: list["OcrService"] = []
+_active_lock = threading.Lock()
+
+
+def get_ocr_service() -> "OcrService | None":
+    """Returns the innermost open service, or None."""
+    with _active_lock:
+        return _active[-1] if _active else None
+
+
+def _warm_up(languages: list[str]) -> None:
+    """Runs OCR on a blank page so the first real file starts warm."""
+    import pikepdf
+
+    with tempfile.TemporaryDirectory(prefix="pdftopdfa_ocr_") as tmp:
+        blank = Path(tmp) / "blank.pdf"
+        with pikepdf.new() as pdf:
+            pdf.add_blank_page(page_size=(72, 72))
+            pdf.save(blank)
+        try:
+            apply_ocr(blank, Path(tmp) / "warm.pdf", languages)
+        except Exception as e:
+            logger.warning("OCR warm-up failed: %s", e)
+
+
+def _init_worker(
+    languages: list[str],
+    warm_up: bool,
+    log_level: int | None,
+    cpu_pool: Any,
+    cpu_held: Any,
+) -> None:
+    """Initializer of a service worker process."""
+    init_worker_process(log_level, cpu_pool, cpu_held)
+
+    tesseract_path = os.environ.get("TESSERACT_PATH")
+    if tesseract_path:
+        # The worker is ours: put Tesseract on PATH once instead of per file
+        p = Path(tesseract_path)
+        tesseract_dir = str(p) if p.is_dir() else str(p.parent)
+        os.environ["PATH"] = tesseract_dir + os.pathsep + os.environ.get("PATH", "")
+
+    if warm_up:
+        _warm_up(languages)
+    logger.debug("OCR worker %d ready for %s", os.getpid(), "+".join(languages))
+
+
+def _ocr_task(
+    input_path: Path,
+    output_path: Path,
+    languages: list[str],
+    quality: OcrQuality,
+    force: bool,
+    pages: list[int] | None,
+    preprocess: OcrPreprocess,
+) -> Path:
+    """Runs one OCR job in a service worker."""
+    with cpu_budget.task_token():
+        return apply_ocr(
+            input_path,
+            output_path,
+            languages,
+            quality=quality,
+            force=force,
+            pages=pages,
+            preprocess=preprocess,
+        )
+
+
+class OcrService:
+    """Pool of warm OCR worker processes, one pool per language set.
+
+    Pools are started on first use of their language set, or ahead of
+    time with :meth:`start`, and are kept until :meth:`close`.  Workers
+    are replaced after ``DEFAULT_MAX_TASKS_PER_WORKER`` files to bound
+    their memory use.
+
+    Args:
+        workers: Number of worker processes per language set.
+        warm_up: If True, every worker OCRs a blank page when it starts.
+
+    Raises:
+        ValueError: If *workers* is less than 1.
+    """
+
+    def __init__(self, workers: int = 1, *, warm_up: bool = True) -> None:
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        self.workers = workers
+        self._warm_up = warm_up
+        self._ctx = multiprocessing.get_context("spawn")
+        self._cpu_pool = self._ctx.BoundedSemaphore(cpu_budget.get_cpu_limit())
+        self._pools: dict[tuple[str, ...], ProcessPoolExecutor] = {}
+        # Tokens of the CPU budget held by the workers of each pool
+        self._cpu_held: dict[tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __enter__(self) -> "OcrService":
+        with _active_lock:
+            _active.append(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        with _active_lock:
+            if self in _active:
+                _active.remove(self)
+        self.close()
+
+    def _pool(self, languages: list[str]) -> ProcessPoolExecutor:
+        key = tuple(languages)
+        with self._lock:
+            if self._closed:
+                raise OCRError("OCR service is closed")
+            pool = self._pools.get(key)
+            if pool is None:
+                logger.info(
+                    "Starting %d OCR worker(s) for %s", self.workers, "+".join(key)
+                )
+                cpu_held = self._ctx.Value("i", 0)
+                pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=self._ctx,
+                    initializer=_init_worker,
+                    initargs=(
+                        list(key),
+                        self._warm_up,
+                        parent_log_level(),
+                        self._cpu_pool,
+                        cpu_held,
+                    ),
+                    max_tasks_per_child=DEFAULT_MAX_TASKS_PER_WORKER,
+                )
+                self._pools[key] = pool
+                self._cpu_held[key] = cpu_held
+            return pool
+
+    def _discard(self, languages: list[str]) -> None:
+        """Drops a pool whose worker died; it is restarted on next use.
+
+        Once the pool's workers have exited, the CPU tokens they held are
+        returned to the budget.
+        """
+        key = tuple(languages)
+        with self._lock:
+            pool = self._pools.pop(key, None)
+            cpu_held = self._cpu_held.pop(key, None)
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+            cpu_budget.reclaim(self._cpu_pool, cpu_held)
+
+    def start(self, languages: list[str] | None = None) -> None:
+        """Starts and warms up the workers for a language set.
+
+        Args:
+            languages: Tesseract language codes (default: ["eng"]).
+        """
+        pool = self._pool(languages or ["eng"])
+        for future in [pool.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+
+    def submit(
+        self,
+        input_path: Path,
+        output_path: Path,
+        languages: list[str] | None = None,
+        *,
+        quality: OcrQuality = OcrQuality.DEFAULT,
+        force: bool = False,
+        pages: Iterable[int] | None = None,
+        preprocess: OcrPreprocess | None = None,
+    ) -> "Future[Path]":
+        """Queues OCR of a PDF; see :func:`~pdftopdfa.ocr.apply_ocr`.
+
+        Returns:
+            Future resolving to *output_path*.
+        """
+        languages = list(languages or ["eng"])
+        if pages is not None:
+            pages = sorted(set(pages))
+        if preprocess is None:
+            # Resolved here: workers keep the environment they started with
+            preprocess = get_ocr_preprocess(quality)
+        return self._pool(languages).submit(
+            _ocr_task,
+            input_path,
+            output_path,
+            languages,
+            quality,
+            force,
+            pages,
+            preprocess,
+        )
+
+    def ocr(
+        self,
+        input_path: Path,
+        output_path: Path,
+        languages: list[str] | None = None,
+        *,
+        quality: OcrQuality = OcrQuality.DEFAULT,
+        force: bool = False,
+        pages: Iterable[int] | None = None,
+        preprocess: OcrPreprocess | None = None,
+    ) -> Path:
+        """Performs OCR of a PDF in a worker and waits for it.
+
+        Takes the arguments of :func:`~pdftopdfa.ocr.apply_ocr`.
+
+        Returns:
+            Path to the OCR-processed PDF.
+
+        Raises:
+            OCRError: If OCR fails or the worker process dies.
+        """
+        languages = list(languages or ["eng"])
+        future = self.submit(
+            input_path,
+            output_path,
+            languages,
+            quality=quality,
+            force=force,
+            pages=pages,
+            preprocess=preprocess,
+        )
+        try:
+            return future.result()
+        except BrokenProcessPool as e:
+            self._discard(languages)
+            raise OCRError("OCR failed: worker process exited unexpectedly") from e
+
+    def close(self) -> None:
+        """Stops all workers; queued files that have not started are dropped."""
+        with self._lock:
+            self._closed = True
+            pools = list(self._pools.values())
+            self._pools.clear()
+            self._cpu_held.clear()
+        for pool in pools:
+            pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,233 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Strip-wise re-encoding of stream data to FlateDecode.
+
+Writing decoded data back with ``Stream.write(data)`` keeps it in memory,
+uncompressed, until the document is saved, and reading it with
+``read_bytes()`` copies it once more.  For a giant scan that means
+several gigabyte-sized copies per image.
+
+:func:`reencode_to_flate` instead compresses the decoded data strip by
+strip with :class:`FlateStripWriter` and stores the compressed data as
+the stream's new FlateDecode data.  :func:`iter_decoded_strips` yields
+the decoded data of a stream in strips: plain FlateDecode streams are
+inflated incrementally, so their decoded data is never held in full;
+other filters are decoded by QPDF into one buffer that is read without
+copying.
+
+This bounds the uncompressed copies, not the compressed result.  pikepdf
+only accepts new stream data as one buffer, so the compressed data is
+read back in full and copied into QPDF when the stream is replaced.
+While strips are being compressed, the compressed data is kept in memory
+up to a spill threshold and spooled to a temporary file beyond it.  The
+threshold defaults to :data:`DEFAULT_MEMORY_LIMIT`.  It can be set in MiB
+with the ``PDFTOPDFA_MEMORY_LIMIT`` environment variable, which worker
+processes inherit, or for a block of code with :func:`memory_limit`.
+"""
+
+import contextlib
+import logging
+import os
+import tempfile
+import zlib
+from collections.abc import Iterator
+
+from pikepdf import Array, Dictionary, Name, Stream
+
+from .compression import flate_level
+from .utils import resolve_indirect
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_LIMIT = 256 * 1024 * 1024
+
+# Environment variable overriding DEFAULT_MEMORY_LIMIT, in MiB.
+MEMORY_LIMIT_ENV = "PDFTOPDFA_MEMORY_LIMIT"
+
+# Decoded bytes handled at a time.
+STRIP_SIZE = 1 << 20
+
+_memory_limit: int | None = None
+
+
+def get_memory_limit() -> int:
+    """Returns the spill threshold in bytes for compressed strips."""
+    if _memory_limit is not None:
+        return _memory_limit
+    value = os.environ.get(MEMORY_LIMIT_ENV)
+    if value:
+        try:
+            mib = int(value)
+        except ValueError:
+            mib = 0
+        if mib > 0:
+            return mib * 1024 * 1024
+        logger.warning("Ignoring invalid %s=%r", MEMORY_LIMIT_ENV, value)
+    return DEFAULT_MEMORY_LIMIT
+
+
+@contextlib.contextmanager
+def memory_limit(limit: int | None) -> Iterator[None]:
+    """Applies a spill threshold for compressed strips until the block exits.
+
+    Args:
+        limit: Threshold in bytes. If None, uses the environment variable or
+            DEFAULT_MEMORY_LIMIT.
+    """
+    global _memory_limit
+    if limit is not None and limit <= 0:
+        raise ValueError(f"memory limit must be positive, got {limit}")
+    previous = _memory_limit
+    _memory_limit = limit
+    try:
+        yield
+    finally:
+        _memory_limit = previous
+
+
+def _is_plain_flate(stream: Stream) -> bool:
+    """Return True if *stream* is FlateDecode without a predictor."""
+    filters = resolve_indirect(stream.get("/Filter"))
+    if isinstance(filters, Array):
+        if len(filters) != 1:
+            return False
+        filters = resolve_indirect(filters[0])
+    if filters != Name.FlateDecode:
+        return False
+
+    parms = resolve_indirect(stream.get("/DecodeParms"))
+    if isinstance(parms, Array):
+        parms = resolve_indirect(parms[0]) if len(parms) == 1 else None
+    if isinstance(parms, Dictionary):
+        return int(parms.get("/Predictor", 1)) <= 1
+    return parms is None
+
+
+def iter_decoded_strips(
+    stream: Stream, strip_size: int = STRIP_SIZE
+) -> Iterator[bytes | memoryview]:
+    """Yield the decoded data of *stream* in strips of at most *strip_size*.
+
+    Args:
+        stream: Stream to decode.
+        strip_size: Maximum size of a strip in bytes.
+    """
+    if _is_plain_flate(stream):
+        raw = memoryview(stream.get_raw_stream_buffer())
+        inflater = zlib.decompressobj()
+        for start in range(0, len(raw), strip_size):
+            data = raw[start : start + strip_size]
+            while data:
+                strip = inflater.decompress(data, strip_size)
+                if strip:
+                    yield strip
+                data = inflater.unconsumed_tail
+            if inflater.eof:
+                return
+        tail = inflater.flush()
+        if tail:
+            yield tail
+        return
+
+    decoded = memoryview(stream.get_stream_buffer())
+    for start in range(0, len(decoded), strip_size):
+        yield decoded[start : start + strip_size]
+
+
+def iter_row_strips(
+    stream: Stream, row_size: int, rows: int, strip_size: int = STRIP_SIZE
+) -> Iterator[bytes]:
+    """Yield the first *rows* rows of decoded data, whole rows at a time.
+
+    Each strip holds as many rows as fit in *strip_size* (at least one).
+    Decoded data after the last row is ignored; if the data ends early,
+    fewer rows are yielded.
+
+    Args:
+        stream: Stream to decode.
+        row_size: Size of one row in bytes.
+        rows: Number of rows to yield.
+        strip_size: Target size of a strip in bytes.
+    """
+    strip_bytes = max(1, strip_size // row_size) * row_size
+    remaining = row_size * rows
+    pending = bytearray()
+    for chunk in iter_decoded_strips(stream, strip_size):
+        pending += chunk
+        while remaining and len(pending) >= min(strip_bytes, remaining):
+            take = min(strip_bytes, remaining)
+            yield bytes(pending[:take])
+            del pending[:take]
+            remaining -= take
+        if not remaining:
+            return
+    take = min(len(pending) - len(pending) % row_size, remaining)
+    if take:
+        yield bytes(pending[:take])
+
+
+class FlateStripWriter:
+    """Compresses data strip by strip into new FlateDecode stream data.
+
+    Compressed data is kept in memory up to the spill threshold and
+    spooled to a temporary file beyond it.  Call
+    :meth:`replace_stream_data` to store it in a stream, or :meth:`close`
+    to discard it.
+    """
+
+    def __init__(self) -> None:
+        self._compressor = zlib.compressobj(flate_level())
+        self._spool = tempfile.SpooledTemporaryFile(max_size=get_memory_limit())
+        self.size = 0
+
+    def __enter__(self) -> "FlateStripWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, data: bytes | memoryview) -> None:
+        """Compresses *data* and appends it."""
+        compressed = self._compressor.compress(data)
+        if compressed:
+            self._spool.write(compressed)
+            self.size += len(compressed)
+
+    def replace_stream_data(self, stream: Stream) -> None:
+        """Replaces the data of *stream* with the compressed data.
+
+        The compressed data is read back into memory in full, because
+        pikepdf takes new stream data only as one buffer.  The stream's
+        filter becomes FlateDecode and its /DecodeParms are removed.  The
+        writer is closed afterwards.
+        """
+        tail = self._compressor.flush()
+        self._spool.write(tail)
+        self.size += len(tail)
+        self._spool.seek(0)
+        data = self._spool.read()
+        self.close()
+        stream.write(data, filter=Name.FlateDecode)
+        if stream.get("/DecodeParms") is not None:
+            del stream["/DecodeParms"]
+
+    def close(self) -> None:
+        """Discards the compressed data."""
+        self._spool.close()
+
+
+def reencode_to_flate(stream: Stream) -> None:
+    """Replaces the data of *stream* with its decoded data, Flate-compressed.
+
+    Args:
+        stream: Stream to re-encode (modified in place).
+
+    Raises:
+        Exception: Whatever decoding raises; the stream is then unchanged.
+    """
+    with FlateStripWriter() as writer:
+        for strip in iter_decoded_strips(stream):
+            writer.write(strip)
+        writer.replace_stream_data(stream)
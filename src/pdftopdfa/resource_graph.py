@@ -0,0 +1,367 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Graph of content-bearing objects and the resources they use.
+
+Pages, Form XObjects, tiling patterns, Type3 fonts and annotation
+appearance streams all carry content that names resources, and the
+resources of each name further content-bearing objects.  Font handling
+and several sanitizers need to visit every one of them.
+:class:`ResourceGraph` walks the resources of a page once and records its
+content-bearing objects (the nodes) in depth-first order.  Each node keeps
+the node it was reached from (the edge), which supplies its effective
+resources when it has none of its own.
+
+Only the structure is recorded: a node reads its ``/Resources`` from its
+owner when asked, so edits to a resource dictionary (a font replaced by
+its embedded version, an entry removed) are always seen.  Once objects
+are added to the document the recorded structure is rebuilt, because new
+appearance streams or fonts may have been attached to existing pages.
+
+During a conversion the graph is activated with :func:`resource_graph`;
+:func:`get_resource_graph` then returns the shared instance.  Outside an
+active scope it returns a graph that rebuilds on every query, so calling
+a helper on its own behaves exactly as before.
+"""
+
+import logging
+from collections.abc import Iterator
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+
+import pikepdf
+from pikepdf import Array, Dictionary, Object, Pdf, Stream
+
+from .document_index import DocumentIndex, get_document_index
+from .utils import PdfScopedRegistry, resolve_indirect
+
+logger = logging.getLogger(__name__)
+
+# Node kinds.
+PAGE = "page"
+FORM = "form"
+PATTERN = "pattern"
+TYPE3_FONT = "type3_font"
+APPEARANCE = "appearance"
+
+_APPEARANCE_KEYS = ("/N", "/R", "/D")
+
+
+@dataclass(frozen=True, eq=False)
+class ResourceNode:
+    """A content-bearing object reached from a page.
+
+    Attributes:
+        owner: The page dictionary, Form XObject, tiling pattern, Type3
+            font dictionary or appearance stream.
+        kind: One of :data:`PAGE`, :data:`FORM`, :data:`PATTERN`,
+            :data:`TYPE3_FONT` or :data:`APPEARANCE`.
+        parent: The node whose resources name *owner*; None for pages and
+            appearance streams.
+    """
+
+    owner: Object
+    kind: str
+    parent: "ResourceNode | None" = None
+
+    @property
+    def own_resources(self) -> Dictionary | None:
+        """The owner's ``/Resources`` dictionary, or None."""
+        try:
+            resources = resolve_indirect(self.owner.get("/Resources"))
+        except Exception:
+            return None
+        return resources if isinstance(resources, Dictionary) else None
+
+    @property
+    def resources(self) -> Dictionary | None:
+        """The resources in effect for the owner's content.
+
+        Form XObjects, patterns and Type3 fonts without ``/Resources`` use
+        the resources of the content they are drawn from (ISO 32000-1,
+        7.8.3 and 9.6.5).
+        """
+        node: ResourceNode | None = self
+        while node is not None:
+            resources = node.own_resources
+            if resources is not None:
+                return resources
+            node = node.parent
+        return None
+
+
+def _visit(obj: Object, visited: set[tuple[int, int]]) -> bool:
+    """Mark *obj* as visited; False if it was visited before."""
+    objgen = obj.objgen
+    if objgen == (0, 0):
+        # Direct objects cannot form cycles
+        return True
+    if objgen in visited:
+        return False
+    visited.add(objgen)
+    return True
+
+
+def _resolved_dict(container: Dictionary, key: str) -> Dictionary | None:
+    try:
+        value = resolve_indirect(container.get(key))
+    except Exception:
+        return None
+    return value if isinstance(value, Dictionary) else None
+
+
+def _iter_children(resources: Dictionary) -> Iterator[tuple[Object, str]]:
+    """Yield the content-bearing objects named by a resources dictionary."""
+    fonts = _resolved_dict(resources, "/Font")
+    if fonts is not None:
+        for key in list(fonts.keys()):
+            try:
+                font = resolve_indirect(fonts[key])
+                if (
+                    isinstance(font, Dictionary)
+                    and font.get("/Subtype") == pikepdf.Name.Type3
+                ):
+                    yield font, TYPE3_FONT
+            except Exception:
+                continue
+
+    xobjects = _resolved_dict(resources, "/XObject")
+    if xobjects is not None:
+        for key in list(xobjects.keys()):
+            try:
+                xobj = resolve_indirect(xobjects[key])
+                if (
+                    isinstance(xobj, Stream)
+                    and xobj.get("/Subtype") == pikepdf.Name.Form
+                ):
+                    yield xobj, FORM
+            except Exception:
+                continue
+
+    patterns = _resolved_dict(resources, "/Pattern")
+    if patterns is not None:
+        for key in list(patterns.keys()):
+            try:
+                pattern = resolve_indirect(patterns[key])
+                if (
+                    isinstance(pattern, Stream)
+                    and int(pattern.get("/PatternType", 0)) == 1
+                ):
+                    yield pattern, PATTERN
+            except Exception:
+                continue
+
+
+def _iter_appearance_streams(page: Dictionary) -> Iterator[Stream]:
+    """Yield the /N, /R and /D appearance streams of a page's annotations."""
+    try:
+        annots = resolve_indirect(page.get("/Annots"))
+    except Exception:
+        return
+    if not isinstance(annots, Array):
+        return
+
+    for annot in annots:
+        try:
+            annot = resolve_indirect(annot)
+            if not isinstance(annot, Dictionary):
+                continue
+            ap = _resolved_dict(annot, "/AP")
+            if ap is None:
+                continue
+            for ap_key in _APPEARANCE_KEYS:
+                entry = resolve_indirect(ap.get(ap_key))
+                if isinstance(entry, Stream):
+                    yield entry
+                elif isinstance(entry, Dictionary):
+                    # Sub-state dictionary (e.g. /On and /Off)
+                    for state in list(entry.keys()):
+                        stream = resolve_indirect(entry[state])
+                        if isinstance(stream, Stream):
+                            yield stream
+        except Exception:
+            continue
+
+
+def _walk_roots(
+    roots: list[ResourceNode], visited: set[tuple[int, int]]
+) -> list[ResourceNode]:
+    """Walk the resources reachable from *roots*, depth first."""
+    nodes: list[ResourceNode] = []
+    for root in roots:
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            resources = node.own_resources
+            if resources is None:
+                continue
+            children = [
+                ResourceNode(child, kind, node)
+                for child, kind in _iter_children(resources)
+                if _visit(child, visited)
+            ]
+            stack.extend(reversed(children))
+    return nodes
+
+
+def _build_page_nodes(page: Dictionary) -> list[ResourceNode]:
+    """Walk the resources reachable from one page, depth first.
+
+    The page comes first, followed by the objects reachable from its
+    resources and then by each appearance stream and the objects reachable
+    from it.  Every object appears once.
+    """
+    visited: set[tuple[int, int]] = set()
+
+    roots = [ResourceNode(page, PAGE)]
+    visited.add(page.objgen)
+    for stream in _iter_appearance_streams(page):
+        if _visit(stream, visited):
+            roots.append(ResourceNode(stream, APPEARANCE))
+    return _walk_roots(roots, visited)
+
+
+def walk_from(owner: Stream, kind: str = FORM) -> list[ResourceNode]:
+    """Return the nodes reachable from an object outside the page structure.
+
+    For content that is only reached through other resources, such as the
+    transparency group of a soft mask.  The result is not cached.
+
+    Args:
+        owner: The content-bearing object to start from.
+        kind: Its node kind.
+
+    Returns:
+        The nodes in depth-first order, *owner* first.
+    """
+    visited: set[tuple[int, int]] = set()
+    _visit(owner, visited)
+    return _walk_roots([ResourceNode(owner, kind)], visited)
+
+
+def _page_dict(page: pikepdf.Page | Dictionary) -> Dictionary:
+    return page.obj if isinstance(page, pikepdf.Page) else page
+
+
+class ResourceGraph:
+    """Content-bearing objects of every page and their resources.
+
+    Pages are walked on first use.  When new objects have been added to
+    the document since then, the recorded pages are walked again on their
+    next use.  New objects are detected through the document's
+    :class:`~pdftopdfa.document_index.DocumentIndex`, so activate
+    :func:`~pdftopdfa.document_index.document_index` around the graph's
+    scope to share it.
+
+    Args:
+        pdf: Opened pikepdf PDF object, or None for a graph that is not
+            tied to a document.
+        cached: If False, every query walks the page again.
+    """
+
+    def __init__(self, pdf: Pdf | None, *, cached: bool = True) -> None:
+        self._pdf = pdf
+        self._cached = cached and pdf is not None
+        self._pages: dict[tuple[int, int], list[ResourceNode]] = {}
+        self._index: DocumentIndex | None = None
+        self._max_objnum = 0
+        if self._cached:
+            self._index = get_document_index(pdf)
+            self._max_objnum = self._index.max_objnum
+
+    def _objects_added(self) -> bool:
+        """Check for objects created since the last check."""
+        self._index.sync()
+        max_objnum = self._index.max_objnum
+        added = max_objnum > self._max_objnum
+        self._max_objnum = max_objnum
+        return added
+
+    def invalidate(self, page: pikepdf.Page | Dictionary | None = None) -> None:
+        """Forget recorded pages after a structural change.
+
+        Call this after attaching existing objects to new places in the
+        resource structure; adding new objects is detected automatically.
+
+        Args:
+            page: The page whose resources changed; all pages if None.
+        """
+        if page is None:
+            self._pages.clear()
+        else:
+            self._pages.pop(_page_dict(page).objgen, None)
+
+    def page_nodes(self, page: pikepdf.Page | Dictionary) -> list[ResourceNode]:
+        """Return the nodes reachable from *page*, the page node first.
+
+        Args:
+            page: A pikepdf Page or page dictionary.
+        """
+        page = _page_dict(page)
+        if not self._cached:
+            return _build_page_nodes(page)
+
+        if self._objects_added():
+            self._pages.clear()
+        objgen = page.objgen
+        nodes = self._pages.get(objgen)
+        if nodes is None:
+            nodes = _build_page_nodes(page)
+            if objgen != (0, 0):
+                self._pages[objgen] = nodes
+        return nodes
+
+    def iter_nodes(self, *kinds: str) -> Iterator[ResourceNode]:
+        """Yield the nodes of all pages, each object once.
+
+        Args:
+            *kinds: Node kinds to yield; all kinds if empty.
+        """
+        if self._pdf is None:
+            raise ValueError("graph is not tied to a document")
+        seen: set[tuple[int, int]] = set()
+        for page in self._pdf.pages:
+            for node in self.page_nodes(page):
+                if kinds and node.kind not in kinds:
+                    continue
+                if _visit(node.owner, seen):
+                    yield node
+
+
+_registry: PdfScopedRegistry[ResourceGraph] = PdfScopedRegistry(
+    ResourceGraph, detached_factory=lambda pdf: ResourceGraph(pdf, cached=False)
+)
+
+
+def resource_graph(pdf: Pdf) -> AbstractContextManager[ResourceGraph]:
+    """Activate a shared :class:`ResourceGraph` for *pdf*.
+
+    Nested scopes for the same PDF reuse the outer graph.
+
+    Args:
+        pdf: Opened pikepdf PDF object.
+
+    Returns:
+        Context manager yielding the active graph.
+    """
+    return _registry.activate(pdf)
+
+
+def get_resource_graph(owner: Pdf | pikepdf.Page | Object) -> ResourceGraph:
+    """Return the active graph for a PDF, or one that is not cached.
+
+    Args:
+        owner: Opened pikepdf PDF object, or a page or other object owned
+            by it for helpers that have no ``Pdf`` at hand.
+
+    Returns:
+        A :class:`ResourceGraph` for the owning PDF.
+    """
+    if isinstance(owner, Pdf):
+        return _registry.get(owner)
+    graph = _registry.lookup_owner(_page_dict(owner))
+    if graph is not None:
+        return graph
+    return ResourceGraph(None, cached=False)
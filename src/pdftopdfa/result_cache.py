@@ -0,0 +1,324 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Content-addressed cache of conversion results.
+
+A :class:`ResultCache` keeps converted PDF/A files in a local directory,
+keyed by the SHA-256 of the input bytes together with the target level,
+the conversion options and the pdftopdfa version.  Converting an input
+that was converted before with the same options then only costs hashing
+the input and copying (or hardlinking) the cached output.
+
+Each entry is a pair of files in a two-level fan-out directory:
+``<key>.pdf`` holds the output and ``<key>.json`` the result metadata.
+Both are written under temporary names and renamed into place, the
+metadata last, so an entry is visible only once it is complete.  Several
+processes can therefore share one cache directory without locking:
+
+- a reader that loses a race with eviction sees a cache miss;
+- hits refresh the modification time of the metadata file, and eviction
+  removes the least recently used entries once the cache exceeds its size
+  limit.
+
+Stores do not scan the directory.  Each :class:`ResultCache` keeps an
+in-memory index of the entries found by its last scan plus its own stores
+and hits, evicts from that index, and rescans only after a number of
+stores that grows with the cache.  Entries stored or used by other
+processes are therefore accounted for from the next scan on.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import cache
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+
+from .utils import file_sha256
+
+logger = logging.getLogger(__name__)
+
+# Default cache size limit (1 GiB).
+DEFAULT_CACHE_SIZE = 1024**3
+
+_PDF_SUFFIX = ".pdf"
+_META_SUFFIX = ".json"
+_TEMP_SUFFIX = ".tmp"
+
+# Age in seconds after which an orphaned temporary or output file left by a
+# crashed process is removed during eviction.
+_STALE_AGE = 3600.0
+
+# Minimum number of stores between two scans of the cache directory.  A
+# scan is otherwise due once a quarter as many entries as it found have
+# been stored, which keeps the cost of scanning constant per store.
+_MIN_RESCAN_STORES = 16
+
+
+@cache
+def _library_version() -> str:
+    try:
+        return version("pdftopdfa")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+class ResultCache:
+    """On-disk LRU cache of converted PDF/A files.
+
+    Instances are pickled with the directory and settings only, without
+    their index, so they can be passed to batch worker processes.
+
+    Args:
+        directory: Cache directory; created if it does not exist.
+        max_bytes: Size limit for the cached outputs and metadata.
+        hardlink: If True, hits are served (and outputs stored) as
+            hardlinks instead of copies.  The outputs then share their
+            inode with the cache and must not be modified in place.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int = DEFAULT_CACHE_SIZE,
+        *,
+        hardlink: bool = False,
+    ) -> None:
+        if max_bytes < 0:
+            raise ValueError(f"max_bytes must not be negative, got {max_bytes}")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hardlink = hardlink
+        directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Least recently used first: metadata path -> (size, output path).
+        self._index: OrderedDict[Path, tuple[int, Path]] | None = None
+        self._total = 0
+        self._stores_until_scan = 0
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_index"] = None
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def key(self, input_path: Path, level: str, **options: Any) -> str:
+        """Computes the cache key of a conversion.
+
+        Args:
+            input_path: Input PDF; its contents are hashed.
+            level: Target PDF/A level.
+            **options: JSON-serializable conversion options that affect
+                the output.
+
+        Returns:
+            Hex digest identifying the conversion.
+        """
+        payload = json.dumps(
+            {
+                "input": file_sha256(input_path),
+                "level": level,
+                "options": options,
+                "version": _library_version(),
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        subdir = self.directory / key[:2]
+        return subdir / f"{key}{_PDF_SUFFIX}", subdir / f"{key}{_META_SUFFIX}"
+
+    def fetch(self, key: str, destination: Path) -> dict | None:
+        """Materializes a cached output at *destination*.
+
+        Args:
+            key: Cache key from :meth:`key`.
+            destination: Path to write the output to; an existing file is
+                replaced.
+
+        Returns:
+            The metadata stored with the entry, or None on a cache miss.
+        """
+        pdf_path, meta_path = self._paths(key)
+        try:
+            metadata = json.loads(meta_path.read_text(encoding="utf-8"))
+            if self.hardlink:
+                destination.unlink(missing_ok=True)
+                os.link(pdf_path, destination)
+            else:
+                # Copying from the open file is not affected by a
+                # concurrent eviction of the entry.
+                with open(pdf_path, "rb") as src, open(destination, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+            os.utime(meta_path)
+            with self._lock:
+                if self._index is not None and meta_path in self._index:
+                    self._index.move_to_end(meta_path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable cache entry %s: %s", key, e)
+            return None
+        logger.debug("Result cache hit: %s", key)
+        return metadata
+
+    def store(self, key: str, output_path: Path, metadata: dict) -> None:
+        """Adds a converted output to the cache and evicts old entries.
+
+        Args:
+            key: Cache key from :meth:`key`.
+            output_path: Converted PDF/A file.
+            metadata: JSON-serializable result metadata.
+
+        Raises:
+            OSError: If the entry cannot be written.
+        """
+        pdf_path, meta_path = self._paths(key)
+        pdf_path.parent.mkdir(exist_ok=True)
+
+        fd, temp_name = tempfile.mkstemp(
+            suffix=_TEMP_SUFFIX, prefix=f".{key}_", dir=pdf_path.parent
+        )
+        os.close(fd)
+        temp_path = Path(temp_name)
+        try:
+            if self.hardlink:
+                temp_path.unlink()
+                os.link(output_path, temp_path)
+            else:
+                shutil.copyfile(output_path, temp_path)
+            size = temp_path.stat().st_size
+            os.replace(temp_path, pdf_path)
+
+            fd, temp_name = tempfile.mkstemp(
+                suffix=_TEMP_SUFFIX, prefix=f".{key}_", dir=pdf_path.parent
+            )
+            temp_path = Path(temp_name)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(metadata, f)
+                size += f.tell()
+            os.replace(temp_path, meta_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+        logger.debug("Result cache store: %s", key)
+        with self._lock:
+            index = self._index
+            if index is None or self._stores_until_scan <= 0:
+                index = self._rescan()
+            else:
+                previous = index.pop(meta_path, None)
+                if previous is not None:
+                    self._total -= previous[0]
+                index[meta_path] = (size, pdf_path)
+                self._total += size
+                self._stores_until_scan -= 1
+            self._trim(index)
+
+    def _scan(self) -> tuple[list[tuple[float, int, Path, Path]], int]:
+        """Lists complete entries and removes stale leftovers.
+
+        Returns:
+            ``(entries, total_bytes)`` where entries are
+            ``(last_used, size, meta_path, pdf_path)`` tuples.
+        """
+        now = time.time()
+        entries = []
+        total = 0
+        for subdir in self.directory.iterdir():
+            if not subdir.is_dir():
+                continue
+            for path in subdir.iterdir():
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                if path.suffix == _META_SUFFIX:
+                    pdf_path = path.with_suffix(_PDF_SUFFIX)
+                    try:
+                        size = stat.st_size + pdf_path.stat().st_size
+                    except FileNotFoundError:
+                        size = stat.st_size
+                    entries.append((stat.st_mtime, size, path, pdf_path))
+                    total += size
+                elif now - stat.st_mtime > _STALE_AGE and (
+                    path.suffix == _TEMP_SUFFIX
+                    or not path.with_suffix(_META_SUFFIX).exists()
+                ):
+                    path.unlink(missing_ok=True)
+        return entries, total
+
+    def _rescan(self) -> OrderedDict[Path, tuple[int, Path]]:
+        """Rebuilds the index from the cache directory and returns it."""
+        entries, self._total = self._scan()
+        self._index = OrderedDict(
+            (meta_path, (size, pdf_path))
+            for _last_used, size, meta_path, pdf_path in sorted(entries)
+        )
+        self._stores_until_scan = max(_MIN_RESCAN_STORES, len(entries) // 4)
+        return self._index
+
+    def _trim(self, index: OrderedDict[Path, tuple[int, Path]]) -> int:
+        """Removes indexed entries, oldest first, until the size limit holds."""
+        removed = 0
+        while self._total > self.max_bytes and index:
+            meta_path, (size, pdf_path) = index.popitem(last=False)
+            # Metadata first: the entry stops being visible before its
+            # output disappears.
+            meta_path.unlink(missing_ok=True)
+            pdf_path.unlink(missing_ok=True)
+            self._total -= size
+            removed += 1
+        if removed:
+            logger.debug("Result cache evicted %d entr(y/ies)", removed)
+        return removed
+
+    def evict(self) -> int:
+        """Removes least recently used entries until the size limit holds.
+
+        The cache directory is rescanned first, so entries stored by other
+        processes are taken into account.
+
+        Returns:
+            Number of entries removed.
+        """
+        with self._lock:
+            return self._trim(self._rescan())
+
+    def size(self) -> int:
+        """Returns the total size of the cached entries in bytes.
+
+        The size is tracked in memory once the directory has been scanned,
+        so entries stored by other processes since the last scan are not
+        included.
+        """
+        with self._lock:
+            if self._index is None:
+                self._rescan()
+            return self._total
+
+    def __len__(self) -> int:
+        with self._lock:
+            index = self._index if self._index is not None else self._rescan()
+            return len(index)
+
+    def clear(self) -> None:
+        """Removes all entries."""
+        with self._lock:
+            for subdir in self.directory.iterdir():
+                if subdir.is_dir():
+                    shutil.rmtree(subdir, ignore_errors=True)
+            self._index = None
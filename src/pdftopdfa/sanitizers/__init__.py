@@ -13,7 +13,10 @@ from typing import Any
 
 from pikepdf import Pdf
 
+from ..content_cache import content_stream_cache
+from ..document_index import document_index
 from ..exceptions import ConversionError
+from ..fonts.program_cache import font_program_cache
 from ..utils import get_required_pdf_version, validate_pdfa_level
 from .actions import remove_actions, validate_destinations
 from .annotations import (
@@ -52,8 +55,11 @@ from .catalog import (
     remove_forbidden_viewer_preferences,
 )
 from .colorspaces import sanitize_colorspaces
+from .content_rewrite import deferred_content_rewrites
 from .extgstate import sanitize_extgstate
 from .files import (
+    EmbeddedPdfLimits,
+    embedded_pdf_limits,
     ensure_af_relationships,
     ensure_embedded_file_params,
     ensure_embedded_file_subtypes,
@@ -65,6 +71,7 @@ from .files import (
 )
 from .filters import (
     convert_lzw_streams,
+    fix_mismatched_stream_lengths,
     fix_stream_lengths,
     remove_crypt_streams,
     remove_external_stream_keys,
@@ -122,12 +129,24 @@ def sanitize_for_pdfa(pdf: Pdf, level: str = "3b") -> dict[str, Any]:
     """
     level = validate_pdfa_level(level)
 
-    if len(pdf.objects) > 8_388_607:
-        raise ConversionError(
-            "PDF exceeds the maximum number of indirect objects allowed by "
-            "ISO 19005-2 rule 6.1.13-7 (limit: 8,388,607)"
-        )
-
+    # All sanitizers share one object index and caches of parsed content
+    # streams and font programs instead of each walking pdf.objects,
+    # tokenizing the same streams and parsing the same fonts on its own.
+    with (
+        document_index(pdf) as index,
+        content_stream_cache(pdf),
+        font_program_cache(pdf),
+    ):
+        if index.object_count > 8_388_607:
+            raise ConversionError(
+                "PDF exceeds the maximum number of indirect objects allowed by "
+                "ISO 19005-2 rule 6.1.13-7 (limit: 8,388,607)"
+            )
+        return _run_sanitizers(pdf, level)
+
+
+def _run_sanitizers(pdf: Pdf, level: str) -> dict[str, Any]:
+    """Run every sanitizer in order and collect their statistics."""
     logger.info("Sanitizing PDF for PDF/A-%s conformance", level)
 
     result: dict[str, Any] = {
@@ -247,8 +266,10 @@ def sanitize_for_pdfa(pdf: Pdf, level: str = "3b") -> dict[str, Any]:
     # Remove forbidden external stream keys /F, /FFilter, /FDecodeParms (6.1.7.1)
     result["external_stream_keys_removed"] = remove_external_stream_keys(pdf)
 
-    # Force re-encoding of non-image streams to repair /Length mismatches (6.1.7.1)
-    result["stream_lengths_fixed"] = fix_stream_lengths(pdf)
+    # Rewrite streams whose declared /Length is wrong (6.1.7.1)
+    length_result = fix_mismatched_stream_lengths(pdf)
+    result["stream_lengths_checked"] = length_result["stream_lengths_checked"]
+    result["stream_lengths_fixed"] = length_result["stream_lengths_fixed"]
 
     # Re-encode inline images with non-Table-6 filters (6.1.10-1)
     result["nonstandard_inline_filters_fixed"] = sanitize_nonstandard_inline_filters(
@@ -327,9 +348,6 @@ def sanitize_for_pdfa(pdf: Pdf, level: str = "3b") -> dict[str, Any]:
     # Remove forbidden XObjects (all levels)
     result["forbidden_xobjects_removed"] = remove_forbidden_xobjects(pdf)
 
-    # Fix /Interpolate on Image XObjects (ISO 19005-2, 6.2.9)
-    result["image_interpolate_fixed"] = fix_image_interpolate(pdf)
-
     # Fix BitsPerComponent on Image XObjects (ISO 19005-2, 6.2.8)
     bpc_result = fix_bits_per_component(pdf)
     result["invalid_bpc_fixed"] = bpc_result["invalid_bpc_fixed"]
@@ -377,30 +395,60 @@ def sanitize_for_pdfa(pdf: Pdf, level: str = "3b") -> dict[str, Any]:
     extgstate_result = sanitize_extgstate(pdf)
     result["extgstate_fixed"] = extgstate_result.get("extgstate_fixed", 0)
 
-    # Sanitize content stream operators/resources and fix invalid ri operands
-    ri_result = sanitize_rendering_intent(pdf)
-    result["ri_operators_fixed"] = ri_result.get("ri_operators_fixed", 0)
-    result["undefined_operators_removed"] = ri_result.get(
-        "undefined_operators_removed", 0
+    # Operator-level content stream fixes of the next three steps are queued
+    # and applied in one fused walk per stream when the block ends.
+    with deferred_content_rewrites(pdf) as rewrites:
+        # Fix /Interpolate on Image XObjects (ISO 19005-2, 6.2.9)
+        result["image_interpolate_fixed"] = fix_image_interpolate(pdf)
+
+        # Sanitize content stream operators/resources and fix invalid ri operands
+        ri_result = sanitize_rendering_intent(pdf)
+
+        # Sanitize implementation limits and structural name/string constraints
+        structure_result = sanitize_structure_limits(pdf)
+
+    # Counts of the queued fixes, reported by the pass under the same names.
+    fused = rewrites.stats
+    result["image_interpolate_fixed"] += fused["image_interpolate_fixed"]
+    result["ri_operators_fixed"] = (
+        ri_result.get("ri_operators_fixed", 0) + fused["ri_operators_fixed"]
+    )
+    result["undefined_operators_removed"] = (
+        ri_result.get("undefined_operators_removed", 0)
+        + fused["undefined_operators_removed"]
     )
     result["resources_dictionaries_added"] = ri_result.get(
         "resources_dictionaries_added", 0
     )
     result["resources_entries_merged"] = ri_result.get("resources_entries_merged", 0)
-    result["image_intents_fixed"] = ri_result.get("image_intents_fixed", 0)
-
-    # Sanitize implementation limits and structural name/string constraints
-    structure_result = sanitize_structure_limits(pdf)
-    result["structure_strings_truncated"] = structure_result.get("strings_truncated", 0)
-    result["structure_names_shortened"] = structure_result.get("names_shortened", 0)
-    result["structure_utf8_names_fixed"] = structure_result.get("utf8_names_fixed", 0)
-    result["structure_integers_clamped"] = structure_result.get("integers_clamped", 0)
-    result["structure_reals_normalized"] = structure_result.get("reals_normalized", 0)
-    result["structure_q_nesting_rebalanced"] = structure_result.get(
-        "q_nesting_rebalanced", 0
+    result["image_intents_fixed"] = (
+        ri_result.get("image_intents_fixed", 0) + fused["image_intents_fixed"]
+    )
+
+    result["structure_strings_truncated"] = (
+        structure_result.get("strings_truncated", 0) + fused["strings_truncated"]
+    )
+    result["structure_names_shortened"] = (
+        structure_result.get("names_shortened", 0) + fused["names_shortened"]
+    )
+    result["structure_utf8_names_fixed"] = (
+        structure_result.get("utf8_names_fixed", 0) + fused["utf8_names_fixed"]
+    )
+    result["structure_integers_clamped"] = (
+        structure_result.get("integers_clamped", 0) + fused["integers_clamped"]
+    )
+    result["structure_reals_normalized"] = (
+        structure_result.get("reals_normalized", 0) + fused["reals_normalized"]
+    )
+    result["structure_q_nesting_rebalanced"] = (
+        structure_result.get("q_nesting_rebalanced", 0) + fused["q_nesting_rebalanced"]
+    )
+    result["structure_hex_odd_fixed"] = (
+        structure_result.get("hex_odd_fixed", 0) + fused["hex_odd_fixed"]
+    )
+    result["structure_hex_invalid_fixed"] = (
+        structure_result.get("hex_invalid_fixed", 0) + fused["hex_invalid_fixed"]
     )
-    result["structure_hex_odd_fixed"] = structure_result.get("hex_odd_fixed", 0)
-    result["structure_hex_invalid_fixed"] = structure_result.get("hex_invalid_fixed", 0)
 
     # Sanitize CIDFont structures for PDF/A-2 compliance (all levels)
     cidfont_result = sanitize_cidfont_structures(pdf)
@@ -483,16 +531,25 @@ def sanitize_for_pdfa(pdf: Pdf, level: str = "3b") -> dict[str, Any]:
             "tounicode_gaps_filled", 0
         )
 
+    # The /ActualText and .notdef rewrites share a second fused walk.
+    with deferred_content_rewrites(pdf) as rewrites:
         # Wrap PUA-mapped characters in /ActualText (rule 6.2.11.7.3-1)
-        pua_at_result = sanitize_pua_actualtext(pdf)
-        result["pua_actualtext_added"] = pua_at_result.get("pua_actualtext_added", 0)
-        result["pua_actualtext_warnings"] = pua_at_result.get(
-            "pua_actualtext_warnings", 0
-        )
-
-    # Remove .notdef glyph references from content streams (ISO 19005-2, 6.2.11.8)
-    notdef_usage_result = sanitize_notdef_usage(pdf)
-    result["notdef_usage_fixed"] = notdef_usage_result.get("notdef_usage_fixed", 0)
+        if level.endswith("u"):
+            pua_at_result = sanitize_pua_actualtext(pdf)
+            result["pua_actualtext_added"] = pua_at_result.get(
+                "pua_actualtext_added", 0
+            )
+            result["pua_actualtext_warnings"] = pua_at_result.get(
+                "pua_actualtext_warnings", 0
+            )
+
+        # Remove .notdef glyph references from content streams (ISO 19005-2, 6.2.11.8)
+        notdef_usage_result = sanitize_notdef_usage(pdf)
+        result["notdef_usage_fixed"] = notdef_usage_result.get("notdef_usage_fixed", 0)
+    fused = rewrites.stats
+    result["pua_actualtext_added"] += fused["pua_actualtext_added"]
+    result["pua_actualtext_warnings"] += fused["pua_actualtext_warnings"]
+    result["notdef_usage_fixed"] += fused["notdef_usage_fixed"]
 
     # Remove non-compliant embedded files (only 2b/2u)
     # PDF/A-2 allows embedded files that are themselves PDF/A-1 or PDF/A-2
@@ -681,6 +738,8 @@ __all__ = [
     "validate_destinations",
     "remove_embedded_files",
     "remove_non_compliant_embedded_files",
+    "EmbeddedPdfLimits",
+    "embedded_pdf_limits",
     "sanitize_embedded_file_filters",
     "ensure_catalog_lang",
     "ensure_mark_info",
@@ -717,6 +776,7 @@ __all__ = [
     "convert_lzw_streams",
     "remove_crypt_streams",
     "remove_external_stream_keys",
+    "fix_mismatched_stream_lengths",
     "fix_stream_lengths",
     "sanitize_nonstandard_inline_filters",
     "convert_jbig2_external_globals",
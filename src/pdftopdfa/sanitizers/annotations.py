@@ -10,6 +10,7 @@ from collections.abc import Iterator
 
 from pikepdf import Array, Dictionary, Name, Pdf, Stream
 
+from ..document_index import get_document_index
 from ..utils import resolve_indirect as _resolve_indirect
 from .base import (
     ANNOT_FLAG_HIDDEN,
@@ -66,7 +67,7 @@ def _iter_annotation_arrays(
     """Yields all /Annots arrays found in document dictionaries."""
     seen_owners: set[tuple[int, int]] = set()
 
-    for obj in pdf.objects:
+    for obj in get_document_index(pdf).iter_annotation_owners():
         try:
             owner = _resolve_indirect(obj)
             if not isinstance(owner, (Dictionary, Stream)):
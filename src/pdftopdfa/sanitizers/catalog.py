@@ -36,6 +36,7 @@ import re
 from lxml import etree
 from pikepdf import Dictionary, Name, Pdf, String
 
+from ..document_index import get_document_index
 from ..utils import resolve_indirect as _resolve_indirect
 
 logger = logging.getLogger(__name__)
@@ -273,7 +274,7 @@ def _remove_docmdp_sigref_digest_keys(pdf: Pdf) -> int:
     """
     removed_count = 0
 
-    for obj in pdf.objects:
+    for obj in get_document_index(pdf).iter_signature_candidates():
         try:
             candidate = _resolve_indirect(obj)
         except Exception:
@@ -0,0 +1,308 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Visitor pipeline for operator-level content stream fixes.
+
+Several sanitizers rewrite content streams one instruction at a time
+(undefined operators, q/Q nesting, .notdef references, PUA /ActualText,
+inline-image /Interpolate).  Each of them is implemented as a
+:class:`ContentStreamVisitor` that handles the operators it registers for
+and passes everything else through.
+
+:func:`submit_content_rewrite` applies a visitor to a stream.  Outside a
+deferred pass it runs immediately, so every sanitizer keeps working on its
+own.  Inside :func:`deferred_content_rewrites` the visitors are only
+queued; when the scope ends, all visitors queued for the same stream are
+chained and run in a single walk over its instructions, in submission
+order, and the stream is serialized at most once.
+
+Chaining is equivalent to running the fixers one after another because
+every visitor decides on an instruction using only the instructions before
+it: the output a visitor emits for an instruction is fed straight into the
+next visitor.  Byte-level repairs that run before parsing are the
+exception; where one changes the stream, the chain is split so that it
+still sees the output of the fixers before it.
+"""
+
+import logging
+import warnings
+from collections import Counter
+from contextlib import AbstractContextManager
+
+import pikepdf
+from pikepdf import Pdf, Stream
+
+from ..content_cache import ContentStreamCache, get_content_stream_cache
+from ..utils import PdfScopedRegistry
+
+logger = logging.getLogger(__name__)
+
+# Operator name pikepdf reports for inline images.
+INLINE_IMAGE_OPERATOR = "INLINE IMAGE"
+
+
+def _operator_name(item) -> str:
+    if isinstance(item, pikepdf.ContentStreamInlineImage):
+        return INLINE_IMAGE_OPERATOR
+    return str(item.operator)
+
+
+class ContentStreamVisitor:
+    """Base class for one fixer's per-operator rewrite rules.
+
+    Subclasses set :attr:`operators` to the operator names they handle
+    (``None`` for every instruction) and override :meth:`visit`.  The
+    optional byte-level hooks :meth:`prepare` and :meth:`finalize` run
+    before parsing and after serialization; a stream that needs
+    :meth:`finalize` is serialized immediately instead of through the
+    content stream cache.
+    """
+
+    #: Operator names dispatched to :meth:`visit`; None means all.
+    operators: frozenset[str] | None = None
+
+    def __init__(self) -> None:
+        self.changed = False
+
+    def prepare(self, data: bytes) -> bytes:
+        """Repair the decoded stream bytes before they are parsed.
+
+        May be called again on the output of earlier visitors; only the
+        last call counts.
+        """
+        return data
+
+    def visit(self, item, operator: str) -> list | None:
+        """Handle one instruction.
+
+        Args:
+            item: The instruction (or inline image) to inspect.
+            operator: Its operator name.
+
+        Returns:
+            None to keep *item* unchanged, otherwise the list of
+            instructions replacing it (empty to drop it).
+        """
+        return None
+
+    def finish(self, upstream_changed: bool) -> None:
+        """Called after the walk, or when the stream could not be parsed.
+
+        Args:
+            upstream_changed: Whether a visitor that ran earlier in the
+                chain modified the stream.
+        """
+
+    @property
+    def needs_write(self) -> bool:
+        """Whether the stream must be serialized for this visitor."""
+        return self.changed
+
+    @property
+    def needs_finalize(self) -> bool:
+        """Whether :meth:`finalize` has to patch the serialized bytes."""
+        return False
+
+    def finalize(self, data: bytes) -> bytes:
+        """Patch the serialized stream bytes."""
+        return data
+
+    def stats(self) -> dict[str, int]:
+        """Return this visitor's counters keyed by statistic name."""
+        return {}
+
+
+def _has_prepare(visitor: ContentStreamVisitor) -> bool:
+    return type(visitor).prepare is not ContentStreamVisitor.prepare
+
+
+def _walk(instructions: list, visitors: list[ContentStreamVisitor]) -> list:
+    """Run *visitors* as a chain over *instructions* in a single pass."""
+    output: list = []
+    for item in instructions:
+        pending = [item]
+        for visitor in visitors:
+            handled = visitor.operators
+            next_pending: list = []
+            for current in pending:
+                operator = _operator_name(current)
+                if handled is not None and operator not in handled:
+                    next_pending.append(current)
+                    continue
+                replacement = visitor.visit(current, operator)
+                if replacement is None:
+                    next_pending.append(current)
+                else:
+                    visitor.changed = True
+                    next_pending.extend(replacement)
+            pending = next_pending
+            if not pending:
+                break
+        output.extend(pending)
+    return output
+
+
+def _walk_stream(
+    stream: Stream, cache: ContentStreamCache, visitors: list[ContentStreamVisitor]
+) -> bool:
+    """Parse *stream*, run *visitors* over it and write the result back."""
+    try:
+        with warnings.catch_warnings():
+            warnings.filterwarnings(
+                "ignore", message="Unexpected end of stream", category=UserWarning
+            )
+            instructions = cache.instructions(stream)
+    except Exception:
+        for visitor in visitors:
+            visitor.finish(False)
+        return False
+
+    output = _walk(instructions, visitors)
+
+    upstream_changed = False
+    for visitor in visitors:
+        visitor.finish(upstream_changed)
+        upstream_changed = upstream_changed or visitor.changed
+
+    if not any(visitor.needs_write for visitor in visitors):
+        return False
+
+    if any(visitor.needs_finalize for visitor in visitors):
+        data = pikepdf.unparse_content_stream(output)
+        for visitor in visitors:
+            data = visitor.finalize(data)
+        cache.write_bytes(stream, data)
+    else:
+        cache.set_instructions(stream, output)
+    return True
+
+
+def rewrite_content_stream(
+    stream: Stream, visitors: list[ContentStreamVisitor]
+) -> bool:
+    """Apply *visitors* to *stream* in a single walk.
+
+    A :meth:`~ContentStreamVisitor.prepare` repair that changes the bytes
+    must see the output of the visitors before it, as it does when the
+    fixers run one after another.  The chain is then split there: the
+    visitors before it are applied first and the rest runs on the result.
+
+    Args:
+        stream: The content stream to rewrite.
+        visitors: Visitors in the order their fixes must be applied.
+
+    Returns:
+        True if the stream was modified.
+    """
+    cache = get_content_stream_cache(stream)
+
+    if any(_has_prepare(visitor) for visitor in visitors):
+        try:
+            data = cache.read_bytes(stream)
+        except Exception as e:
+            logger.debug("Skipping unreadable content stream %s: %s", stream.objgen, e)
+            return False
+        prepared = data
+        for index, visitor in enumerate(visitors):
+            repaired = visitor.prepare(prepared)
+            if index and repaired != prepared:
+                if prepared != data:
+                    cache.write_bytes(stream, prepared)
+                changed = _walk_stream(stream, cache, visitors[:index])
+                return rewrite_content_stream(stream, visitors[index:]) or changed
+            prepared = repaired
+        if prepared != data:
+            cache.write_bytes(stream, prepared)
+
+    return _walk_stream(stream, cache, visitors)
+
+
+class ContentRewritePass:
+    """Queue of visitors that run fused, one walk per stream.
+
+    Args:
+        pdf: Opened pikepdf PDF object.
+    """
+
+    def __init__(self, pdf: Pdf) -> None:
+        self._pdf = pdf
+        self._queue: dict[tuple[int, int], tuple[Stream, list]] = {}
+        self.stats: Counter[str] = Counter()
+        self.streams_rewritten = 0
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def submit(self, stream: Stream, visitor: ContentStreamVisitor) -> bool:
+        """Queue *visitor* for *stream*.
+
+        Returns:
+            False if the stream cannot be queued (direct object); the caller
+            must then apply the visitor itself.
+        """
+        objgen = stream.objgen
+        if objgen == (0, 0):
+            return False
+        entry = self._queue.get(objgen)
+        if entry is None:
+            self._queue[objgen] = (stream, [visitor])
+        else:
+            entry[1].append(visitor)
+        return True
+
+    def run(self) -> Counter[str]:
+        """Run every queued visitor and return the accumulated statistics."""
+        queue, self._queue = self._queue, {}
+        for stream, visitors in queue.values():
+            if rewrite_content_stream(stream, visitors):
+                self.streams_rewritten += 1
+            for visitor in visitors:
+                self.stats.update(visitor.stats())
+        if queue:
+            logger.debug(
+                "Fused content rewrite pass: %d stream(s) walked, %d rewritten",
+                len(queue),
+                self.streams_rewritten,
+            )
+        return self.stats
+
+
+_registry: PdfScopedRegistry[ContentRewritePass] = PdfScopedRegistry(
+    ContentRewritePass, on_exit=ContentRewritePass.run
+)
+
+
+def deferred_content_rewrites(pdf: Pdf) -> AbstractContextManager[ContentRewritePass]:
+    """Collect content stream visitors and run them fused at scope exit.
+
+    Sanitizers called inside the scope queue their operator-level fixes
+    instead of applying them; the counts they return exclude those fixes,
+    which are reported in :attr:`ContentRewritePass.stats` once the scope
+    has ended.
+
+    Args:
+        pdf: Opened pikepdf PDF object.
+
+    Returns:
+        Context manager yielding the active pass.
+    """
+    return _registry.activate(pdf)
+
+
+def submit_content_rewrite(stream: Stream, visitor: ContentStreamVisitor) -> bool:
+    """Apply *visitor* to *stream*, or queue it inside a deferred pass.
+
+    Args:
+        stream: The content stream to rewrite.
+        visitor: The fixer to apply.
+
+    Returns:
+        True if the visitor ran immediately (its counters are final), False
+        if it was queued.
+    """
+    rewrite_pass = _registry.lookup_owner(stream)
+    if rewrite_pass is not None and rewrite_pass.submit(stream, visitor):
+        return False
+    rewrite_content_stream(stream, [visitor])
+    return True
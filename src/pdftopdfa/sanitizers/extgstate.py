@@ -23,7 +23,7 @@ import logging
 import pikepdf
 from pikepdf import Array, Dictionary, Name, Pdf, Stream
 
-from ..utils import iter_type3_fonts as _iter_type3_fonts
+from ..resource_graph import get_resource_graph
 from ..utils import resolve_indirect as _resolve_indirect
 from .rendering_intent import VALID_RENDERING_INTENTS
 
@@ -160,136 +160,13 @@ def _resources_use_iccbased_cmyk(resources, visited: set[tuple[int, int]]) -> bo
     return False
 
 
-def _form_xobjects_use_iccbased_cmyk(
-    resources, visited_forms: set[tuple[int, int]], visited_cs: set[tuple[int, int]]
-) -> bool:
-    """Return True if nested Form XObjects use ICCBased CMYK."""
-    resources = _resolve_indirect(resources)
-    if not isinstance(resources, Dictionary):
-        return False
-
-    xobjects = _resolve_indirect(resources.get("/XObject"))
-    if not isinstance(xobjects, Dictionary):
-        return False
-
-    for xobj_name in list(xobjects.keys()):
-        xobj = _resolve_indirect(xobjects[xobj_name])
-        if not isinstance(xobj, Stream):
-            continue
-
-        subtype = xobj.get("/Subtype")
-        if subtype is None or str(subtype) != "/Form":
-            continue
-
-        objgen = xobj.objgen
-        if objgen != (0, 0):
-            if objgen in visited_forms:
-                continue
-            visited_forms.add(objgen)
-
-        form_resources = xobj.get("/Resources")
-        if not form_resources:
-            continue
-
-        form_resources = _resolve_indirect(form_resources)
-        if _resources_use_iccbased_cmyk(form_resources, visited_cs):
-            return True
-        if _form_xobjects_use_iccbased_cmyk(form_resources, visited_forms, visited_cs):
-            return True
-
-    return False
-
-
-def _ap_entry_uses_iccbased_cmyk(
-    ap_entry, visited_forms: set[tuple[int, int]], visited_cs: set[tuple[int, int]]
-) -> bool:
-    """Return True if an annotation AP entry uses ICCBased CMYK."""
-    ap_entry = _resolve_indirect(ap_entry)
-
-    if isinstance(ap_entry, Stream):
-        form_resources = ap_entry.get("/Resources")
-        if form_resources:
-            form_resources = _resolve_indirect(form_resources)
-            if _resources_use_iccbased_cmyk(form_resources, visited_cs):
-                return True
-            if _form_xobjects_use_iccbased_cmyk(
-                form_resources, visited_forms, visited_cs
-            ):
-                return True
-    elif isinstance(ap_entry, Dictionary):
-        for state_name in list(ap_entry.keys()):
-            state_stream = _resolve_indirect(ap_entry[state_name])
-            if not isinstance(state_stream, Stream):
-                continue
-            form_resources = state_stream.get("/Resources")
-            if not form_resources:
-                continue
-            form_resources = _resolve_indirect(form_resources)
-            if _resources_use_iccbased_cmyk(form_resources, visited_cs):
-                return True
-            if _form_xobjects_use_iccbased_cmyk(
-                form_resources, visited_forms, visited_cs
-            ):
-                return True
-
-    return False
-
-
-def _type3_fonts_use_iccbased_cmyk(
-    resources, visited_forms: set[tuple[int, int]], visited_cs: set[tuple[int, int]]
-) -> bool:
-    """Return True if any Type3 font resources use ICCBased CMYK."""
-    for _font_name, font in _iter_type3_fonts(resources, visited_forms):
-        font_resources = font.get("/Resources")
-        if font_resources is None:
-            continue
-
-        font_resources = _resolve_indirect(font_resources)
-        if not isinstance(font_resources, Dictionary):
-            continue
-
-        if _resources_use_iccbased_cmyk(font_resources, visited_cs):
-            return True
-        if _form_xobjects_use_iccbased_cmyk(font_resources, visited_forms, visited_cs):
-            return True
-
-    return False
-
-
 def _pdf_uses_iccbased_cmyk(pdf: Pdf) -> bool:
     """Return True if the PDF uses ICCBased CMYK in relevant resources."""
-    visited_forms: set[tuple[int, int]] = set()
     visited_cs: set[tuple[int, int]] = set()
 
-    for page in pdf.pages:
-        page_dict = _resolve_indirect(page.obj)
-
-        resources = page_dict.get("/Resources")
-        if resources:
-            resources = _resolve_indirect(resources)
-            if _resources_use_iccbased_cmyk(resources, visited_cs):
-                return True
-            if _form_xobjects_use_iccbased_cmyk(resources, visited_forms, visited_cs):
-                return True
-            if _type3_fonts_use_iccbased_cmyk(resources, visited_forms, visited_cs):
-                return True
-
-        annots = page_dict.get("/Annots")
-        if annots:
-            annots = _resolve_indirect(annots)
-            for annot in annots:
-                annot = _resolve_indirect(annot)
-                if not isinstance(annot, Dictionary):
-                    continue
-                ap = _resolve_indirect(annot.get("/AP"))
-                if not isinstance(ap, Dictionary):
-                    continue
-                for ap_key in ("/N", "/R", "/D"):
-                    ap_entry = ap.get(ap_key)
-                    if ap_entry and _ap_entry_uses_iccbased_cmyk(
-                        ap_entry, visited_forms, visited_cs
-                    ):
-                        return True
+    for node in get_resource_graph(pdf).iter_nodes():
+        if _resources_use_iccbased_cmyk(node.own_resources, visited_cs):
+            return True
 
     return False
 
@@ -764,136 +641,6 @@ def _process_resources(resources, has_iccbased_cmyk: bool) -> int:
     return removed
 
 
-def _process_form_xobjects_recursive(
-    resources, visited: set, has_iccbased_cmyk: bool
-) -> int:
-    """Recurse into Form XObjects' nested Resources for ExtGState entries.
-
-    Args:
-        resources: A resolved Resources dictionary.
-        visited: Set of (objnum, gen) tuples for cycle detection.
-
-    Returns:
-        Number of forbidden entries removed.
-    """
-    removed = 0
-    resources = _resolve_indirect(resources)
-
-    if not isinstance(resources, Dictionary):
-        return 0
-
-    xobjects = resources.get("/XObject")
-    if not xobjects:
-        return 0
-
-    xobjects = _resolve_indirect(xobjects)
-    if not isinstance(xobjects, Dictionary):
-        return 0
-
-    for xobj_name in list(xobjects.keys()):
-        xobj = _resolve_indirect(xobjects[xobj_name])
-
-        # Check if this is a Form XObject (streams with /Subtype /Form)
-        if not isinstance(xobj, Stream):
-            continue
-
-        subtype = xobj.get("/Subtype")
-        if subtype is None or str(subtype) != "/Form":
-            continue
-
-        # Cycle detection using objgen for indirect objects
-        objgen = xobj.objgen
-        if objgen != (0, 0):
-            if objgen in visited:
-                continue
-            visited.add(objgen)
-
-        # Process this Form XObject's own Resources
-        form_resources = xobj.get("/Resources")
-        if form_resources:
-            form_resources = _resolve_indirect(form_resources)
-            removed += _process_resources(form_resources, has_iccbased_cmyk)
-            # Recurse into nested Form XObjects
-            removed += _process_form_xobjects_recursive(
-                form_resources, visited, has_iccbased_cmyk
-            )
-
-    return removed
-
-
-def _process_ap_stream(ap_entry, visited: set, has_iccbased_cmyk: bool) -> int:
-    """Process an annotation appearance stream entry for ExtGState.
-
-    An AP entry value can be a Form XObject (stream) directly, or a
-    dictionary of sub-state Form XObjects.
-
-    Args:
-        ap_entry: An appearance entry (N, R, or D value).
-        visited: Set of (objnum, gen) tuples for cycle detection.
-
-    Returns:
-        Number of forbidden entries removed.
-    """
-    removed = 0
-    ap_entry = _resolve_indirect(ap_entry)
-
-    if isinstance(ap_entry, Stream):
-        # Direct Form XObject appearance stream
-        form_resources = ap_entry.get("/Resources")
-        if form_resources:
-            form_resources = _resolve_indirect(form_resources)
-            removed += _process_resources(form_resources, has_iccbased_cmyk)
-            removed += _process_form_xobjects_recursive(
-                form_resources, visited, has_iccbased_cmyk
-            )
-    elif isinstance(ap_entry, Dictionary):
-        # Sub-state dictionary: keys map to Form XObject streams
-        for state_name in list(ap_entry.keys()):
-            state_stream = _resolve_indirect(ap_entry[state_name])
-            if isinstance(state_stream, Stream):
-                form_resources = state_stream.get("/Resources")
-                if form_resources:
-                    form_resources = _resolve_indirect(form_resources)
-                    removed += _process_resources(form_resources, has_iccbased_cmyk)
-                    removed += _process_form_xobjects_recursive(
-                        form_resources, visited, has_iccbased_cmyk
-                    )
-
-    return removed
-
-
-def _process_type3_font_extgstate(
-    resources, visited: set, has_iccbased_cmyk: bool
-) -> int:
-    """Process ExtGState entries inside Type3 font resources.
-
-    Also recurses into Form XObjects in the font's own ``/Resources``.
-
-    Args:
-        resources: A resolved Resources dictionary.
-        visited: Set of (objnum, gen) tuples for cycle detection.
-
-    Returns:
-        Number of forbidden entries removed.
-    """
-    removed = 0
-
-    for _font_name, font in _iter_type3_fonts(resources, visited):
-        font_resources = font.get("/Resources")
-        if font_resources is None:
-            continue
-        font_resources = _resolve_indirect(font_resources)
-        if not isinstance(font_resources, Dictionary):
-            continue
-
-        removed += _process_resources(font_resources, has_iccbased_cmyk)
-        removed += _process_form_xobjects_recursive(
-            font_resources, visited, has_iccbased_cmyk
-        )
-
-    return removed
-
-
 def sanitize_extgstate(pdf: Pdf) -> dict[str, int]:
     """Sanitize Extended Graphics State dictionaries for PDF/A compliance.
 
@@ -907,10 +654,8 @@ def sanitize_extgstate(pdf: Pdf) -> dict[str, int]:
     - /CA and /ca (opacity) — clamped to [0.0, 1.0]
     - /SMask (soft mask) — must be /None or a valid dictionary
 
-    Traverses:
-    - Page Resources → ExtGState
-    - Page Resources → XObject → Form XObjects → Resources (recursive)
-    - Page Annotations → AP streams → Resources
+    Traverses the resources of every page, Form XObject, tiling pattern,
+    Type3 font and annotation appearance stream in the resource graph.
 
     Args:
         pdf: Opened pikepdf PDF object (modified in place).
@@ -919,56 +664,18 @@ def sanitize_extgstate(pdf: Pdf) -> dict[str, int]:
         Dictionary with key 'extgstate_fixed': number of entries removed.
     """
     total_removed = 0
-    visited: set = set()
     has_iccbased_cmyk = _pdf_uses_iccbased_cmyk(pdf)
 
-    for page_num, page in enumerate(pdf.pages, start=1):
+    for node in get_resource_graph(pdf).iter_nodes():
         try:
-            page_dict = _resolve_indirect(page.obj)
-
-            # 1. Page → Resources → ExtGState
-            resources = page_dict.get("/Resources")
-            if resources:
-                resources = _resolve_indirect(resources)
-                total_removed += _process_resources(resources, has_iccbased_cmyk)
-
-                # 2. Page → Resources → XObject → Form XObjects (recursive)
-                total_removed += _process_form_xobjects_recursive(
-                    resources, visited, has_iccbased_cmyk
-                )
-
-                # 2b. Page → Resources → Font → Type3 ExtGState
-                total_removed += _process_type3_font_extgstate(
-                    resources, visited, has_iccbased_cmyk
-                )
-
-            # 3. Page → Annots → AP streams
-            annots = page_dict.get("/Annots")
-            if annots:
-                annots = _resolve_indirect(annots)
-                for annot in annots:
-                    annot = _resolve_indirect(annot)
-                    if not isinstance(annot, Dictionary):
-                        continue
-
-                    ap = annot.get("/AP")
-                    if not ap:
-                        continue
-
-                    ap = _resolve_indirect(ap)
-                    if not isinstance(ap, Dictionary):
-                        continue
-
-                    # Process N (normal), R (rollover), D (down) appearances
-                    for ap_key in ("/N", "/R", "/D"):
-                        ap_entry = ap.get(ap_key)
-                        if ap_entry:
-                            total_removed += _process_ap_stream(
-                                ap_entry, visited, has_iccbased_cmyk
-                            )
-
+            total_removed += _process_resources(node.own_resources, has_iccbased_cmyk)
         except Exception as e:
-            logger.debug("Error sanitizing ExtGState on page %d: %s", page_num, e)
+            logger.debug(
+                "Error sanitizing ExtGState of %s %s: %s",
+                node.kind,
+                node.owner.objgen,
+                e,
+            )
 
     if total_removed > 0:
         logger.info("ExtGState sanitized: %d forbidden entries removed", total_removed)
@@ -4,11 +4,17 @@
 
 """Embedded file handling for PDF/A compliance."""
 
+import hashlib
 import logging
 import mimetypes
+import multiprocessing
 import re
 import tempfile
+import time
 from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
 from datetime import UTC, datetime
 from io import BytesIO
 from pathlib import Path
@@ -16,6 +22,7 @@ from pathlib import Path
 import pikepdf
 from pikepdf import Array, Dictionary, Name, Pdf, Stream
 
+from ..document_index import get_document_index
 from ..metadata import _format_pdf_date
 from ..utils import resolve_indirect as _resolve_indirect
 from ..validator import detect_pdfa_level
@@ -57,74 +64,94 @@ VALID_AF_RELATIONSHIPS = frozenset(
 )
 
 
-def _is_pdfa_compliant_embedded(filespec: object) -> bool:
-    """Checks if an embedded file in a FileSpec is PDF/A-1 or PDF/A-2 compliant.
+def _embedded_file_data(filespec: object) -> bytes | None:
+    """Returns the data of the embedded file of a FileSpec.
 
     Args:
         filespec: A pikepdf FileSpec dictionary object.
 
     Returns:
-        True if the embedded file is a PDF/A-1 or PDF/A-2 document.
+        The decoded /UF (preferred) or /F stream, or None if there is none.
     """
-    try:
-        resolved = _resolve_indirect(filespec)
+    resolved = _resolve_indirect(filespec)
 
-        # Extract /EF dictionary
-        ef = resolved.get("/EF")
-        if ef is None:
-            return False
+    # Extract /EF dictionary
+    ef = resolved.get("/EF")
+    if ef is None:
+        return None
+
+    ef = _resolve_indirect(ef)
 
-        ef = _resolve_indirect(ef)
+    # Get embedded file stream: prefer /UF, fall back to /F
+    stream = ef.get("/UF")
+    if stream is None:
+        stream = ef.get("/F")
+    if stream is None:
+        return None
 
-        # Get embedded file stream: prefer /UF, fall back to /F
-        stream = ef.get("/UF")
-        if stream is None:
-            stream = ef.get("/F")
-        if stream is None:
-            return False
+    stream = _resolve_indirect(stream)
+    return bytes(stream.read_bytes())
 
-        stream = _resolve_indirect(stream)
 
-        # Read embedded file data
-        data = bytes(stream.read_bytes())
-        if not data:
-            return False
+def _is_pdfa_compliant_pdf_data(data: bytes) -> bool:
+    """Checks if PDF bytes are a PDF/A-1 or PDF/A-2 document.
+
+    Args:
+        data: Raw bytes of an embedded file.
+
+    Returns:
+        True if the data is a PDF/A-1 or PDF/A-2 document.
+    """
+    # Quick check: must start with PDF magic bytes
+    if not data[:5] == b"%PDF-":
+        return False
 
-        # Quick check: must start with PDF magic bytes
-        if not data[:5] == b"%PDF-":
+    # Open as PDF and check PDF/A level via XMP
+    with pikepdf.open(BytesIO(data)) as embedded_pdf:
+        level = detect_pdfa_level(embedded_pdf)
+        if level is None:
+            return False
+        # PDF/A-1 and PDF/A-2 are allowed in PDF/A-2
+        if level[0] not in ("1", "2"):
             return False
 
-        # Open as PDF and check PDF/A level via XMP
-        with pikepdf.open(BytesIO(data)) as embedded_pdf:
-            level = detect_pdfa_level(embedded_pdf)
-            if level is None:
-                return False
-            # PDF/A-1 and PDF/A-2 are allowed in PDF/A-2
-            if level[0] not in ("1", "2"):
-                return False
+    # XMP claims PDF/A compliance — verify with veraPDF if available
+    if is_verapdf_available():
+        tmp_path = None
+        try:
+            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+                tmp.write(data)
+                tmp_path = Path(tmp.name)
+            result = validate_with_verapdf(tmp_path, flavour=level)
+            return result.compliant
+        except Exception as e:
+            logger.warning(
+                "veraPDF validation failed for embedded file, "
+                "falling back to XMP result: %s",
+                e,
+            )
+            return True
+        finally:
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)
 
-        # XMP claims PDF/A compliance — verify with veraPDF if available
-        if is_verapdf_available():
-            tmp_path = None
-            try:
-                with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-                    tmp.write(data)
-                    tmp_path = Path(tmp.name)
-                result = validate_with_verapdf(tmp_path, flavour=level)
-                return result.compliant
-            except Exception as e:
-                logger.warning(
-                    "veraPDF validation failed for embedded file, "
-                    "falling back to XMP result: %s",
-                    e,
-                )
-                return True
-            finally:
-                if tmp_path is not None:
-                    tmp_path.unlink(missing_ok=True)
+    return True
 
-        return True
 
+def _is_pdfa_compliant_embedded(filespec: object) -> bool:
+    """Checks if an embedded file in a FileSpec is PDF/A-1 or PDF/A-2 compliant.
+
+    Args:
+        filespec: A pikepdf FileSpec dictionary object.
+
+    Returns:
+        True if the embedded file is a PDF/A-1 or PDF/A-2 document.
+    """
+    try:
+        data = _embedded_file_data(filespec)
+        if not data:
+            return False
+        return _is_pdfa_compliant_pdf_data(data)
     except Exception as e:
         logger.debug("Error checking embedded file compliance: %s", e)
         return False
@@ -133,7 +160,10 @@ def _is_pdfa_compliant_embedded(filespec: object) -> bool:
 def _try_convert_embedded_pdf_to_pdfa2(data: bytes) -> bytes | None:
     """Attempt to convert embedded PDF bytes to PDF/A-2b.
 
-    Uses a deferred import of convert_to_pdfa to avoid a circular dependency
+    The conversion runs in memory in this process and stops with a
+    failure between its stages once the deadline of the current
+    :func:`embedded_pdf_limits` scope has passed.  Uses a deferred import
+    of the converter to avoid a circular dependency
     (converter → sanitizers/__init__ → files → converter).
 
     Args:
@@ -143,35 +173,256 @@ def _try_convert_embedded_pdf_to_pdfa2(data: bytes) -> bytes | None:
         Converted PDF/A-2b bytes on success, or None if conversion failed.
     """
     # Deferred import breaks the circular dependency at module load time.
-    from ..converter import convert_to_pdfa  # noqa: PLC0415
+    from ..converter import _convert_embedded_pdf  # noqa: PLC0415
 
-    tmp_in_path: Path | None = None
-    tmp_out_path: Path | None = None
     try:
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp_in:
-            tmp_in.write(data)
-            tmp_in_path = Path(tmp_in.name)
-
-        tmp_out_path = tmp_in_path.with_name(tmp_in_path.stem + "_pdfa2b.pdf")
-        result = convert_to_pdfa(tmp_in_path, tmp_out_path, level="2b")
-        if result.success:
-            converted = tmp_out_path.read_bytes()
-            logger.debug(
-                "Converted embedded PDF to PDF/A-2b (%d → %d bytes)",
-                len(data),
-                len(converted),
-            )
-            return converted
-        logger.debug("Embedded PDF conversion failed: %s", result.error)
-        return None
+        converted = _convert_embedded_pdf(
+            data, level="2b", deadline=_embedded_scope.get().deadline
+        )
     except Exception as e:
         logger.debug("Error converting embedded PDF to PDF/A-2b: %s", e)
         return None
+    logger.debug(
+        "Converted embedded PDF to PDF/A-2b (%d → %d bytes)",
+        len(data),
+        len(converted),
+    )
+    return converted
+
+
+# Nesting depth up to which embedded PDFs are converted: 1 converts the
+# attachments of the document itself, 2 also those of its attachments.
+# Deeper non-compliant PDFs are removed instead.
+DEFAULT_EMBEDDED_MAX_DEPTH = 3
+
+
+@dataclass(frozen=True)
+class EmbeddedPdfLimits:
+    """Limits for converting embedded PDFs to PDF/A-2b.
+
+    Attributes:
+        max_depth: Nesting depth up to which embedded PDFs are converted;
+            0 removes all non-compliant embedded PDFs.
+        time_budget: Seconds all embedded conversions of one document may
+            take in total, or None for no limit.  A conversion that is
+            still running when the budget runs out is abandoned at its
+            next stage.
+        workers: Worker processes for converting distinct attachments of
+            a document in parallel; 1 converts them one by one in this
+            process.  Daemonic processes, such as the workers of a batch
+            conversion, cannot start worker processes and always convert
+            one by one.
+
+    Raises:
+        ValueError: If a limit is out of range.
+    """
+
+    max_depth: int = DEFAULT_EMBEDDED_MAX_DEPTH
+    time_budget: float | None = None
+    workers: int = 1
+
+    def __post_init__(self) -> None:
+        if self.max_depth < 0:
+            raise ValueError(f"max_depth must not be negative, got {self.max_depth}")
+        if self.time_budget is not None and self.time_budget <= 0:
+            raise ValueError(f"time_budget must be positive, got {self.time_budget}")
+        if self.workers < 1:
+            raise ValueError(f"workers must be at least 1, got {self.workers}")
+
+
+@dataclass(frozen=True)
+class _EmbeddedScope(EmbeddedPdfLimits):
+    """Limits of the current embedded PDF conversion.
+
+    Attributes:
+        depth: Nesting depth of the document being sanitized.
+        deadline: ``time.monotonic()`` value at which the budget of the
+            outermost document runs out, or None.
+    """
+
+    depth: int = 0
+    deadline: float | None = None
+
+
+_embedded_scope: ContextVar[_EmbeddedScope] = ContextVar(
+    "_embedded_scope", default=_EmbeddedScope()
+)
+
+
+@contextmanager
+def embedded_pdf_limits(
+    *,
+    max_depth: int = DEFAULT_EMBEDDED_MAX_DEPTH,
+    time_budget: float | None = None,
+    workers: int = 1,
+) -> Iterator[None]:
+    """Sets the limits for converting embedded PDFs within the block.
+
+    Applies to PDF/A-2 conversions, where non-compliant embedded PDFs are
+    converted to PDF/A-2b (rule 6.8-5).  Attachments that exceed a limit
+    are removed like unconvertible ones.  The converter functions take
+    the same limits as an :class:`EmbeddedPdfLimits` in their
+    ``embedded_limits`` argument.
+
+    Args:
+        max_depth: Nesting depth up to which embedded PDFs are converted;
+            0 removes all non-compliant embedded PDFs.
+        time_budget: Seconds all embedded conversions of one document may
+            take in total, or None for no limit.
+        workers: Worker processes for converting distinct attachments of
+            a document in parallel; 1 converts them one by one in this
+            process.
+
+    Raises:
+        ValueError: If a limit is out of range.
+    """
+    token = _embedded_scope.set(
+        _EmbeddedScope(max_depth=max_depth, time_budget=time_budget, workers=workers)
+    )
+    try:
+        yield
     finally:
-        if tmp_in_path is not None:
-            tmp_in_path.unlink(missing_ok=True)
-        if tmp_out_path is not None:
-            tmp_out_path.unlink(missing_ok=True)
+        _embedded_scope.reset(token)
+
+
+def _convert_embedded_task(
+    task: tuple[bytes, _EmbeddedScope, float | None],
+) -> bytes | None:
+    """Worker process entry point: convert one embedded PDF.
+
+    Args:
+        task: Tuple of (data, scope, remaining) where *scope* is the
+            scope of the converted PDF and *remaining* the seconds left of
+            the time budget.
+    """
+    data, scope, remaining = task
+    deadline = None if remaining is None else time.monotonic() + remaining
+    # Nested attachments are converted serially inside the worker.
+    _embedded_scope.set(replace(scope, workers=1, deadline=deadline))
+    return _try_convert_embedded_pdf_to_pdfa2(data)
+
+
+def _conversion_failed(_task: object, message: str) -> bytes | None:
+    logger.debug("Embedded PDF conversion failed: %s", message)
+    return None
+
+
+class _EmbeddedPdfs:
+    """Compliance checks and conversions of the embedded PDFs of a document.
+
+    Results are kept per SHA-256 of the file data, so identical payloads
+    attached several times are checked and converted only once.
+    """
+
+    def __init__(self) -> None:
+        parent = _embedded_scope.get()
+        deadline = parent.deadline
+        if deadline is None and parent.time_budget is not None:
+            deadline = time.monotonic() + parent.time_budget
+        self._scope = replace(parent, depth=parent.depth + 1, deadline=deadline)
+        self._compliant: dict[bytes, bool] = {}
+        self._converted: dict[bytes, bytes | None] = {}
+
+    def _remaining(self) -> float | None:
+        if self._scope.deadline is None:
+            return None
+        return self._scope.deadline - time.monotonic()
+
+    def _may_convert(self) -> bool:
+        if self._scope.depth > self._scope.max_depth:
+            logger.debug(
+                "Embedded PDF nested deeper than %d levels, not converting",
+                self._scope.max_depth,
+            )
+            return False
+        remaining = self._remaining()
+        if remaining is not None and remaining <= 0:
+            logger.debug("Time budget for embedded PDFs exhausted, not converting")
+            return False
+        return True
+
+    def is_compliant(self, filespec: object) -> bool:
+        """Cached :func:`_is_pdfa_compliant_embedded`."""
+        try:
+            data = _embedded_file_data(filespec)
+        except Exception as e:
+            logger.debug("Error checking embedded file compliance: %s", e)
+            return False
+        if not data:
+            return False
+        digest = hashlib.sha256(data).digest()
+        compliant = self._compliant.get(digest)
+        if compliant is None:
+            try:
+                compliant = _is_pdfa_compliant_pdf_data(data)
+            except Exception as e:
+                logger.debug("Error checking embedded file compliance: %s", e)
+                compliant = False
+            self._compliant[digest] = compliant
+        return compliant
+
+    def convert(self, data: bytes) -> bytes | None:
+        """Cached :func:`_try_convert_embedded_pdf_to_pdfa2`."""
+        digest = hashlib.sha256(data).digest()
+        if digest in self._converted:
+            return self._converted[digest]
+        if not self._may_convert():
+            return None
+        token = _embedded_scope.set(self._scope)
+        try:
+            converted = _try_convert_embedded_pdf_to_pdfa2(data)
+        finally:
+            _embedded_scope.reset(token)
+        self._converted[digest] = converted
+        return converted
+
+    def prefetch(self, pdf: Pdf) -> None:
+        """Converts the distinct non-compliant embedded PDFs in parallel.
+
+        Does nothing unless more than one worker is configured, or in a
+        daemonic process such as a batch worker, which cannot start child
+        processes; :meth:`convert` then converts the attachments one by
+        one.  The results are picked up by :meth:`convert`.
+        """
+        if self._scope.workers < 2:
+            return
+        if multiprocessing.current_process().daemon:
+            logger.debug(
+                "Daemonic process cannot start workers, "
+                "converting embedded PDFs one by one"
+            )
+            return
+        pending: dict[bytes, bytes] = {}
+        for filespec in _iter_all_filespecs(pdf):
+            try:
+                data = _embedded_file_data(filespec)
+            except Exception:
+                continue
+            if not data or data[:5] != b"%PDF-" or self.is_compliant(filespec):
+                continue
+            pending.setdefault(hashlib.sha256(data).digest(), data)
+        if len(pending) < 2 or not self._may_convert():
+            return
+
+        # Deferred import: the batch module is only needed here.
+        from ..batch import run_in_workers  # noqa: PLC0415
+
+        digests = list(pending)
+        remaining = self._remaining()
+        logger.debug(
+            "Converting %d embedded PDF(s) in %d worker(s)",
+            len(digests),
+            min(self._scope.workers, len(digests)),
+        )
+        for index, converted in run_in_workers(
+            _convert_embedded_task,
+            ((pending[digest], self._scope, remaining) for digest in digests),
+            workers=min(self._scope.workers, len(digests)),
+            on_failure=_conversion_failed,
+            timeout=remaining,
+            max_tasks_per_worker=None,
+        ):
+            self._converted[digests[index]] = converted
 
 
 def _update_embedded_stream(ef: object, new_data: bytes) -> None:
@@ -290,7 +541,7 @@ def _iter_name_tree_pairs(
 
 
 def _iter_all_filespecs_by_scan(pdf: Pdf) -> Iterator[object]:
-    """Yield all FileSpec objects by scanning every object in the PDF.
+    """Yield all FileSpec objects found by the document-wide object index.
 
     Finds FileSpecs that may be missed by Name Tree / annotation traversal,
     such as those referenced only from page-level /AF arrays or other objects.
@@ -299,7 +550,7 @@ def _iter_all_filespecs_by_scan(pdf: Pdf) -> Iterator[object]:
         pdf: Opened pikepdf PDF object.
     """
     seen_objgen: set[tuple[int, int]] = set()
-    for obj in pdf.objects:
+    for obj in get_document_index(pdf).iter_filespecs():
         try:
             resolved = _resolve_indirect(obj)
             if not isinstance(resolved, Dictionary):
@@ -328,7 +579,7 @@ def _iter_all_filespecs(pdf: Pdf) -> Iterator[object]:
     """Yield all FileSpec objects found in the PDF.
 
     Combines Name Tree traversal, FileAttachment annotation scanning,
-    and full pdf.objects scan to find all FileSpec dictionaries.
+    and the document object index to find all FileSpec dictionaries.
     The full scan catches indirect FileSpecs in page-level /AF arrays
     and other locations; the traversal catches direct (inline) FileSpecs
     in the Name Tree or annotations.
@@ -387,7 +638,7 @@ def _iter_all_filespecs(pdf: Pdf) -> Iterator[object]:
         except Exception as e:
             logger.debug("Error processing annotations on page %d: %s", page_num, e)
 
-    # 3. Full pdf.objects scan for orphan indirect FileSpecs
+    # 3. Document object index for orphan indirect FileSpecs
     for obj in _iter_all_filespecs_by_scan(pdf):
         result = _dedup(obj)
         if result is not None:
@@ -463,6 +714,9 @@ def remove_non_compliant_embedded_files(pdf: Pdf) -> dict[str, int]:
     Only if conversion fails (or the file is not a PDF) does it fall back
     to removing the embedded content.
 
+    Identical embedded files are checked and converted once.  Conversion
+    depth, time budget and parallelism follow :func:`embedded_pdf_limits`.
+
     Args:
         pdf: Opened pikepdf PDF object (modified in place).
 
@@ -473,6 +727,8 @@ def remove_non_compliant_embedded_files(pdf: Pdf) -> dict[str, int]:
     kept = 0
     converted = 0
     processed_filespecs: set[tuple[int, int]] = set()
+    embedded_pdfs = _EmbeddedPdfs()
+    embedded_pdfs.prefetch(pdf)
 
     # 1. Process EmbeddedFiles from Names (traverse full Name Tree)
     try:
@@ -489,7 +745,7 @@ def remove_non_compliant_embedded_files(pdf: Pdf) -> dict[str, int]:
                         og = (0, 0)
                     if og != (0, 0):
                         processed_filespecs.add(og)
-                    if _is_pdfa_compliant_embedded(filespec):
+                    if embedded_pdfs.is_compliant(filespec):
                         new_names.append(name)
                         new_names.append(filespec)
                         kept += 1
@@ -505,9 +761,7 @@ def remove_non_compliant_embedded_files(pdf: Pdf) -> dict[str, int]:
                                 if stream is not None:
                                     raw = bytes(_resolve_indirect(stream).read_bytes())
                                     if raw[:5] == b"%PDF-":
-                                        new_data = _try_convert_embedded_pdf_to_pdfa2(
-                                            raw
-                                        )
+                                        new_data = embedded_pdfs.convert(raw)
                                         if new_data is not None:
                                             _update_embedded_stream(ef, new_data)
                                             new_names.append(name)
@@ -570,7 +824,7 @@ def remove_non_compliant_embedded_files(pdf: Pdf) -> dict[str, int]:
                                 continue
                             if og != (0, 0):
                                 processed_filespecs.add(og)
-                        if fs is not None and _is_pdfa_compliant_embedded(fs):
+                        if fs is not None and embedded_pdfs.is_compliant(fs):
                             kept += 1
                         else:
                             # Not compliant — try to convert it to PDF/A-2b first
@@ -586,11 +840,7 @@ def remove_non_compliant_embedded_files(pdf: Pdf) -> dict[str, int]:
                                                 _resolve_indirect(stream).read_bytes()
                                             )
                                             if raw[:5] == b"%PDF-":
-                                                new_data = (
-                                                    _try_convert_embedded_pdf_to_pdfa2(
-                                                        raw
-                                                    )
-                                                )
+                                                new_data = embedded_pdfs.convert(raw)
                                                 if new_data is not None:
                                                     _update_embedded_stream(
                                                         ef, new_data
@@ -634,7 +884,7 @@ def remove_non_compliant_embedded_files(pdf: Pdf) -> dict[str, int]:
             ef = resolved.get("/EF")
             if ef is None:
                 continue
-            if _is_pdfa_compliant_embedded(resolved):
+            if embedded_pdfs.is_compliant(resolved):
                 kept += 1
                 continue
             # Not compliant — try to convert it to PDF/A-2b first
@@ -647,7 +897,7 @@ def remove_non_compliant_embedded_files(pdf: Pdf) -> dict[str, int]:
                     if stream is not None:
                         raw = bytes(_resolve_indirect(stream).read_bytes())
                         if raw[:5] == b"%PDF-":
-                            new_data = _try_convert_embedded_pdf_to_pdfa2(raw)
+                            new_data = embedded_pdfs.convert(raw)
                             if new_data is not None:
                                 _update_embedded_stream(ef_r, new_data)
                                 converted += 1
@@ -7,41 +7,26 @@
 This module converts LZW-compressed streams to FlateDecode, removes /Crypt
 filters (both forbidden per ISO 19005-2, 6.1.8), strips external stream
 keys /F, /FFilter, /FDecodeParms (forbidden per ISO 19005-2, 6.1.7.1),
-re-encodes non-image streams to fix /Length mismatches (rule 6.1.7.1),
+repairs /Length mismatches (rule 6.1.7.1),
 and re-encodes inline images with non-Table-6 filters (rule 6.1.10-1).
 """
 
 import logging
 import warnings
 import zlib
+from collections.abc import Callable
 
 from pikepdf import Array, Dictionary, Name, Pdf, Stream, parse_content_stream
-from pikepdf import unparse_content_stream as _unparse_content_stream
 
+from ..compression import flate_level
+from ..content_cache import get_content_stream_cache
+from ..document_index import CONTENT_STREAMS, NONCANONICAL_FILTERS, get_document_index
+from ..reencode import reencode_to_flate
+from ..utils import normalize_filter_name as _normalize_inline_filter_name
 from ..utils import resolve_indirect as _resolve_indirect
 
 logger = logging.getLogger(__name__)
 
-_CANONICAL_FILTER_NAMES_BY_LOWER: dict[str, str] = {
-    "/ahx": "/ASCIIHexDecode",
-    "/asciihexdecode": "/ASCIIHexDecode",
-    "/a85": "/ASCII85Decode",
-    "/ascii85decode": "/ASCII85Decode",
-    "/lzw": "/LZWDecode",
-    "/lzwdecode": "/LZWDecode",
-    "/fl": "/FlateDecode",
-    "/flatedecode": "/FlateDecode",
-    "/rl": "/RunLengthDecode",
-    "/runlengthdecode": "/RunLengthDecode",
-    "/ccf": "/CCITTFaxDecode",
-    "/ccittfaxdecode": "/CCITTFaxDecode",
-    "/dct": "/DCTDecode",
-    "/dctdecode": "/DCTDecode",
-    "/jbig2decode": "/JBIG2Decode",
-    "/jpxdecode": "/JPXDecode",
-    "/crypt": "/Crypt",
-}
-
 _INLINE_FILTER_KEYS = frozenset({"/F", "/Filter"})
 _INLINE_DECODE_PARMS_KEYS = frozenset({"/DP", "/DecodeParms"})
 
@@ -57,14 +42,6 @@ _INLINE_IMAGE_ALLOWED_FILTER_NAMES: frozenset[str] = frozenset(
 )
 
 
-def _normalize_inline_filter_name(filter_name: str) -> str:
-    """Normalize filter names to canonical PDF names."""
-    return _CANONICAL_FILTER_NAMES_BY_LOWER.get(
-        filter_name.lower(),
-        filter_name,
-    )
-
-
 def _normalize_inline_filter_object(
     filter_obj,
 ) -> tuple[list[str], Name | Array, bool] | None:
@@ -316,7 +293,7 @@ def _sanitize_inline_image_filters(
         decoded = _decode_inline_image_payload(
             raw_payload, normalized_filter_obj, decode_parms
         )
-        rewritten_payload = zlib.compress(decoded) + b"\n"
+        rewritten_payload = zlib.compress(decoded, flate_level()) + b"\n"
         replacement_filter: Name | Array | None = Name("/FlateDecode")
         replacement_decode_parms = None
         nonstandard_fixed = has_nonstandard
@@ -361,12 +338,13 @@ def _sanitize_inline_images_in_stream(
     sanitize_nonstandard: bool = False,
 ) -> tuple[bool, bool, bool]:
     """Sanitize inline-image filters inside one content stream."""
+    cache = get_content_stream_cache(stream)
     try:
         with warnings.catch_warnings():
             warnings.filterwarnings(
                 "ignore", message="Unexpected end of stream", category=UserWarning
             )
-            instructions = list(parse_content_stream(stream))
+            instructions = cache.instructions(stream)
     except Exception:
         return False, False, False
 
@@ -397,7 +375,7 @@ def _sanitize_inline_images_in_stream(
         nonstandard_changed = nonstandard_changed or replaced_nonstandard
 
     if changed:
-        stream.write(_unparse_content_stream(instructions))
+        cache.set_instructions(stream, instructions)
 
     return lzw_changed, crypt_changed, nonstandard_changed
 
@@ -462,8 +440,8 @@ def _has_lzw_filter(stream: Stream) -> bool:
 def _convert_lzw_stream(stream: Stream, pdf: Pdf) -> bool:
     """Convert a single LZW-compressed stream to FlateDecode.
 
-    Reads the decompressed data and writes it back; pikepdf automatically
-    compresses with FlateDecode on save.
+    Decodes the stream and writes it back Flate-compressed, strip by
+    strip, so the decoded data is never held in memory twice.
 
     Args:
         stream: A pikepdf Stream object with LZW compression.
@@ -473,15 +451,12 @@ def _convert_lzw_stream(stream: Stream, pdf: Pdf) -> bool:
         True if conversion succeeded, False otherwise.
     """
     try:
-        # Read decompressed data (pikepdf handles LZW decompression)
-        data = stream.read_bytes()
-
-        # Write back - pikepdf will compress with FlateDecode on save.
-        # stream.write() removes /Filter and /DecodeParms implicitly;
-        # we delete /DecodeParms explicitly as a defensive measure.
-        stream.write(data)
-        if stream.get("/DecodeParms") is not None:
-            del stream["/DecodeParms"]
+        # Serialize pending content edits first, then decode (pikepdf
+        # handles LZW decompression) and write back under FlateDecode
+        cache = get_content_stream_cache(stream)
+        cache.flush(stream)
+        reencode_to_flate(stream)
+        cache.note_reencoded(stream)
 
         return True
     except Exception as e:
@@ -503,8 +478,11 @@ def convert_lzw_streams(pdf: Pdf) -> int:
         Number of streams converted.
     """
     converted = 0
+    index = get_document_index(pdf)
 
-    for obj in pdf.objects:
+    for obj in index.iter_matching(
+        NONCANONICAL_FILTERS, CONTENT_STREAMS, filters=("/LZWDecode",)
+    ):
         try:
             obj = _resolve_indirect(obj)
 
@@ -512,8 +490,9 @@ def convert_lzw_streams(pdf: Pdf) -> int:
                 continue
 
             stream_converted = False
+            inline_lzw_changed = False
 
-            _normalize_stream_filter_names(obj)
+            normalized = _normalize_stream_filter_names(obj)
 
             # Check if it's a stream with LZW filter
             if _has_lzw_filter(obj):
@@ -535,6 +514,9 @@ def convert_lzw_streams(pdf: Pdf) -> int:
                         obj.objgen,
                     )
 
+            if normalized or stream_converted or inline_lzw_changed:
+                index.refresh(obj)
+
         except Exception as e:
             logger.debug("Error processing object: %s", e)
 
@@ -597,7 +579,8 @@ def _remove_crypt_stream(stream: Stream, pdf: Pdf) -> bool:
     """
     try:
         # Read decompressed/decrypted data
-        data = stream.read_bytes()
+        cache = get_content_stream_cache(stream)
+        data = cache.read_bytes(stream)
 
         # Write back - pikepdf will compress with FlateDecode on save.
         # stream.write() removes /Filter and /DecodeParms implicitly;
@@ -605,6 +588,7 @@ def _remove_crypt_stream(stream: Stream, pdf: Pdf) -> bool:
         stream.write(data)
         if stream.get("/DecodeParms") is not None:
             del stream["/DecodeParms"]
+        cache.note_reencoded(stream)
 
         return True
     except Exception as e:
@@ -627,8 +611,11 @@ def remove_crypt_streams(pdf: Pdf) -> int:
         Number of streams from which the Crypt filter was removed.
     """
     removed = 0
+    index = get_document_index(pdf)
 
-    for obj in pdf.objects:
+    for obj in index.iter_matching(
+        NONCANONICAL_FILTERS, CONTENT_STREAMS, filters=("/Crypt",)
+    ):
         try:
             obj = _resolve_indirect(obj)
 
@@ -636,8 +623,9 @@ def remove_crypt_streams(pdf: Pdf) -> int:
                 continue
 
             stream_removed = False
+            inline_crypt_removed = False
 
-            _normalize_stream_filter_names(obj)
+            normalized = _normalize_stream_filter_names(obj)
 
             if _has_crypt_filter(obj):
                 if _remove_crypt_stream(obj, pdf):
@@ -658,6 +646,9 @@ def remove_crypt_streams(pdf: Pdf) -> int:
                         obj.objgen,
                     )
 
+            if normalized or stream_removed or inline_crypt_removed:
+                index.refresh(obj)
+
         except Exception as e:
             logger.debug("Error processing object: %s", e)
 
@@ -706,8 +697,9 @@ def remove_external_stream_keys(pdf: Pdf) -> int:
         Number of streams from which forbidden keys were removed.
     """
     fixed = 0
+    index = get_document_index(pdf)
 
-    for obj in pdf.objects:
+    for obj in index.iter_external_streams():
         try:
             obj = _resolve_indirect(obj)
 
@@ -736,6 +728,7 @@ def remove_external_stream_keys(pdf: Pdf) -> int:
 
             for key in found:
                 del obj[key]
+            index.refresh(obj)
 
             fixed += 1
             logger.debug(
@@ -767,7 +760,8 @@ def sanitize_nonstandard_inline_filters(pdf: Pdf) -> int:
         Number of content streams containing modified inline images.
     """
     fixed = 0
-    for obj in pdf.objects:
+    index = get_document_index(pdf)
+    for obj in index.iter_content_streams():
         try:
             obj = _resolve_indirect(obj)
             if not isinstance(obj, Stream):
@@ -863,8 +857,10 @@ def fix_stream_lengths(pdf: Pdf) -> int:
         Number of streams re-encoded.
     """
     reencoded = 0
+    index = get_document_index(pdf)
+    cache = get_content_stream_cache(pdf)
 
-    for obj in pdf.objects:
+    for obj in index.iter_streams():
         try:
             obj = _resolve_indirect(obj)
 
@@ -874,8 +870,10 @@ def fix_stream_lengths(pdf: Pdf) -> int:
             if _has_image_filter(obj):
                 continue
 
-            data = obj.read_bytes()
+            data = cache.read_bytes(obj)
             obj.write(data)
+            cache.note_reencoded(obj)
+            index.refresh(obj)
             reencoded += 1
 
         except Exception as e:
@@ -885,3 +883,93 @@ def fix_stream_lengths(pdf: Pdf) -> int:
         logger.info("%d stream(s) re-encoded to fix /Length", reencoded)
 
     return reencoded
+
+
+def _has_wrong_length(stream: Stream) -> bool:
+    """Check whether the declared /Length differs from the stream data.
+
+    When the declared /Length is wrong, QPDF recovers the real data span by
+    searching for ``endstream`` but leaves /Length untouched, so comparing
+    it with the size of the raw (still encoded) data detects the mismatch
+    without decoding anything.
+    """
+    length = stream.get("/Length")
+    if not isinstance(length, int) or isinstance(length, bool):
+        return True
+    return length != len(stream.read_raw_bytes())
+
+
+def _read_from_file(pdf: Pdf) -> Callable[[Stream], bool]:
+    """Returns a test for streams that were read from the source file.
+
+    ``Pdf.get_xref_table()`` is only available from pikepdf 10.9 on.  With
+    older releases, objects numbered below the trailer /Size are taken as
+    read from the file, since QPDF numbers new objects after them; without
+    a usable /Size every stream counts as read from the file.
+    """
+    get_xref_table = getattr(pdf, "get_xref_table", None)
+    if get_xref_table is not None:
+        source_objects = {
+            objgen for objgen, entry in get_xref_table().items() if entry.type == 1
+        }
+        return lambda stream: stream.objgen in source_objects
+
+    size = pdf.trailer.get("/Size")
+    if isinstance(size, int) and not isinstance(size, bool):
+        return lambda stream: stream.objgen[0] < size
+    return lambda stream: True
+
+
+def fix_mismatched_stream_lengths(pdf: Pdf) -> dict[str, int]:
+    """Rewrite only the streams whose /Length does not match their data.
+
+    Unlike :func:`fix_stream_lengths` this neither decodes nor recompresses
+    anything: every stream read from the source file is checked against
+    its raw data, and a mismatched stream gets its raw bytes written back
+    with the same filters, which makes QPDF emit the correct /Length on
+    save.  Image streams are included because their encoding is kept.
+    Streams created in memory are not checked; QPDF computes their
+    /Length when writing.
+
+    Args:
+        pdf: pikepdf Pdf object (modified in place).
+
+    Returns:
+        Dictionary with ``stream_lengths_checked`` and
+        ``stream_lengths_fixed`` counts.
+    """
+    checked = 0
+    fixed = 0
+    index = get_document_index(pdf)
+    cache = get_content_stream_cache(pdf)
+    read_from_file = _read_from_file(pdf)
+
+    for obj in index.iter_streams():
+        try:
+            obj = _resolve_indirect(obj)
+
+            if not isinstance(obj, Stream) or not read_from_file(obj):
+                continue
+
+            # A pending cached edit is written with a fresh /Length.
+            cache.flush(obj)
+            checked += 1
+            if not _has_wrong_length(obj):
+                continue
+
+            obj.write(
+                obj.read_raw_bytes(),
+                filter=obj.get("/Filter"),
+                decode_parms=obj.get("/DecodeParms"),
+            )
+            cache.note_reencoded(obj)
+            index.refresh(obj)
+            fixed += 1
+
+        except Exception as e:
+            logger.debug("Error fixing stream /Length: %s", e)
+
+    if fixed > 0:
+        logger.info("%d of %d stream(s) rewritten to fix /Length", fixed, checked)
+
+    return {"stream_lengths_checked": checked, "stream_lengths_fixed": fixed}
@@ -12,8 +12,8 @@ are in the standard PDF unit of 1/1000 of the font size.
 from __future__ import annotations
 
 import logging
-from io import BytesIO
 
+from ..fonts.program_cache import get_font_program_cache
 from ..utils import resolve_indirect as _resolve
 
 logger = logging.getLogger(__name__)
@@ -1802,38 +1802,30 @@ def _read_widths_from_font_dict(font_dict) -> dict[int, int]:
     return result
 
 
-def _read_widths_from_ttfont(font_stream_data: bytes) -> dict[int, int]:
+def _read_widths_from_ttfont(font_file, font_file_key: str) -> dict[int, int]:
     """Read glyph widths from an embedded TrueType font program using fonttools.
 
+    The program is loaded through the shared font program cache.
+
     Returns a dict mapping Unicode code points to widths in 1/1000 units.
     """
     try:
-        from fontTools.ttLib import TTFont
-    except ImportError:
-        return {}
-
-    tt = None
-    try:
-        tt = TTFont(BytesIO(font_stream_data))
-        hmtx = tt["hmtx"]
-        try:
-            cmap = tt.getBestCmap()
-        except KeyError:
-            cmap = None
+        program = get_font_program_cache(font_file).load(font_file, font_file_key)
+        if program is None or "hmtx" not in program.tt_font:
+            return {}
+        cmap = program.best_cmap
         if cmap is None:
             return {}
-        units_per_em = tt["head"].unitsPerEm
+        advance_widths = program.advance_widths
+        units_per_em = program.tt_font["head"].unitsPerEm
         scale = 1000.0 / units_per_em if units_per_em != 1000 else 1.0
         widths: dict[int, int] = {}
         for code, name in cmap.items():
-            if name in hmtx.metrics:
-                widths[code] = int(hmtx.metrics[name][0] * scale)
+            if name in advance_widths:
+                widths[code] = int(advance_widths[name] * scale)
         return widths
     except Exception:
         return {}
-    finally:
-        if tt is not None:
-            tt.close()
 
 
 def _get_font_descriptor(font_dict):
@@ -1871,12 +1863,9 @@ def _get_widths_for_font(font_dict, font_name: str | None = None) -> dict[int, i
                 for key in ("/FontFile2", "/FontFile3"):
                     ff = fd.get(key)
                     if ff is not None:
-                        ff = _resolve(ff)
-                        data = bytes(ff.read_bytes())
-                        if data:
-                            widths = _read_widths_from_ttfont(data)
-                            if widths:
-                                return widths
+                        widths = _read_widths_from_ttfont(_resolve(ff), key)
+                        if widths:
+                            return widths
         except Exception:
             pass
 
@@ -19,6 +19,7 @@ from collections.abc import Iterator
 import pikepdf
 from pikepdf import Array, Dictionary, Name, Pdf
 
+from ..fonts.program_cache import get_font_program_cache
 from ..fonts.traversal import iter_all_page_fonts
 from ..fonts.utils import safe_str as _safe_str
 from ..utils import resolve_indirect as _resolve
@@ -159,52 +160,50 @@ def _fix_notdef(
     Returns:
         ``True`` if the font was modified.
     """
-    from fontTools.ttLib import TTFont
-
     fd = _resolve(font.get("/FontDescriptor"))
     stream = _resolve(fd.get(font_file_key))
-    font_data = bytes(stream.read_bytes())
+    cache = get_font_program_cache(stream)
 
-    try:
-        tt_font = TTFont(io.BytesIO(font_data))
-    except Exception:
+    # Bare CFF is only readable wrapped in OTF, which cannot be written back.
+    program = cache.load(stream, font_file_key)
+    if program is None or program.is_bare_cff:
         logger.debug("Font %s: cannot parse embedded font program", font_name)
         return False
 
-    try:
-        glyph_order = tt_font.getGlyphOrder()
-        if ".notdef" in glyph_order:
-            return False
-
-        # .notdef is missing — add a minimal empty one
-        logger.info("Font %s: adding missing .notdef glyph", font_name)
-        _add_notdef_glyph(tt_font)
-
-        # Serialize and write back
-        buf = io.BytesIO()
-        tt_font.save(buf)
-        buf.seek(0)
-        new_data = buf.read()
+    if ".notdef" in program.glyph_names:
+        return False
 
-        new_stream = pdf.make_stream(new_data)
-        # Preserve the original stream's metadata keys
-        if font_file_key == "/FontFile2":
-            new_stream[Name.Length1] = len(new_data)
-        elif font_file_key == "/FontFile":
-            new_stream[Name.Length1] = len(new_data)
-        elif font_file_key == "/FontFile3":
-            original_subtype = stream.get("/Subtype")
-            if original_subtype is not None:
-                new_stream[Name("/Subtype")] = original_subtype
-        fd[Name(font_file_key)] = pdf.make_indirect(new_stream)
-
-        # Inserting .notdef at GID 0 shifts every existing GID by +1.
-        # Update CIDToGIDMap (both explicit streams and /Identity) to match.
-        _update_cidtogidmap(pdf, font, len(glyph_order))
-
-        return True
-    finally:
-        tt_font.close()
+    # .notdef is missing — add a minimal empty one.  The cached font is
+    # modified in place, so drop it from the cache first.
+    logger.info("Font %s: adding missing .notdef glyph", font_name)
+    cache.invalidate(stream)
+    tt_font = program.tt_font
+    glyph_order = tt_font.getGlyphOrder()
+    _add_notdef_glyph(tt_font)
+
+    # Serialize and write back
+    buf = io.BytesIO()
+    tt_font.save(buf)
+    buf.seek(0)
+    new_data = buf.read()
+
+    new_stream = pdf.make_stream(new_data)
+    # Preserve the original stream's metadata keys
+    if font_file_key == "/FontFile2":
+        new_stream[Name.Length1] = len(new_data)
+    elif font_file_key == "/FontFile":
+        new_stream[Name.Length1] = len(new_data)
+    elif font_file_key == "/FontFile3":
+        original_subtype = stream.get("/Subtype")
+        if original_subtype is not None:
+            new_stream[Name("/Subtype")] = original_subtype
+    fd[Name(font_file_key)] = pdf.make_indirect(new_stream)
+
+    # Inserting .notdef at GID 0 shifts every existing GID by +1.
+    # Update CIDToGIDMap (both explicit streams and /Identity) to match.
+    _update_cidtogidmap(pdf, font, len(glyph_order))
+
+    return True
 
 
 def _add_notdef_glyph(tt_font) -> None:
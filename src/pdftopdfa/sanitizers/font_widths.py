@@ -9,14 +9,15 @@ font dictionary are consistent with the widths in the embedded font program.
 This module validates and corrects widths for already-embedded fonts.
 """
 
-import io
 import logging
 from collections.abc import Iterator
 
 import pikepdf
 from pikepdf import Array, Dictionary, Name, Pdf
 
+from ..content_cache import get_content_stream_cache
 from ..fonts.metrics import FontMetricsExtractor
+from ..fonts.program_cache import get_font_program_cache
 from ..fonts.tounicode import (
     generate_tounicode_for_macroman,
     generate_tounicode_for_standard_encoding,
@@ -384,44 +385,29 @@ def _parse_type1_font(font_data: bytes):
 def _extract_font_program(font: pikepdf.Object):
     """Extracts and parses the embedded font program.
 
+    TrueType and CFF programs come from the shared font program cache, so
+    the returned font must not be modified or closed.
+
     Args:
         font: Font dictionary (simple font or CIDFont descendant).
 
     Returns:
         fontTools TTFont object, or None if extraction fails.
     """
-    from fontTools.ttLib import TTFont
-
     fd = _resolve(font.get("/FontDescriptor"))
-    font_data = None
-    font_file_key = None
     for key in ("/FontFile2", "/FontFile3", "/FontFile"):
         stream = fd.get(key)
-        if stream is not None:
-            stream = _resolve(stream)
-            font_data = bytes(stream.read_bytes())
-            font_file_key = key
-            break
-
-    if font_data is None:
-        return None
-
-    try:
-        return TTFont(io.BytesIO(font_data))
-    except Exception:
-        # Try wrapping bare CFF (Type1C / CIDFontType0C) in OTF container
-        if font_file_key == "/FontFile3":
-            try:
-                from .glyph_coverage import _wrap_cff_in_otf
-
-                otf_data = _wrap_cff_in_otf(font_data)
-                return TTFont(io.BytesIO(otf_data))
-            except Exception:
-                return None
+        if stream is None:
+            continue
+        stream = _resolve(stream)
+        program = get_font_program_cache(stream).load(stream, key)
+        if program is not None:
+            return program.tt_font
         # Try parsing Type1 PFB/PFA via fontTools.t1Lib
-        if font_file_key == "/FontFile":
-            return _parse_type1_font(font_data)
+        if key == "/FontFile":
+            return _parse_type1_font(bytes(stream.read_bytes()))
         return None
+    return None
 
 
 def _get_missing_width(font: pikepdf.Object, tt_font) -> int | None:
@@ -737,7 +723,7 @@ def _fix_type3_font_widths(font: pikepdf.Object, font_name: str) -> bool:
         glyph_name = _safe_str(glyph_name_key)[1:]
         stream = _resolve(char_procs[glyph_name_key])
         try:
-            ops = pikepdf.parse_content_stream(stream)
+            ops = get_content_stream_cache(stream).instructions(stream)
             for operands, op in ops:
                 op_str = str(op)
                 if op_str in ("d0", "d1"):
@@ -894,8 +880,6 @@ def _fix_simple_font_widths(font: pikepdf.Object, font_name: str) -> bool:
     except Exception as e:
         logger.debug("Error validating widths for %s: %s", font_name, e)
         return False
-    finally:
-        tt_font.close()
 
 
 def _fix_simple_font_widths_cff(
@@ -1116,8 +1100,6 @@ def _fix_cidfont_widths(font: pikepdf.Object, font_name: str) -> bool:
     except Exception as e:
         logger.debug("Error validating CIDFont widths for %s: %s", font_name, e)
         return False
-    finally:
-        tt_font.close()
 
 
 def _fix_cidfont_widths_cff(
@@ -16,12 +16,12 @@ missing glyphs, ensuring full glyph coverage.
 
 import io
 import logging
-import struct
 
 import pikepdf
 from pikepdf import Array, Dictionary, Name, Pdf
 
 from ..fonts.glyph_usage import collect_font_usage
+from ..fonts.program_cache import get_font_program_cache
 from ..fonts.tounicode import parse_cidtogidmap_stream
 from ..fonts.traversal import iter_all_page_fonts
 from ..fonts.utils import safe_str as _safe_str
@@ -229,37 +229,25 @@ def _process_simple_font(pdf: Pdf, font: pikepdf.Object, used_codes: set[int]) -
 
     fd = _resolve(font.get("/FontDescriptor"))
     stream = _resolve(fd.get(font_file_key))
-    font_data = bytes(stream.read_bytes())
+    cache = get_font_program_cache(stream)
 
-    from fontTools.ttLib import TTFont
-
-    is_bare_cff = False
-    try:
-        tt_font = TTFont(io.BytesIO(font_data))
-    except Exception:
-        # Try wrapping bare CFF (Type1C) in OTF container
-        if font_file_key == "/FontFile3":
-            try:
-                otf_data = _wrap_cff_in_otf(font_data)
-                tt_font = TTFont(io.BytesIO(otf_data))
-                is_bare_cff = True
-            except Exception:
-                logger.debug("Font %s: cannot parse font program", font_name)
-                return 0
-        elif font_file_key == "/FontFile":
+    program = cache.load(stream, font_file_key)
+    if program is None:
+        if font_file_key == "/FontFile":
             # Type1 PFA/PFB — handle separately
             return _process_type1_simple_font(
                 pdf,
                 font,
                 fd,
                 font_name,
-                font_data,
+                bytes(stream.read_bytes()),
                 encoding,
                 used_codes,
             )
-        else:
-            logger.debug("Font %s: cannot parse font program", font_name)
-            return 0
+        logger.debug("Font %s: cannot parse font program", font_name)
+        return 0
+    tt_font = program.tt_font
+    is_bare_cff = program.is_bare_cff
 
     try:
         glyph_order = tt_font.getGlyphOrder()
@@ -291,6 +279,7 @@ def _process_simple_font(pdf: Pdf, font: pikepdf.Object, used_codes: set[int]) -
             len(missing_names),
         )
 
+        cache.invalidate(stream)
         _add_empty_glyphs_by_name(tt_font, missing_names, missing_widths)
         if is_bare_cff:
             _write_back_cff(pdf, fd, tt_font)
@@ -305,8 +294,6 @@ def _process_simple_font(pdf: Pdf, font: pikepdf.Object, used_codes: set[int]) -
     except Exception as e:
         logger.debug("Font %s: error fixing glyph coverage: %s", font_name, e)
         return 0
-    finally:
-        tt_font.close()
 
 
 def _resolve_encoding(font: pikepdf.Object) -> dict[int, str] | None:
@@ -383,28 +370,16 @@ def _fix_missing_gids(
     Returns:
         Number of missing referenced GIDs that were fixed.
     """
-    from fontTools.ttLib import TTFont
-
     fd = _resolve(desc_font.get("/FontDescriptor"))
     stream = _resolve(fd.get(font_file_key))
-    font_data = bytes(stream.read_bytes())
+    cache = get_font_program_cache(stream)
 
-    is_bare_cff = False
-    try:
-        tt_font = TTFont(io.BytesIO(font_data))
-    except Exception:
-        # Try wrapping bare CFF (CIDFontType0C / Type1C) in OTF
-        if font_file_key == "/FontFile3":
-            try:
-                otf_data = _wrap_cff_in_otf(font_data)
-                tt_font = TTFont(io.BytesIO(otf_data))
-                is_bare_cff = True
-            except Exception:
-                logger.debug("Font %s: cannot parse font program", font_name)
-                return 0
-        else:
-            logger.debug("Font %s: cannot parse font program", font_name)
-            return 0
+    program = cache.load(stream, font_file_key)
+    if program is None:
+        logger.debug("Font %s: cannot parse font program", font_name)
+        return 0
+    tt_font = program.tt_font
+    is_bare_cff = program.is_bare_cff
 
     try:
         glyph_order = tt_font.getGlyphOrder()
@@ -425,6 +400,7 @@ def _fix_missing_gids(
             num_glyphs,
         )
 
+        cache.invalidate(stream)
         _add_empty_glyphs_by_gid(
             tt_font,
             missing_gids,
@@ -440,8 +416,6 @@ def _fix_missing_gids(
     except Exception as e:
         logger.debug("Font %s: error fixing glyph coverage: %s", font_name, e)
         return 0
-    finally:
-        tt_font.close()
 
 
 def _fix_missing_cids_in_cff(
@@ -462,25 +436,16 @@ def _fix_missing_cids_in_cff(
         Number of missing CID glyphs added.
     """
     from fontTools.misc.psCharStrings import T2CharString
-    from fontTools.ttLib import TTFont
 
     fd = _resolve(desc_font.get("/FontDescriptor"))
     stream = _resolve(fd.get(font_file_key))
-    font_data = bytes(stream.read_bytes())
+    cache = get_font_program_cache(stream)
 
-    is_bare_cff = False
-    try:
-        tt_font = TTFont(io.BytesIO(font_data))
-    except Exception:
-        if font_file_key == "/FontFile3":
-            try:
-                otf_data = _wrap_cff_in_otf(font_data)
-                tt_font = TTFont(io.BytesIO(otf_data))
-                is_bare_cff = True
-            except Exception:
-                return 0
-        else:
-            return 0
+    program = cache.load(stream, font_file_key)
+    if program is None:
+        return 0
+    tt_font = program.tt_font
+    is_bare_cff = program.is_bare_cff
 
     try:
         if "CFF " not in tt_font:
@@ -511,6 +476,7 @@ def _fix_missing_cids_in_cff(
             len(missing_cids),
         )
 
+        cache.invalidate(stream)
         # Determine Private dict for new charstrings
         if hasattr(top_dict, "FDArray") and top_dict.FDArray:
             private = top_dict.FDArray[0].Private
@@ -576,8 +542,6 @@ def _fix_missing_cids_in_cff(
     except Exception as e:
         logger.debug("Font %s: error fixing CID glyph coverage: %s", font_name, e)
         return 0
-    finally:
-        tt_font.close()
 
 
 def _add_empty_glyphs_by_gid(
@@ -766,21 +730,6 @@ def _add_empty_glyphs_by_name(
         tt_font["maxp"].numGlyphs = len(glyph_order)
 
 
-def _wrap_cff_in_otf(cff_data: bytes) -> bytes:
-    """Wraps standalone CFF data in a minimal OTF container."""
-    tag = b"CFF "
-    offset = 12 + 16  # sfnt header (12) + one table record (16)
-    length = len(cff_data)
-    pad_len = (4 - length % 4) % 4
-    padded = cff_data + b"\x00" * pad_len
-    checksum = 0
-    for i in range(0, len(padded), 4):
-        checksum = (checksum + struct.unpack(">I", padded[i : i + 4])[0]) & 0xFFFFFFFF
-    header = struct.pack(">4sHHHH", b"OTTO", 1, 16, 0, 16)
-    table_record = struct.pack(">4sIII", tag, checksum, offset, length)
-    return header + table_record + cff_data
-
-
 def _write_back_cff(pdf: Pdf, fd: pikepdf.Object, tt_font) -> None:
     """Extracts CFF table data and writes it back as a FontFile3 stream."""
     # Preserve original subtype (Type1C or CIDFontType0C)
@@ -15,6 +15,8 @@ import zlib
 
 from pikepdf import Array, Name, Pdf, Stream
 
+from ..document_index import get_document_index
+from ..reencode import reencode_to_flate
 from ..utils import resolve_indirect as _resolve_indirect
 
 logger = logging.getLogger(__name__)
@@ -329,18 +331,13 @@ def _reencode_jbig2_to_flatedecode(stream: Stream) -> bool:
     """Re-encode a JBIG2 stream to FlateDecode as lossless fallback.
 
     Decodes JBIG2 image data to raw pixels via pikepdf/QPDF and writes
-    them back under FlateDecode.  Requires QPDF to have JBIG2 decode
-    support (jbig2dec library).
+    them back under FlateDecode, compressed strip by strip.  Requires
+    QPDF to have JBIG2 decode support (jbig2dec library).
 
     Returns True on success, False on failure.
     """
     try:
-        decoded_data = stream.read_bytes()
-        stream.write(decoded_data)
-        try:
-            del stream["/DecodeParms"]
-        except (KeyError, AttributeError):
-            pass
+        reencode_to_flate(stream)
         return True
     except Exception as e:
         logger.debug("Failed to re-encode JBIG2 to FlateDecode: %s", e)
@@ -463,8 +460,9 @@ def convert_jbig2_external_globals(pdf: Pdf) -> dict[str, int]:
     reencoded = 0
     failed = 0
 
+    index = get_document_index(pdf)
     seen: set[tuple[int, int]] = set()
-    for obj in pdf.objects:
+    for obj in index.iter_streams_with_filter("/JBIG2Decode"):
         try:
             objgen = obj.objgen
             if objgen in seen:
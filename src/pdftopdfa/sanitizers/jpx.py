@@ -24,6 +24,8 @@ import struct
 from pikepdf import Array, Name, Pdf, Stream
 
 from ..color_profile import get_cmyk_profile
+from ..document_index import get_document_index
+from ..reencode import reencode_to_flate
 from ..utils import resolve_indirect as _resolve_indirect
 
 logger = logging.getLogger(__name__)
@@ -613,17 +615,11 @@ def _reencode_to_flatedecode(stream: Stream) -> bool:
         elif raw_data[:2] == _SOC_MARKER:
             image_info = _parse_siz_marker(raw_data)
 
-        # Decode JPX to raw pixels (requires QPDF JPX support)
-        decoded_data = stream.read_bytes()
-
-        # Write decoded pixel data — pikepdf applies FlateDecode
-        stream.write(decoded_data)
-
-        # Remove /DecodeParms that were specific to JPXDecode
-        try:
-            del stream["/DecodeParms"]
-        except (KeyError, AttributeError):
-            pass
+        # Decode JPX to raw pixels (requires QPDF JPX support) and
+        # write them back Flate-compressed, strip by strip; this also
+        # removes the /DecodeParms that were specific to JPXDecode
+        del raw_data
+        reencode_to_flate(stream)
 
         # Ensure required image metadata is in the stream dictionary.
         if image_info is not None:
@@ -673,8 +669,9 @@ def sanitize_jpx_color_boxes(pdf: Pdf) -> dict[str, int]:
         "jpx_failed": 0,
     }
 
+    index = get_document_index(pdf)
     seen: set[tuple[int, int]] = set()
-    for obj in pdf.objects:
+    for obj in index.iter_streams_with_filter("/JPXDecode"):
         try:
             objgen = obj.objgen
             if objgen in seen:
@@ -11,19 +11,20 @@ streams (page contents, Form XObjects, Tiling Patterns, annotation AP
 streams, Type3 CharProcs).
 """
 
-import io
 import logging
 import struct
 
 import pikepdf
 from pikepdf import Array, Dictionary, Name, Pdf, Stream, String
 
+from ..fonts.program_cache import load_embedded_font_program
 from ..fonts.subsetter import (
     _resolve_simple_font_encoding,
 )
 from ..fonts.utils import safe_str as _safe_str
 from ..utils import iter_type3_fonts as _iter_type3_fonts
 from ..utils import resolve_indirect as _resolve
+from .content_rewrite import ContentStreamVisitor, submit_content_rewrite
 
 logger = logging.getLogger(__name__)
 
@@ -252,49 +253,21 @@ def _find_missing_glyphs_in_simple_font(
             return set()
         fd = _resolve(fd)
 
-        # Find embedded font data
-        font_data = None
-        font_file_key = None
-        for key in ("/FontFile2", "/FontFile3", "/FontFile"):
-            stream = fd.get(key)
-            if stream is not None:
-                stream = _resolve(stream)
-                font_data = bytes(stream.read_bytes())
-                font_file_key = key
-                break
-
-        if font_data is None:
+        program = load_embedded_font_program(fd)
+        if program is None:
             return set()
 
-        from fontTools.ttLib import TTFont
-
-        tt_font = None
-        try:
-            try:
-                tt_font = TTFont(io.BytesIO(font_data))
-            except Exception:
-                if font_file_key == "/FontFile3":
-                    from .glyph_coverage import _wrap_cff_in_otf
-
-                    otf_data = _wrap_cff_in_otf(font_data)
-                    tt_font = TTFont(io.BytesIO(otf_data))
-                else:
-                    return set()
-
-            glyph_set = set(tt_font.getGlyphOrder())
-            missing = set()
-            for code in range(first_char, last_char + 1):
-                name = encoding.get(code)
-                if name is None or name == ".notdef":
-                    # No encoding entry or explicit .notdef → maps to .notdef
-                    missing.add(code)
-                elif name not in glyph_set:
-                    missing.add(code)
-
-            return missing
-        finally:
-            if tt_font is not None:
-                tt_font.close()
+        glyph_set = program.glyph_names
+        missing = set()
+        for code in range(first_char, last_char + 1):
+            name = encoding.get(code)
+            if name is None or name == ".notdef":
+                # No encoding entry or explicit .notdef → maps to .notdef
+                missing.add(code)
+            elif name not in glyph_set:
+                missing.add(code)
+
+        return missing
     except Exception:
         logger.debug("Error analyzing simple font glyphs", exc_info=True)
         return set()
@@ -347,38 +320,10 @@ def _get_cidfont_num_glyphs(cidfont: pikepdf.Object) -> int | None:
             return None
         fd = _resolve(fd)
 
-        font_data = None
-        font_file_key = None
-        for key in ("/FontFile2", "/FontFile3", "/FontFile"):
-            stream = fd.get(key)
-            if stream is not None:
-                stream = _resolve(stream)
-                font_data = bytes(stream.read_bytes())
-                font_file_key = key
-                break
-
-        if font_data is None:
+        program = load_embedded_font_program(fd)
+        if program is None:
             return None
-
-        from fontTools.ttLib import TTFont
-
-        tt_font = None
-        try:
-            try:
-                tt_font = TTFont(io.BytesIO(font_data))
-            except Exception:
-                if font_file_key == "/FontFile3":
-                    from .glyph_coverage import _wrap_cff_in_otf
-
-                    otf_data = _wrap_cff_in_otf(font_data)
-                    tt_font = TTFont(io.BytesIO(otf_data))
-                else:
-                    return None
-
-            return len(tt_font.getGlyphOrder())
-        finally:
-            if tt_font is not None:
-                tt_font.close()
+        return len(program.glyph_order)
     except Exception:
         return None
 
@@ -507,6 +452,71 @@ def _filter_text_operand(
     return String(filtered)
 
 
+class _NotdefUsageVisitor(ContentStreamVisitor):
+    """Remove .notdef references from text-showing operators."""
+
+    operators = frozenset({"Tf", "TJ"} | _TEXT_OPERATORS)
+
+    def __init__(
+        self,
+        font_map: dict[str, pikepdf.Object],
+        notdef_cache: dict[tuple[int, int], _NotdefCodes],
+    ) -> None:
+        super().__init__()
+        self._font_map = font_map
+        self._notdef_cache = notdef_cache
+        self._current_font_name: str | None = None
+        self.fixed = 0
+
+    def visit(self, item, operator: str) -> list | None:
+        operands = item.operands
+
+        # Track font changes via Tf operator
+        if operator == "Tf":
+            if len(operands) >= 1:
+                try:
+                    self._current_font_name = str(operands[0])
+                except Exception:
+                    self._current_font_name = None
+            return None
+
+        if self._current_font_name is None:
+            return None
+        font_obj = self._font_map.get(self._current_font_name)
+        if font_obj is None:
+            return None
+        notdef_codes = _get_notdef_codes(font_obj, self._notdef_cache)
+        if not notdef_codes:
+            return None
+        is_cid = _is_cidfont(font_obj)
+
+        # Handle single-string text operators: Tj, ', "
+        if operator in _TEXT_OPERATORS:
+            modified = _fix_single_string_op(
+                operands,
+                item.operator,
+                operator,
+                notdef_codes,
+                is_cid=is_cid,
+            )
+        # Handle TJ (array of strings and adjustments)
+        else:
+            modified = _fix_tj_array_op(
+                operands,
+                item.operator,
+                notdef_codes,
+                is_cid=is_cid,
+            )
+        if modified is None:
+            return None
+        self.fixed += 1
+        # An empty result removes the operator
+        return [modified] if modified else []
+
+    def stats(self) -> dict[str, int]:
+        return {"notdef_usage_fixed": self.fixed}
+
+
 def _fix_notdef_in_stream(
     stream_obj: Stream,
     font_map: dict[str, pikepdf.Object],
@@ -514,6 +524,9 @@ def _fix_notdef_in_stream(
 ) -> int:
     """Parses a content stream and removes .notdef references from text ops.
 
+    Inside a deferred content rewrite pass the fix is only queued and 0 is
+    returned.
+
     Args:
         stream_obj: A pikepdf Stream whose content may contain text operators.
         font_map: Mapping of font resource names to font dictionaries.
@@ -522,84 +535,10 @@ def _fix_notdef_in_stream(
     Returns:
         Number of text operators modified.
     """
-    try:
-        instructions = list(pikepdf.parse_content_stream(stream_obj))
-    except Exception:
+    visitor = _NotdefUsageVisitor(font_map, notdef_cache)
+    if not submit_content_rewrite(stream_obj, visitor):
         return 0
-
-    fixed = 0
-    new_instructions = []
-    current_font_name: str | None = None
-
-    for item in instructions:
-        if isinstance(item, pikepdf.ContentStreamInlineImage):
-            new_instructions.append(item)
-            continue
-
-        operands, operator = item.operands, item.operator
-        op_str = str(operator)
-
-        # Track font changes via Tf operator
-        if op_str == "Tf" and len(operands) >= 1:
-            try:
-                current_font_name = str(operands[0])
-            except Exception:
-                current_font_name = None
-            new_instructions.append(item)
-            continue
-
-        # Handle single-string text operators: Tj, ', "
-        if op_str in _TEXT_OPERATORS and current_font_name is not None:
-            font_obj = font_map.get(current_font_name)
-            if font_obj is not None:
-                notdef_codes = _get_notdef_codes(font_obj, notdef_cache)
-                if notdef_codes:
-                    is_cid = _is_cidfont(font_obj)
-                    modified = _fix_single_string_op(
-                        operands,
-                        operator,
-                        op_str,
-                        notdef_codes,
-                        is_cid=is_cid,
-                    )
-                    if modified is not None:
-                        fixed += 1
-                        if modified:
-                            new_instructions.append(modified)
-                        # modified is empty list → operator removed
-                        continue
-
-            new_instructions.append(item)
-            continue
-
-        # Handle TJ (array of strings and adjustments)
-        if op_str == "TJ" and current_font_name is not None:
-            font_obj = font_map.get(current_font_name)
-            if font_obj is not None:
-                notdef_codes = _get_notdef_codes(font_obj, notdef_cache)
-                if notdef_codes:
-                    is_cid = _is_cidfont(font_obj)
-                    modified_tj = _fix_tj_array_op(
-                        operands,
-                        operator,
-                        notdef_codes,
-                        is_cid=is_cid,
-                    )
-                    if modified_tj is not None:
-                        fixed += 1
-                        if modified_tj:
-                            new_instructions.append(modified_tj)
-                        continue
-
-            new_instructions.append(item)
-            continue
-
-        new_instructions.append(item)
-
-    if fixed > 0:
-        stream_obj.write(pikepdf.unparse_content_stream(new_instructions))
-
-    return fixed
+    return visitor.fixed
 
 
 def _fix_single_string_op(
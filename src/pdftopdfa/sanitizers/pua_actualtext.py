@@ -20,6 +20,7 @@ from ..fonts.subsetter import _resolve_simple_font_encoding
 from ..fonts.tounicode import parse_tounicode_cmap, resolve_glyph_to_unicode
 from ..utils import iter_type3_fonts as _iter_type3_fonts
 from ..utils import resolve_indirect as _resolve
+from .content_rewrite import ContentStreamVisitor, submit_content_rewrite
 
 logger = logging.getLogger(__name__)
 
@@ -369,40 +370,36 @@ def _build_actualtext_value(
 # ---------------------------------------------------------------------------
 
 
-def _fix_pua_in_stream(
-    stream_obj: Stream,
-    font_map: dict[str, pikepdf.Object],
-    tounicode_cache: dict[tuple[int, int], dict[int, int]],
-    encoding_cache: dict[tuple[int, int], dict[int, str] | None],
-) -> tuple[int, int]:
-    """Core stream processor.
-
-    Parses a content stream, identifies text operators with PUA codes,
-    and wraps them in BDC /Span <</ActualText ...>> ... EMC.
-
-    Returns:
-        Tuple of (wrapped_count, warning_count).
-    """
-    try:
-        instructions = list(pikepdf.parse_content_stream(stream_obj))
-    except Exception:
-        return 0, 0
-
-    # First pass: find text operator indices inside /ActualText BDC
-    covered: set[int] = set()
-    stack: list[bool] = []
-    actualtext_depth = 0
-
-    for idx, item in enumerate(instructions):
-        if isinstance(item, pikepdf.ContentStreamInlineImage):
-            continue
-
-        op_str = str(item.operator)
-
-        if op_str == "BDC":
+class _PuaActualTextVisitor(ContentStreamVisitor):
+    """Wrap text operators with PUA codes in BDC /Span <</ActualText>> EMC."""
+
+    operators = frozenset({"BDC", "BMC", "EMC", "Tf", "TJ"} | _TEXT_OPERATORS)
+
+    def __init__(
+        self,
+        font_map: dict[str, pikepdf.Object],
+        tounicode_cache: dict[tuple[int, int], dict[int, int]],
+        encoding_cache: dict[tuple[int, int], dict[int, str] | None],
+    ) -> None:
+        super().__init__()
+        self._font_map = font_map
+        self._tounicode_cache = tounicode_cache
+        self._encoding_cache = encoding_cache
+        self._stack: list[bool] = []
+        self._actualtext_depth = 0
+        self._current_font_name: str | None = None
+        self.wrapped_count = 0
+        self.warning_count = 0
+
+    def visit(self, item, operator: str) -> list | None:
+        operands = item.operands
+
+        # Track marked-content nesting: text inside an existing
+        # /ActualText sequence is already covered.
+        if operator == "BDC":
             has_actualtext = False
-            if len(item.operands) >= 2:
-                props = item.operands[1]
+            if len(operands) >= 2:
+                props = operands[1]
                 if isinstance(props, Dictionary):
                     try:
                         if props.get("/ActualText") is not None:
@@ -410,84 +407,58 @@ def _fix_pua_in_stream(
                     except Exception:
                         pass
             if has_actualtext:
-                actualtext_depth += 1
-            stack.append(has_actualtext)
-        elif op_str == "BMC":
-            stack.append(False)
-        elif op_str == "EMC":
-            if stack:
-                if stack.pop():
-                    actualtext_depth -= 1
-        elif actualtext_depth > 0:
-            if op_str in _TEXT_OPERATORS or op_str == "TJ":
-                covered.add(idx)
-
-    # Second pass: wrap PUA text operators
-    new_instructions: list = []
-    current_font_name: str | None = None
-    wrapped_count = 0
-    warning_count = 0
-
-    for idx, item in enumerate(instructions):
-        if isinstance(item, pikepdf.ContentStreamInlineImage):
-            new_instructions.append(item)
-            continue
-
-        operands, operator = item.operands, item.operator
-        op_str = str(operator)
+                self._actualtext_depth += 1
+            self._stack.append(has_actualtext)
+            return None
+        if operator == "BMC":
+            self._stack.append(False)
+            return None
+        if operator == "EMC":
+            if self._stack and self._stack.pop():
+                self._actualtext_depth -= 1
+            return None
 
         # Track font changes
-        if op_str == "Tf" and len(operands) >= 1:
-            try:
-                current_font_name = str(operands[0])
-            except Exception:
-                current_font_name = None
-            new_instructions.append(item)
-            continue
-
-        # Skip non-text operators
-        if op_str not in _TEXT_OPERATORS and op_str != "TJ":
-            new_instructions.append(item)
-            continue
+        if operator == "Tf":
+            if len(operands) >= 1:
+                try:
+                    self._current_font_name = str(operands[0])
+                except Exception:
+                    self._current_font_name = None
+            return None
 
         # Skip if already covered by existing /ActualText
-        if idx in covered:
-            new_instructions.append(item)
-            continue
+        if self._actualtext_depth > 0:
+            return None
 
         # Skip if no font context
-        if current_font_name is None:
-            new_instructions.append(item)
-            continue
+        if self._current_font_name is None:
+            return None
 
-        font_obj = font_map.get(current_font_name)
+        font_obj = self._font_map.get(self._current_font_name)
         if font_obj is None:
-            new_instructions.append(item)
-            continue
+            return None
 
-        tounicode = _get_tounicode_map(font_obj, tounicode_cache)
+        tounicode = _get_tounicode_map(font_obj, self._tounicode_cache)
         if not tounicode:
-            new_instructions.append(item)
-            continue
+            return None
 
         is_cid = _is_cidfont(font_obj)
 
         # Collect raw bytes from the text operand
-        raw = _extract_text_bytes(op_str, operands)
+        raw = _extract_text_bytes(operator, operands)
         if raw is None:
-            new_instructions.append(item)
-            continue
+            return None
 
         # Check if any codes map to PUA
         if not _has_pua_codes(raw, tounicode, is_cid):
-            new_instructions.append(item)
-            continue
+            return None
 
         # Build ActualText
         text, warnings = _build_actualtext_value(
-            raw, tounicode, is_cid, font_obj, encoding_cache
+            raw, tounicode, is_cid, font_obj, self._encoding_cache
         )
-        warning_count += warnings
+        self.warning_count += warnings
 
         # Create BDC/EMC wrapper
         actualtext_bytes = _encode_actualtext(text)
@@ -498,15 +469,35 @@ def _fix_pua_in_stream(
         )
         emc = pikepdf.ContentStreamInstruction([], pikepdf.Operator("EMC"))
 
-        new_instructions.append(bdc)
-        new_instructions.append(item)
-        new_instructions.append(emc)
-        wrapped_count += 1
+        self.wrapped_count += 1
+        return [bdc, item, emc]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "pua_actualtext_added": self.wrapped_count,
+            "pua_actualtext_warnings": self.warning_count,
+        }
 
-    if wrapped_count > 0:
-        stream_obj.write(pikepdf.unparse_content_stream(new_instructions))
 
-    return wrapped_count, warning_count
+def _fix_pua_in_stream(
+    stream_obj: Stream,
+    font_map: dict[str, pikepdf.Object],
+    tounicode_cache: dict[tuple[int, int], dict[int, int]],
+    encoding_cache: dict[tuple[int, int], dict[int, str] | None],
+) -> tuple[int, int]:
+    """Core stream processor.
+
+    Identifies text operators with PUA codes in a content stream and wraps
+    them in BDC /Span <</ActualText ...>> ... EMC.  Inside a deferred
+    content rewrite pass the fix is only queued and zeros are returned.
+
+    Returns:
+        Tuple of (wrapped_count, warning_count).
+    """
+    visitor = _PuaActualTextVisitor(font_map, tounicode_cache, encoding_cache)
+    if not submit_content_rewrite(stream_obj, visitor):
+        return 0, 0
+    return visitor.wrapped_count, visitor.warning_count
 
 
 # ---------------------------------------------------------------------------
@@ -13,12 +13,23 @@ This module handles three related requirements:
 
 import logging
 import re
-import warnings
 
 import pikepdf
 from pikepdf import Array, Dictionary, Name, Pdf, Stream
 
+from ..resource_graph import (
+    APPEARANCE,
+    PAGE,
+    TYPE3_FONT,
+    ResourceNode,
+    get_resource_graph,
+)
 from ..utils import resolve_indirect as _resolve_indirect
+from .content_rewrite import (
+    INLINE_IMAGE_OPERATOR,
+    ContentStreamVisitor,
+    submit_content_rewrite,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -119,6 +130,11 @@ VALID_CONTENT_STREAM_OPERATORS: frozenset[str] = frozenset(
 
 _DEFAULT_INTENT = Name.RelativeColorimetric
 
+# Inherited resources not copied into Type3 font /Resources: injecting the
+# parent's /Font can create self-referential font loops for direct
+# (objgen 0,0) objects.
+_TYPE3_EXCLUDED_KEYS = frozenset({"/Font"})
+
 # Expected operand counts for critical operators (veraPDF checks these).
 # value is (count, validator) where validator checks operand types.
 _OPERATOR_ARG_COUNTS: dict[str, tuple[int, str]] = {
@@ -267,126 +283,137 @@ def _get_inherited_page_resources(page_dict: Dictionary):
     return None
 
 
-def _sanitize_stream_operators(
-    stream_obj: Stream,
-) -> tuple[int, int, int, int]:
-    """Replace invalid ``ri`` operands, remove undefined operators,
-    validate operator argument counts, and fix invalid ``/Intent`` in
-    inline images.
+class _StreamOperatorVisitor(ContentStreamVisitor):
+    """Fix ``ri`` operands, undefined operators, bad argument counts and
+    invalid ``/Intent`` entries of inline images."""
 
-    Returns:
-        Tuple of (ri_fixed, undefined_removed, inline_intents_fixed,
-        bad_args_removed).
-    """
-    try:
-        with warnings.catch_warnings():
-            warnings.filterwarnings(
-                "ignore", message="Unexpected end of stream", category=UserWarning
-            )
-            instructions = list(pikepdf.parse_content_stream(stream_obj))
-    except Exception:
-        return 0, 0, 0, 0
+    def __init__(self) -> None:
+        super().__init__()
+        self.ri_fixed = 0
+        self.undefined_removed = 0
+        self.bad_args_removed = 0
+        self.inline_intents: dict[str, int] = {}
 
-    ri_fixed = 0
-    undefined_removed = 0
-    bad_args_removed = 0
-    inline_intents: dict[str, int] = {}
-    new_instructions = []
+    @property
+    def inline_fixed(self) -> int:
+        return sum(self.inline_intents.values())
 
-    for item in instructions:
+    def visit(self, item, operator: str) -> list | None:
         # ContentStreamInlineImage items are not regular instructions
-        if isinstance(item, pikepdf.ContentStreamInlineImage):
+        if operator == INLINE_IMAGE_OPERATOR:
             try:
                 intent = item.iimage.obj.get("/Intent")
                 if isinstance(intent, Name) and (
                     str(intent) not in VALID_RENDERING_INTENTS
                 ):
                     key = str(intent)
-                    inline_intents[key] = inline_intents.get(key, 0) + 1
+                    self.inline_intents[key] = self.inline_intents.get(key, 0) + 1
+                    self.changed = True
             except Exception:
                 pass
-            new_instructions.append(item)
-            continue
+            return None
 
-        operands, operator = item.operands, item.operator
-        operator_name = str(operator)
+        operands = item.operands
 
-        if operator_name not in VALID_CONTENT_STREAM_OPERATORS:
-            undefined_removed += 1
+        if operator not in VALID_CONTENT_STREAM_OPERATORS:
+            self.undefined_removed += 1
             logger.debug(
                 "Removed undefined content stream operator: %s",
-                operator_name,
+                operator,
             )
-            continue
+            return []
 
         # Validate argument counts for critical operators
-        if not _check_operator_args(operator_name, operands):
-            bad_args_removed += 1
+        if not _check_operator_args(operator, operands):
+            self.bad_args_removed += 1
             logger.warning(
                 "Removed operator '%s' with %d operand(s) (expected %d)",
-                operator_name,
+                operator,
                 len(operands),
-                _OPERATOR_ARG_COUNTS[operator_name][0],
+                _OPERATOR_ARG_COUNTS[operator][0],
             )
-            continue
+            return []
 
-        if operator_name == "ri" and operands:
+        if operator == "ri" and operands:
             operand = operands[0]
             if isinstance(operand, Name) and (
                 str(operand) not in VALID_RENDERING_INTENTS
             ):
-                new_instructions.append(
-                    pikepdf.ContentStreamInstruction([_DEFAULT_INTENT], operator)
-                )
-                ri_fixed += 1
+                self.ri_fixed += 1
                 logger.debug(
                     "Replaced invalid ri operand %s with /RelativeColorimetric",
                     operand,
                 )
-                continue
+                return [
+                    pikepdf.ContentStreamInstruction([_DEFAULT_INTENT], item.operator)
+                ]
+
+        return None
+
+    @property
+    def needs_finalize(self) -> bool:
+        return bool(self.inline_intents)
+
+    def finalize(self, data: bytes) -> bytes:
+        if not self.inline_intents:
+            return data
+
+        # Replace invalid intents only within inline image headers
+        # (between BI and ID markers) to avoid false matches elsewhere.
+        intents_to_fix = self.inline_intents
+
+        def _fix_inline_header(m: re.Match[bytes]) -> bytes:
+            header = m.group(0)
+            for intent_str in intents_to_fix:
+                old = f"/Intent {intent_str}".encode()
+                header = header.replace(old, b"/Intent /RelativeColorimetric")
+            return header
+
+        data = re.sub(
+            rb"\bBI\b(.*?)\bID\b",
+            _fix_inline_header,
+            data,
+            flags=re.DOTALL,
+        )
+        for intent_str in intents_to_fix:
+            logger.debug(
+                "Replaced invalid inline image /Intent %s with /RelativeColorimetric",
+                intent_str,
+            )
+        return data
 
-        new_instructions.append(item)
+    def stats(self) -> dict[str, int]:
+        return {
+            "ri_operators_fixed": self.ri_fixed,
+            "undefined_operators_removed": self.undefined_removed,
+            "bad_args_operators_removed": self.bad_args_removed,
+            "image_intents_fixed": self.inline_fixed,
+        }
 
-    inline_fixed = sum(inline_intents.values())
-    has_changes = (
-        ri_fixed > 0
-        or undefined_removed > 0
-        or inline_fixed > 0
-        or bad_args_removed > 0
-    )
 
-    if has_changes:
-        # Always use parse-and-unparse cycle for structured output
-        data = pikepdf.unparse_content_stream(new_instructions)
-
-        if inline_fixed > 0:
-            # Replace invalid intents only within inline image headers
-            # (between BI and ID markers) to avoid false matches elsewhere.
-            intents_to_fix = inline_intents
-
-            def _fix_inline_header(m: re.Match[bytes]) -> bytes:
-                header = m.group(0)
-                for intent_str in intents_to_fix:
-                    old = f"/Intent {intent_str}".encode()
-                    header = header.replace(old, b"/Intent /RelativeColorimetric")
-                return header
-
-            data = re.sub(
-                rb"\bBI\b(.*?)\bID\b",
-                _fix_inline_header,
-                data,
-                flags=re.DOTALL,
-            )
-            for intent_str in inline_intents:
-                logger.debug(
-                    "Replaced invalid inline image /Intent %s "
-                    "with /RelativeColorimetric",
-                    intent_str,
-                )
+def _sanitize_stream_operators(
+    stream_obj: Stream,
+) -> tuple[int, int, int, int]:
+    """Replace invalid ``ri`` operands, remove undefined operators,
+    validate operator argument counts, and fix invalid ``/Intent`` in
+    inline images.
 
-        stream_obj.write(data)
+    Inside a deferred content rewrite pass the fix is only queued and
+    zeros are returned.
 
-    return ri_fixed, undefined_removed, inline_fixed, bad_args_removed
+    Returns:
+        Tuple of (ri_fixed, undefined_removed, inline_intents_fixed,
+        bad_args_removed).
+    """
+    visitor = _StreamOperatorVisitor()
+    if not submit_content_rewrite(stream_obj, visitor):
+        return 0, 0, 0, 0
+    return (
+        visitor.ri_fixed,
+        visitor.undefined_removed,
+        visitor.inline_fixed,
+        visitor.bad_args_removed,
+    )
 
 
 def _sanitize_page_contents(
@@ -422,393 +449,61 @@ def _sanitize_page_contents(
     return ri_fixed, undefined_removed, inline_fixed, bad_args_removed
 
 
-def _iter_form_xobjects(resources, visited: set[tuple[int, int]]):
-    """Yield Form XObjects from a resources dictionary with cycle detection."""
-    resources = _resolve_indirect(resources)
-    if not isinstance(resources, Dictionary):
-        return
+def _sanitize_image_intents(resources, visited: set[tuple[int, int]]) -> int:
+    """Fix invalid ``/Intent`` on the Image XObjects of one resources dict.
 
-    xobjects = resources.get("/XObject")
-    xobjects = _resolve_indirect(xobjects) if xobjects else None
+    Replaces each invalid intent with the default ``/RelativeColorimetric``.
+    Nested Forms, patterns and Type3 fonts are separate graph nodes.
+    """
+    xobjects = _resolve_indirect(resources.get("/XObject"))
     if not isinstance(xobjects, Dictionary):
-        return
+        return 0
 
+    fixed = 0
     for xobj_name in list(xobjects.keys()):
         xobj = _resolve_indirect(xobjects[xobj_name])
-        if not isinstance(xobj, Stream):
+        if not isinstance(xobj, Stream) or str(xobj.get("/Subtype", "")) != "/Image":
             continue
-        if str(xobj.get("/Subtype")) != "/Form":
-            continue
-
         if not _visit_once(xobj, visited):
             continue
-        yield xobj
-
-
-def _iter_tiling_patterns(resources, visited: set[tuple[int, int]]):
-    """Yield tiling pattern streams (PatternType 1) with cycle detection."""
-    resources = _resolve_indirect(resources)
-    if not isinstance(resources, Dictionary):
-        return
-
-    patterns = resources.get("/Pattern")
-    patterns = _resolve_indirect(patterns) if patterns else None
-    if not isinstance(patterns, Dictionary):
-        return
-
-    for pattern_name in list(patterns.keys()):
-        pattern = _resolve_indirect(patterns[pattern_name])
-        if not isinstance(pattern, Stream):
-            continue
-        if int(pattern.get("/PatternType", 0)) != 1:
-            continue
-
-        if not _visit_once(pattern, visited):
+        intent = xobj.get("/Intent")
+        if intent is None:
             continue
-        yield pattern
-
-
-def _iter_type3_fonts(resources, visited: set[tuple[int, int]]):
-    """Yield Type3 fonts from a resources dictionary with cycle detection."""
-    resources = _resolve_indirect(resources)
-    if not isinstance(resources, Dictionary):
-        return
-
-    fonts = resources.get("/Font")
-    fonts = _resolve_indirect(fonts) if fonts else None
-    if not isinstance(fonts, Dictionary):
-        return
-
-    for font_name in list(fonts.keys()):
-        font = _resolve_indirect(fonts[font_name])
-        if not isinstance(font, Dictionary):
-            continue
-        if str(font.get("/Subtype")) != "/Type3":
-            continue
-        if not _visit_once(font, visited):
-            continue
-        yield font_name, font
-
-
-def _ensure_explicit_resources_in_resource_graph(
-    resources,
-    visited_forms: set[tuple[int, int]],
-    visited_fonts: set[tuple[int, int]],
-    visited_patterns: set[tuple[int, int]],
-) -> tuple[int, int]:
-    """Ensure explicit resources for nested content stream containers."""
-    resources = _resolve_indirect(resources)
-    if not isinstance(resources, Dictionary):
-        return 0, 0
-
-    resources_added = 0
-    resources_merged = 0
-
-    # Form XObjects
-    for form in _iter_form_xobjects(resources, visited_forms):
-        form_resources, added, merged = _ensure_associated_resources(form, resources)
-        resources_added += added
-        resources_merged += merged
-
-        add2, merge2 = _ensure_explicit_resources_in_resource_graph(
-            form_resources, visited_forms, visited_fonts, visited_patterns
-        )
-        resources_added += add2
-        resources_merged += merge2
-
-    # Type3 fonts used by CharProcs
-    for _font_name, font in _iter_type3_fonts(resources, visited_fonts):
-        # Avoid injecting /Font from parent into Type3 /Resources, which can
-        # create self-referential font loops for direct (objgen 0,0) objects.
-        font_resources, added, merged = _ensure_associated_resources(
-            font, resources, excluded_keys=frozenset({"/Font"})
-        )
-        resources_added += added
-        resources_merged += merged
-
-        add2, merge2 = _ensure_explicit_resources_in_resource_graph(
-            font_resources, visited_forms, visited_fonts, visited_patterns
-        )
-        resources_added += add2
-        resources_merged += merge2
-
-    # Tiling patterns are content streams with their own resources
-    for pattern in _iter_tiling_patterns(resources, visited_patterns):
-        pat_resources, added, merged = _ensure_associated_resources(pattern, resources)
-        resources_added += added
-        resources_merged += merged
-
-        add2, merge2 = _ensure_explicit_resources_in_resource_graph(
-            pat_resources, visited_forms, visited_fonts, visited_patterns
-        )
-        resources_added += add2
-        resources_merged += merge2
-
-    return resources_added, resources_merged
-
-
-def _sanitize_operators_in_resource_graph(
-    resources,
-    visited_forms: set[tuple[int, int]],
-    visited_fonts: set[tuple[int, int]],
-    visited_patterns: set[tuple[int, int]],
-) -> tuple[int, int, int, int]:
-    """Sanitize operators in nested forms, Type3 CharProcs and patterns."""
-    resources = _resolve_indirect(resources)
-    if not isinstance(resources, Dictionary):
-        return 0, 0, 0, 0
-
-    ri_fixed = 0
-    undefined_removed = 0
-    inline_fixed = 0
-    bad_args_removed = 0
-
-    # Form XObjects
-    for form in _iter_form_xobjects(resources, visited_forms):
-        ri, undef, inl, bad = _sanitize_stream_operators(form)
-        ri_fixed += ri
-        undefined_removed += undef
-        inline_fixed += inl
-        bad_args_removed += bad
-
-        form_resources = _resolve_indirect(form.get("/Resources"))
-        ri2, undef2, inl2, bad2 = _sanitize_operators_in_resource_graph(
-            form_resources, visited_forms, visited_fonts, visited_patterns
-        )
-        ri_fixed += ri2
-        undefined_removed += undef2
-        inline_fixed += inl2
-        bad_args_removed += bad2
-
-    # Type3 CharProcs
-    for _font_name, font in _iter_type3_fonts(resources, visited_fonts):
-        charprocs = _resolve_indirect(font.get("/CharProcs"))
-        if isinstance(charprocs, Dictionary):
-            for cp_name in list(charprocs.keys()):
-                cp_stream = _resolve_indirect(charprocs[cp_name])
-                if isinstance(cp_stream, Stream):
-                    ri, undef, inl, bad = _sanitize_stream_operators(cp_stream)
-                    ri_fixed += ri
-                    undefined_removed += undef
-                    inline_fixed += inl
-                    bad_args_removed += bad
-
-        font_resources = _resolve_indirect(font.get("/Resources"))
-        ri2, undef2, inl2, bad2 = _sanitize_operators_in_resource_graph(
-            font_resources, visited_forms, visited_fonts, visited_patterns
-        )
-        ri_fixed += ri2
-        undefined_removed += undef2
-        inline_fixed += inl2
-        bad_args_removed += bad2
-
-    # Tiling patterns
-    for pattern in _iter_tiling_patterns(resources, visited_patterns):
-        ri, undef, inl, bad = _sanitize_stream_operators(pattern)
-        ri_fixed += ri
-        undefined_removed += undef
-        inline_fixed += inl
-        bad_args_removed += bad
-
-        pat_resources = _resolve_indirect(pattern.get("/Resources"))
-        ri2, undef2, inl2, bad2 = _sanitize_operators_in_resource_graph(
-            pat_resources, visited_forms, visited_fonts, visited_patterns
-        )
-        ri_fixed += ri2
-        undefined_removed += undef2
-        inline_fixed += inl2
-        bad_args_removed += bad2
-
-    return ri_fixed, undefined_removed, inline_fixed, bad_args_removed
-
-
-def _ensure_resources_in_ap_stream(
-    ap_entry,
-    page_resources,
-    visited_forms: set[tuple[int, int]],
-    visited_fonts: set[tuple[int, int]],
-    visited_patterns: set[tuple[int, int]],
-) -> tuple[int, int]:
-    """Ensure explicit resources on AP streams and nested content streams."""
-    ap_entry = _resolve_indirect(ap_entry)
-    resources_added = 0
-    resources_merged = 0
-
-    if isinstance(ap_entry, Stream):
-        ap_resources, added, merged = _ensure_associated_resources(
-            ap_entry, page_resources
-        )
-        resources_added += added
-        resources_merged += merged
-        add2, merge2 = _ensure_explicit_resources_in_resource_graph(
-            ap_resources, visited_forms, visited_fonts, visited_patterns
-        )
-        resources_added += add2
-        resources_merged += merge2
-    elif isinstance(ap_entry, Dictionary):
-        for state_name in list(ap_entry.keys()):
-            state_stream = _resolve_indirect(ap_entry[state_name])
-            if isinstance(state_stream, Stream):
-                st_resources, added, merged = _ensure_associated_resources(
-                    state_stream, page_resources
-                )
-                resources_added += added
-                resources_merged += merged
-                add2, merge2 = _ensure_explicit_resources_in_resource_graph(
-                    st_resources, visited_forms, visited_fonts, visited_patterns
-                )
-                resources_added += add2
-                resources_merged += merge2
-
-    return resources_added, resources_merged
-
-
-def _sanitize_ap_stream(
-    ap_entry,
-    visited_forms: set[tuple[int, int]],
-    visited_fonts: set[tuple[int, int]],
-    visited_patterns: set[tuple[int, int]],
-) -> tuple[int, int, int, int]:
-    """Sanitize operators in AP streams and nested content streams."""
-    ap_entry = _resolve_indirect(ap_entry)
-    ri_fixed = 0
-    undefined_removed = 0
-    inline_fixed = 0
-    bad_args_removed = 0
-
-    if isinstance(ap_entry, Stream):
-        ri, undef, inl, bad = _sanitize_stream_operators(ap_entry)
-        ri_fixed += ri
-        undefined_removed += undef
-        inline_fixed += inl
-        bad_args_removed += bad
-        ap_resources = _resolve_indirect(ap_entry.get("/Resources"))
-        ri2, undef2, inl2, bad2 = _sanitize_operators_in_resource_graph(
-            ap_resources, visited_forms, visited_fonts, visited_patterns
-        )
-        ri_fixed += ri2
-        undefined_removed += undef2
-        inline_fixed += inl2
-        bad_args_removed += bad2
-    elif isinstance(ap_entry, Dictionary):
-        for state_name in list(ap_entry.keys()):
-            state_stream = _resolve_indirect(ap_entry[state_name])
-            if isinstance(state_stream, Stream):
-                ri, undef, inl, bad = _sanitize_stream_operators(state_stream)
-                ri_fixed += ri
-                undefined_removed += undef
-                inline_fixed += inl
-                bad_args_removed += bad
-
-                st_resources = _resolve_indirect(state_stream.get("/Resources"))
-                ri2, undef2, inl2, bad2 = _sanitize_operators_in_resource_graph(
-                    st_resources,
-                    visited_forms,
-                    visited_fonts,
-                    visited_patterns,
-                )
-                ri_fixed += ri2
-                undefined_removed += undef2
-                inline_fixed += inl2
-                bad_args_removed += bad2
-
-    return ri_fixed, undefined_removed, inline_fixed, bad_args_removed
-
-
-def _sanitize_image_intents_in_resource_graph(
-    resources, visited: set[tuple[int, int]]
-) -> int:
-    """Fix invalid ``/Intent`` on Image XObjects throughout a resource graph.
-
-    Recursively traverses XObjects, tiling patterns and Type3 fonts to find
-    Image XObjects with invalid ``/Intent`` and replaces with the default
-    ``/RelativeColorimetric``.
-    """
-    resources = _resolve_indirect(resources)
-    if not isinstance(resources, Dictionary):
-        return 0
-
-    fixed = 0
-
-    xobjects = resources.get("/XObject")
-    xobjects = _resolve_indirect(xobjects) if xobjects else None
-    if isinstance(xobjects, Dictionary):
-        for xobj_name in list(xobjects.keys()):
-            xobj = _resolve_indirect(xobjects[xobj_name])
-            if not isinstance(xobj, Stream):
-                continue
-
-            subtype = str(xobj.get("/Subtype", ""))
-
-            if subtype == "/Image":
-                intent = xobj.get("/Intent")
-                if intent is not None:
-                    intent = _resolve_indirect(intent)
-                    if isinstance(intent, Name) and (
-                        str(intent) not in VALID_RENDERING_INTENTS
-                    ):
-                        xobj[Name.Intent] = _DEFAULT_INTENT
-                        fixed += 1
-                        logger.debug(
-                            "Replaced invalid /Intent %s on Image XObject %s",
-                            intent,
-                            xobj_name,
-                        )
-            elif subtype == "/Form":
-                if not _visit_once(xobj, visited):
-                    continue
-                form_resources = _resolve_indirect(xobj.get("/Resources"))
-                fixed += _sanitize_image_intents_in_resource_graph(
-                    form_resources, visited
-                )
-
-    # Tiling patterns can reference Image XObjects
-    patterns = resources.get("/Pattern")
-    patterns = _resolve_indirect(patterns) if patterns else None
-    if isinstance(patterns, Dictionary):
-        for pattern_name in list(patterns.keys()):
-            pattern = _resolve_indirect(patterns[pattern_name])
-            if not isinstance(pattern, Stream):
-                continue
-            if int(pattern.get("/PatternType", 0)) != 1:
-                continue
-            if not _visit_once(pattern, visited):
-                continue
-            pat_resources = _resolve_indirect(pattern.get("/Resources"))
-            fixed += _sanitize_image_intents_in_resource_graph(pat_resources, visited)
-
+        intent = _resolve_indirect(intent)
+        if isinstance(intent, Name) and str(intent) not in VALID_RENDERING_INTENTS:
+            xobj[Name.Intent] = _DEFAULT_INTENT
+            fixed += 1
+            logger.debug(
+                "Replaced invalid /Intent %s on Image XObject %s",
+                intent,
+                xobj_name,
+            )
     return fixed
 
 
-def _sanitize_image_intents_in_ap(ap_entry, visited: set[tuple[int, int]]) -> int:
-    """Fix invalid ``/Intent`` on Image XObjects in AP streams."""
-    ap_entry = _resolve_indirect(ap_entry)
-    fixed = 0
-
-    if isinstance(ap_entry, Stream):
-        ap_resources = _resolve_indirect(ap_entry.get("/Resources"))
-        fixed += _sanitize_image_intents_in_resource_graph(ap_resources, visited)
-    elif isinstance(ap_entry, Dictionary):
-        for state_name in list(ap_entry.keys()):
-            state_stream = _resolve_indirect(ap_entry[state_name])
-            if isinstance(state_stream, Stream):
-                st_resources = _resolve_indirect(state_stream.get("/Resources"))
-                fixed += _sanitize_image_intents_in_resource_graph(
-                    st_resources, visited
-                )
+def _sanitize_node_operators(node: ResourceNode) -> tuple[int, int, int, int]:
+    """Sanitize operators in the content of one resource graph node."""
+    if node.kind == PAGE:
+        return _sanitize_page_contents(node.owner)
+    if node.kind != TYPE3_FONT:
+        return _sanitize_stream_operators(node.owner)
 
-    return fixed
+    totals = [0, 0, 0, 0]
+    charprocs = _resolve_indirect(node.owner.get("/CharProcs"))
+    if isinstance(charprocs, Dictionary):
+        for cp_name in list(charprocs.keys()):
+            cp_stream = _resolve_indirect(charprocs[cp_name])
+            if isinstance(cp_stream, Stream):
+                for i, count in enumerate(_sanitize_stream_operators(cp_stream)):
+                    totals[i] += count
+    return totals[0], totals[1], totals[2], totals[3]
 
 
 def sanitize_rendering_intent(pdf: Pdf) -> dict[str, int]:
     """Sanitize content streams for rule 6.2.2 + rendering intents.
 
-    Traverses:
-    - Page contents
-    - Form XObjects (recursive)
-    - Type3 CharProcs (recursive resources)
-    - Tiling patterns (recursive resources)
-    - Annotation AP streams
+    Traverses every node of the resource graph: page contents, Form
+    XObjects, Type3 CharProcs, tiling patterns and annotation AP streams.
 
     Returns:
         Dictionary with:
@@ -827,15 +522,9 @@ def sanitize_rendering_intent(pdf: Pdf) -> dict[str, int]:
     resources_added_total = 0
     resources_merged_total = 0
 
-    ensure_forms_visited: set[tuple[int, int]] = set()
-    ensure_fonts_visited: set[tuple[int, int]] = set()
-    ensure_patterns_visited: set[tuple[int, int]] = set()
-
-    sanitize_forms_visited: set[tuple[int, int]] = set()
-    sanitize_fonts_visited: set[tuple[int, int]] = set()
-    sanitize_patterns_visited: set[tuple[int, int]] = set()
-
-    image_intents_visited: set[tuple[int, int]] = set()
+    graph = get_resource_graph(pdf)
+    visited_nodes: set[tuple[int, int]] = set()
+    visited_images: set[tuple[int, int]] = set()
 
     for page_num, page in enumerate(pdf.pages, start=1):
         try:
@@ -848,99 +537,43 @@ def sanitize_rendering_intent(pdf: Pdf) -> dict[str, int]:
             )
             resources_added_total += added
             resources_merged_total += merged
-
-            add2, merge2 = _ensure_explicit_resources_in_resource_graph(
-                page_resources,
-                ensure_forms_visited,
-                ensure_fonts_visited,
-                ensure_patterns_visited,
-            )
-            resources_added_total += add2
-            resources_merged_total += merge2
-
-            # Annotation AP streams are outside page /Resources graph
-            annots = page_dict.get("/Annots")
-            annots = _resolve_indirect(annots) if annots else None
-            if isinstance(annots, Array):
-                for annot in annots:
-                    annot = _resolve_indirect(annot)
-                    if not isinstance(annot, Dictionary):
-                        continue
-                    ap = _resolve_indirect(annot.get("/AP"))
-                    if not isinstance(ap, Dictionary):
-                        continue
-                    for ap_key in ("/N", "/R", "/D"):
-                        ap_entry = ap.get(ap_key)
-                        if ap_entry:
-                            add_ap, merge_ap = _ensure_resources_in_ap_stream(
-                                ap_entry,
-                                page_resources,
-                                ensure_forms_visited,
-                                ensure_fonts_visited,
-                                ensure_patterns_visited,
-                            )
-                            resources_added_total += add_ap
-                            resources_merged_total += merge_ap
-
-            # 2) Sanitize operators in page contents + nested content streams
-            ri, undef, inl, bad = _sanitize_page_contents(page_dict)
-            ri_total += ri
-            undefined_total += undef
-            inline_total += inl
-            bad_args_total += bad
-
-            ri2, undef2, inl2, bad2 = _sanitize_operators_in_resource_graph(
-                page_resources,
-                sanitize_forms_visited,
-                sanitize_fonts_visited,
-                sanitize_patterns_visited,
-            )
-            ri_total += ri2
-            undefined_total += undef2
-            inline_total += inl2
-            bad_args_total += bad2
-
-            if isinstance(annots, Array):
-                for annot in annots:
-                    annot = _resolve_indirect(annot)
-                    if not isinstance(annot, Dictionary):
-                        continue
-                    ap = _resolve_indirect(annot.get("/AP"))
-                    if not isinstance(ap, Dictionary):
-                        continue
-                    for ap_key in ("/N", "/R", "/D"):
-                        ap_entry = ap.get(ap_key)
-                        if ap_entry:
-                            ri_ap, undef_ap, inl_ap, bad_ap = _sanitize_ap_stream(
-                                ap_entry,
-                                sanitize_forms_visited,
-                                sanitize_fonts_visited,
-                                sanitize_patterns_visited,
-                            )
-                            ri_total += ri_ap
-                            undefined_total += undef_ap
-                            inline_total += inl_ap
-                            bad_args_total += bad_ap
-
-            # 3) Fix invalid /Intent on Image XObjects
-            image_intents_total += _sanitize_image_intents_in_resource_graph(
-                page_resources, image_intents_visited
-            )
-
-            if isinstance(annots, Array):
-                for annot in annots:
-                    annot = _resolve_indirect(annot)
-                    if not isinstance(annot, Dictionary):
-                        continue
-                    ap = _resolve_indirect(annot.get("/AP"))
-                    if not isinstance(ap, Dictionary):
+            if added or merged:
+                # The page now names resources it used to inherit
+                graph.invalidate(page_dict)
+
+            # Nodes come parent first, so a node's parent already has
+            # explicit resources when the node inherits from it.
+            # Annotation appearance streams inherit from the page.
+            for node in graph.page_nodes(page_dict):
+                if node.kind != PAGE:
+                    if not _visit_once(node.owner, visited_nodes):
                         continue
-                    for ap_key in ("/N", "/R", "/D"):
-                        ap_entry = ap.get(ap_key)
-                        if ap_entry:
-                            image_intents_total += _sanitize_image_intents_in_ap(
-                                ap_entry, image_intents_visited
-                            )
+                    if node.kind == APPEARANCE:
+                        inherited = page_resources
+                    else:
+                        inherited = node.parent.resources
+                    excluded = (
+                        _TYPE3_EXCLUDED_KEYS if node.kind == TYPE3_FONT else frozenset()
+                    )
+                    _resources, added, merged = _ensure_associated_resources(
+                        node.owner, inherited, excluded_keys=excluded
+                    )
+                    resources_added_total += added
+                    resources_merged_total += merged
+
+                # 2) Sanitize operators in the node's content
+                ri, undef, inl, bad = _sanitize_node_operators(node)
+                ri_total += ri
+                undefined_total += undef
+                inline_total += inl
+                bad_args_total += bad
+
+                # 3) Fix invalid /Intent on Image XObjects
+                resources = node.own_resources
+                if resources is not None:
+                    image_intents_total += _sanitize_image_intents(
+                        resources, visited_images
+                    )
 
         except Exception as e:
             logger.debug(
@@ -14,6 +14,7 @@ import logging
 
 from pikepdf import Dictionary, Name, Pdf
 
+from ..document_index import get_document_index
 from ..utils import resolve_indirect as _resolve
 
 logger = logging.getLogger(__name__)
@@ -343,7 +344,7 @@ def sanitize_signatures(pdf: Pdf, level: str = "3b") -> dict:
 
     # Global scan as fallback (catches orphaned signature dictionaries that
     # may still be validated by tools even when unreferenced).
-    for obj in pdf.objects:
+    for obj in get_document_index(pdf).iter_signature_candidates():
         try:
             resolved = _resolve(obj)
         except Exception:
@@ -17,17 +17,23 @@ from __future__ import annotations
 import hashlib
 import logging
 import re
-import warnings
+from collections.abc import Iterable
 from decimal import Decimal
 from typing import Any
 
 import pikepdf
 from pikepdf import Array, Dictionary, Name, Pdf, Stream
 
+from ..document_index import get_document_index
 from ..exceptions import UnsupportedPDFError
 from ..fonts.glyph_usage import _iter_content_streams_with_resources
 from ..fonts.traversal import iter_all_page_fonts
 from ..utils import resolve_indirect as _resolve
+from .content_rewrite import (
+    INLINE_IMAGE_OPERATOR,
+    ContentStreamVisitor,
+    submit_content_rewrite,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -352,77 +358,78 @@ def _strip_invalid_hex_chars(stream_data: bytes) -> tuple[bytes, int]:
     return re.sub(rb"(?<!<)<([^<>]*)>(?!>)", _fix, stream_data), count
 
 
-def _sanitize_content_stream(stream_obj: Stream, stats: dict[str, int]) -> None:
-    """Sanitize one parsed content stream."""
-    try:
-        raw = stream_obj.read_bytes()
-    except Exception as e:
-        logger.debug("Skipping unreadable content stream %s: %s", stream_obj.objgen, e)
-        return
-
-    # Strip non-hex chars before counting or parsing (rule 6.1.6-2).
-    raw, invalid_hex = _strip_invalid_hex_chars(raw)
-    if invalid_hex > 0:
-        stats["hex_invalid_fixed"] += invalid_hex
-        stream_obj.write(raw)  # update stream so pikepdf parser sees clean bytes
-
-    odd_hex = _count_odd_hex_string_tokens(raw)
-    if odd_hex > 0:
-        stats["hex_odd_fixed"] += odd_hex
-
-    try:
-        with warnings.catch_warnings():
-            warnings.filterwarnings(
-                "ignore", message="Unexpected end of stream", category=UserWarning
-            )
-            instructions = list(pikepdf.parse_content_stream(stream_obj))
-    except Exception:
-        return
-
-    depth = 0
-    suppressed_q = 0
-    changed = False
-    rewritten: list[Any] = []
-
-    for instruction in instructions:
-        if isinstance(instruction, pikepdf.ContentStreamInlineImage):
-            rewritten.append(instruction)
-            continue
-
-        op_name = str(instruction.operator)
-        if op_name == "q":
-            if depth >= _MAX_Q_NESTING:
-                suppressed_q += 1
-                stats["q_nesting_rebalanced"] += 1
-                changed = True
-                continue
-            depth += 1
-        elif op_name == "Q":
-            if suppressed_q > 0:
-                suppressed_q -= 1
-                stats["q_nesting_rebalanced"] += 1
-                changed = True
-                continue
-            if depth > 0:
-                depth -= 1
+class _ContentLimitsVisitor(ContentStreamVisitor):
+    """Repair hex strings, rebalance q/Q nesting and sanitize operands."""
+
+    def __init__(self, stat_keys: Iterable[str]) -> None:
+        super().__init__()
+        self._depth = 0
+        self._suppressed_q = 0
+        self.invalid_hex = 0
+        self.odd_hex = 0
+        self._local: dict[str, int] = dict.fromkeys(stat_keys, 0)
+
+    def prepare(self, data: bytes) -> bytes:
+        # Strip non-hex chars before counting or parsing (rule 6.1.6-2).
+        data, self.invalid_hex = _strip_invalid_hex_chars(data)
+        self.odd_hex = _count_odd_hex_string_tokens(data)
+        return data
+
+    def visit(self, item, operator: str) -> list | None:
+        if operator == INLINE_IMAGE_OPERATOR:
+            return None
+
+        if operator == "q":
+            if self._depth >= _MAX_Q_NESTING:
+                self._suppressed_q += 1
+                self._local["q_nesting_rebalanced"] += 1
+                return []
+            self._depth += 1
+        elif operator == "Q":
+            if self._suppressed_q > 0:
+                self._suppressed_q -= 1
+                self._local["q_nesting_rebalanced"] += 1
+                return []
+            if self._depth > 0:
+                self._depth -= 1
 
         new_operands = []
         operands_changed = False
-        for operand in instruction.operands:
-            replacement, operand_changed = _sanitize_operand(operand, stats)
+        for operand in item.operands:
+            replacement, operand_changed = _sanitize_operand(operand, self._local)
             new_operands.append(replacement)
             operands_changed = operands_changed or operand_changed
 
         if operands_changed:
-            changed = True
-            rewritten.append(
-                pikepdf.ContentStreamInstruction(new_operands, instruction.operator)
-            )
-        else:
-            rewritten.append(instruction)
+            return [pikepdf.ContentStreamInstruction(new_operands, item.operator)]
+        return None
+
+    def finish(self, upstream_changed: bool) -> None:
+        # A rewrite earlier in the chain already re-serialized the stream,
+        # which normalizes odd-length hex strings.
+        if upstream_changed:
+            self.odd_hex = 0
+        self._local["hex_invalid_fixed"] += self.invalid_hex
+        self._local["hex_odd_fixed"] += self.odd_hex
 
-    if changed or odd_hex > 0 or invalid_hex > 0:
-        stream_obj.write(pikepdf.unparse_content_stream(rewritten))
+    @property
+    def needs_write(self) -> bool:
+        return self.changed or self.odd_hex > 0 or self.invalid_hex > 0
+
+    def stats(self) -> dict[str, int]:
+        return dict(self._local)
+
+
+def _sanitize_content_stream(stream_obj: Stream, stats: dict[str, int]) -> None:
+    """Sanitize one parsed content stream.
+
+    Inside a deferred content rewrite pass the fix is only queued; its
+    counts are then reported by the pass instead of added to *stats*.
+    """
+    visitor = _ContentLimitsVisitor(stats)
+    if submit_content_rewrite(stream_obj, visitor):
+        for key, value in visitor.stats().items():
+            stats[key] += value
 
 
 def _iter_owner_streams(owner: Any) -> list[Stream]:
@@ -628,7 +635,7 @@ def sanitize_structure_limits(pdf: Pdf) -> dict[str, int]:
     _ensure_no_cid_overflow(pdf)
 
     visited: set[tuple[int, int]] = set()
-    for obj in pdf.objects:
+    for obj in get_document_index(pdf).iter_objects():
         _sanitize_object_graph(obj, stats, visited)
 
     processed_streams: set[tuple[int, int]] = set()
@@ -21,6 +21,7 @@ import logging
 import pikepdf
 from pikepdf import Pdf, Stream
 
+from ..content_cache import get_content_stream_cache
 from ..fonts.analysis import get_font_type
 from ..fonts.tounicode import (
     _is_invalid_unicode,
@@ -289,7 +290,7 @@ def _extract_used_codes_from_page(
     used: dict[str, set[int]] = {}
 
     try:
-        instructions = pikepdf.parse_content_stream(page)
+        instructions = get_content_stream_cache(page).instructions(page)
     except Exception:
         return used
 
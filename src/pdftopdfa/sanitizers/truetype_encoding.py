@@ -21,6 +21,7 @@ from fontTools.ttLib.tables._c_m_a_p import cmap_format_4
 from pikepdf import Dictionary, Name, Pdf, Stream
 
 from ..fonts.analysis import is_symbolic_font
+from ..fonts.program_cache import get_font_program_cache
 from ..fonts.tounicode import resolve_glyph_to_unicode
 from ..fonts.traversal import iter_all_page_fonts
 from ..fonts.utils import safe_str as _safe_str
@@ -136,6 +137,9 @@ def _iter_embedded_truetype_fonts(pdf: Pdf):
 def _load_tt_font(fd: pikepdf.Object) -> TTFont | None:
     """Loads a TTFont from the /FontFile2 stream in a FontDescriptor.
 
+    The font comes from the shared font program cache; call
+    :func:`_detach_tt_font` before modifying it.
+
     Args:
         fd: Resolved FontDescriptor Dictionary.
 
@@ -144,11 +148,24 @@ def _load_tt_font(fd: pikepdf.Object) -> TTFont | None:
     """
     try:
         font_file = _resolve(fd["/FontFile2"])
-        data = bytes(font_file.read_bytes())
-        return TTFont(BytesIO(data))
+        program = get_font_program_cache(font_file).load(font_file, "/FontFile2")
     except Exception as e:
         logger.debug("Could not load TTFont from /FontFile2: %s", e)
         return None
+    if program is None:
+        logger.debug("Could not load TTFont from /FontFile2")
+        return None
+    return program.tt_font
+
+
+def _detach_tt_font(fd: pikepdf.Object) -> None:
+    """Drops the cached TTFont of *fd* before it is modified in place.
+
+    Args:
+        fd: Resolved FontDescriptor Dictionary.
+    """
+    font_file = _resolve(fd["/FontFile2"])
+    get_font_program_cache(font_file).invalidate(font_file)
 
 
 def _save_tt_font(pdf: Pdf, fd: pikepdf.Object, tt_font: TTFont) -> None:
@@ -224,49 +241,46 @@ def _apply_rule_6_2_11_6_1(
     if tt_font is None:
         return
 
-    try:
-        cmap_table = tt_font.get("cmap")
-        if cmap_table is None:
-            return
-
-        subtables = cmap_table.tables
-
-        # Check if any subtable is NOT (3,0) — if so, already compliant
-        for st in subtables:
-            if not (st.platformID == 3 and st.platEncID == 0):
-                return  # At least one non-(3,0) subtable → compliant
-
-        # All subtables are (3,0) — find the (3,0) to derive (3,1) from
-        source_30 = None
-        for st in subtables:
-            if st.platformID == 3 and st.platEncID == 0 and st.cmap:
-                source_30 = st
-                break
-
-        if source_30 is None:
-            return  # No usable (3,0) source
-
-        # Build (3,1) mapping: strip 0xF000 prefix for symbol-range codes
-        new_mapping: dict[int, str] = {}
-        for code, glyph_name in source_30.cmap.items():
-            if 0xF000 <= code <= 0xF0FF:
-                new_mapping[code & 0xFF] = glyph_name
-            else:
-                new_mapping[code] = glyph_name
+    cmap_table = tt_font.get("cmap")
+    if cmap_table is None:
+        return
 
-        new_subtable = cmap_format_4(4)
-        new_subtable.platformID = 3
-        new_subtable.platEncID = 1
-        new_subtable.language = 0
-        new_subtable.cmap = new_mapping
-        cmap_table.tables.append(new_subtable)
+    subtables = cmap_table.tables
+
+    # Check if any subtable is NOT (3,0) — if so, already compliant
+    for st in subtables:
+        if not (st.platformID == 3 and st.platEncID == 0):
+            return  # At least one non-(3,0) subtable → compliant
 
-        _save_tt_font(pdf, fd, tt_font)
-        result["tt_nonsymbolic_cmap_added"] += 1
-        logger.info("Added (3,1) cmap to non-symbolic TrueType font (rule 6.2.11.6-1)")
+    # All subtables are (3,0) — find the (3,0) to derive (3,1) from
+    source_30 = None
+    for st in subtables:
+        if st.platformID == 3 and st.platEncID == 0 and st.cmap:
+            source_30 = st
+            break
+
+    if source_30 is None:
+        return  # No usable (3,0) source
+
+    # Build (3,1) mapping: strip 0xF000 prefix for symbol-range codes
+    new_mapping: dict[int, str] = {}
+    for code, glyph_name in source_30.cmap.items():
+        if 0xF000 <= code <= 0xF0FF:
+            new_mapping[code & 0xFF] = glyph_name
+        else:
+            new_mapping[code] = glyph_name
+
+    _detach_tt_font(fd)
+    new_subtable = cmap_format_4(4)
+    new_subtable.platformID = 3
+    new_subtable.platEncID = 1
+    new_subtable.language = 0
+    new_subtable.cmap = new_mapping
+    cmap_table.tables.append(new_subtable)
 
-    finally:
-        tt_font.close()
+    _save_tt_font(pdf, fd, tt_font)
+    result["tt_nonsymbolic_cmap_added"] += 1
+    logger.info("Added (3,1) cmap to non-symbolic TrueType font (rule 6.2.11.6-1)")
 
 
 def _apply_rule_6_2_11_6_2(
@@ -390,63 +404,60 @@ def _apply_rule_6_2_11_6_4(
     if tt_font is None:
         return
 
-    try:
-        cmap_table = tt_font.get("cmap")
-        if cmap_table is None:
-            return
-
-        subtables = cmap_table.tables
+    cmap_table = tt_font.get("cmap")
+    if cmap_table is None:
+        return
 
-        # Exactly one subtable → compliant
-        if len(subtables) == 1:
-            return
+    subtables = cmap_table.tables
 
-        # Check if (3,0) already exists and is non-empty
-        existing_30 = None
-        for st in subtables:
-            if st.platformID == 3 and st.platEncID == 0:
-                existing_30 = st
-                break
+    # Exactly one subtable → compliant
+    if len(subtables) == 1:
+        return
 
-        if existing_30 is not None and existing_30.cmap:
-            return  # Already compliant
+    # Check if (3,0) already exists and is non-empty
+    existing_30 = None
+    for st in subtables:
+        if st.platformID == 3 and st.platEncID == 0:
+            existing_30 = st
+            break
+
+    if existing_30 is not None and existing_30.cmap:
+        return  # Already compliant
+
+    # Find best source subtable (prefer (1,0), then (3,1), then first)
+    source_subtables = [
+        st
+        for st in subtables
+        if st.cmap and not (st.platformID == 3 and st.platEncID == 0)
+    ]
+    source = _find_best_cmap_source(source_subtables)
+    if source is None:
+        return
 
-        # Find best source subtable (prefer (1,0), then (3,1), then first)
-        source_subtables = [
-            st
-            for st in subtables
-            if st.cmap and not (st.platformID == 3 and st.platEncID == 0)
-        ]
-        source = _find_best_cmap_source(source_subtables)
-        if source is None:
-            return
-
-        # Build (3,0) mapping in 0xF000 range
-        new_mapping: dict[int, str] = {}
-        for code, glyph_name in source.cmap.items():
-            sym_code = (code & 0xFF) | 0xF000
-            new_mapping[sym_code] = glyph_name
-
-        if existing_30 is not None:
-            # Repair empty (3,0) in-place
-            existing_30.cmap = new_mapping
-        else:
-            new_subtable = cmap_format_4(4)
-            new_subtable.platformID = 3
-            new_subtable.platEncID = 0
-            new_subtable.language = 0
-            new_subtable.cmap = new_mapping
-            cmap_table.tables.append(new_subtable)
-
-        _save_tt_font(pdf, fd, tt_font)
-        result["tt_symbolic_cmap_added"] += 1
-        logger.info(
-            "%s (3,0) cmap for symbolic TrueType font (rule 6.2.11.6-4)",
-            "Repaired" if existing_30 is not None else "Added",
-        )
+    # Build (3,0) mapping in 0xF000 range
+    new_mapping: dict[int, str] = {}
+    for code, glyph_name in source.cmap.items():
+        sym_code = (code & 0xFF) | 0xF000
+        new_mapping[sym_code] = glyph_name
+
+    _detach_tt_font(fd)
+    if existing_30 is not None:
+        # Repair empty (3,0) in-place
+        existing_30.cmap = new_mapping
+    else:
+        new_subtable = cmap_format_4(4)
+        new_subtable.platformID = 3
+        new_subtable.platEncID = 0
+        new_subtable.language = 0
+        new_subtable.cmap = new_mapping
+        cmap_table.tables.append(new_subtable)
 
-    finally:
-        tt_font.close()
+    _save_tt_font(pdf, fd, tt_font)
+    result["tt_symbolic_cmap_added"] += 1
+    logger.info(
+        "%s (3,0) cmap for symbolic TrueType font (rule 6.2.11.6-4)",
+        "Repaired" if existing_30 is not None else "Added",
+    )
 
 
 def _find_best_cmap_source(subtables: list) -> object | None:
@@ -7,12 +7,26 @@
 import logging
 
 import pikepdf
+
+# Optional import of numpy (vectorized BitsPerComponent re-encoding)
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
 from pikepdf import Array, Dictionary, Name, Pdf, Stream
 from pikepdf import parse_content_stream as _parse_content_stream
-from pikepdf import unparse_content_stream as _unparse_content_stream
 
+from ..reencode import FlateStripWriter, iter_row_strips
+from ..resource_graph import get_resource_graph
 from ..utils import resolve_indirect as _resolve_indirect
 from .base import FORBIDDEN_XOBJECT_SUBTYPES
+from .content_rewrite import (
+    INLINE_IMAGE_OPERATOR,
+    ContentStreamVisitor,
+    submit_content_rewrite,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -45,36 +59,42 @@ def _remove_forbidden_form_keys(xobj: Stream, key_name: str) -> int:
     return removed
 
 
-def _process_xobjects_for_removal(
-    xobjects: pikepdf.Dictionary,
-    pdf: Pdf,
-    visited: set[tuple[int, int]],
-) -> tuple[list[str], int]:
-    """Processes XObjects for forbidden subtypes, alternates and OPI.
+def _remove_forbidden_in_resources(
+    resources: Dictionary, visited: set[tuple[int, int]]
+) -> int:
+    """Removes forbidden XObjects, alternates and OPI from one resources dict.
 
-    Recursively processes XObjects, collecting forbidden subtypes for removal
-    and removing /Alternates arrays. Nested forbidden XObjects are removed
-    immediately during recursion.
+    Forbidden subtypes are removed from the ``/XObject`` dictionary itself;
+    ``/Alternates``, ``/OPI`` and forbidden Form keys are removed from each
+    remaining XObject once.  Nested Form XObjects are separate nodes of the
+    resource graph.
 
     Args:
-        xobjects: XObject dictionary from page or Form XObject resources.
-        pdf: Parent PDF (for object ID tracking).
-        visited: Set of already-visited objgen tuples for cycle detection.
+        resources: Resources dictionary of a resource graph node.
+        visited: Set of already-processed XObject objgen tuples.
 
     Returns:
-        Tuple of (list of keys to remove at this level, total count of
-        elements removed including nested XObjects and Alternates).
+        Number of elements removed.
     """
-    keys_to_remove: list[str] = []
-    removed_count = 0
+    xobjects = _resolve_indirect(resources.get("/XObject"))
+    if not isinstance(xobjects, Dictionary):
+        return 0
 
-    for key in xobjects.keys():
+    removed_count = 0
+    for key in list(xobjects.keys()):
         try:
-            xobj = xobjects.get(key)
-            if xobj is None:
+            xobj = _resolve_indirect(xobjects[key])
+            subtype = xobj.get("/Subtype")
+            if subtype is None:
                 continue
+            subtype_str = str(subtype)
 
-            xobj = _resolve_indirect(xobj)
+            # Remove forbidden subtypes
+            if subtype_str in FORBIDDEN_XOBJECT_SUBTYPES:
+                del xobjects[key]
+                removed_count += 1
+                logger.debug("Removed forbidden XObject %s: %s", subtype_str, key)
+                continue
 
             # Cycle detection using objgen
             obj_key = xobj.objgen
@@ -83,108 +103,25 @@ def _process_xobjects_for_removal(
                     continue
                 visited.add(obj_key)
 
-            # Check subtype
-            subtype = xobj.get("/Subtype")
-            if subtype is not None:
-                subtype_str = str(subtype)
+            # Remove /Alternates from any XObject
+            if "/Alternates" in xobj:
+                del xobj["/Alternates"]
+                removed_count += 1
+                logger.debug("Removed /Alternates from XObject: %s", key)
 
-                # Mark forbidden subtypes for removal
-                if subtype_str in FORBIDDEN_XOBJECT_SUBTYPES:
-                    keys_to_remove.append(str(key))
-                    logger.debug("Found forbidden XObject %s: %s", subtype_str, key)
-                    continue
+            # Remove /OPI from any XObject (ISO 19005-2, 6.2.4)
+            if "/OPI" in xobj:
+                del xobj["/OPI"]
+                removed_count += 1
+                logger.debug("Removed /OPI from XObject: %s", key)
 
-                # Remove /Alternates from any XObject
-                if "/Alternates" in xobj:
-                    del xobj["/Alternates"]
-                    removed_count += 1
-                    logger.debug("Removed /Alternates from XObject: %s", key)
-
-                # Remove /OPI from any XObject (ISO 19005-2, 6.2.4)
-                if "/OPI" in xobj:
-                    del xobj["/OPI"]
-                    removed_count += 1
-                    logger.debug("Removed /OPI from XObject: %s", key)
-
-                # Recurse into Form XObjects for nested XObjects
-                if subtype_str == "/Form":
-                    removed_count += _remove_forbidden_form_keys(xobj, str(key))
-                    nested_resources = xobj.get("/Resources")
-                    if nested_resources is not None:
-                        nested_resources = _resolve_indirect(nested_resources)
-                        nested_xobjects = nested_resources.get("/XObject")
-                        if nested_xobjects is not None:
-                            nested_xobjects = _resolve_indirect(nested_xobjects)
-                            nested_keys, nested_removed = _process_xobjects_for_removal(
-                                nested_xobjects, pdf, visited
-                            )
-                            # Remove forbidden XObjects from nested resources
-                            for nested_key in nested_keys:
-                                del nested_xobjects[nested_key]
-                                removed_count += 1
-                                logger.debug(
-                                    "Removed nested forbidden XObject: %s", nested_key
-                                )
-                            removed_count += nested_removed
+            if subtype_str == "/Form":
+                removed_count += _remove_forbidden_form_keys(xobj, str(key))
 
         except Exception as e:
             logger.debug("Error processing XObject %s: %s", key, e)
 
-    return keys_to_remove, removed_count
-
-
-def _remove_forbidden_in_ap_stream(
-    ap_entry, pdf: Pdf, visited: set[tuple[int, int]]
-) -> int:
-    """Remove forbidden XObjects from an annotation appearance stream entry.
-
-    An AP entry value can be a Form XObject (stream) directly, or a
-    dictionary of sub-state Form XObjects (e.g. /Yes, /Off).
-
-    Args:
-        ap_entry: An appearance entry (N, R, or D value).
-        pdf: Parent PDF (for object ID tracking).
-        visited: Set of (objnum, gen) tuples for cycle detection.
-
-    Returns:
-        Number of forbidden elements removed.
-    """
-    removed = 0
-    ap_entry = _resolve_indirect(ap_entry)
-
-    if isinstance(ap_entry, Stream):
-        resources = ap_entry.get("/Resources")
-        if resources:
-            resources = _resolve_indirect(resources)
-            xobjects = resources.get("/XObject")
-            if xobjects:
-                xobjects = _resolve_indirect(xobjects)
-                keys_to_remove, nested_removed = _process_xobjects_for_removal(
-                    xobjects, pdf, visited
-                )
-                for key in keys_to_remove:
-                    del xobjects[key]
-                    removed += 1
-                removed += nested_removed
-    elif isinstance(ap_entry, Dictionary):
-        for state_name in list(ap_entry.keys()):
-            state_stream = _resolve_indirect(ap_entry[state_name])
-            if isinstance(state_stream, Stream):
-                resources = state_stream.get("/Resources")
-                if resources:
-                    resources = _resolve_indirect(resources)
-                    xobjects = resources.get("/XObject")
-                    if xobjects:
-                        xobjects = _resolve_indirect(xobjects)
-                        keys_to_remove, nested_removed = _process_xobjects_for_removal(
-                            xobjects, pdf, visited
-                        )
-                        for key in keys_to_remove:
-                            del xobjects[key]
-                            removed += 1
-                        removed += nested_removed
-
-    return removed
+    return removed_count
 
 
 def remove_forbidden_xobjects(pdf: Pdf) -> int:
@@ -197,6 +134,10 @@ def remove_forbidden_xobjects(pdf: Pdf) -> int:
     - /OPI dictionaries in XObjects
     - In Form XObjects: /Ref, /Subtype2 /PS, and /PS keys
 
+    The resources of every node of the resource graph are checked: pages,
+    Form XObjects, tiling patterns, Type3 fonts and annotation appearance
+    streams.
+
     Args:
         pdf: Opened pikepdf PDF object (modified in place).
 
@@ -205,57 +146,14 @@ def remove_forbidden_xobjects(pdf: Pdf) -> int:
     """
     removed_count = 0
     visited: set[tuple[int, int]] = set()
+    graph = get_resource_graph(pdf)
 
     for page_num, page in enumerate(pdf.pages, start=1):
         try:
-            page_dict = _resolve_indirect(page.obj)
-
-            # 1. Page → Resources → XObject
-            resources = page_dict.get("/Resources")
-            if resources is not None:
-                resources = _resolve_indirect(resources)
-
-                xobjects = resources.get("/XObject")
-                if xobjects is not None:
-                    xobjects = _resolve_indirect(xobjects)
-
-                    keys_to_remove, nested_removed = _process_xobjects_for_removal(
-                        xobjects, pdf, visited
-                    )
-
-                    # Remove forbidden XObjects (two-phase deletion)
-                    for key in keys_to_remove:
-                        del xobjects[key]
-                        removed_count += 1
-                        logger.debug(
-                            "Removed forbidden XObject on page %d: %s",
-                            page_num,
-                            key,
-                        )
-
-                    removed_count += nested_removed
-
-            # 2. Page → Annots → AP streams
-            annots = page_dict.get("/Annots")
-            if annots:
-                annots = _resolve_indirect(annots)
-                for annot in annots:
-                    annot = _resolve_indirect(annot)
-                    if not isinstance(annot, Dictionary):
-                        continue
-                    ap = annot.get("/AP")
-                    if not ap:
-                        continue
-                    ap = _resolve_indirect(ap)
-                    if not isinstance(ap, Dictionary):
-                        continue
-                    for ap_key in ("/N", "/R", "/D"):
-                        ap_entry = ap.get(ap_key)
-                        if ap_entry is not None:
-                            removed_count += _remove_forbidden_in_ap_stream(
-                                ap_entry, pdf, visited
-                            )
-
+            for node in graph.page_nodes(page):
+                resources = node.own_resources
+                if resources is not None:
+                    removed_count += _remove_forbidden_in_resources(resources, visited)
         except Exception as e:
             logger.debug("Error processing XObjects on page %d: %s", page_num, e)
 
@@ -428,21 +326,18 @@ def _extract_inline_image_payload(inline_image) -> bytes | None:
     return None
 
 
-def _fix_inline_image_interpolate_in_stream(stream: Stream) -> int:
-    """Set /I or /Interpolate to false in inline images of one content stream."""
-    try:
-        instructions = list(_parse_content_stream(stream))
-    except Exception:
-        return 0
+class _InlineInterpolateVisitor(ContentStreamVisitor):
+    """Set /I or /Interpolate to false in inline images."""
 
-    fixed_count = 0
-    changed = False
+    operators = frozenset({INLINE_IMAGE_OPERATOR})
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.fixed_count = 0
 
-    for index, item in enumerate(instructions):
-        if not isinstance(item, pikepdf.ContentStreamInlineImage):
-            continue
+    def visit(self, item, operator: str) -> list | None:
         if not item.operands:
-            continue
+            return None
 
         inline_image = item.operands[0]
         # Private pikepdf API (tested with pikepdf 8.x–9.x): _image_object
@@ -461,27 +356,35 @@ def _fix_inline_image_interpolate_in_stream(stream: Stream) -> int:
             value = image_tokens[token_idx + 1]
             if bool(value):
                 image_tokens[token_idx + 1] = False
-                fixed_count += 1
+                self.fixed_count += 1
                 local_changed = True
 
         if not local_changed:
-            continue
+            return None
 
         payload = _extract_inline_image_payload(inline_image)
         if payload is None:
-            continue
+            return None
 
         replacement = _create_inline_image_instruction(image_tokens, payload)
         if replacement is None:
-            continue
+            return None
+        return [replacement]
 
-        instructions[index] = replacement
-        changed = True
+    def stats(self) -> dict[str, int]:
+        return {"image_interpolate_fixed": self.fixed_count}
 
-    if changed:
-        stream.write(_unparse_content_stream(instructions))
 
-    return fixed_count
+def _fix_inline_image_interpolate_in_stream(stream: Stream) -> int:
+    """Set /I or /Interpolate to false in inline images of one content stream.
+
+    Inside a deferred content rewrite pass the fix is only queued and 0 is
+    returned.
+    """
+    visitor = _InlineInterpolateVisitor()
+    if not submit_content_rewrite(stream, visitor):
+        return 0
+    return visitor.fixed_count
 
 
 def _fix_inline_interpolate_in_stream_once(
@@ -759,9 +662,124 @@ def _pack_samples_1bit(samples: list[int], width: int, height: int) -> bytes:
     return bytes(result)
 
 
+def _reencode_samples(
+    data: bytes,
+    source_bpc: int,
+    target_bpc: int,
+    width: int,
+    height: int,
+    num_components: int,
+) -> bytes | None:
+    """Rescale samples from source_bpc to target_bpc in pure Python.
+
+    Returns:
+        The packed samples, or None if target_bpc is not 1 or 8.
+    """
+    samples = _unpack_samples(data, source_bpc, width, height, num_components)
+
+    # Scale samples from source range to target range
+    source_max = (1 << source_bpc) - 1
+    target_max = (1 << target_bpc) - 1
+    if source_max > 0:
+        scaled = [round(s * target_max / source_max) for s in samples]
+    else:
+        scaled = samples
+
+    # Pack into target BPC
+    if target_bpc == 8:
+        return _pack_samples_8bit(scaled, width, height, num_components)
+    if target_bpc == 1:
+        return _pack_samples_1bit(scaled, width, height)
+    return None
+
+
+# Encoded bytes of source rows unpacked at a time by the numpy path; the
+# unpacked bits of a band take eight times as much memory.
+_BPC_BAND_BYTES = 1 << 20
+
+# Largest source BPC the numpy path handles (its lookup table has
+# 2**bpc entries).
+_MAX_NUMPY_BPC = 16
+
+
+def _numpy_supports(source_bpc: int, target_bpc: int, num_components: int) -> bool:
+    """Return True if the numpy path handles this re-encoding."""
+    if not 1 <= source_bpc <= _MAX_NUMPY_BPC or target_bpc not in (1, 8):
+        return False
+    return target_bpc == 8 or num_components == 1
+
+
+def _unpack_rows_numpy(rows, bpc: int, samples_per_row: int):
+    """Unpack a band of rows (uint8, one row per line) into samples."""
+    if bpc == 8:
+        return rows[:, :samples_per_row]
+    if bpc == 16:
+        pairs = rows[:, : samples_per_row * 2].astype(np.uint16)
+        return (pairs[:, 0::2] << 8) | pairs[:, 1::2]
+    if bpc in (1, 2, 4):
+        # Each byte holds 8 // bpc samples, MSB first
+        shifts = np.arange(8 - bpc, -1, -bpc, dtype=np.uint8)
+        samples = (rows[:, :, np.newaxis] >> shifts) & ((1 << bpc) - 1)
+        return samples.reshape(len(rows), -1)[:, :samples_per_row]
+    # Other widths (3, 5, 6, 7, 9-15): combine the individual bits
+    bits = np.unpackbits(rows, axis=1)[:, : samples_per_row * bpc]
+    bits = bits.reshape(len(rows), samples_per_row, bpc).astype(np.uint16)
+    weights = np.left_shift(1, np.arange(bpc - 1, -1, -1)).astype(np.uint16)
+    return (bits * weights).sum(axis=2, dtype=np.uint16)
+
+
+def _reencode_image_strips_numpy(
+    stream: Stream,
+    source_bpc: int,
+    target_bpc: int,
+    width: int,
+    height: int,
+    num_components: int,
+) -> bool:
+    """Rescale the samples of *stream* from source_bpc to target_bpc with numpy.
+
+    Produces the same samples as :func:`_reencode_samples`.  Decoded rows
+    are processed in bands of about ``_BPC_BAND_BYTES`` and compressed
+    band by band, so neither the decoded nor the re-encoded image is held
+    in memory in full.  Samples are rescaled through a lookup table built
+    with the same rounding as the pure-Python path.
+
+    Returns:
+        True on success, False if the decoded data is too short (the
+        stream is then unchanged).
+    """
+    samples_per_row = width * num_components
+    bytes_per_row = (samples_per_row * source_bpc + 7) // 8
+
+    source_max = (1 << source_bpc) - 1
+    target_max = (1 << target_bpc) - 1
+    lut = np.array(
+        [round(s * target_max / source_max) for s in range(source_max + 1)],
+        dtype=np.uint8,
+    )
+
+    rows_done = 0
+    with FlateStripWriter() as writer:
+        for strip in iter_row_strips(stream, bytes_per_row, height, _BPC_BAND_BYTES):
+            rows = np.frombuffer(strip, dtype=np.uint8).reshape(-1, bytes_per_row)
+            scaled = lut[_unpack_rows_numpy(rows, source_bpc, samples_per_row)]
+            if target_bpc == 1:
+                writer.write(np.packbits(scaled != 0, axis=1).tobytes())
+            else:
+                writer.write(scaled.tobytes())
+            rows_done += len(rows)
+        if rows_done < height:
+            return False
+        writer.replace_stream_data(stream)
+    return True
+
+
 def _reencode_image_stream(stream: Stream, source_bpc: int, target_bpc: int) -> bool:
     """Re-encode image pixel data from source_bpc to target_bpc.
 
+    Uses numpy, streaming the image in bands, when it is installed and
+    falls back to pure Python otherwise.
+
     Returns True on success, False if re-encoding cannot be performed.
     """
     if _should_skip_stream(stream):
@@ -784,6 +802,17 @@ def _reencode_image_stream(stream: Stream, source_bpc: int, target_bpc: int) ->
         if num_components is None:
             return False
 
+    if HAS_NUMPY and _numpy_supports(source_bpc, target_bpc, num_components):
+        try:
+            if not _reencode_image_strips_numpy(
+                stream, source_bpc, target_bpc, width, height, num_components
+            ):
+                return False
+        except Exception:
+            return False
+        stream[Name.BitsPerComponent] = target_bpc
+        return True
+
     try:
         data = stream.read_bytes()
     except Exception:
@@ -798,24 +827,12 @@ def _reencode_image_stream(stream: Stream, source_bpc: int, target_bpc: int) ->
         return False
 
     try:
-        samples = _unpack_samples(data, source_bpc, width, height, num_components)
+        new_data = _reencode_samples(
+            data, source_bpc, target_bpc, width, height, num_components
+        )
     except Exception:
         return False
-
-    # Scale samples from source range to target range
-    source_max = (1 << source_bpc) - 1
-    target_max = (1 << target_bpc) - 1
-    if source_max > 0:
-        scaled = [round(s * target_max / source_max) for s in samples]
-    else:
-        scaled = samples
-
-    # Pack into target BPC
-    if target_bpc == 8:
-        new_data = _pack_samples_8bit(scaled, width, height, num_components)
-    elif target_bpc == 1:
-        new_data = _pack_samples_1bit(scaled, width, height)
-    else:
+    if new_data is None:
         return False
 
     # Write re-encoded data (pikepdf re-compresses with FlateDecode)
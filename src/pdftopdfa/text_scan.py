@@ -0,0 +1,164 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Fast detection of text-showing operators in content stream bytes.
+
+Deciding whether a page needs OCR, or whether a content stream can use
+any glyphs at all, only requires knowing whether a ``Tj``, ``TJ``, ``'``
+or ``"`` operator occurs.  Tokenizing the whole stream with
+``pikepdf.parse_content_stream`` builds an object for every operand and
+operator just to answer that.
+
+:func:`has_text_operators` instead lets a regular expression skip over
+numbers, names and path operators and only stops at comments, strings
+and the operators it cares about.  It returns at the first text
+operator.  Inline image data is skipped as a whole, using the exact data
+length when the image is unfiltered, and otherwise the first ``EI``
+that is followed by content-stream-like bytes.
+"""
+
+import re
+
+# Candidates: the start of a comment, literal string or hex string, or a
+# text-showing operator or BI.  Only literal alternatives, so the regular
+# expression engine can skip ahead by first byte; token boundaries are
+# checked afterwards.
+_SCAN_RE = re.compile(rb"%|\(|<|Tj|TJ|'|\"|BI")
+_DELIMITERS = frozenset(b"()<>[]{}/%")
+_WHITESPACE = frozenset(b"\x00\t\n\x0c\r ")
+# Bytes that end the token before an operator; a slash would make it a name.
+_BEFORE_TOKEN = _WHITESPACE | _DELIMITERS - {ord("/")}
+_AFTER_TOKEN = _WHITESPACE | _DELIMITERS
+_TOKEN_START = rb"(?<![^\s()<>\[\]{}%])"
+_STRING_RE = re.compile(rb"[()\\]")
+_EOL_RE = re.compile(rb"[\r\n]")
+_ID_RE = re.compile(_TOKEN_START + rb"ID(?=\s)")
+_EI_RE = re.compile(rb"(?<=\s)EI(?![^\s()<>\[\]{}/%])")
+
+# Bytes that may follow an inline image's EI in a well-formed stream.
+_CONTENT_BYTES = frozenset(b"\t\n\x0c\r" + bytes(range(0x20, 0x7F)))
+_EI_LOOKAHEAD = 32
+
+# Inline image dictionary entries (abbreviated and full keys).
+_DICT_ENTRY_RE = re.compile(rb"/([A-Za-z]+)\s*(/?[A-Za-z0-9.]+|\[)")
+_COMPONENTS = {
+    b"/G": 1,
+    b"/DeviceGray": 1,
+    b"/RGB": 3,
+    b"/DeviceRGB": 3,
+    b"/CMYK": 4,
+    b"/DeviceCMYK": 4,
+    b"/I": 1,
+    b"/Indexed": 1,
+    b"[": 1,  # Only Indexed arrays are allowed inline
+}
+
+
+def _skip_string(data: bytes, pos: int) -> int:
+    """Return the position after the literal string whose body starts at pos."""
+    depth = 1
+    while True:
+        match = _STRING_RE.search(data, pos)
+        if match is None:
+            return len(data)
+        char = data[match.start()]
+        if char == 0x5C:  # backslash escapes the next byte
+            pos = match.start() + 2
+            continue
+        pos = match.end()
+        depth += 1 if char == 0x28 else -1
+        if depth == 0:
+            return pos
+
+
+def _inline_image_length(header: bytes) -> int | None:
+    """Data length of an unfiltered inline image, or None if unknown."""
+    entries: dict[bytes, bytes] = {}
+    for match in _DICT_ENTRY_RE.finditer(header):
+        entries[match.group(1)] = match.group(2)
+    if b"F" in entries or b"Filter" in entries:
+        return None
+    try:
+        width = int(entries.get(b"W") or entries[b"Width"])
+        height = int(entries.get(b"H") or entries[b"Height"])
+    except (KeyError, ValueError):
+        return None
+    if (entries.get(b"IM") or entries.get(b"ImageMask")) == b"true":
+        bpc, components = 1, 1
+    else:
+        try:
+            bpc = int(entries.get(b"BPC") or entries[b"BitsPerComponent"])
+        except (KeyError, ValueError):
+            return None
+        colorspace = entries.get(b"CS") or entries.get(b"ColorSpace")
+        components = _COMPONENTS.get(colorspace)
+        if components is None:
+            return None
+    return height * ((width * components * bpc + 7) // 8)
+
+
+def _looks_like_content(data: bytes, pos: int) -> bool:
+    """Return True if the bytes at pos could continue a content stream."""
+    return all(byte in _CONTENT_BYTES for byte in data[pos : pos + _EI_LOOKAHEAD])
+
+
+def _skip_inline_image(data: bytes, pos: int) -> int:
+    """Return the position after the EI of an inline image whose BI ends at pos."""
+    id_match = _ID_RE.search(data, pos)
+    if id_match is None:
+        return len(data)
+    # ID is followed by exactly one whitespace byte before the data
+    start = id_match.end() + 1
+
+    length = _inline_image_length(data[pos : id_match.start()])
+    if length is not None:
+        match = _EI_RE.search(data, start + length)
+        if match is not None and not data[start + length : match.start()].strip():
+            return match.end()
+
+    search_from = start
+    while True:
+        match = _EI_RE.search(data, search_from)
+        if match is None:
+            return len(data)
+        if _looks_like_content(data, match.end()):
+            return match.end()
+        search_from = match.end()
+
+
+def _is_token(data: bytes, start: int, end: int) -> bool:
+    """Return True if data[start:end] is a whole token and not a name."""
+    return (start == 0 or data[start - 1] in _BEFORE_TOKEN) and (
+        end == len(data) or data[end] in _AFTER_TOKEN
+    )
+
+
+def has_text_operators(data: bytes) -> bool:
+    """Return True if content stream *data* contains a text-showing operator.
+
+    Args:
+        data: Decoded content stream bytes.
+    """
+    pos = 0
+    while True:
+        match = _SCAN_RE.search(data, pos)
+        if match is None:
+            return False
+        start, pos = match.span()
+        first = data[start]
+        if first == 0x25:  # % comment
+            eol = _EOL_RE.search(data, pos)
+            pos = len(data) if eol is None else eol.end()
+        elif first == 0x28:  # ( literal string
+            pos = _skip_string(data, pos)
+        elif first == 0x3C:  # < hex string or dictionary
+            if data[pos : pos + 1] == b"<":
+                pos += 1
+            else:
+                end = data.find(b">", pos)
+                pos = len(data) if end < 0 else end + 1
+        elif _is_token(data, start, pos):
+            if first != 0x42:  # not BI
+                return True
+            pos = _skip_inline_image(data, pos)
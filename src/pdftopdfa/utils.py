@@ -4,12 +4,16 @@
 
 """Utility functions for PDF/A conversion."""
 
+import hashlib
 import logging
 import sys
-from collections.abc import Generator
+import threading
+from collections.abc import Callable, Generator, Iterator
+from contextlib import contextmanager
+from pathlib import Path
 from typing import Any
 
-from pikepdf import Dictionary, Pdf
+from pikepdf import Dictionary, Pdf, Stream
 
 from .exceptions import ConversionError
 
@@ -29,6 +33,31 @@ REQUIRED_PDF_VERSIONS = {
     "3u": "1.7",
 }
 
+# Bytes read at a time when hashing files
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Stream filter names (lowercased, including inline-image abbreviations)
+# mapped to their canonical spelling in ISO 32000-1, Table 6
+_CANONICAL_FILTER_NAMES_BY_LOWER: dict[str, str] = {
+    "/ahx": "/ASCIIHexDecode",
+    "/asciihexdecode": "/ASCIIHexDecode",
+    "/a85": "/ASCII85Decode",
+    "/ascii85decode": "/ASCII85Decode",
+    "/lzw": "/LZWDecode",
+    "/lzwdecode": "/LZWDecode",
+    "/fl": "/FlateDecode",
+    "/flatedecode": "/FlateDecode",
+    "/rl": "/RunLengthDecode",
+    "/runlengthdecode": "/RunLengthDecode",
+    "/ccf": "/CCITTFaxDecode",
+    "/ccittfaxdecode": "/CCITTFaxDecode",
+    "/dct": "/DCTDecode",
+    "/dctdecode": "/DCTDecode",
+    "/jbig2decode": "/JBIG2Decode",
+    "/jpxdecode": "/JPXDecode",
+    "/crypt": "/Crypt",
+}
+
 
 def setup_logging(verbose: bool = False, quiet: bool = False) -> logging.Logger:
     """Configures logging for pdftopdfa.
@@ -67,6 +96,22 @@ def setup_logging(verbose: bool = False, quiet: bool = False) -> logging.Logger:
     return pdftopdfa_logger
 
 
+def file_sha256(path: Path) -> str:
+    """Returns the hex SHA-256 digest of a file's contents.
+
+    Args:
+        path: File to hash.
+
+    Returns:
+        Hex digest string.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def is_pdf_encrypted(pdf: Pdf) -> bool:
     """Checks if a PDF is encrypted.
 
@@ -143,6 +188,42 @@ def resolve_indirect(obj: Any) -> Any:
         return obj
 
 
+def normalize_filter_name(filter_name: str) -> str:
+    """Normalize a filter name to its canonical PDF spelling.
+
+    Args:
+        filter_name: Filter name including the leading slash
+            (e.g., ``"/Fl"`` or ``"/flatedecode"``).
+
+    Returns:
+        The canonical name (e.g., ``"/FlateDecode"``), or the input
+        unchanged if it is not a known filter.
+    """
+    return _CANONICAL_FILTER_NAMES_BY_LOWER.get(filter_name.lower(), filter_name)
+
+
+def stream_fingerprint(stream: Stream) -> tuple:
+    """Fingerprints the encoded state of a stream.
+
+    Two fingerprints compare equal when the raw bytes and the filters are
+    the same, so cached results derived from the stream can be validated
+    without decoding it.
+
+    Args:
+        stream: The pikepdf stream.
+
+    Returns:
+        Hashable tuple of length, digest, /Filter and /DecodeParms.
+    """
+    raw = stream.read_raw_bytes()
+    return (
+        len(raw),
+        hashlib.blake2b(raw, digest_size=16).digest(),
+        repr(stream.get("/Filter")),
+        repr(stream.get("/DecodeParms")),
+    )
+
+
 def iter_type3_fonts(
     resources, visited: set[tuple[int, int]]
 ) -> Generator[tuple[str, Dictionary], None, None]:
@@ -191,3 +272,86 @@ def iter_type3_fonts(
             visited.add(objgen)
 
         yield font_name, font
+
+
+class PdfScopedRegistry[T]:
+    """Per-PDF helper objects that live for the duration of one conversion.
+
+    A helper (index, cache, ...) is created by *factory* when a scope is
+    activated with :meth:`activate` and shared by every :meth:`get` call for
+    the same ``Pdf`` until the scope ends.  Outside an active scope
+    :meth:`get` returns a fresh, unshared helper so that standalone calls
+    keep their original behavior.
+
+    Args:
+        factory: Callable that builds the helper for a ``Pdf``.
+        on_exit: Optional callable invoked with the helper when its scope
+            ends without an exception (e.g. to flush pending writes).
+        detached_factory: Optional callable that builds the unshared helper
+            returned by :meth:`get` outside an active scope.  Defaults to
+            *factory*.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[Pdf], T],
+        on_exit: Callable[[T], None] | None = None,
+        detached_factory: Callable[[Pdf], T] | None = None,
+    ) -> None:
+        self._factory = factory
+        self._on_exit = on_exit
+        self._detached_factory = detached_factory or factory
+        self._active: dict[int, tuple[Pdf, T]] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, pdf: Pdf) -> T | None:
+        """Return the active helper for *pdf*, or None."""
+        with self._lock:
+            entry = self._active.get(id(pdf))
+        if entry is not None and entry[0] is pdf:
+            return entry[1]
+        return None
+
+    def lookup_owner(self, obj: Any) -> T | None:
+        """Return the active helper for the PDF that owns *obj*, or None."""
+        with self._lock:
+            entries = list(self._active.values())
+        for pdf, helper in entries:
+            try:
+                if obj.is_owned_by(pdf):
+                    return helper
+            except (AttributeError, TypeError):
+                return None
+        return None
+
+    @contextmanager
+    def activate(self, pdf: Pdf) -> Iterator[T]:
+        """Activate a shared helper for *pdf*.
+
+        Nested scopes for the same PDF reuse the outer helper.
+
+        Yields:
+            The active helper.
+        """
+        existing = self.lookup(pdf)
+        if existing is not None:
+            yield existing
+            return
+
+        helper = self._factory(pdf)
+        with self._lock:
+            self._active[id(pdf)] = (pdf, helper)
+        try:
+            yield helper
+            if self._on_exit is not None:
+                self._on_exit(helper)
+        finally:
+            with self._lock:
+                self._active.pop(id(pdf), None)
+
+    def get(self, pdf: Pdf) -> T:
+        """Return the active helper for *pdf*, or build an unshared one."""
+        helper = self.lookup(pdf)
+        if helper is not None:
+            return helper
+        return self._detached_factory(pdf)
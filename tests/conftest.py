@@ -12,6 +12,31 @@ import pikepdf
 import pytest
 from pikepdf import Array, Dictionary, Name, Pdf
 
+# -- Benchmarks --
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Adds the ``--run-benchmarks`` option."""
+    parser.addoption(
+        "--run-benchmarks",
+        action="store_true",
+        default=False,
+        help="Run the tests marked benchmark.",
+    )
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: list[pytest.Item]
+) -> None:
+    """Skips benchmarks unless ``--run-benchmarks`` is given."""
+    if config.getoption("--run-benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="benchmark, use --run-benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
 # -- Global PDF tracker --
 
 _tracked_pdfs: list[Pdf] = []
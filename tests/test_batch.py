@@ -0,0 +1,228 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Tests for the batch conversion process pool."""
+
+import multiprocessing
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from pdftopdfa import cpu_budget
+from pdftopdfa.batch import run_in_workers
+
+
+def _square(value: int) -> int:
+    return value * value
+
+
+def _misbehave(value: int) -> int:
+    if value == 1:
+        os._exit(3)
+    if value == 2:
+        time.sleep(60)
+    if value == 3:
+        raise ValueError("bad input")
+    return value
+
+
+def _pid(value: int) -> int:
+    return os.getpid()
+
+
+def _reserved_jobs(value: int) -> int:
+    with cpu_budget.reserve(value) as jobs:
+        return jobs
+
+
+def _die_holding_tokens(value: int) -> int:
+    """Crashes or hangs (values below 0) while holding CPU tokens."""
+    if value < 0:
+        with cpu_budget.reserve(4):
+            if value == -1:
+                os._exit(3)
+            time.sleep(60)
+    return value
+
+
+def _exit_soon(value: int) -> int:
+    """Returns, then ends the worker while it waits for the next task."""
+    threading.Timer(0.2, os._exit, (0,)).start()
+    return value
+
+
+class _SlowToLoad:
+    """Task function that takes *delay* seconds to unpickle in a worker."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+
+    def __reduce__(self):
+        return (_load_slowly, (self.delay,))
+
+    def __call__(self, value: int) -> int:
+        return value
+
+
+def _load_slowly(delay: float) -> _SlowToLoad:
+    time.sleep(delay)
+    return _SlowToLoad(delay)
+
+
+def _failure(value: int, error: str) -> str:
+    return f"failed: {error}"
+
+
+class TestRunInWorkers:
+    """Tests for run_in_workers()."""
+
+    def test_all_tasks_complete(self) -> None:
+        results = dict(
+            run_in_workers(_square, range(6), workers=2, on_failure=_failure)
+        )
+
+        assert results == {i: i * i for i in range(6)}
+
+    def test_failures_do_not_stop_the_batch(self) -> None:
+        results = dict(
+            run_in_workers(
+                _misbehave, range(5), workers=2, on_failure=_failure, timeout=3
+            )
+        )
+
+        assert results[0] == 0
+        assert results[1].startswith("failed: worker process exited unexpectedly")
+        assert results[2] == "failed: timed out after 3s"
+        assert results[3] == "failed: ValueError: bad input"
+        assert results[4] == 4
+
+    def test_workers_are_recycled(self) -> None:
+        results = dict(
+            run_in_workers(
+                _pid, range(4), workers=1, on_failure=_failure, max_tasks_per_worker=2
+            )
+        )
+
+        assert results[0] == results[1]
+        assert results[2] == results[3]
+        assert results[0] != results[2]
+
+    def test_on_start_is_called_in_input_order(self) -> None:
+        started = []
+
+        list(
+            run_in_workers(
+                _square,
+                range(4),
+                workers=2,
+                on_failure=_failure,
+                on_start=lambda index, task: started.append(index),
+            )
+        )
+
+        assert started == [0, 1, 2, 3]
+
+    def test_cancel_stops_dispatch(self) -> None:
+        cancel = threading.Event()
+
+        def on_start(index: int, task: int) -> None:
+            if index == 1:
+                cancel.set()
+
+        results = dict(
+            run_in_workers(
+                _square,
+                range(5),
+                workers=1,
+                on_failure=_failure,
+                on_start=on_start,
+                cancel_event=cancel,
+            )
+        )
+
+        assert results == {0: 0, 1: 1}
+
+    def test_invalid_worker_count(self) -> None:
+        with pytest.raises(ValueError):
+            list(run_in_workers(_square, range(2), workers=0, on_failure=_failure))
+
+    def test_cpu_tokens_limit_workers(self) -> None:
+        results = dict(
+            run_in_workers(
+                _pid,
+                range(4),
+                workers=3,
+                on_failure=_failure,
+                max_tasks_per_worker=None,
+                cpu_tokens=1,
+            )
+        )
+
+        assert len(set(results.values())) == 1
+
+    def test_tasks_reserve_from_shared_tokens(self) -> None:
+        results = dict(
+            run_in_workers(
+                _reserved_jobs, [8, 2], workers=1, on_failure=_failure, cpu_tokens=3
+            )
+        )
+
+        assert results == {0: 3, 1: 2}
+
+    def test_timeout_excludes_worker_start_up(self) -> None:
+        """A task is not timed out while its worker is still starting."""
+        results = dict(
+            run_in_workers(
+                _SlowToLoad(2.0), range(2), workers=1, on_failure=_failure, timeout=1
+            )
+        )
+
+        assert results == {0: 0, 1: 1}
+
+    def test_worker_dead_between_tasks_is_replaced(self) -> None:
+        """A worker that died while idle is replaced when sending fails."""
+        results = run_in_workers(
+            _exit_soon,
+            range(2),
+            workers=1,
+            on_failure=_failure,
+            max_tasks_per_worker=None,
+        )
+        first = next(results)
+        time.sleep(1.0)
+        # Hide the death from the liveness check so that sending fails
+        with patch.object(
+            multiprocessing.get_context("spawn").Process, "is_alive", return_value=True
+        ):
+            rest = list(results)
+
+        assert dict([first, *rest]) == {0: 0, 1: 1}
+
+    def test_killed_workers_return_their_tokens(self) -> None:
+        """Workers killed while holding tokens do not starve the batch."""
+        results: dict[int, object] = {}
+
+        def run() -> None:
+            results.update(
+                run_in_workers(
+                    _die_holding_tokens,
+                    [-1, -1, -2, -1, 4, 5],
+                    workers=2,
+                    on_failure=_failure,
+                    timeout=1,
+                    cpu_tokens=2,
+                )
+            )
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(60)
+
+        assert not thread.is_alive(), "batch hung on leaked CPU tokens"
+        assert results[2] == "failed: timed out after 1s"
+        assert results[4] == 4
+        assert results[5] == 5
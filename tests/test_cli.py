@@ -4,6 +4,7 @@
 
 """Unit tests for cli.py."""
 
+import json
 from pathlib import Path
 from unittest.mock import patch
 
@@ -19,7 +20,9 @@ from pdftopdfa.cli import (
     EXIT_VALIDATION_FAILED,
     main,
 )
-from pdftopdfa.converter import ConversionResult
+from pdftopdfa.compression import CompressionProfile
+from pdftopdfa.converter import ConversionResult, convert_to_pdfa
+from pdftopdfa.sanitizers import EmbeddedPdfLimits
 
 
 @pytest.fixture
@@ -124,6 +127,119 @@ class TestCliConvert:
         assert "Converting" not in result.output
 
 
+class TestCliObjectStreams:
+    """Tests for --object-streams."""
+
+    def test_generate_writes_object_streams(
+        self, runner: CliRunner, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """--object-streams generate compresses the output structure."""
+        output_path = tmp_dir / "output.pdf"
+
+        result = runner.invoke(
+            main, [str(sample_pdf), str(output_path), "--object-streams", "generate"]
+        )
+
+        assert result.exit_code == EXIT_SUCCESS
+        assert b"/ObjStm" in output_path.read_bytes()
+
+    def test_invalid_mode_rejected(
+        self, runner: CliRunner, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """Unknown modes are rejected by the option parser."""
+        result = runner.invoke(
+            main, [str(sample_pdf), str(tmp_dir / "o.pdf"), "--object-streams", "x"]
+        )
+
+        assert result.exit_code != EXIT_SUCCESS
+
+
+class TestCliCompression:
+    """Tests for --compression."""
+
+    @pytest.mark.parametrize("profile", ["fast", "balanced", "max-compression"])
+    def test_profile_passed_to_conversion(
+        self, runner: CliRunner, sample_pdf: Path, tmp_dir: Path, profile: str
+    ) -> None:
+        """The chosen profile reaches convert_to_pdfa()."""
+        output_path = tmp_dir / "output.pdf"
+
+        with patch(
+            "pdftopdfa.cli.convert_to_pdfa", wraps=convert_to_pdfa
+        ) as mock_convert:
+            result = runner.invoke(
+                main, [str(sample_pdf), str(output_path), "--compression", profile]
+            )
+
+        assert result.exit_code == EXIT_SUCCESS
+        assert mock_convert.call_args.kwargs["compression"] == CompressionProfile(
+            profile
+        )
+
+    def test_invalid_profile_rejected(
+        self, runner: CliRunner, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """Unknown profiles are rejected by the option parser."""
+        result = runner.invoke(
+            main, [str(sample_pdf), str(tmp_dir / "o.pdf"), "--compression", "x"]
+        )
+
+        assert result.exit_code != EXIT_SUCCESS
+
+
+class TestCliEmbeddedLimits:
+    """Tests for the --embedded-* options."""
+
+    def test_limits_passed_to_conversion(
+        self, runner: CliRunner, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """The limits reach convert_to_pdfa()."""
+        with patch(
+            "pdftopdfa.cli.convert_to_pdfa", wraps=convert_to_pdfa
+        ) as mock_convert:
+            result = runner.invoke(
+                main,
+                [
+                    str(sample_pdf),
+                    str(tmp_dir / "output.pdf"),
+                    "--embedded-max-depth",
+                    "1",
+                    "--embedded-time-budget",
+                    "30",
+                    "--embedded-jobs",
+                    "2",
+                ],
+            )
+
+        assert result.exit_code == EXIT_SUCCESS
+        assert mock_convert.call_args.kwargs["embedded_limits"] == EmbeddedPdfLimits(
+            max_depth=1, time_budget=30.0, workers=2
+        )
+
+    def test_default_limits(
+        self, runner: CliRunner, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """Without options the default limits are used."""
+        with patch(
+            "pdftopdfa.cli.convert_to_pdfa", wraps=convert_to_pdfa
+        ) as mock_convert:
+            result = runner.invoke(main, [str(sample_pdf), str(tmp_dir / "o.pdf")])
+
+        assert result.exit_code == EXIT_SUCCESS
+        assert mock_convert.call_args.kwargs["embedded_limits"] == EmbeddedPdfLimits()
+
+    def test_invalid_time_budget_rejected(
+        self, runner: CliRunner, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """A non-positive time budget is rejected by the option parser."""
+        result = runner.invoke(
+            main,
+            [str(sample_pdf), str(tmp_dir / "o.pdf"), "--embedded-time-budget", "0"],
+        )
+
+        assert result.exit_code != EXIT_SUCCESS
+
+
 class TestCliMissingInput:
     """Tests for missing input file."""
 
@@ -186,6 +302,76 @@ class TestCliDirectory:
         assert result.exit_code == EXIT_SUCCESS
         assert "2 file(s) successfully converted" in result.output
 
+    def test_cli_convert_directory_parallel(
+        self, runner: CliRunner, tmp_dir: Path, sample_pdf_bytes: bytes
+    ) -> None:
+        """-j converts a directory with several worker processes."""
+        input_dir = tmp_dir / "input"
+        input_dir.mkdir()
+
+        for i in range(3):
+            (input_dir / f"test{i}.pdf").write_bytes(sample_pdf_bytes)
+
+        result = runner.invoke(main, [str(input_dir), "-j", "2", "--timeout", "120"])
+
+        assert result.exit_code == EXIT_SUCCESS
+        assert "3 file(s) successfully converted" in result.output
+
+    def test_cli_convert_directory_jsonl(
+        self, runner: CliRunner, tmp_dir: Path, sample_pdf_bytes: bytes
+    ) -> None:
+        """--jsonl writes one JSON record per converted file."""
+        input_dir = tmp_dir / "input"
+        input_dir.mkdir()
+        (input_dir / "good.pdf").write_bytes(sample_pdf_bytes)
+        (input_dir / "bad.pdf").write_bytes(b"not a pdf")
+        jsonl_path = tmp_dir / "results.jsonl"
+
+        result = runner.invoke(main, [str(input_dir), "--jsonl", str(jsonl_path)])
+
+        assert result.exit_code == EXIT_CONVERSION_FAILED
+        records = [json.loads(line) for line in jsonl_path.read_text().splitlines()]
+        assert [Path(r["input_path"]).name for r in records] == ["bad.pdf", "good.pdf"]
+        assert [r["success"] for r in records] == [False, True]
+        assert records[0]["error"]
+
+    def test_cli_convert_directory_resume(
+        self, runner: CliRunner, tmp_dir: Path, sample_pdf_bytes: bytes
+    ) -> None:
+        """--resume skips files converted by an earlier run."""
+        input_dir = tmp_dir / "input"
+        input_dir.mkdir()
+        output_dir = tmp_dir / "output"
+        for i in range(2):
+            (input_dir / f"test{i}.pdf").write_bytes(sample_pdf_bytes)
+
+        first = runner.invoke(main, [str(input_dir), str(output_dir), "--resume"])
+        assert first.exit_code == EXIT_SUCCESS
+        assert (output_dir / ".pdftopdfa-journal.sqlite").exists()
+
+        (input_dir / "test2.pdf").write_bytes(sample_pdf_bytes)
+        second = runner.invoke(main, [str(input_dir), str(output_dir), "--resume"])
+
+        assert second.exit_code == EXIT_SUCCESS
+        assert "1 file(s) successfully converted" in second.output
+
+    def test_cli_cache_dir(
+        self, runner: CliRunner, tmp_dir: Path, sample_pdf: Path
+    ) -> None:
+        """--cache-dir stores outputs and serves repeated inputs."""
+        cache_dir = tmp_dir / "cache"
+        for name in ("first.pdf", "second.pdf"):
+            result = runner.invoke(
+                main,
+                [str(sample_pdf), str(tmp_dir / name), "--cache-dir", str(cache_dir)],
+            )
+            assert result.exit_code == EXIT_SUCCESS
+
+        assert (tmp_dir / "first.pdf").read_bytes() == (
+            tmp_dir / "second.pdf"
+        ).read_bytes()
+        assert list(cache_dir.glob("*/*.json"))
+
     def test_cli_convert_directory_recursive(
         self, runner: CliRunner, tmp_dir: Path, sample_pdf_bytes: bytes
     ) -> None:
@@ -379,6 +565,39 @@ class TestCliOcr:
 
         assert result.exit_code == 2  # Click rejects invalid choice
 
+    @patch("pdftopdfa.ocr.apply_ocr")
+    @patch("pdftopdfa.ocr.pages_needing_ocr", return_value=[0])
+    @patch("pdftopdfa.ocr.is_ocr_available", return_value=True)
+    def test_cli_ocr_preprocess(
+        self,
+        mock_is_ocr_available,
+        mock_pages_needing_ocr,
+        mock_apply_ocr,
+        runner: CliRunner,
+        sample_pdf: Path,
+        tmp_dir: Path,
+    ) -> None:
+        """--ocr-preprocess is passed on to OCR."""
+        import shutil
+
+        from pdftopdfa.ocr import OcrPreprocess
+
+        output_path = tmp_dir / "output.pdf"
+
+        def create_ocr_output(input_path, output_path, langs, **kwargs):
+            shutil.copy(input_path, output_path)
+            return output_path
+
+        mock_apply_ocr.side_effect = create_ocr_output
+
+        result = runner.invoke(
+            main,
+            [str(sample_pdf), str(output_path), "--ocr", "--ocr-preprocess", "none"],
+        )
+
+        assert result.exit_code == EXIT_SUCCESS
+        assert mock_apply_ocr.call_args[1]["preprocess"] is OcrPreprocess.NONE
+
     @patch("pdftopdfa.ocr.apply_ocr")
     @patch("pdftopdfa.ocr.is_ocr_available")
     def test_cli_ocr_force_implies_ocr(
@@ -471,7 +690,7 @@ class TestCliOcr:
 class TestDirectoryValidationFailures:
     """Tests for validation failure surfacing in directory mode."""
 
-    @patch("pdftopdfa.cli.convert_directory")
+    @patch("pdftopdfa.cli.iter_convert_directory")
     def test_validation_failure_returns_exit_code(
         self, mock_convert_dir, runner: CliRunner, tmp_dir: Path
     ) -> None:
@@ -495,7 +714,7 @@ class TestDirectoryValidationFailures:
 
         assert result.exit_code == EXIT_VALIDATION_FAILED
 
-    @patch("pdftopdfa.cli.convert_directory")
+    @patch("pdftopdfa.cli.iter_convert_directory")
     def test_conversion_failure_takes_priority_over_validation(
         self, mock_convert_dir, runner: CliRunner, tmp_dir: Path
     ) -> None:
@@ -527,7 +746,7 @@ class TestDirectoryValidationFailures:
 
         assert result.exit_code == EXIT_CONVERSION_FAILED
 
-    @patch("pdftopdfa.cli.convert_directory")
+    @patch("pdftopdfa.cli.iter_convert_directory")
     def test_validation_failure_summary_output(
         self, mock_convert_dir, runner: CliRunner, tmp_dir: Path
     ) -> None:
@@ -551,7 +770,7 @@ class TestDirectoryValidationFailures:
 
         assert "1 file(s) failed validation" in result.output
 
-    @patch("pdftopdfa.cli.convert_directory")
+    @patch("pdftopdfa.cli.iter_convert_directory")
     def test_no_validation_failure_returns_success(
         self, mock_convert_dir, runner: CliRunner, tmp_dir: Path
     ) -> None:
@@ -3247,6 +3247,51 @@ class TestCalibratedConversion:
         assert cs[0] == Name.ICCBased
         assert int(cs[1][Name.N]) == 3
 
+    def test_cal_gray_in_tiling_pattern_and_type3_font(self):
+        """CalGray in tiling pattern and Type3 font resources is converted."""
+        pdf = new_pdf()
+
+        pattern = pdf.make_stream(b"/CS0 cs 0.5 sc 0 0 10 10 re f")
+        pattern[Name.PatternType] = 1
+        pattern[Name.PaintType] = 1
+        pattern[Name.TilingType] = 1
+        pattern[Name.BBox] = Array([0, 0, 10, 10])
+        pattern[Name.XStep] = 10
+        pattern[Name.YStep] = 10
+        pattern[Name.Resources] = Dictionary(
+            ColorSpace=Dictionary(CS0=self._make_cal_gray()),
+        )
+        type3_font = pdf.make_indirect(
+            Dictionary(
+                Type=Name.Font,
+                Subtype=Name.Type3,
+                FontBBox=Array([0, 0, 1000, 1000]),
+                FontMatrix=Array([0.001, 0, 0, 0.001, 0, 0]),
+                CharProcs=Dictionary(a=pdf.make_stream(b"/CS0 cs 0 0 1 1 re f")),
+                Encoding=Dictionary(Differences=Array([0, Name.a])),
+                Resources=Dictionary(
+                    ColorSpace=Dictionary(CS0=self._make_cal_gray()),
+                ),
+            )
+        )
+
+        page_dict = Dictionary(
+            Type=Name.Page,
+            MediaBox=Array([0, 0, 612, 792]),
+            Resources=Dictionary(
+                Pattern=Dictionary(P0=pattern),
+                Font=Dictionary(T0=type3_font),
+            ),
+        )
+        pdf.pages.append(pikepdf.Page(page_dict))
+
+        cache: dict[ColorSpaceType, pikepdf.Stream] = {}
+        replaced = _convert_calibrated_colorspaces(pdf, cache)
+
+        assert replaced == 2
+        for resources in (pattern.Resources, type3_font.Resources):
+            assert resources.ColorSpace.CS0[0] == Name.ICCBased
+
     def test_integration_convert_to_pdfa(self, tmp_path):
         """Integration: convert_calibrated=True converts CalRGB via convert_to_pdfa."""
         from pdftopdfa.converter import convert_to_pdfa
@@ -3831,6 +3876,39 @@ class TestSMaskGFormDefaultColorSpaces:
         assert isinstance(replaced_cs, Array)
         assert replaced_cs[0] == Name.ICCBased
 
+    def test_smask_g_form_in_form_xobject_gets_defaults(self):
+        """SMask /G referenced from a Form XObject's ExtGState is covered."""
+        from pdftopdfa.color_profile._defaults import _apply_default_colorspaces
+
+        pdf = new_pdf()
+
+        g_form = pdf.make_stream(b"0.5 g")
+        g_form[Name.Type] = Name.XObject
+        g_form[Name.Subtype] = Name.Form
+        g_form[Name.BBox] = Array([0, 0, 100, 100])
+
+        gs = Dictionary(SMask=Dictionary(S=Name.Luminosity, G=g_form))
+        form = pdf.make_stream(b"/GS0 gs 0 0 10 10 re f")
+        form[Name.Type] = Name.XObject
+        form[Name.Subtype] = Name.Form
+        form[Name.BBox] = Array([0, 0, 100, 100])
+        form[Name.Resources] = Dictionary(ExtGState=Dictionary(GS0=gs))
+
+        page = pikepdf.Page(
+            Dictionary(
+                Type=Name.Page,
+                MediaBox=Array([0, 0, 612, 792]),
+                Resources=Dictionary(XObject=Dictionary(Fm0=form)),
+            )
+        )
+        pdf.pages.append(page)
+
+        _apply_default_colorspaces(pdf, {ColorSpaceType.DEVICE_GRAY}, {})
+
+        cs = g_form.Resources.get(Name.ColorSpace)
+        assert cs is not None
+        assert Name.DefaultGray in cs
+
     def test_embed_color_profiles_covers_smask_g(self):
         """End-to-end: embed_color_profiles covers SMask /G form."""
         pdf = new_pdf()
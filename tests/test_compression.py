@@ -0,0 +1,141 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Tests for compression profiles."""
+
+import threading
+import time
+import zlib
+from io import BytesIO
+from unittest.mock import patch
+
+import pikepdf
+import pytest
+from conftest import new_pdf
+
+from pdftopdfa.compression import (
+    DEFAULT_FLATE_LEVEL,
+    CompressionProfile,
+    compression_profile,
+    flate_level,
+    qpdf_flate_level,
+    save_options,
+)
+
+_TEXT = b"".join(
+    b"BT /F1 9 Tf %d %d Td (Word %d of line %d) Tj ET\n"
+    % (i * 37 % 600, i * 53 % 800, i * i % 977, i)
+    for i in range(2000)
+)
+
+
+def _saved(pdf: pikepdf.Pdf, profile: CompressionProfile) -> bytes:
+    buffer = BytesIO()
+    with qpdf_flate_level(profile):
+        pdf.save(buffer, **save_options(profile))
+    return buffer.getvalue()
+
+
+class TestCompressionProfile:
+    """Tests for compression_profile() and save_options()."""
+
+    @pytest.mark.parametrize(
+        ("profile", "level"),
+        [
+            (CompressionProfile.FAST, 1),
+            (CompressionProfile.BALANCED, DEFAULT_FLATE_LEVEL),
+            (CompressionProfile.MAX_COMPRESSION, 9),
+            (None, DEFAULT_FLATE_LEVEL),
+        ],
+    )
+    def test_flate_level_applied_and_restored(self, profile, level) -> None:
+        with compression_profile(profile):
+            assert flate_level() == level
+        assert flate_level() == DEFAULT_FLATE_LEVEL
+
+    def test_nested_profiles_restore_outer_level(self) -> None:
+        with compression_profile(CompressionProfile.FAST):
+            with compression_profile(CompressionProfile.MAX_COMPRESSION):
+                assert flate_level() == 9
+            assert flate_level() == 1
+
+    def test_threads_keep_their_own_level(self) -> None:
+        barrier = threading.Barrier(2)
+        seen = {}
+
+        def run(profile: CompressionProfile) -> None:
+            with compression_profile(profile):
+                barrier.wait()
+                seen[profile] = flate_level()
+
+        threads = [
+            threading.Thread(target=run, args=(profile,))
+            for profile in (CompressionProfile.FAST, CompressionProfile.MAX_COMPRESSION)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert seen == {
+            CompressionProfile.FAST: 1,
+            CompressionProfile.MAX_COMPRESSION: 9,
+        }
+
+    def test_qpdf_level_set_and_restored_per_save(self) -> None:
+        with patch("pdftopdfa.compression.pikepdf_settings") as settings:
+            with qpdf_flate_level(CompressionProfile.FAST):
+                settings.set_flate_compression_level.assert_called_once_with(1)
+        settings.set_flate_compression_level.assert_called_with(DEFAULT_FLATE_LEVEL)
+
+    def test_concurrent_saves_do_not_interleave(self) -> None:
+        calls = []
+
+        def run(profile: CompressionProfile) -> None:
+            with qpdf_flate_level(profile):
+                time.sleep(0.05)
+
+        with patch("pdftopdfa.compression.pikepdf_settings") as settings:
+            settings.set_flate_compression_level.side_effect = calls.append
+            threads = [
+                threading.Thread(target=run, args=(profile,))
+                for profile in (
+                    CompressionProfile.FAST,
+                    CompressionProfile.MAX_COMPRESSION,
+                )
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert len(calls) == 4
+        assert calls[1] == calls[3] == DEFAULT_FLATE_LEVEL
+        assert sorted(calls[0::2]) == [1, 9]
+
+    def test_default_save_options_are_balanced(self) -> None:
+        assert save_options(None) == save_options(CompressionProfile.BALANCED)
+        assert save_options(None)["recompress_flate"] is False
+
+    def test_new_streams_smaller_at_higher_levels(self) -> None:
+        pdf = new_pdf()
+        pdf.Root.Data = pdf.make_stream(_TEXT)
+
+        fast = _saved(pdf, CompressionProfile.FAST)
+        best = _saved(pdf, CompressionProfile.MAX_COMPRESSION)
+
+        assert len(best) < len(fast)
+
+    def test_max_compression_recompresses_flate(self) -> None:
+        pdf = new_pdf()
+        stream = pdf.make_stream(zlib.compress(_TEXT, 1))
+        stream.Filter = pikepdf.Name.FlateDecode
+        pdf.Root.Data = stream
+
+        balanced = _saved(pdf, CompressionProfile.BALANCED)
+        best = _saved(pdf, CompressionProfile.MAX_COMPRESSION)
+
+        assert len(best) < len(balanced)
+        with pikepdf.open(BytesIO(best)) as reopened:
+            assert reopened.Root.Data.read_bytes() == _TEXT
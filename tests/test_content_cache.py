@@ -0,0 +1,266 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Tests for the shared content stream cache."""
+
+import zlib
+from unittest.mock import patch
+
+import pikepdf
+from conftest import new_pdf
+from pikepdf import Array, Dictionary, Name, Pdf
+
+from pdftopdfa.content_cache import (
+    ContentStreamCache,
+    content_stream_cache,
+    get_content_stream_cache,
+)
+
+
+def _make_pdf(content: bytes = b"q 1 0 0 1 0 0 cm Q") -> Pdf:
+    pdf = new_pdf()
+    pdf.pages.append(
+        pikepdf.Page(Dictionary(Type=Name.Page, MediaBox=Array([0, 0, 612, 792])))
+    )
+    pdf.pages[0].obj[Name.Contents] = pdf.make_stream(content)
+    return pdf
+
+
+def _operators(instructions) -> list[str]:
+    return [str(item.operator) for item in instructions]
+
+
+class TestParsing:
+    """Tests for instruction lookup."""
+
+    def test_stream_is_parsed_once(self) -> None:
+        pdf = _make_pdf()
+        stream = pdf.pages[0].obj.Contents
+        cache = ContentStreamCache(pdf)
+
+        first = cache.instructions(stream)
+        second = cache.instructions(pdf.pages[0])
+
+        assert _operators(first) == ["q", "cm", "Q"]
+        assert _operators(second) == ["q", "cm", "Q"]
+        assert cache.parses == 1
+        assert cache.hits == 1
+
+    def test_returned_list_is_a_copy(self) -> None:
+        pdf = _make_pdf()
+        stream = pdf.pages[0].obj.Contents
+        cache = ContentStreamCache(pdf)
+
+        cache.instructions(stream).clear()
+
+        assert len(cache.instructions(stream)) == 3
+
+    def test_direct_write_invalidates_entry(self) -> None:
+        pdf = _make_pdf()
+        stream = pdf.pages[0].obj.Contents
+        cache = ContentStreamCache(pdf)
+        cache.instructions(stream)
+
+        stream.write(b"BT ET")
+
+        assert _operators(cache.instructions(stream)) == ["BT", "ET"]
+        assert cache.parses == 2
+
+    def test_array_contents_are_concatenated(self) -> None:
+        pdf = _make_pdf()
+        page = pdf.pages[0].obj
+        page[Name.Contents] = Array(
+            [pdf.make_stream(b"q"), pdf.make_stream(b"1 0 0 1 0 0 cm Q")]
+        )
+        cache = ContentStreamCache(pdf)
+
+        assert _operators(cache.instructions(page)) == ["q", "cm", "Q"]
+        assert _operators(cache.instructions(page)) == ["q", "cm", "Q"]
+        assert cache.parses == 1
+
+        page.Contents[1].write(b"Q")
+        assert _operators(cache.instructions(page)) == ["q", "Q"]
+        assert cache.parses == 2
+
+    def test_note_reencoded_keeps_entry(self) -> None:
+        pdf = _make_pdf()
+        stream = pdf.pages[0].obj.Contents
+        stream.write(zlib.compress(b"q Q"), filter=Name.FlateDecode)
+        cache = ContentStreamCache(pdf)
+        cache.instructions(stream)
+
+        stream.write(stream.read_bytes())
+        cache.note_reencoded(stream)
+        cache.instructions(stream)
+
+        assert cache.parses == 1
+
+
+class TestHasText:
+    """Tests for text detection without parsing."""
+
+    def test_detects_text_without_parsing(self) -> None:
+        pdf = _make_pdf(b"BT /F1 12 Tf (Hi) Tj ET")
+        cache = ContentStreamCache(pdf)
+
+        assert cache.has_text(pdf.pages[0]) is True
+        assert cache.parses == 0
+
+    def test_image_only_page(self) -> None:
+        pdf = _make_pdf(b"q 100 0 0 100 0 0 cm /Im0 Do Q")
+        assert ContentStreamCache(pdf).has_text(pdf.pages[0]) is False
+
+    def test_array_contents(self) -> None:
+        pdf = _make_pdf()
+        page = pdf.pages[0].obj
+        page[Name.Contents] = Array(
+            [pdf.make_stream(b"BT (a)"), pdf.make_stream(b" Tj ET")]
+        )
+
+        assert ContentStreamCache(pdf).has_text(page) is True
+
+    def test_page_without_contents(self) -> None:
+        pdf = _make_pdf()
+        del pdf.pages[0].obj[Name.Contents]
+        assert ContentStreamCache(pdf).has_text(pdf.pages[0]) is False
+
+    def test_result_follows_direct_writes(self) -> None:
+        pdf = _make_pdf(b"q Q")
+        stream = pdf.pages[0].obj.Contents
+        cache = ContentStreamCache(pdf)
+        assert cache.has_text(stream) is False
+
+        stream.write(b"BT (x) Tj ET")
+
+        assert cache.has_text(stream) is True
+
+    def test_pending_edits_are_seen(self) -> None:
+        pdf = _make_pdf(b"BT (x) Tj ET")
+        stream = pdf.pages[0].obj.Contents
+        cache = ContentStreamCache(pdf, deferred=True)
+        instructions = cache.instructions(stream)
+
+        cache.set_instructions(
+            stream, [item for item in instructions if str(item.operator) != "Tj"]
+        )
+
+        assert cache.has_text(stream) is False
+        assert cache.writes == 0
+
+    def test_results_shared_between_documents(self) -> None:
+        content = b"BT (memo) Tj ET " * 3
+        with patch(
+            "pdftopdfa.content_cache.has_text_operators", return_value=True
+        ) as scan:
+            first = _make_pdf(content)
+            second = _make_pdf(content)
+            ContentStreamCache(first).has_text(first.pages[0])
+            ContentStreamCache(second).has_text(second.pages[0])
+
+        scan.assert_called_once()
+
+
+class TestWrites:
+    """Tests for deferred and write-through edits."""
+
+    def test_deferred_edit_is_written_on_flush(self) -> None:
+        pdf = _make_pdf()
+        stream = pdf.pages[0].obj.Contents
+        cache = ContentStreamCache(pdf, deferred=True)
+        instructions = cache.instructions(stream)
+
+        cache.set_instructions(stream, instructions[1:2])
+
+        assert stream.read_bytes() == b"q 1 0 0 1 0 0 cm Q"
+        assert _operators(cache.instructions(stream)) == ["cm"]
+        assert cache.flush() == 1
+        assert _operators(pikepdf.parse_content_stream(stream)) == ["cm"]
+        assert cache.parses == 1
+
+    def test_read_bytes_flushes_pending_edit(self) -> None:
+        pdf = _make_pdf()
+        stream = pdf.pages[0].obj.Contents
+        cache = ContentStreamCache(pdf, deferred=True)
+        cache.set_instructions(stream, cache.instructions(stream)[:1])
+
+        assert cache.read_bytes(stream).strip() == b"q"
+        assert cache.flush() == 0
+
+    def test_repeated_edits_serialize_once(self) -> None:
+        pdf = _make_pdf()
+        stream = pdf.pages[0].obj.Contents
+        cache = ContentStreamCache(pdf, deferred=True)
+
+        cache.set_instructions(stream, cache.instructions(stream)[1:])
+        cache.set_instructions(stream, cache.instructions(stream)[1:])
+        cache.flush()
+
+        assert cache.writes == 1
+        assert _operators(pikepdf.parse_content_stream(stream)) == ["Q"]
+
+    def test_write_through_cache(self) -> None:
+        pdf = _make_pdf()
+        stream = pdf.pages[0].obj.Contents
+        cache = ContentStreamCache(pdf)
+
+        cache.set_instructions(stream, cache.instructions(stream)[:1])
+
+        assert stream.read_bytes().strip() == b"q"
+
+    def test_write_bytes_drops_entry(self) -> None:
+        pdf = _make_pdf()
+        stream = pdf.pages[0].obj.Contents
+        cache = ContentStreamCache(pdf, deferred=True)
+        cache.set_instructions(stream, [])
+
+        cache.write_bytes(stream, b"BT ET")
+
+        assert cache.flush() == 0
+        assert _operators(cache.instructions(stream)) == ["BT", "ET"]
+
+
+class TestActiveScope:
+    """Tests for content_stream_cache() and get_content_stream_cache()."""
+
+    def test_active_cache_is_shared(self) -> None:
+        pdf = _make_pdf()
+        stream = pdf.pages[0].obj.Contents
+        with content_stream_cache(pdf) as cache:
+            assert cache.deferred
+            assert get_content_stream_cache(pdf) is cache
+            assert get_content_stream_cache(stream) is cache
+            assert get_content_stream_cache(pdf.pages[0]) is cache
+            with content_stream_cache(pdf) as inner:
+                assert inner is cache
+
+        assert get_content_stream_cache(pdf) is not cache
+        assert not get_content_stream_cache(stream).deferred
+
+    def test_scope_exit_flushes(self) -> None:
+        pdf = _make_pdf()
+        stream = pdf.pages[0].obj.Contents
+        with content_stream_cache(pdf) as cache:
+            cache.set_instructions(stream, cache.instructions(stream)[:1])
+            assert b"cm" in stream.read_bytes()
+
+        assert stream.read_bytes().strip() == b"q"
+
+    def test_sanitizers_share_parsed_streams(self, monkeypatch) -> None:
+        from pdftopdfa.sanitizers import sanitize_for_pdfa
+
+        parsed = []
+        original_parse = ContentStreamCache._parse
+
+        def counting_parse(self, owner):
+            parsed.append(getattr(owner, "objgen", None))
+            return original_parse(self, owner)
+
+        monkeypatch.setattr(ContentStreamCache, "_parse", counting_parse)
+        pdf = _make_pdf(b"q /Bogus ri 0 0 m 1 1 l S Q")
+
+        sanitize_for_pdfa(pdf, "3b")
+
+        stream = pdf.pages[0].obj.Contents
+        assert parsed.count(stream.objgen) == 1
+        assert b"/RelativeColorimetric ri" in stream.read_bytes()
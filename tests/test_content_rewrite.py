@@ -0,0 +1,258 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Tests for the fused content stream rewrite pass."""
+
+import pikepdf
+import pytest
+from conftest import new_pdf
+from pikepdf import Array, Dictionary, Name, Pdf
+
+from pdftopdfa.content_cache import ContentStreamCache, content_stream_cache
+from pdftopdfa.sanitizers.content_rewrite import (
+    ContentStreamVisitor,
+    deferred_content_rewrites,
+    rewrite_content_stream,
+    submit_content_rewrite,
+)
+from pdftopdfa.sanitizers.notdef_usage import sanitize_notdef_usage
+from pdftopdfa.sanitizers.pua_actualtext import sanitize_pua_actualtext
+from pdftopdfa.sanitizers.rendering_intent import sanitize_rendering_intent
+from pdftopdfa.sanitizers.structure_limits import sanitize_structure_limits
+from pdftopdfa.sanitizers.xobjects import fix_image_interpolate
+
+_MIXED_CONTENT = (
+    b"q /Bogus ri 0 0 m 1 1 l S Q\n"
+    + b"q " * 30
+    + b"Q " * 30
+    + b"\nfoo\n"
+    + b"q BI /W 1 /H 1 /BPC 8 /CS /G /I true ID \x80 EI Q\n"
+    + b"BT /F1 12 Tf (\x00A) Tj ET\n"
+)
+
+
+# Maps "A" into the Private Use Area.
+_PUA_TOUNICODE = b"""/CIDInit /ProcSet findresource begin
+12 dict begin
+begincmap
+/CMapName /Adobe-Identity-UCS def
+/CMapType 2 def
+1 begincodespacerange
+<00> <FF>
+endcodespacerange
+2 beginbfchar
+<41> <E000>
+<42> <0042>
+endbfchar
+endcmap
+CMapName currentdict /CMap defineresource pop
+end
+end"""
+
+
+def _make_pdf(
+    content: bytes = b"q 1 0 0 1 0 0 cm Q", tounicode: bytes | None = None
+) -> Pdf:
+    pdf = new_pdf()
+    font = Dictionary(
+        Type=Name.Font,
+        Subtype=Name.TrueType,
+        BaseFont=Name("/TestFont"),
+        FirstChar=32,
+        LastChar=114,
+        Encoding=Name.WinAnsiEncoding,
+    )
+    if tounicode is not None:
+        font[Name.ToUnicode] = pdf.make_stream(tounicode)
+    pdf.pages.append(
+        pikepdf.Page(
+            Dictionary(
+                Type=Name.Page,
+                MediaBox=Array([0, 0, 612, 792]),
+                Resources=Dictionary(Font=Dictionary(F1=font)),
+            )
+        )
+    )
+    pdf.pages[0].obj[Name.Contents] = pdf.make_stream(content)
+    return pdf
+
+
+def _operators(stream) -> list[str]:
+    return [
+        "INLINE IMAGE"
+        if isinstance(item, pikepdf.ContentStreamInlineImage)
+        else str(item.operator)
+        for item in pikepdf.parse_content_stream(stream)
+    ]
+
+
+class _DropOperator(ContentStreamVisitor):
+    def __init__(self, name: str) -> None:
+        super().__init__()
+        self.operators = frozenset({name})
+        self.seen = 0
+
+    def visit(self, item, operator: str) -> list | None:
+        self.seen += 1
+        return []
+
+    def stats(self) -> dict[str, int]:
+        return {"dropped": self.seen}
+
+
+class _SplitMoveTo(ContentStreamVisitor):
+    operators = frozenset({"m"})
+
+    def visit(self, item, operator: str) -> list | None:
+        line = pikepdf.ContentStreamInstruction(item.operands, pikepdf.Operator("l"))
+        return [item, line]
+
+
+class TestVisitorChain:
+    """Tests for chaining visitors over one stream."""
+
+    def test_output_feeds_next_visitor(self) -> None:
+        pdf = _make_pdf(b"0 0 m S")
+        stream = pdf.pages[0].obj.Contents
+        drop_lines = _DropOperator("l")
+
+        assert rewrite_content_stream(stream, [_SplitMoveTo(), drop_lines])
+
+        assert _operators(stream) == ["m", "S"]
+        assert drop_lines.seen == 1
+
+    def test_unchanged_stream_is_not_written(self) -> None:
+        pdf = _make_pdf()
+        stream = pdf.pages[0].obj.Contents
+        raw = stream.read_raw_bytes()
+
+        assert not rewrite_content_stream(stream, [_DropOperator("Tj")])
+        assert stream.read_raw_bytes() == raw
+
+
+class TestDeferredPass:
+    """Tests for deferred_content_rewrites() and submit_content_rewrite()."""
+
+    def test_submit_runs_immediately_outside_pass(self) -> None:
+        pdf = _make_pdf()
+        stream = pdf.pages[0].obj.Contents
+
+        assert submit_content_rewrite(stream, _DropOperator("cm"))
+        assert _operators(stream) == ["q", "Q"]
+
+    def test_queued_visitors_share_one_walk(self, monkeypatch) -> None:
+        pdf = _make_pdf()
+        stream = pdf.pages[0].obj.Contents
+        parsed = []
+        original_parse = ContentStreamCache._parse
+
+        def counting_parse(self, owner):
+            parsed.append(owner.objgen)
+            return original_parse(self, owner)
+
+        monkeypatch.setattr(ContentStreamCache, "_parse", counting_parse)
+
+        with content_stream_cache(pdf) as cache:
+            with deferred_content_rewrites(pdf) as rewrites:
+                assert not submit_content_rewrite(stream, _DropOperator("cm"))
+                assert not submit_content_rewrite(stream, _DropOperator("Q"))
+                assert _operators(stream) == ["q", "cm", "Q"]
+
+        assert _operators(stream) == ["q"]
+        assert parsed == [stream.objgen]
+        assert cache.writes == 1
+        assert rewrites.streams_rewritten == 1
+        assert rewrites.stats["dropped"] == 2
+
+
+class TestGoldenOutput:
+    """Fused fixes must reproduce the output of the sequential fixers.
+
+    The expected bytes and counts were produced by running the fixers one
+    after another, each with its own walk, before they were fused.
+    """
+
+    CASES = {
+        "mixed": (
+            _MIXED_CONTENT,
+            b"q\n/RelativeColorimetric ri\n0 0 m\n1 1 l\nS\nQ\n"
+            + b"q\n" * 28
+            + b"Q\n" * 28
+            + b"q\nBI\n/W 1 /H 1 /BPC 8 /CS /G /I false\nID\n\x80EI\nQ\n"
+            + b"BT\n/F1 12 Tf\n/Span << /ActualText <feff0041> >> BDC\n(A) Tj\n"
+            + b"EMC\nET",
+            {
+                "image_interpolate_fixed": 1,
+                "ri_operators_fixed": 1,
+                "undefined_operators_removed": 1,
+                "q_nesting_rebalanced": 4,
+                "pua_actualtext_added": 1,
+                "notdef_usage_fixed": 1,
+            },
+        ),
+        # The hex repair runs on the output of the rendering intent fix.
+        "hex_after_rewrite": (
+            b"q /Bogus ri Q\nBT /F1 12 Tf <4G2> Tj <423> Tj ET\n",
+            b"q\n/RelativeColorimetric ri\nQ\nBT\n/F1 12 Tf\n"
+            + b"null 2 null Tj\n(B0) Tj\nET",
+            {"ri_operators_fixed": 1},
+        ),
+        "hex_only": (
+            b"BT /F1 12 Tf <4 2zz> Tj <421> Tj ET\n",
+            b"BT\n/F1 12 Tf\nnull Tj\n(B) Tj\nET",
+            {"undefined_operators_removed": 1, "notdef_usage_fixed": 1},
+        ),
+        "hex_unchanged_stream": (
+            b"BT /F1 12 Tf <4 2> Tj <421> Tj ET\n",
+            b"BT\n/F1 12 Tf\n(B) Tj\n(B) Tj\nET",
+            {"hex_odd_fixed": 1, "notdef_usage_fixed": 1},
+        ),
+        "pua": (
+            b"BT /F1 12 Tf (AB) Tj [(B) -10 (A)] TJ ET\nfoo\n",
+            b"BT\n/F1 12 Tf\n"
+            + b"/Span << /ActualText <feff00410042> >> BDC\n(AB) Tj\nEMC\n"
+            + b"/Span << /ActualText <feff00420041> >> BDC\n[ (B) -10 (A) ] TJ\n"
+            + b"EMC\nET",
+            {"undefined_operators_removed": 1, "pua_actualtext_added": 2},
+        ),
+    }
+
+    @staticmethod
+    def _add(stats: dict[str, int], result) -> None:
+        for key, value in result.items():
+            if isinstance(value, int) and value:
+                stats[key] = stats.get(key, 0) + value
+
+    def _run_fixers(self, pdf: Pdf, fused: bool) -> dict[str, int]:
+        # Same grouping as sanitize_for_pdfa(): two fused windows.
+        windows = (
+            lambda: [
+                {"image_interpolate_fixed": fix_image_interpolate(pdf)},
+                sanitize_rendering_intent(pdf),
+                sanitize_structure_limits(pdf),
+            ],
+            lambda: [sanitize_pua_actualtext(pdf), sanitize_notdef_usage(pdf)],
+        )
+        stats: dict[str, int] = {}
+        for window in windows:
+            if fused:
+                with deferred_content_rewrites(pdf) as rewrites:
+                    results = window()
+                results.append(rewrites.stats)
+            else:
+                results = window()
+            for result in results:
+                self._add(stats, result)
+        return stats
+
+    @pytest.mark.parametrize("fused", [False, True], ids=["sequential", "fused"])
+    @pytest.mark.parametrize("case", list(CASES))
+    def test_matches_golden_output(self, case: str, fused: bool) -> None:
+        content, expected, expected_stats = self.CASES[case]
+        pdf = _make_pdf(content, tounicode=_PUA_TOUNICODE)
+
+        stats = self._run_fixers(pdf, fused)
+
+        assert pdf.pages[0].obj.Contents.read_bytes() == expected
+        assert stats == expected_stats
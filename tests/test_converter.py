@@ -5,24 +5,33 @@
 """Unit tests for converter.py."""
 
 import threading
+import time
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 from pikepdf import Array, Dictionary, Name, Pdf
 
+from pdftopdfa.compression import DEFAULT_FLATE_LEVEL, CompressionProfile, flate_level
 from pdftopdfa.converter import (
     ConversionResult,
     _compare_pdfa_levels,
+    _convert_embedded_pdf,
     _ensure_binary_comment,
+    _harden_saved_file,
+    _result_cache_key,
     _truncate_trailing_data,
     _verify_file_structure,
     convert_directory,
     convert_files,
     convert_to_pdfa,
+    convert_to_pdfa_bytes,
     generate_output_path,
+    iter_convert_directory,
+    iter_convert_files,
 )
 from pdftopdfa.exceptions import ConversionError, UnsupportedPDFError
+from pdftopdfa.sanitizers import EmbeddedPdfLimits
 from pdftopdfa.verapdf import VeraPDFResult
 
 
@@ -242,19 +251,19 @@ class TestConvertToPdfa:
         assert has_ocr_warning
 
     @patch("pdftopdfa.ocr.apply_ocr")
-    @patch("pdftopdfa.ocr.needs_ocr")
+    @patch("pdftopdfa.ocr.pages_needing_ocr")
     @patch("pdftopdfa.ocr.is_ocr_available")
     def test_convert_with_ocr_languages_parameter(
         self,
         mock_is_ocr_available: MagicMock,
-        mock_needs_ocr: MagicMock,
+        mock_pages_needing_ocr: MagicMock,
         mock_apply_ocr: MagicMock,
         sample_pdf: Path,
         tmp_dir: Path,
     ) -> None:
         """ocr_languages is passed through to apply_ocr."""
         mock_is_ocr_available.return_value = True
-        mock_needs_ocr.return_value = True
+        mock_pages_needing_ocr.return_value = [0]
 
         # apply_ocr should create the temporary file
         def create_ocr_output(
@@ -279,19 +288,19 @@ class TestConvertToPdfa:
         assert call_args[0][2] == ["eng"]  # Languages parameter
 
     @patch("pdftopdfa.ocr.apply_ocr")
-    @patch("pdftopdfa.ocr.needs_ocr")
+    @patch("pdftopdfa.ocr.pages_needing_ocr")
     @patch("pdftopdfa.ocr.is_ocr_available")
     def test_convert_with_ocr_adds_warning_message(
         self,
         mock_is_ocr_available: MagicMock,
-        mock_needs_ocr: MagicMock,
+        mock_pages_needing_ocr: MagicMock,
         mock_apply_ocr: MagicMock,
         sample_pdf: Path,
         tmp_dir: Path,
     ) -> None:
         """OCR execution adds warning with language info."""
         mock_is_ocr_available.return_value = True
-        mock_needs_ocr.return_value = True
+        mock_pages_needing_ocr.return_value = [0]
 
         def create_ocr_output(
             input_path: Path, output_path: Path, langs: list[str], **kwargs: object
@@ -313,18 +322,18 @@ class TestConvertToPdfa:
         )
         assert has_ocr_done_warning
 
-    @patch("pdftopdfa.ocr.needs_ocr")
+    @patch("pdftopdfa.ocr.pages_needing_ocr")
     @patch("pdftopdfa.ocr.is_ocr_available")
     def test_convert_skips_ocr_when_not_needed(
         self,
         mock_is_ocr_available: MagicMock,
-        mock_needs_ocr: MagicMock,
+        mock_pages_needing_ocr: MagicMock,
         sample_pdf: Path,
         tmp_dir: Path,
     ) -> None:
         """OCR is skipped when PDF already contains text."""
         mock_is_ocr_available.return_value = True
-        mock_needs_ocr.return_value = False  # PDF doesn't need OCR
+        mock_pages_needing_ocr.return_value = []  # PDF doesn't need OCR
 
         output_path = tmp_dir / "output.pdf"
 
@@ -336,17 +345,17 @@ class TestConvertToPdfa:
         assert not has_ocr_done_warning
 
     @patch("pdftopdfa.ocr.apply_ocr")
-    @patch("pdftopdfa.ocr.needs_ocr")
+    @patch("pdftopdfa.ocr.pages_needing_ocr")
     @patch("pdftopdfa.ocr.is_ocr_available")
-    def test_convert_ocr_force_skips_needs_ocr_check(
+    def test_convert_ocr_force_skips_page_check(
         self,
         mock_is_ocr_available: MagicMock,
-        mock_needs_ocr: MagicMock,
+        mock_pages_needing_ocr: MagicMock,
         mock_apply_ocr: MagicMock,
         sample_pdf: Path,
         tmp_dir: Path,
     ) -> None:
-        """ocr_force=True skips needs_ocr() and calls apply_ocr(force=True)."""
+        """ocr_force=True skips pages_needing_ocr() and OCRs every page."""
         mock_is_ocr_available.return_value = True
 
         def create_ocr_output(
@@ -366,27 +375,27 @@ class TestConvertToPdfa:
         )
 
         assert result.success is True
-        # needs_ocr should NOT have been called
-        mock_needs_ocr.assert_not_called()
+        # pages_needing_ocr should NOT have been called
+        mock_pages_needing_ocr.assert_not_called()
         # apply_ocr should have been called with force=True
         mock_apply_ocr.assert_called_once()
         call_kwargs = mock_apply_ocr.call_args[1]
         assert call_kwargs["force"] is True
 
     @patch("pdftopdfa.ocr.apply_ocr")
-    @patch("pdftopdfa.ocr.needs_ocr")
+    @patch("pdftopdfa.ocr.pages_needing_ocr")
     @patch("pdftopdfa.ocr.is_ocr_available")
-    def test_convert_ocr_force_false_checks_needs_ocr(
+    def test_convert_ocr_force_false_checks_pages(
         self,
         mock_is_ocr_available: MagicMock,
-        mock_needs_ocr: MagicMock,
+        mock_pages_needing_ocr: MagicMock,
         mock_apply_ocr: MagicMock,
         sample_pdf: Path,
         tmp_dir: Path,
     ) -> None:
-        """ocr_force=False (default) still calls needs_ocr()."""
+        """ocr_force=False (default) still calls pages_needing_ocr()."""
         mock_is_ocr_available.return_value = True
-        mock_needs_ocr.return_value = False
+        mock_pages_needing_ocr.return_value = []
 
         output_path = tmp_dir / "output.pdf"
 
@@ -395,9 +404,83 @@ class TestConvertToPdfa:
         )
 
         assert result.success is True
-        mock_needs_ocr.assert_called_once()
+        mock_pages_needing_ocr.assert_called_once()
         mock_apply_ocr.assert_not_called()
 
+    @patch("pdftopdfa.ocr.apply_ocr")
+    @patch("pdftopdfa.ocr.pages_needing_ocr")
+    @patch("pdftopdfa.ocr.is_ocr_available")
+    def test_convert_ocr_only_pages_needing_it(
+        self,
+        mock_is_ocr_available: MagicMock,
+        mock_pages_needing_ocr: MagicMock,
+        mock_apply_ocr: MagicMock,
+        tmp_dir: Path,
+    ) -> None:
+        """Only the pages needing OCR are passed to apply_ocr()."""
+        mock_is_ocr_available.return_value = True
+        mock_pages_needing_ocr.return_value = [1]
+
+        def create_ocr_output(
+            input_path: Path, output_path: Path, langs: list[str], **kwargs: object
+        ) -> Path:
+            import shutil
+
+            shutil.copy(input_path, output_path)
+            return output_path
+
+        mock_apply_ocr.side_effect = create_ocr_output
+
+        input_path = tmp_dir / "three_pages.pdf"
+        pdf = Pdf.new()
+        for _ in range(3):
+            pdf.add_blank_page()
+        pdf.save(input_path)
+        output_path = tmp_dir / "output.pdf"
+
+        result = convert_to_pdfa(input_path, output_path, ocr_languages=["eng"])
+
+        assert result.success is True
+        assert mock_apply_ocr.call_args[1]["pages"] == [1]
+        assert any("OCR performed on 1 of 3 page(s)" in w for w in result.warnings)
+
+    @patch("pdftopdfa.ocr.apply_ocr")
+    @patch("pdftopdfa.ocr.pages_needing_ocr")
+    @patch("pdftopdfa.ocr.is_ocr_available")
+    def test_convert_ocr_preprocess_passed_to_apply_ocr(
+        self,
+        mock_is_ocr_available: MagicMock,
+        mock_pages_needing_ocr: MagicMock,
+        mock_apply_ocr: MagicMock,
+        sample_pdf: Path,
+        tmp_dir: Path,
+    ) -> None:
+        """ocr_preprocess reaches apply_ocr()."""
+        from pdftopdfa.ocr import OcrPreprocess
+
+        mock_is_ocr_available.return_value = True
+        mock_pages_needing_ocr.return_value = [0]
+
+        def create_ocr_output(
+            input_path: Path, output_path: Path, langs: list[str], **kwargs: object
+        ) -> Path:
+            import shutil
+
+            shutil.copy(input_path, output_path)
+            return output_path
+
+        mock_apply_ocr.side_effect = create_ocr_output
+
+        result = convert_to_pdfa(
+            sample_pdf,
+            tmp_dir / "output.pdf",
+            ocr_languages=["eng"],
+            ocr_preprocess=OcrPreprocess.MEDIAN,
+        )
+
+        assert result.success is True
+        assert mock_apply_ocr.call_args[1]["preprocess"] is OcrPreprocess.MEDIAN
+
     def test_upgrades_pdf_version_and_adds_warning(
         self, sample_pdf: Path, tmp_dir: Path
     ) -> None:
@@ -595,6 +678,42 @@ class TestConvertDirectory:
         assert len(results) == 1
         assert results[0].input_path == input_dir / "doc.pdf"
 
+    def test_convert_directory_path_order(
+        self, tmp_dir: Path, sample_pdf_bytes: bytes
+    ) -> None:
+        """Files are discovered in sorted path order, subdirectories in place."""
+        input_dir = tmp_dir / "input"
+        (input_dir / "b").mkdir(parents=True)
+        for rel in ("c.pdf", "a.pdf", "b/x.pdf", "notes.txt"):
+            (input_dir / rel).write_bytes(sample_pdf_bytes)
+
+        results = convert_directory(
+            input_dir, tmp_dir / "output", recursive=True, show_progress=False
+        )
+
+        assert [r.input_path for r in results] == sorted(input_dir.glob("**/*.pdf"))
+
+    def test_iter_convert_directory_streams_results(
+        self, tmp_dir: Path, sample_pdf_bytes: bytes
+    ) -> None:
+        """iter_convert_directory() yields a result before the next file starts."""
+        input_dir = tmp_dir / "input"
+        input_dir.mkdir()
+        for i in range(3):
+            (input_dir / f"test{i}.pdf").write_bytes(sample_pdf_bytes)
+
+        results = iter_convert_directory(input_dir, show_progress=False)
+        first = next(results)
+
+        assert first.input_path == input_dir / "test0.pdf"
+        assert not (input_dir / "test1_pdfa.pdf").exists()
+        assert len(list(results)) == 2
+
+    def test_iter_convert_directory_nonexistent(self, tmp_dir: Path) -> None:
+        """The missing directory is reported before iteration starts."""
+        with pytest.raises(ConversionError, match="does not exist"):
+            iter_convert_directory(tmp_dir / "nonexistent")
+
     @patch("pdftopdfa.ocr.is_ocr_available")
     def test_convert_directory_with_ocr_languages(
         self,
@@ -620,6 +739,469 @@ class TestConvertDirectory:
         assert has_ocr_warning
 
 
+class TestAtomicOutput:
+    """The output only appears once it is complete."""
+
+    def test_failed_post_save_step_leaves_no_output(
+        self, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """A failure after saving removes the temporary file."""
+        output_path = tmp_dir / "out" / "output.pdf"
+
+        with patch(
+            "pdftopdfa.converter._harden_saved_file",
+            side_effect=RuntimeError("disk full"),
+        ):
+            with pytest.raises(ConversionError):
+                convert_to_pdfa(sample_pdf, output_path, level="2b")
+
+        assert list(output_path.parent.iterdir()) == []
+
+    def test_output_is_renamed_into_place(
+        self, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """Post-save steps run on a temporary file next to the output."""
+        output_path = tmp_dir / "output.pdf"
+        seen: list[Path] = []
+
+        def _record(path: Path, required_version: str, *, verify: bool) -> None:
+            seen.append(path)
+            assert not output_path.exists()
+
+        with patch("pdftopdfa.converter._harden_saved_file", _record):
+            convert_to_pdfa(sample_pdf, output_path, level="2b")
+
+        assert seen[0].parent == tmp_dir
+        assert seen[0] != output_path
+        assert not seen[0].exists()
+        assert output_path.exists()
+
+
+class TestConvertToPdfaBytes:
+    """Tests for the in-memory convert_to_pdfa_bytes()."""
+
+    def test_bytes_in_bytes_out(self, sample_pdf_bytes: bytes) -> None:
+        """Bytes are converted without touching the filesystem."""
+        import io
+
+        with (
+            patch(
+                "pdftopdfa.converter.tempfile.mkstemp",
+                side_effect=AssertionError("temporary file written"),
+            ),
+            patch(
+                "pdftopdfa.converter._make_temp_output_path",
+                side_effect=AssertionError("temporary file written"),
+            ),
+        ):
+            output, result = convert_to_pdfa_bytes(sample_pdf_bytes, level="2b")
+
+        assert result.success is True
+        assert result.level == "2b"
+        assert result.input_path is None
+        assert result.to_dict()["output_path"] is None
+        assert output.startswith(b"%PDF-1.7")
+        assert output.rstrip(b"\r\n").endswith(b"%%EOF")
+        with Pdf.open(io.BytesIO(output)) as pdf:
+            assert len(pdf.pages) == 1
+            assert "/OutputIntents" in pdf.Root
+
+    @pytest.mark.parametrize("wrap", ["memoryview", "bytearray", "file"])
+    def test_other_sources(self, sample_pdf_bytes: bytes, wrap: str) -> None:
+        """memoryview, bytearray and binary file objects are accepted."""
+        import io
+
+        source = {
+            "memoryview": memoryview(sample_pdf_bytes),
+            "bytearray": bytearray(sample_pdf_bytes),
+            "file": io.BytesIO(sample_pdf_bytes),
+        }[wrap]
+
+        output, result = convert_to_pdfa_bytes(source, level="3b")
+
+        assert result.success is True
+        assert output.startswith(b"%PDF-")
+
+    def test_invalid_bytes_raise(self) -> None:
+        """Data that is not a PDF raises ConversionError."""
+        with pytest.raises(ConversionError, match="PDF processing error"):
+            convert_to_pdfa_bytes(b"%PDF-1.4 this is not valid pdf content")
+
+    def test_resave_keeps_save_options(self, sample_pdf_bytes: bytes) -> None:
+        """The re-save for a missing binary comment uses the same options."""
+        from pdftopdfa import converter
+
+        with (
+            patch(
+                "pdftopdfa.converter._harden_saved_stream",
+                side_effect=[False, True],
+            ),
+            patch(
+                "pdftopdfa.converter._save_pdfa", wraps=converter._save_pdfa
+            ) as mock_save,
+        ):
+            output, _result = convert_to_pdfa_bytes(
+                sample_pdf_bytes,
+                level="2b",
+                compress_structure=True,
+                compression=CompressionProfile.FAST,
+            )
+
+        assert mock_save.call_count == 2
+        for call in mock_save.call_args_list:
+            assert call.kwargs["compress_structure"] is True
+            assert call.kwargs["compression"] is CompressionProfile.FAST
+        assert b"/ObjStm" in output
+
+
+class TestSingleOpen:
+    """The input is opened once and the output is not reopened."""
+
+    def test_conversion_opens_pdf_once(self, sample_pdf: Path, tmp_dir: Path) -> None:
+        """Pre-checks, conversion and post-save checks share one open."""
+        import pikepdf
+
+        with patch("pdftopdfa.converter.pikepdf.open", wraps=pikepdf.open) as mock_open:
+            result = convert_to_pdfa(sample_pdf, tmp_dir / "output.pdf", level="2b")
+
+        assert result.success is True
+        mock_open.assert_called_once_with(sample_pdf)
+
+    def test_output_is_read_once(self, sample_pdf: Path, tmp_dir: Path) -> None:
+        """Post-save hardening and verification read the saved file once."""
+        import builtins
+
+        output_path = tmp_dir / "output.pdf"
+        opened: list[str] = []
+        real_open = builtins.open
+
+        def _counting_open(file, *args, **kwargs):
+            if str(file).endswith(".tmp"):
+                opened.append(str(file))
+            return real_open(file, *args, **kwargs)
+
+        with patch("builtins.open", _counting_open):
+            convert_to_pdfa(sample_pdf, output_path, level="2b")
+
+        assert len(opened) == 1
+
+
+class TestCompressStructure:
+    """Tests for compress_structure (object streams and xref stream)."""
+
+    def test_writes_object_and_xref_streams(
+        self, sample_pdf: Path, tmp_dir: Path, caplog
+    ) -> None:
+        """The output uses object streams and still passes verification."""
+        import logging
+
+        import pikepdf
+
+        output_path = tmp_dir / "output.pdf"
+        with caplog.at_level(logging.WARNING):
+            result = convert_to_pdfa(
+                sample_pdf, output_path, level="2b", compress_structure=True
+            )
+
+        assert result.success is True
+        data = output_path.read_bytes()
+        assert b"/ObjStm" in data
+        assert b"/XRef" in data
+        assert b"\nxref\n" not in data
+        assert not any("Post-save verification" in r.message for r in caplog.records)
+        with pikepdf.open(output_path) as pdf:
+            assert len(pdf.pages) == 1
+
+    def test_default_writes_classic_xref(self, sample_pdf: Path, tmp_dir: Path) -> None:
+        """Without compress_structure no object streams are generated."""
+        output_path = tmp_dir / "output.pdf"
+
+        convert_to_pdfa(sample_pdf, output_path, level="2b")
+
+        assert b"/ObjStm" not in output_path.read_bytes()
+
+    def test_in_memory(self, sample_pdf_bytes: bytes) -> None:
+        """convert_to_pdfa_bytes() supports compress_structure too."""
+        output, result = convert_to_pdfa_bytes(
+            sample_pdf_bytes, level="3b", compress_structure=True
+        )
+
+        assert result.success is True
+        assert b"/ObjStm" in output
+
+    @pytest.mark.benchmark
+    def test_benchmark_form_heavy_document(self, tmp_dir: Path) -> None:
+        """Output size and save time of a form-heavy document in both modes."""
+        import pikepdf
+
+        from pdftopdfa.converter import _save_pdfa
+
+        pdf = Pdf.new()
+        fields = []
+        for page_no in range(40):
+            annots = []
+            for i in range(250):
+                appearance = pdf.make_stream(
+                    b"q 0 0 1 rg 0 0 10 10 re f Q",
+                    Type=Name.XObject,
+                    Subtype=Name.Form,
+                    BBox=Array([0, 0, 10, 10]),
+                )
+                widget = pdf.make_indirect(
+                    Dictionary(
+                        Type=Name.Annot,
+                        Subtype=Name.Widget,
+                        FT=Name.Tx,
+                        T=pikepdf.String(f"f{page_no}_{i}"),
+                        Rect=Array([10, i * 3, 20, i * 3 + 2]),
+                        F=4,
+                        AP=Dictionary(N=appearance),
+                        DA=pikepdf.String("/Helv 0 Tf 0 g"),
+                    )
+                )
+                annots.append(widget)
+                fields.append(widget)
+            pdf.pages.append(
+                pikepdf.Page(
+                    Dictionary(
+                        Type=Name.Page,
+                        MediaBox=Array([0, 0, 612, 792]),
+                        Annots=Array(annots),
+                    )
+                )
+            )
+        pdf.Root.AcroForm = Dictionary(Fields=Array(fields))
+        source = tmp_dir / "forms.pdf"
+        pdf.save(source)
+        pdf.close()
+
+        sizes = {}
+        for compress_structure in (False, True):
+            output_path = tmp_dir / f"out_{compress_structure}.pdf"
+            times = []
+            for _ in range(3):
+                with pikepdf.open(source) as opened:
+                    start = time.perf_counter()
+                    _save_pdfa(
+                        opened,
+                        output_path,
+                        "1.7",
+                        compress_structure=compress_structure,
+                    )
+                    times.append(time.perf_counter() - start)
+            _verify_file_structure(output_path, "1.7")
+            sizes[compress_structure] = output_path.stat().st_size
+            print(
+                f"\ncompress_structure={compress_structure}: "
+                f"{sizes[compress_structure] / 1024:.0f} KiB, "
+                f"best save {min(times) * 1000:.0f} ms"
+            )
+
+        assert sizes[True] < sizes[False]
+
+
+class TestCompressionOption:
+    """Tests for the compression profile of a conversion."""
+
+    @pytest.mark.parametrize("profile", list(CompressionProfile))
+    def test_every_profile_converts(
+        self, sample_pdf: Path, tmp_dir: Path, profile: CompressionProfile
+    ) -> None:
+        """Each profile produces a valid output and restores the Flate level."""
+        import pikepdf
+
+        output_path = tmp_dir / "output.pdf"
+
+        result = convert_to_pdfa(
+            sample_pdf, output_path, level="2b", compression=profile
+        )
+
+        assert result.success is True
+        assert flate_level() == DEFAULT_FLATE_LEVEL
+        with pikepdf.open(output_path) as pdf:
+            assert len(pdf.pages) == 1
+
+    def test_profile_part_of_cache_key(self, sample_pdf: Path, tmp_dir: Path) -> None:
+        """Outputs cached for one profile are not served for another."""
+        from pdftopdfa.result_cache import ResultCache
+
+        cache = ResultCache(tmp_dir / "cache", 2**30)
+        keys = {
+            _result_cache_key(
+                cache,
+                sample_pdf,
+                "2b",
+                validate=False,
+                ocr_languages=None,
+                ocr_quality=None,
+                ocr_preprocess=None,
+                ocr_force=False,
+                convert_calibrated=True,
+                compress_structure=False,
+                compression=profile,
+            )
+            for profile in (None, *CompressionProfile)
+        }
+
+        assert len(keys) == len(CompressionProfile)
+
+    def test_ocr_preprocess_part_of_cache_key(
+        self, sample_pdf: Path, tmp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Outputs cached for one preprocessing mode are not served for another."""
+        from pdftopdfa.ocr import OCR_PREPROCESS_ENV, OcrPreprocess
+        from pdftopdfa.result_cache import ResultCache
+
+        monkeypatch.delenv(OCR_PREPROCESS_ENV, raising=False)
+        cache = ResultCache(tmp_dir / "cache", 2**30)
+
+        def key(mode: OcrPreprocess | None) -> str:
+            return _result_cache_key(
+                cache,
+                sample_pdf,
+                "2b",
+                validate=False,
+                ocr_languages=["eng"],
+                ocr_quality=None,
+                ocr_preprocess=mode,
+                ocr_force=False,
+                convert_calibrated=True,
+                compress_structure=False,
+                compression=None,
+            )
+
+        keys = {mode: key(mode) for mode in OcrPreprocess}
+
+        assert len(set(keys.values())) == len(OcrPreprocess)
+        # An unset mode is keyed as the mode it resolves to
+        assert key(None) == keys[OcrPreprocess.AUTO]
+        monkeypatch.setenv(OCR_PREPROCESS_ENV, "median")
+        assert key(None) == keys[OcrPreprocess.MEDIAN]
+
+
+class TestEmbeddedLimits:
+    """Tests for the embedded_limits option."""
+
+    def test_limits_applied_to_conversion(
+        self, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """The limits are in effect while the document is converted."""
+        from pdftopdfa.sanitizers import files
+
+        seen: list[EmbeddedPdfLimits] = []
+
+        def record(pdf):
+            seen.append(files._embedded_scope.get())
+            return {"removed": 0, "kept": 0}
+
+        with patch(
+            "pdftopdfa.sanitizers.remove_non_compliant_embedded_files",
+            side_effect=record,
+        ):
+            result = convert_to_pdfa(
+                sample_pdf,
+                tmp_dir / "output.pdf",
+                level="2b",
+                embedded_limits=EmbeddedPdfLimits(max_depth=1, time_budget=5.0),
+            )
+
+        assert result.success is True
+        assert seen
+        assert seen[0].max_depth == 1
+        assert seen[0].time_budget == 5.0
+        assert files._embedded_scope.get().time_budget is None
+
+    def test_limits_part_of_cache_key(self, sample_pdf: Path, tmp_dir: Path) -> None:
+        """Outputs cached for other depth or time limits are not served."""
+        from pdftopdfa.result_cache import ResultCache
+
+        cache = ResultCache(tmp_dir / "cache", 2**30)
+
+        def key(limits: EmbeddedPdfLimits | None) -> str:
+            return _result_cache_key(
+                cache,
+                sample_pdf,
+                "2b",
+                validate=False,
+                ocr_languages=None,
+                ocr_quality=None,
+                ocr_preprocess=None,
+                ocr_force=False,
+                convert_calibrated=True,
+                compress_structure=False,
+                compression=None,
+                embedded_limits=limits,
+            )
+
+        assert key(EmbeddedPdfLimits(max_depth=0)) != key(None)
+        assert key(EmbeddedPdfLimits(time_budget=1.0)) != key(None)
+        # Unset limits are keyed as the defaults; workers are not keyed
+        assert key(EmbeddedPdfLimits(workers=4)) == key(None)
+
+    def test_deadline_stops_embedded_conversion(self, sample_pdf: Path) -> None:
+        """An embedded conversion past its deadline is abandoned."""
+        with pytest.raises(ConversionError, match="Time limit"):
+            _convert_embedded_pdf(
+                sample_pdf.read_bytes(), deadline=time.monotonic() - 1
+            )
+
+
+class TestHardenSavedFile:
+    """Tests for _harden_saved_file."""
+
+    def test_trailing_data_removed_and_verified(
+        self, sample_pdf: Path, tmp_dir: Path, caplog
+    ) -> None:
+        """Trailing data is truncated and the trailer /ID is found."""
+        import logging
+
+        output = tmp_dir / "output.pdf"
+        convert_to_pdfa(sample_pdf, output, level="2b")
+        data = output.read_bytes()
+        output.write_bytes(data + b"junk")
+
+        with caplog.at_level(logging.WARNING):
+            _harden_saved_file(output, "1.7", verify=True)
+
+        assert output.read_bytes() == data
+        assert not any("Post-save verification" in r.message for r in caplog.records)
+
+    def test_missing_trailer_id_logs_warning(self, tmp_dir: Path, caplog) -> None:
+        """A trailer without /ID is reported."""
+        import logging
+
+        output = tmp_dir / "output.pdf"
+        output.write_bytes(
+            b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\nxref\n0 1\n0000000000 65535 f \n"
+            b"trailer\n<< /Size 1 >>\nstartxref\n23\n%%EOF\n"
+        )
+
+        with caplog.at_level(logging.WARNING):
+            _harden_saved_file(output, "1.7", verify=True)
+
+        assert any("/ID missing" in r.message for r in caplog.records)
+
+    def test_weak_binary_comment_patched_in_place(
+        self, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """A comment without high bytes is patched without re-saving."""
+        output = tmp_dir / "output.pdf"
+        convert_to_pdfa(sample_pdf, output, level="2b")
+        data = output.read_bytes()
+        first_nl = data.find(b"\n")
+        second_nl = data.find(b"\n", first_nl + 1)
+        weak = (
+            data[: first_nl + 2] + b"a" * (second_nl - first_nl - 2) + data[second_nl:]
+        )
+        output.write_bytes(weak + b"junk")
+
+        with patch("pdftopdfa.converter._ensure_binary_comment") as mock_resave:
+            _harden_saved_file(output, "1.7", verify=True)
+
+        mock_resave.assert_not_called()
+        assert output.read_bytes() == data
+
+
 class TestConvertFiles:
     """Tests for convert_files."""
 
@@ -780,6 +1362,76 @@ class TestConvertFiles:
         results = convert_files([])
         assert results == []
 
+    def test_convert_files_parallel(
+        self, tmp_dir: Path, sample_pdf_bytes: bytes
+    ) -> None:
+        """workers > 1 keeps input order, progress calls and error results."""
+        input_dir = tmp_dir / "input"
+        input_dir.mkdir()
+        output_dir = tmp_dir / "output"
+        output_dir.mkdir()
+
+        file_pairs: list[tuple[Path, Path]] = []
+        for name in ("a", "bad", "c", "d"):
+            in_path = input_dir / f"{name}.pdf"
+            in_path.write_bytes(b"not a pdf" if name == "bad" else sample_pdf_bytes)
+            file_pairs.append((in_path, output_dir / f"{name}_pdfa.pdf"))
+
+        progress_calls: list[int] = []
+        results = convert_files(
+            file_pairs,
+            workers=2,
+            on_progress=lambda idx, total, name: progress_calls.append(idx),
+        )
+
+        assert [r.input_path for r in results] == [p[0] for p in file_pairs]
+        assert [r.success for r in results] == [True, False, True, True]
+        assert results[1].error is not None
+        assert progress_calls == [0, 1, 2, 3]
+        assert all(p[1].exists() for i, p in enumerate(file_pairs) if i != 1)
+
+    def test_iter_convert_files_consumes_lazily(
+        self, tmp_dir: Path, sample_pdf_bytes: bytes
+    ) -> None:
+        """iter_convert_files() accepts a generator and yields as it goes."""
+        in_path = tmp_dir / "test.pdf"
+        in_path.write_bytes(sample_pdf_bytes)
+        produced: list[int] = []
+
+        def pairs():
+            for i in range(3):
+                produced.append(i)
+                yield in_path, tmp_dir / f"out{i}.pdf"
+
+        results = iter_convert_files(pairs())
+
+        assert next(results).output_path == tmp_dir / "out0.pdf"
+        assert produced == [0]
+        assert [r.success for r in results] == [True, True]
+
+    def test_result_to_dict(self, tmp_dir: Path) -> None:
+        """ConversionResult.to_dict() is JSON-serializable."""
+        import json
+
+        result = ConversionResult(
+            success=True,
+            input_path=tmp_dir / "in.pdf",
+            output_path=tmp_dir / "out.pdf",
+            level="3b",
+            warnings=["w"],
+        )
+
+        data = json.loads(json.dumps(result.to_dict()))
+
+        assert data["input_path"] == str(tmp_dir / "in.pdf")
+        assert data["warnings"] == ["w"]
+        assert data["error"] is None
+
+    def test_convert_files_invalid_workers(self) -> None:
+        """workers must be positive."""
+        with pytest.raises(ValueError):
+            convert_files([], workers=0)
+
 
 class TestVerifyFileStructure:
     """Tests for _verify_file_structure."""
@@ -901,6 +1553,19 @@ class TestTruncateTrailingData:
         f.write_bytes(b"%PDF-1.7\nsome content\n")
         assert _truncate_trailing_data(f) is False
 
+    def test_comment_patched_without_moving_objects(
+        self, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """A comment line with too few high bytes is overwritten in place."""
+        output = tmp_dir / "output.pdf"
+        convert_to_pdfa(sample_pdf, output, level="2b")
+        data = output.read_bytes()
+        first_nl = data.find(b"\n")
+        output.write_bytes(data[: first_nl + 2] + b"abcd" + data[first_nl + 6 :])
+
+        assert _ensure_binary_comment(output, "1.7") is True
+        assert output.read_bytes() == data
+
     def test_nonexistent_file_returns_false(self, tmp_dir: Path) -> None:
         """Non-existent file returns False."""
         f = tmp_dir / "missing.pdf"
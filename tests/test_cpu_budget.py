@@ -0,0 +1,129 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Tests for the CPU budget shared by batch workers and OCR."""
+
+import multiprocessing
+import threading
+
+import pytest
+
+from pdftopdfa.cpu_budget import (
+    CPU_LIMIT_ENV,
+    cpu_limit,
+    get_cpu_limit,
+    reclaim,
+    reserve,
+    task_token,
+    use_shared_pool,
+)
+
+
+class TestCpuLimit:
+    """Tests for get_cpu_limit() and cpu_limit()."""
+
+    def test_default_is_cpu_count(self, monkeypatch) -> None:
+        monkeypatch.delenv(CPU_LIMIT_ENV, raising=False)
+        monkeypatch.setattr("os.cpu_count", lambda: 6)
+        assert get_cpu_limit() == 6
+
+    def test_environment(self, monkeypatch) -> None:
+        monkeypatch.setenv(CPU_LIMIT_ENV, "3")
+        assert get_cpu_limit() == 3
+
+    @pytest.mark.parametrize("value", ["many", "0", "-2"])
+    def test_invalid_environment_ignored(self, monkeypatch, value) -> None:
+        monkeypatch.setenv(CPU_LIMIT_ENV, value)
+        monkeypatch.setattr("os.cpu_count", lambda: 6)
+        assert get_cpu_limit() == 6
+
+    def test_context_overrides_and_restores(self, monkeypatch) -> None:
+        monkeypatch.setenv(CPU_LIMIT_ENV, "3")
+        with cpu_limit(2):
+            assert get_cpu_limit() == 2
+        assert get_cpu_limit() == 3
+
+    def test_rejects_zero(self) -> None:
+        with pytest.raises(ValueError):
+            with cpu_limit(0):
+                pass
+
+
+class TestReserve:
+    """Tests for reserve() and task_token()."""
+
+    def test_takes_free_tokens_up_to_wanted(self) -> None:
+        with cpu_limit(4):
+            with reserve(3) as jobs:
+                assert jobs == 3
+            with reserve(10) as jobs:
+                assert jobs == 4
+
+    def test_task_token_counts_towards_reservation(self) -> None:
+        with cpu_limit(4):
+            with task_token(), reserve(10) as jobs:
+                assert jobs == 4
+
+    def test_concurrent_jobs_share_the_budget(self) -> None:
+        reserved = threading.Event()
+        done = threading.Event()
+
+        def run() -> None:
+            with reserve(3):
+                reserved.set()
+                done.wait(5)
+
+        with cpu_limit(4):
+            thread = threading.Thread(target=run)
+            thread.start()
+            reserved.wait(5)
+            with reserve(3) as jobs:
+                assert jobs == 1
+            done.set()
+            thread.join(5)
+            with reserve(4) as jobs:
+                assert jobs == 4
+
+    def test_waits_for_a_token(self) -> None:
+        reserved: list[int] = []
+
+        def run() -> None:
+            with reserve(2) as jobs:
+                reserved.append(jobs)
+
+        with cpu_limit(1):
+            with task_token():
+                thread = threading.Thread(target=run)
+                thread.start()
+                thread.join(0.2)
+                assert thread.is_alive()
+            thread.join(5)
+
+        assert reserved == [1]
+
+
+class TestReclaim:
+    """Tests for the held-token counter and reclaim()."""
+
+    def test_shared_pool_tokens_are_counted(self) -> None:
+        ctx = multiprocessing.get_context("spawn")
+        held = ctx.Value("i", 0)
+        use_shared_pool(ctx.BoundedSemaphore(3), held)
+        try:
+            with reserve(2):
+                assert held.value == 2
+            assert held.value == 0
+        finally:
+            use_shared_pool(None)
+
+    def test_reclaim_releases_recorded_tokens(self) -> None:
+        ctx = multiprocessing.get_context("spawn")
+        pool = ctx.BoundedSemaphore(2)
+        held = ctx.Value("i", 2)
+        pool.acquire()
+        pool.acquire()
+
+        assert reclaim(pool, held) == 2
+        assert held.value == 0
+        assert pool.acquire(False) and pool.acquire(False)
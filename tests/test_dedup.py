@@ -0,0 +1,144 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Tests for stream deduplication before saving."""
+
+from io import BytesIO
+
+import pikepdf
+from conftest import new_pdf
+from pikepdf import Array, Dictionary, Name, Pdf, Stream
+
+from pdftopdfa.color_profile import get_srgb_profile
+from pdftopdfa.dedup import deduplicate_streams
+
+
+def _make_pdf(pages: int = 2) -> Pdf:
+    pdf = new_pdf()
+    for _ in range(pages):
+        pdf.pages.append(
+            pikepdf.Page(Dictionary(Type=Name.Page, MediaBox=Array([0, 0, 612, 792])))
+        )
+    return pdf
+
+
+def _icc_stream(pdf: Pdf) -> Stream:
+    stream = pdf.make_stream(get_srgb_profile())
+    stream.N = 3
+    stream.Alternate = Name.DeviceRGB
+    return stream
+
+
+def _image(pdf: Pdf, data: bytes = b"\x00\xff", colorspace=None) -> Stream:
+    image = pdf.make_stream(data)
+    image.Type = Name.XObject
+    image.Subtype = Name.Image
+    image.Width = len(data)
+    image.Height = 1
+    image.BitsPerComponent = 8
+    image.ColorSpace = colorspace if colorspace is not None else Name.DeviceGray
+    return image
+
+
+def _saved_size(pdf: Pdf) -> int:
+    buf = BytesIO()
+    pdf.save(buf)
+    return len(buf.getvalue())
+
+
+class TestDeduplicateStreams:
+    """Tests for deduplicate_streams()."""
+
+    def test_identical_icc_profiles_share_one_stream(self) -> None:
+        pdf = _make_pdf()
+        for page in pdf.pages:
+            page.Resources = Dictionary(
+                ColorSpace=Dictionary(CS0=Array([Name.ICCBased, _icc_stream(pdf)]))
+            )
+        size_before = _saved_size(pdf)
+
+        assert deduplicate_streams(pdf) == 1
+
+        first = pdf.pages[0].Resources.ColorSpace.CS0[1]
+        second = pdf.pages[1].Resources.ColorSpace.CS0[1]
+        assert first.objgen == second.objgen
+        assert _saved_size(pdf) < size_before - len(get_srgb_profile()) // 2
+
+    def test_identical_font_programs_share_one_stream(self) -> None:
+        pdf = _make_pdf()
+        programs = []
+        for page in pdf.pages:
+            program = pdf.make_stream(b"\x00\x01\x00\x00 font data")
+            program.Length1 = 16
+            descriptor = pdf.make_indirect(
+                Dictionary(Type=Name.FontDescriptor, FontFile2=program)
+            )
+            font = pdf.make_indirect(
+                Dictionary(
+                    Type=Name.Font,
+                    Subtype=Name.TrueType,
+                    BaseFont=Name.Arial,
+                    FontDescriptor=descriptor,
+                )
+            )
+            page.Resources = Dictionary(Font=Dictionary(F1=font))
+            programs.append(program)
+
+        assert deduplicate_streams(pdf) == 1
+
+        descriptors = [page.Resources.Font.F1.FontDescriptor for page in pdf.pages]
+        assert descriptors[0].FontFile2.objgen == programs[0].objgen
+        assert descriptors[1].FontFile2.objgen == programs[0].objgen
+
+    def test_images_referencing_merged_profiles_are_merged(self) -> None:
+        pdf = _make_pdf()
+        images = [
+            _image(pdf, colorspace=Array([Name.ICCBased, _icc_stream(pdf)]))
+            for _ in pdf.pages
+        ]
+        for page, image in zip(pdf.pages, images, strict=True):
+            page.Resources = Dictionary(XObject=Dictionary(Im0=image))
+
+        assert deduplicate_streams(pdf) == 2
+
+        assert (
+            pdf.pages[0].Resources.XObject.Im0.objgen
+            == pdf.pages[1].Resources.XObject.Im0.objgen
+        )
+
+    def test_different_data_or_dictionary_not_merged(self) -> None:
+        pdf = _make_pdf(pages=3)
+        pdf.pages[0].Resources = Dictionary(XObject=Dictionary(Im0=_image(pdf)))
+        pdf.pages[1].Resources = Dictionary(
+            XObject=Dictionary(Im0=_image(pdf, b"\xff\x00"))
+        )
+        interpolated = _image(pdf)
+        interpolated.Interpolate = True
+        pdf.pages[2].Resources = Dictionary(XObject=Dictionary(Im0=interpolated))
+
+        assert deduplicate_streams(pdf) == 0
+
+        objgens = {page.Resources.XObject.Im0.objgen for page in pdf.pages}
+        assert len(objgens) == 3
+
+    def test_content_streams_untouched(self) -> None:
+        pdf = _make_pdf()
+        for page in pdf.pages:
+            page.Contents = pdf.make_stream(b"q Q")
+
+        assert deduplicate_streams(pdf) == 0
+        assert pdf.pages[0].Contents.objgen != pdf.pages[1].Contents.objgen
+
+    def test_output_still_opens(self) -> None:
+        pdf = _make_pdf()
+        for page in pdf.pages:
+            page.Resources = Dictionary(XObject=Dictionary(Im0=_image(pdf)))
+        deduplicate_streams(pdf)
+
+        buf = BytesIO()
+        pdf.save(buf)
+        with pikepdf.open(BytesIO(buf.getvalue())) as reopened:
+            images = [page.Resources.XObject.Im0 for page in reopened.pages]
+            assert images[0].objgen == images[1].objgen
+            assert bytes(images[1].read_bytes()) == b"\x00\xff"
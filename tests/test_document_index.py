@@ -0,0 +1,202 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Tests for the shared document object index."""
+
+import pikepdf
+from conftest import new_pdf
+from pikepdf import Array, Dictionary, Name, Pdf, Stream
+
+from pdftopdfa.document_index import (
+    DocumentIndex,
+    document_index,
+    get_document_index,
+)
+
+
+def _objgens(objects) -> list[tuple[int, int]]:
+    return [obj.objgen for obj in objects]
+
+
+def _make_pdf() -> Pdf:
+    pdf = new_pdf()
+    pdf.pages.append(
+        pikepdf.Page(Dictionary(Type=Name.Page, MediaBox=Array([0, 0, 612, 792])))
+    )
+    return pdf
+
+
+class TestClassification:
+    """Tests for object classification."""
+
+    def test_streams_by_filter_chain(self) -> None:
+        pdf = _make_pdf()
+        lzw = pdf.make_indirect(
+            Stream(pdf, b"x", Dictionary(Filter=Array([Name("/LZW"), Name.Fl])))
+        )
+        flate = pdf.make_indirect(Stream(pdf, b"y", Dictionary(Filter=Name.Fl)))
+
+        index = DocumentIndex(pdf)
+
+        assert _objgens(index.iter_streams_with_filter("/LZWDecode")) == [lzw.objgen]
+        assert _objgens(index.iter_streams_with_filter("/FlateDecode")) == [
+            lzw.objgen,
+            flate.objgen,
+        ]
+        assert index.filter_chain(lzw) == ("/LZWDecode", "/FlateDecode")
+        assert _objgens(index.iter_noncanonical_filter_streams()) == [
+            lzw.objgen,
+            flate.objgen,
+        ]
+
+    def test_images_forms_and_content_streams(self) -> None:
+        pdf = _make_pdf()
+        image = pdf.make_indirect(Stream(pdf, b"\x00", Dictionary(Subtype=Name.Image)))
+        form = pdf.make_indirect(Stream(pdf, b"", Dictionary(Subtype=Name.Form)))
+        content = pdf.make_indirect(Stream(pdf, b"q Q"))
+        font_file = pdf.make_indirect(Stream(pdf, b"\x00", Dictionary(Length1=1)))
+
+        index = DocumentIndex(pdf)
+
+        assert _objgens(index.iter_images()) == [image.objgen]
+        assert _objgens(index.iter_forms()) == [form.objgen]
+        content_objgens = _objgens(index.iter_content_streams())
+        assert form.objgen in content_objgens
+        assert content.objgen in content_objgens
+        assert font_file.objgen not in content_objgens
+        assert image.objgen not in content_objgens
+
+    def test_dictionary_categories(self) -> None:
+        pdf = _make_pdf()
+        font = pdf.make_indirect(
+            Dictionary(Type=Name.Font, Subtype=Name.Type1, BaseFont=Name.Helvetica)
+        )
+        annot = pdf.make_indirect(
+            Dictionary(Type=Name.Annot, Subtype=Name.Link, Rect=[0, 0, 1, 1])
+        )
+        filespec = pdf.make_indirect(Dictionary(Type=Name.Filespec, F="a.txt"))
+        sig = pdf.make_indirect(
+            Dictionary(Type=Name.Sig, Filter=Name("/Adobe.PPKLite"))
+        )
+        meta_stream = pdf.make_indirect(
+            Stream(pdf, b"<x/>", Dictionary(Type=Name.Metadata, Subtype=Name.XML))
+        )
+        owner = pdf.make_indirect(Dictionary(Metadata=meta_stream))
+        pdf.pages[0].obj[Name.Annots] = Array([annot])
+
+        index = DocumentIndex(pdf)
+
+        assert _objgens(index.iter_fonts()) == [font.objgen]
+        assert _objgens(index.iter_annotations()) == [annot.objgen]
+        assert pdf.pages[0].obj.objgen in _objgens(index.iter_annotation_owners())
+        assert _objgens(index.iter_filespecs()) == [filespec.objgen]
+        assert _objgens(index.iter_signature_candidates()) == [sig.objgen]
+        assert _objgens(index.iter_metadata_streams()) == [meta_stream.objgen]
+        assert _objgens(index.iter_metadata_owners()) == [owner.objgen]
+
+    def test_external_stream_keys(self) -> None:
+        pdf = _make_pdf()
+        external = pdf.make_indirect(Stream(pdf, b"", Dictionary(F="data.bin")))
+        pdf.make_indirect(Stream(pdf, b"plain"))
+
+        index = DocumentIndex(pdf)
+
+        assert _objgens(index.iter_external_streams()) == [external.objgen]
+
+    def test_object_count_includes_scalars(self) -> None:
+        pdf = _make_pdf()
+        pdf.make_indirect(pikepdf.Object.parse(b"42"))
+
+        index = DocumentIndex(pdf)
+
+        assert index.object_count == len(pdf.objects)
+        assert len(index) == index.object_count - 1
+
+
+class TestIncrementalUpdates:
+    """Tests for sync(), refresh() and discard()."""
+
+    def test_sync_picks_up_new_objects(self) -> None:
+        pdf = _make_pdf()
+        index = DocumentIndex(pdf)
+        assert list(index.iter_images()) == []
+
+        image = pdf.make_indirect(Stream(pdf, b"\x00", Dictionary(Subtype=Name.Image)))
+
+        assert _objgens(index.iter_images()) == [image.objgen]
+        assert index.sync() == 0
+
+    def test_refresh_reclassifies_rewritten_stream(self) -> None:
+        pdf = _make_pdf()
+        stream = pdf.make_indirect(Stream(pdf, b"x", Dictionary(Filter=Name.LZWDecode)))
+        index = DocumentIndex(pdf)
+        assert _objgens(index.iter_streams_with_filter("/LZWDecode")) == [stream.objgen]
+
+        del stream[Name.Filter]
+        index.refresh(stream)
+
+        assert list(index.iter_streams_with_filter("/LZWDecode")) == []
+        assert stream.objgen in _objgens(index.iter_streams())
+
+    def test_discard_drops_object(self) -> None:
+        pdf = _make_pdf()
+        filespec = pdf.make_indirect(Dictionary(Type=Name.Filespec, F="a.txt"))
+        index = DocumentIndex(pdf)
+
+        index.discard(filespec)
+
+        assert list(index.iter_filespecs()) == []
+
+    def test_iteration_is_a_snapshot(self) -> None:
+        pdf = _make_pdf()
+        pdf.make_indirect(Stream(pdf, b"a"))
+        index = DocumentIndex(pdf)
+
+        seen = []
+        for stream in index.iter_streams():
+            seen.append(stream.objgen)
+            if len(seen) == 1:
+                pdf.make_indirect(Stream(pdf, b"b"))
+
+        assert len(seen) == 1
+        assert len(list(index.iter_streams())) == 2
+
+
+class TestActiveScope:
+    """Tests for document_index() and get_document_index()."""
+
+    def test_active_index_is_shared(self) -> None:
+        pdf = _make_pdf()
+        with document_index(pdf) as index:
+            assert get_document_index(pdf) is index
+            with document_index(pdf) as inner:
+                assert inner is index
+            assert get_document_index(pdf) is index
+
+        assert get_document_index(pdf) is not index
+
+    def test_index_is_per_pdf(self) -> None:
+        pdf_a = _make_pdf()
+        pdf_b = _make_pdf()
+        with document_index(pdf_a) as index:
+            assert get_document_index(pdf_b) is not index
+            assert get_document_index(pdf_b).pdf is pdf_b
+
+    def test_sanitize_for_pdfa_builds_one_index(self, monkeypatch) -> None:
+        from pdftopdfa import document_index as module
+        from pdftopdfa.sanitizers import sanitize_for_pdfa
+
+        builds = []
+        original_init = module.DocumentIndex.__init__
+
+        def counting_init(self, pdf):
+            builds.append(pdf)
+            original_init(self, pdf)
+
+        monkeypatch.setattr(module.DocumentIndex, "__init__", counting_init)
+        pdf = _make_pdf()
+
+        sanitize_for_pdfa(pdf, "3b")
+
+        assert len(builds) == 1
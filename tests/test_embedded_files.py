@@ -4,20 +4,24 @@
 
 """Tests for selective embedded file removal (PDF/A-2 compliance)."""
 
+import time
 from io import BytesIO
 from unittest.mock import patch
 
 import pikepdf
+import pytest
 from conftest import new_pdf
 from pikepdf import Array, Dictionary, Name, Pdf
 
 from pdftopdfa.sanitizers import sanitize_for_pdfa
 from pdftopdfa.sanitizers.files import (
+    EmbeddedPdfLimits,
     _is_pdfa_compliant_embedded,
     _iter_all_filespecs,
     _iter_all_filespecs_by_scan,
     _iter_name_tree_pairs,
     _iter_name_tree_values,
+    embedded_pdf_limits,
     ensure_af_relationships,
     ensure_embedded_file_params,
     ensure_embedded_file_subtypes,
@@ -437,6 +441,142 @@ class TestConvertNonCompliantEmbeddedFiles:
         assert isinstance(result["embedded_files_converted"], int)
 
 
+def _make_pdf_with_embedded_files(files: dict[str, bytes]) -> Pdf:
+    """Create a PDF with one embedded file per (filename, data) entry."""
+    pdf = new_pdf()
+    pdf.pages.append(pikepdf.Page(Dictionary(Type=Name.Page)))
+
+    entries: list[object] = []
+    for filename, data in sorted(files.items()):
+        ef_stream = pdf.make_stream(data)
+        file_spec = Dictionary(
+            Type=Name.Filespec,
+            F=filename,
+            UF=filename,
+            EF=Dictionary(F=ef_stream, UF=ef_stream),
+        )
+        entries += [filename, file_spec]
+    pdf.Root.Names = Dictionary(EmbeddedFiles=Dictionary(Names=Array(entries)))
+    return pdf
+
+
+def _plain_pdf_bytes() -> bytes:
+    """Create a minimal PDF without PDF/A metadata and return as bytes."""
+    pdf = new_pdf()
+    pdf.pages.append(pikepdf.Page(Dictionary(Type=Name.Page)))
+    buf = BytesIO()
+    pdf.save(buf)
+    return buf.getvalue()
+
+
+class TestEmbeddedPdfLimits:
+    """Tests for deduplication and limits of embedded PDF conversion."""
+
+    def test_identical_payloads_converted_once(self) -> None:
+        """Identical embedded PDFs are converted once and all updated."""
+        payload = b"%PDF-1.4 same content"
+        pdf = _make_pdf_with_embedded_files(
+            {"a.pdf": payload, "b.pdf": payload, "c.pdf": b"%PDF-1.4 other"}
+        )
+
+        with patch(_TRY_CONVERT, return_value=b"%PDF-1.7 converted") as mock_convert:
+            result = remove_non_compliant_embedded_files(pdf)
+
+        assert result["converted"] == 3
+        assert mock_convert.call_count == 2
+
+    def test_real_pdf_converted_in_memory(self) -> None:
+        """A non-compliant embedded PDF is converted without temp files."""
+        pdf = _make_pdf_with_embedded(_plain_pdf_bytes(), "doc.pdf")
+
+        with patch(
+            "pdftopdfa.sanitizers.files.tempfile.NamedTemporaryFile",
+            side_effect=AssertionError("temporary file written"),
+        ):
+            result = remove_non_compliant_embedded_files(pdf)
+
+        assert result["converted"] == 1
+        filespec = _resolve_indirect(pdf.Root.Names.EmbeddedFiles.Names[1])
+        data = bytes(filespec.EF.UF.read_bytes())
+        with pikepdf.open(BytesIO(data)) as converted:
+            assert "/OutputIntents" in converted.Root
+
+    def test_depth_zero_removes_instead_of_converting(self) -> None:
+        """With max_depth=0 non-compliant embedded PDFs are removed."""
+        pdf = _make_pdf_with_embedded(b"%PDF-1.4 non-compliant", "doc.pdf")
+
+        with embedded_pdf_limits(max_depth=0), patch(_TRY_CONVERT) as mock_convert:
+            result = remove_non_compliant_embedded_files(pdf)
+
+        mock_convert.assert_not_called()
+        assert result["removed"] == 1
+        assert result["converted"] == 0
+
+    def test_nested_conversion_sees_increased_depth(self) -> None:
+        """Attachments of an attachment are not converted past max_depth."""
+        seen: list[bool] = []
+
+        def convert(data: bytes) -> bytes | None:
+            inner = _make_pdf_with_embedded(b"%PDF-1.4 inner", "inner.pdf")
+            seen.append(remove_non_compliant_embedded_files(inner)["converted"] == 1)
+            return b"%PDF-1.7 converted"
+
+        pdf = _make_pdf_with_embedded(b"%PDF-1.4 outer", "outer.pdf")
+        with embedded_pdf_limits(max_depth=1), patch(_TRY_CONVERT, side_effect=convert):
+            result = remove_non_compliant_embedded_files(pdf)
+
+        assert result["converted"] == 1
+        assert seen == [False]
+
+    def test_exhausted_time_budget_stops_conversion(self) -> None:
+        """Once the time budget is spent, remaining attachments are removed."""
+        pdf = _make_pdf_with_embedded_files(
+            {"a.pdf": b"%PDF-1.4 first", "b.pdf": b"%PDF-1.4 second"}
+        )
+
+        with (
+            embedded_pdf_limits(time_budget=10.0),
+            patch("pdftopdfa.sanitizers.files.time.monotonic") as mock_time,
+            patch(_TRY_CONVERT, return_value=b"%PDF-1.7 converted") as mock_convert,
+        ):
+            mock_time.side_effect = [0.0, 1.0, 20.0]
+            result = remove_non_compliant_embedded_files(pdf)
+
+        assert mock_convert.call_count == 1
+        assert result["converted"] == 1
+        assert result["removed"] == 1
+
+    def test_conversion_gets_budget_deadline(self) -> None:
+        """The conversion itself is given the deadline of the time budget."""
+        pdf = _make_pdf_with_embedded(b"%PDF-1.4 non-compliant", "doc.pdf")
+        deadlines: list[float | None] = []
+
+        def convert(data: bytes, level: str, *, deadline: float | None) -> bytes:
+            deadlines.append(deadline)
+            return b"%PDF-1.7 converted"
+
+        with (
+            embedded_pdf_limits(time_budget=10.0),
+            patch("pdftopdfa.converter._convert_embedded_pdf", side_effect=convert),
+        ):
+            start = time.monotonic()
+            result = remove_non_compliant_embedded_files(pdf)
+
+        assert result["converted"] == 1
+        assert len(deadlines) == 1
+        assert start < deadlines[0] <= time.monotonic() + 10.0
+
+    @pytest.mark.parametrize(
+        "kwargs", [{"max_depth": -1}, {"time_budget": 0}, {"workers": 0}]
+    )
+    def test_invalid_limits_rejected(self, kwargs: dict) -> None:
+        """Out-of-range limits raise ValueError."""
+        with pytest.raises(ValueError), embedded_pdf_limits(**kwargs):
+            pass
+        with pytest.raises(ValueError):
+            EmbeddedPdfLimits(**kwargs)
+
+
 # --- Integration tests for sanitize_for_pdfa ---
 
 
@@ -4,8 +4,11 @@
 
 """Tests for filter conversion and external stream key removal in PDF/A sanitization."""
 
+import io
+import re
 import zlib
 from collections.abc import Generator
+from unittest.mock import patch
 
 import pikepdf
 import pytest
@@ -20,6 +23,7 @@ from pdftopdfa.sanitizers.filters import (
     _has_lzw_filter,
     _remove_crypt_stream,
     convert_lzw_streams,
+    fix_mismatched_stream_lengths,
     fix_stream_lengths,
     remove_crypt_streams,
     remove_external_stream_keys,
@@ -643,6 +647,87 @@ class TestFixStreamLengths:
             assert page_contents.read_bytes() == data
 
 
+def _reopen_with_wrong_length(pdf: Pdf, payload: bytes, delta: int = -3) -> Pdf:
+    """Save *pdf* and reopen it with the /Length of *payload* off by *delta*."""
+    buffer = io.BytesIO()
+    pdf.save(
+        buffer,
+        compress_streams=False,
+        object_stream_mode=pikepdf.ObjectStreamMode.disable,
+    )
+    pattern = rb"/Length (\d+)(?=[^\n]*>>\nstream\n" + re.escape(payload) + rb")"
+    patched, count = re.subn(
+        pattern,
+        lambda match: b"/Length %d" % (int(match.group(1)) + delta),
+        buffer.getvalue(),
+    )
+    assert count == 1
+    return pikepdf.open(io.BytesIO(patched))
+
+
+class TestFixMismatchedStreamLengths:
+    """Tests for fix_mismatched_stream_lengths."""
+
+    def test_in_memory_streams_not_checked(self, pdf: Pdf) -> None:
+        pdf.make_indirect(Stream(pdf, b"hello world"))
+        result = fix_mismatched_stream_lengths(pdf)
+        assert result == {"stream_lengths_checked": 0, "stream_lengths_fixed": 0}
+
+    def test_correct_lengths_not_rewritten(self, pdf: Pdf) -> None:
+        stream = pdf.make_indirect(Stream(pdf, b"0 0 m 10 10 l S"))
+        pdf.pages[0][Name("/Contents")] = stream
+        reopened = _reopen_with_wrong_length(pdf, b"0 0 m", delta=0)
+        result = fix_mismatched_stream_lengths(reopened)
+        assert result["stream_lengths_checked"] == 1
+        assert result["stream_lengths_fixed"] == 0
+
+    def test_wrong_length_fixed(self, pdf: Pdf, tmp_path) -> None:
+        data = b"BT /F1 12 Tf (Hello) Tj ET"
+        stream = pdf.make_indirect(Stream(pdf, data))
+        pdf.pages[0][Name("/Contents")] = stream
+        other = pdf.make_indirect(Stream(pdf, b"untouched"))
+        pdf.pages[0][Name("/Extra")] = other
+        reopened = _reopen_with_wrong_length(pdf, data)
+
+        result = fix_mismatched_stream_lengths(reopened)
+
+        assert result == {"stream_lengths_checked": 2, "stream_lengths_fixed": 1}
+        out = tmp_path / "out.pdf"
+        reopened.save(str(out))
+        with pikepdf.open(out) as final:
+            contents = final.pages[0]["/Contents"]
+            assert contents.read_bytes().strip() == data
+            assert int(contents["/Length"]) == len(contents.read_raw_bytes())
+
+    def test_image_stream_keeps_encoding(self, pdf: Pdf) -> None:
+        jpeg = b"\xff\xd8\xff\xe0 not really a jpeg \xff\xd9"
+        stream = pdf.make_indirect(
+            Stream(pdf, jpeg, Dictionary(Filter=Name("/DCTDecode")))
+        )
+        pdf.pages[0][Name("/Image")] = stream
+        reopened = _reopen_with_wrong_length(pdf, jpeg)
+
+        result = fix_mismatched_stream_lengths(reopened)
+
+        assert result["stream_lengths_fixed"] == 1
+        fixed = reopened.pages[0]["/Image"]
+        assert fixed["/Filter"] == Name("/DCTDecode")
+        assert fixed.read_raw_bytes().startswith(jpeg)
+
+    def test_without_xref_table_api(self, pdf: Pdf) -> None:
+        """pikepdf before 10.9 has no get_xref_table(); /Size bounds the file."""
+        data = b"BT /F1 12 Tf (Hello) Tj ET"
+        stream = pdf.make_indirect(Stream(pdf, data))
+        pdf.pages[0][Name("/Contents")] = stream
+        reopened = _reopen_with_wrong_length(pdf, data)
+        reopened.make_indirect(Stream(reopened, b"created in memory"))
+
+        with patch.object(Pdf, "get_xref_table", None):
+            result = fix_mismatched_stream_lengths(reopened)
+
+        assert result == {"stream_lengths_checked": 1, "stream_lengths_fixed": 1}
+
+
 # --- sanitize_nonstandard_inline_filters tests ---
 
 
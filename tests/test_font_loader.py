@@ -0,0 +1,196 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Tests for the process-wide bundled font cache."""
+
+import threading
+
+import pytest
+from conftest import new_pdf
+from pikepdf import Dictionary, Name
+
+from pdftopdfa.fonts.embedder import FontEmbedder
+from pdftopdfa.fonts.loader import (
+    BundledFontCache,
+    FontLoader,
+    bundled_font_derived,
+    get_bundled_font_cache,
+)
+
+
+@pytest.fixture
+def bundled_cache():
+    cache = get_bundled_font_cache()
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+class TestBundledFontCache:
+    """Tests for BundledFontCache."""
+
+    def test_font_is_loaded_once(self) -> None:
+        cache = BundledFontCache()
+        calls = []
+
+        def load() -> bytes:
+            calls.append(1)
+            return b"font"
+
+        first = cache.get("a.ttf", load)
+        second = cache.get("a.ttf", load)
+
+        assert first is second
+        assert len(calls) == 1
+        assert (cache.loads, cache.hits) == (1, 1)
+
+    def test_least_recently_used_font_is_evicted(self) -> None:
+        cache = BundledFontCache(max_entries=2)
+        cache.get("a", lambda: b"a")
+        cache.get("b", lambda: b"b")
+        cache.get("a", lambda: b"a")
+        cache.get("c", lambda: b"c")
+
+        assert len(cache) == 2
+        cache.get("a", lambda: b"a")
+        cache.get("b", lambda: b"b")
+        assert cache.loads == 4
+
+    def test_concurrent_callers_load_once(self) -> None:
+        cache = BundledFontCache()
+        barrier = threading.Barrier(8)
+        fonts = []
+
+        def worker() -> None:
+            barrier.wait()
+            fonts.append(cache.get("a.ttf", lambda: b"font"))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert cache.loads == 1
+        assert all(font is fonts[0] for font in fonts)
+
+    def test_derived_value_is_copied(self) -> None:
+        font = BundledFontCache().get("a.ttf", lambda: b"font")
+        calls = []
+
+        def compute() -> list[int]:
+            calls.append(1)
+            return [1, 2, 3]
+
+        first = font.derived("widths", compute)
+        first.append(4)
+
+        assert font.derived("widths", compute) == [1, 2, 3]
+        assert len(calls) == 1
+
+    def test_derived_values_are_computed_outside_the_lock(self) -> None:
+        """A slow computation does not block other derived values."""
+        font = BundledFontCache().get("a.ttf", lambda: b"font")
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow() -> int:
+            started.set()
+            release.wait(5)
+            return 1
+
+        thread = threading.Thread(target=font.derived, args=("slow", slow))
+        thread.start()
+        started.wait(5)
+        try:
+            assert font.derived("fast", lambda: 2) == 2
+        finally:
+            release.set()
+            thread.join()
+        assert font.derived("slow", lambda: 3) == 1
+
+
+class TestFontLoader:
+    """FontLoader shares bundled fonts across instances."""
+
+    def test_loaders_share_font_bytes(self, bundled_cache) -> None:
+        first_data, first_font = FontLoader({}).load_standard14_font("Helvetica")
+        second_data, second_font = FontLoader({}).load_fallback_font()
+
+        assert first_data is second_data
+        assert first_font is not second_font
+        assert bundled_cache.loads == 1
+
+    def test_modifying_a_font_does_not_affect_other_loaders(
+        self, bundled_cache
+    ) -> None:
+        _, first = FontLoader({}).load_standard14_font("Helvetica")
+        cmap = first.getBestCmap()
+        glyph = cmap[ord("A")]
+        first["head"].unitsPerEm = 1000
+        cmap[ord("A")] = ".notdef"
+        first["hmtx"][glyph] = (0, 0)
+        first.close()
+
+        _, second = FontLoader({}).load_standard14_font("Helvetica")
+
+        assert second["head"].unitsPerEm == 2048
+        assert second.getBestCmap()[ord("A")] == glyph
+        assert second["hmtx"][glyph][0] > 0
+
+    def test_unbundled_data_is_not_memoized(self) -> None:
+        calls = []
+
+        def compute() -> int:
+            calls.append(1)
+            return 1
+
+        bundled_font_derived(b"other", "key", compute)
+        bundled_font_derived(b"other", "key", compute)
+
+        assert len(calls) == 2
+
+
+class TestEmbedderReuse:
+    """Embedding in several documents reads and measures the font once."""
+
+    @staticmethod
+    def _embed_helvetica() -> list:
+        pdf = new_pdf()
+        font = pdf.make_indirect(
+            Dictionary(Type=Name.Font, Subtype=Name.Type1, BaseFont=Name.Helvetica)
+        )
+        page = pdf.add_blank_page()
+        page.obj[Name.Resources] = Dictionary(Font=Dictionary(F1=font))
+        with FontEmbedder(pdf) as embedder:
+            assert embedder.embed_missing_fonts().fonts_embedded == ["Helvetica"]
+        return list(pdf.pages[0].Resources.Font.F1.Widths)
+
+    def test_metrics_are_computed_once(self, bundled_cache, monkeypatch) -> None:
+        from pdftopdfa.fonts.metrics import FontMetricsExtractor
+
+        calls = []
+        original = FontMetricsExtractor.extract_widths
+
+        def counting(self, tt_font):
+            calls.append(1)
+            return original(self, tt_font)
+
+        monkeypatch.setattr(FontMetricsExtractor, "extract_widths", counting)
+
+        first = self._embed_helvetica()
+        second = self._embed_helvetica()
+
+        assert first == second
+        assert len(calls) == 1
+        assert bundled_cache.loads == 1
+
+    def test_closing_an_embedder_keeps_bundled_fonts_usable(
+        self, bundled_cache
+    ) -> None:
+        self._embed_helvetica()
+        _, tt_font = FontLoader({}).load_standard14_font("Helvetica")
+
+        assert tt_font["head"].unitsPerEm == 2048
+        assert tt_font["glyf"] is not None
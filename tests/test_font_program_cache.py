@@ -0,0 +1,188 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Tests for the per-conversion font program cache."""
+
+from io import BytesIO
+
+import pikepdf
+from conftest import new_pdf
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.t2CharStringPen import T2CharStringPen
+from fontTools.ttLib import TTFont
+from fontTools.ttLib.tables._g_l_y_f import Glyph
+from pikepdf import Array, Dictionary, Name, Pdf
+
+from pdftopdfa.fonts.program_cache import (
+    FontProgramCache,
+    font_program_cache,
+    get_font_program_cache,
+    load_embedded_font_program,
+)
+from pdftopdfa.sanitizers.font_notdef import sanitize_font_notdef
+
+
+def _make_font_data(glyph_names: list[str], *, cff: bool = False) -> bytes:
+    """Builds a minimal TrueType (or CFF-flavoured OpenType) font."""
+    fb = FontBuilder(1000, isTTF=not cff)
+    fb.setupGlyphOrder(glyph_names)
+    fb.setupCharacterMap({ord("A"): "A"} if "A" in glyph_names else {})
+    if cff:
+        charstrings = {}
+        for name in glyph_names:
+            pen = T2CharStringPen(500, None)
+            charstrings[name] = pen.getCharString()
+        fb.setupCFF("TestFont", {}, charstrings, {})
+    else:
+        fb.setupGlyf({name: Glyph() for name in glyph_names})
+    fb.setupHorizontalMetrics(
+        {name: (500 + i, 0) for i, name in enumerate(glyph_names)}
+    )
+    fb.setupHorizontalHeader(ascent=800, descent=-200)
+    fb.setupNameTable({"familyName": "TestFont", "styleName": "Regular"})
+    fb.setupOS2()
+    fb.setupPost()
+    fb.setupHead(unitsPerEm=1000)
+    buf = BytesIO()
+    fb.font.save(buf)
+    return buf.getvalue()
+
+
+def _make_pdf(font_data: bytes, font_file_key: str = "/FontFile2") -> Pdf:
+    pdf = new_pdf()
+    fd = pdf.make_indirect(
+        Dictionary(Type=Name.FontDescriptor, FontName=Name("/TestFont"), Flags=32)
+    )
+    fd[Name(font_file_key)] = pdf.make_stream(font_data)
+    font = pdf.make_indirect(
+        Dictionary(
+            Type=Name.Font,
+            Subtype=Name.TrueType,
+            BaseFont=Name("/TestFont"),
+            FontDescriptor=fd,
+            FirstChar=65,
+            LastChar=65,
+            Widths=Array([501]),
+        )
+    )
+    pdf.pages.append(
+        pikepdf.Page(
+            Dictionary(
+                Type=Name.Page,
+                MediaBox=Array([0, 0, 612, 792]),
+                Resources=Dictionary(Font=Dictionary(F1=font)),
+            )
+        )
+    )
+    return pdf
+
+
+def _font_descriptor(pdf: Pdf):
+    return pdf.pages[0].Resources.Font.F1.FontDescriptor
+
+
+class TestLoad:
+    """Tests for FontProgramCache.load()."""
+
+    def test_program_is_parsed_once(self) -> None:
+        pdf = _make_pdf(_make_font_data([".notdef", "A"]))
+        stream = _font_descriptor(pdf).FontFile2
+        cache = FontProgramCache(pdf)
+
+        first = cache.load(stream, "/FontFile2")
+        second = cache.load(stream, "/FontFile2")
+
+        assert first is second
+        assert cache.parses == 1
+        assert cache.hits == 1
+
+    def test_derived_tables(self) -> None:
+        pdf = _make_pdf(_make_font_data([".notdef", "A"]))
+        program = FontProgramCache(pdf).load(
+            _font_descriptor(pdf).FontFile2, "/FontFile2"
+        )
+
+        assert program.glyph_order == (".notdef", "A")
+        assert "A" in program.glyph_names
+        assert program.advance_widths == {".notdef": 500, "A": 501}
+        assert program.best_cmap == {ord("A"): "A"}
+        assert not program.is_bare_cff
+
+    def test_stream_write_invalidates_entry(self) -> None:
+        pdf = _make_pdf(_make_font_data([".notdef", "A"]))
+        stream = _font_descriptor(pdf).FontFile2
+        cache = FontProgramCache(pdf)
+        cache.load(stream, "/FontFile2")
+
+        stream.write(_make_font_data([".notdef", "A", "B"]))
+
+        assert cache.load(stream, "/FontFile2").glyph_order == (".notdef", "A", "B")
+        assert cache.parses == 2
+
+    def test_invalidate(self) -> None:
+        pdf = _make_pdf(_make_font_data([".notdef", "A"]))
+        stream = _font_descriptor(pdf).FontFile2
+        cache = FontProgramCache(pdf)
+        first = cache.load(stream, "/FontFile2")
+
+        cache.invalidate(stream)
+
+        assert cache.load(stream, "/FontFile2") is not first
+
+    def test_unparsable_program_is_cached(self) -> None:
+        pdf = _make_pdf(b"not a font")
+        stream = _font_descriptor(pdf).FontFile2
+        cache = FontProgramCache(pdf)
+
+        assert cache.load(stream, "/FontFile2") is None
+        assert cache.load(stream, "/FontFile2") is None
+        assert cache.parses == 1
+
+    def test_bare_cff_is_wrapped(self) -> None:
+        tt = TTFont(BytesIO(_make_font_data([".notdef", "A"], cff=True)))
+        pdf = _make_pdf(tt.getTableData("CFF "), "/FontFile3")
+
+        program = load_embedded_font_program(_font_descriptor(pdf))
+
+        assert program is not None
+        assert program.is_bare_cff
+        assert program.glyph_order == (".notdef", "A")
+
+
+class TestActiveScope:
+    """Tests for font_program_cache() and get_font_program_cache()."""
+
+    def test_active_cache_is_shared(self) -> None:
+        pdf = _make_pdf(_make_font_data([".notdef", "A"]))
+        stream = _font_descriptor(pdf).FontFile2
+        with font_program_cache(pdf) as cache:
+            assert get_font_program_cache(pdf) is cache
+            assert get_font_program_cache(stream) is cache
+            load_embedded_font_program(_font_descriptor(pdf))
+            load_embedded_font_program(_font_descriptor(pdf))
+            assert cache.parses == 1
+
+        assert len(cache) == 0
+        assert get_font_program_cache(stream) is not cache
+
+    def test_detached_cache_does_not_keep_programs(self) -> None:
+        pdf = _make_pdf(_make_font_data([".notdef", "A"]))
+        cache = get_font_program_cache(pdf)
+
+        cache.load(_font_descriptor(pdf).FontFile2, "/FontFile2")
+
+        assert len(cache) == 0
+
+    def test_modified_font_is_not_served_to_later_readers(self) -> None:
+        font_data = _make_font_data(["glyph00000", "A"])
+        pdf = _make_pdf(font_data)
+        original = _font_descriptor(pdf).FontFile2
+        with font_program_cache(pdf) as cache:
+            assert ".notdef" not in cache.load(original, "/FontFile2").glyph_names
+
+            assert sanitize_font_notdef(pdf)["notdef_fixed"] == 1
+
+            replaced = _font_descriptor(pdf).FontFile2
+            assert ".notdef" in cache.load(replaced, "/FontFile2").glyph_names
+            assert ".notdef" not in cache.load(original, "/FontFile2").glyph_names
@@ -1043,9 +1043,9 @@ class TestType1CFont:
         fixed_cff = bytes(stream.read_bytes())
 
         # Wrap back in OTF to parse with TTFont
-        from pdftopdfa.sanitizers.glyph_coverage import _wrap_cff_in_otf
+        from pdftopdfa.fonts.utils import wrap_cff_in_otf
 
-        otf_data = _wrap_cff_in_otf(fixed_cff)
+        otf_data = wrap_cff_in_otf(fixed_cff)
         tt = TTFont(BytesIO(otf_data))
         assert "A" in tt.getGlyphOrder()
         tt.close()
@@ -8,6 +8,7 @@ import pikepdf
 from conftest import new_pdf
 from pikepdf import Array, Dictionary, Name
 
+from pdftopdfa.content_cache import content_stream_cache
 from pdftopdfa.fonts.glyph_usage import (
     _extract_char_codes,
     _is_cidfont,
@@ -338,6 +339,21 @@ class TestCollectFontUsage:
         usage = collect_font_usage(pdf)
         assert usage == {}
 
+    def test_streams_without_text_are_not_parsed(self):
+        """Streams without text operators are skipped without parsing."""
+        pdf = new_pdf()
+        font_obj = pdf.make_indirect(
+            Dictionary(Type=Name.Font, Subtype=Name.TrueType, BaseFont=Name.F)
+        )
+        _make_page_with_content(pdf, b"0 0 m 1 1 l S", Dictionary(F1=font_obj))
+        _make_page_with_content(pdf, b"BT /F1 12 Tf (A) Tj ET", Dictionary(F1=font_obj))
+
+        with content_stream_cache(pdf) as cache:
+            usage = collect_font_usage(pdf)
+
+        assert usage == {font_obj.objgen: {ord("A")}}
+        assert cache.parses == 1
+
     def test_direct_font_object_skipped(self):
         """Direct font objects (objgen 0,0) are not tracked."""
         pdf = new_pdf()
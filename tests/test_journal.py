@@ -0,0 +1,133 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Tests for the resumable batch journal."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from pdftopdfa.converter import ConversionResult, convert_files
+from pdftopdfa.journal import ConversionJournal, file_sha256
+
+
+def _make_batch(tmp_dir: Path, sample_pdf_bytes: bytes) -> list[tuple[Path, Path]]:
+    input_dir = tmp_dir / "input"
+    input_dir.mkdir()
+    output_dir = tmp_dir / "output"
+    output_dir.mkdir()
+    pairs = []
+    for name in ("a", "bad", "c"):
+        in_path = input_dir / f"{name}.pdf"
+        in_path.write_bytes(b"not a pdf" if name == "bad" else sample_pdf_bytes)
+        pairs.append((in_path, output_dir / f"{name}_pdfa.pdf"))
+    return pairs
+
+
+class TestConversionJournal:
+    """Tests for ConversionJournal."""
+
+    def test_record_success(self, tmp_dir: Path, sample_pdf: Path) -> None:
+        output = tmp_dir / "out.pdf"
+        output.write_bytes(b"%PDF-converted")
+        result = ConversionResult(
+            success=True,
+            input_path=sample_pdf,
+            output_path=output,
+            level="2b",
+            warnings=["w"],
+            processing_time=1.5,
+        )
+
+        with ConversionJournal(tmp_dir / "journal.sqlite") as journal:
+            journal.record(result, "2b")
+            entry = journal.entry(sample_pdf)
+
+            assert entry["status"] == "success"
+            assert entry["warnings"] == ["w"]
+            assert entry["processing_time"] == 1.5
+            assert entry["input_sha256"] == file_sha256(sample_pdf)
+            assert entry["output_sha256"] == file_sha256(output)
+            assert journal.is_done(sample_pdf, output, "2b")
+            assert not journal.is_done(sample_pdf, output, "3b")
+
+    def test_failure_is_not_done(self, tmp_dir: Path, sample_pdf: Path) -> None:
+        output = tmp_dir / "out.pdf"
+        result = ConversionResult(
+            success=False,
+            input_path=sample_pdf,
+            output_path=output,
+            level="2b",
+            error="boom",
+        )
+
+        with ConversionJournal(tmp_dir / "journal.sqlite") as journal:
+            journal.record(result, "2b")
+
+            assert journal.entry(sample_pdf)["error"] == "boom"
+            assert not journal.is_done(sample_pdf, output, "2b")
+
+    def test_changed_input_or_output(self, tmp_dir: Path, sample_pdf: Path) -> None:
+        output = tmp_dir / "out.pdf"
+        output.write_bytes(b"%PDF-converted")
+        result = ConversionResult(
+            success=True, input_path=sample_pdf, output_path=output, level="2b"
+        )
+
+        with ConversionJournal(tmp_dir / "journal.sqlite") as journal:
+            journal.record(result, "2b")
+
+            # Touching the input without changing it keeps it done
+            stat = sample_pdf.stat()
+            os.utime(sample_pdf, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            assert journal.is_done(sample_pdf, output, "2b")
+
+            # Different content is converted again
+            data = bytearray(sample_pdf.read_bytes())
+            data[-2] ^= 0x20
+            sample_pdf.write_bytes(bytes(data))
+            os.utime(sample_pdf, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+            assert not journal.is_done(sample_pdf, output, "2b")
+
+            journal.record(result, "2b")
+            output.write_bytes(b"%PDF-trunc")
+            assert not journal.is_done(sample_pdf, output, "2b")
+
+    def test_journal_persists(self, tmp_dir: Path, sample_pdf: Path) -> None:
+        output = tmp_dir / "out.pdf"
+        output.write_bytes(b"%PDF-converted")
+        result = ConversionResult(
+            success=True, input_path=sample_pdf, output_path=output, level="2b"
+        )
+        with ConversionJournal(tmp_dir / "journal.sqlite") as journal:
+            journal.record(result, "2b")
+
+        with ConversionJournal(tmp_dir / "journal.sqlite") as journal:
+            assert journal.is_done(sample_pdf, output, "2b")
+
+
+class TestResume:
+    """Tests for resuming a batch from the journal."""
+
+    def test_resume_skips_done_and_retries_failures(
+        self, tmp_dir: Path, sample_pdf_bytes: bytes
+    ) -> None:
+        pairs = _make_batch(tmp_dir, sample_pdf_bytes)
+
+        with ConversionJournal(tmp_dir / "journal.sqlite") as journal:
+            first = convert_files(pairs, journal=journal)
+            assert [r.success for r in first] == [True, False, True]
+
+            # Fix the broken input; only it is converted again
+            pairs[1][0].write_bytes(sample_pdf_bytes)
+            second = convert_files(pairs, journal=journal, resume=True)
+
+            assert [r.input_path for r in second] == [pairs[1][0]]
+            assert second[0].success
+            assert all(journal.is_done(i, o, "3b") for i, o in pairs)
+
+    def test_resume_requires_journal(self) -> None:
+        with pytest.raises(ValueError, match="journal"):
+            convert_files([], resume=True)
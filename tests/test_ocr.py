@@ -7,24 +7,32 @@
 import logging
 import os
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 import pikepdf
 import pytest
 from conftest import new_pdf
 from pikepdf import Array, Dictionary, Name, Pdf
-from PIL import Image
+from PIL import Image, ImageDraw
 
+from pdftopdfa.cpu_budget import cpu_limit
 from pdftopdfa.exceptions import OCRError
 from pdftopdfa.ocr import (
     _PREPROCESS_QUALITIES,
+    HAS_OCR,
+    HAS_OPENCV,
+    OCR_PREPROCESS_ENV,
     OCR_SETTINGS,
+    OcrPreprocess,
     OcrQuality,
+    _format_page_ranges,
     _page_has_images,
     _page_has_text,
     apply_ocr,
+    get_ocr_preprocess,
     is_ocr_available,
     needs_ocr,
+    pages_needing_ocr,
 )
 
 
@@ -115,6 +123,7 @@ class TestNeedsOcr:
         result = needs_ocr(pdf, threshold=0.6)
 
         assert result is False
+        assert pages_needing_ocr(pdf) == [1]
 
     def test_simple_pdf_without_images_returns_false(self, sample_pdf_obj: Pdf) -> None:
         """Simple PDF without images doesn't need OCR."""
@@ -432,6 +441,7 @@ class TestApplyOcr:
             language=["eng"],
             output_type="pdf",
             rasterizer="pypdfium",
+            jobs=ANY,
             **OCR_SETTINGS[OcrQuality.DEFAULT],
         )
 
@@ -704,6 +714,7 @@ class TestOcrQuality:
             language=["eng"],
             output_type="pdf",
             rasterizer="pypdfium",
+            jobs=ANY,
             **OCR_SETTINGS[OcrQuality.FAST],
         )
 
@@ -724,6 +735,7 @@ class TestOcrQuality:
             language=["eng"],
             output_type="pdf",
             rasterizer="pypdfium",
+            jobs=ANY,
             **OCR_SETTINGS[OcrQuality.DEFAULT],
         )
 
@@ -744,6 +756,7 @@ class TestOcrQuality:
             language=["eng"],
             output_type="pdf",
             rasterizer="pypdfium",
+            jobs=ANY,
             **OCR_SETTINGS[OcrQuality.BEST],
         )
 
@@ -827,6 +840,100 @@ class TestApplyOcrForce:
         assert call_kwargs["rotate_pages"] is True
 
 
+class TestApplyOcrPages:
+    """Tests for apply_ocr(pages=...) behaviour."""
+
+    @pytest.mark.parametrize(
+        ("pages", "expected"),
+        [
+            ([0], "1"),
+            ([0, 1, 2, 6], "1-3,7"),
+            ([4, 2, 3, 2], "3-5"),
+            ([1, 3, 5], "2,4,6"),
+        ],
+    )
+    def test_format_page_ranges(self, pages: list[int], expected: str) -> None:
+        assert _format_page_ranges(pages) == expected
+
+    @patch("pdftopdfa.ocr.HAS_OPENCV", False)
+    @patch("pdftopdfa.ocr.HAS_OCR", True)
+    @patch("pdftopdfa.ocr.ocrmypdf")
+    def test_apply_ocr_pages_passed_one_based(
+        self, mock_ocrmypdf: MagicMock, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """pages are passed to ocrmypdf as one-based page ranges."""
+        output_path = tmp_dir / "output.pdf"
+
+        apply_ocr(sample_pdf, output_path, ["eng"], pages=[0, 2])
+
+        call_kwargs = mock_ocrmypdf.ocr.call_args[1]
+        assert call_kwargs["pages"] == "1,3"
+        assert call_kwargs["skip_text"] is True
+
+    @patch("pdftopdfa.ocr.HAS_OPENCV", False)
+    @patch("pdftopdfa.ocr.HAS_OCR", True)
+    @patch("pdftopdfa.ocr.ocrmypdf")
+    def test_apply_ocr_without_pages_considers_all(
+        self, mock_ocrmypdf: MagicMock, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """Without pages, no page selection is passed to ocrmypdf."""
+        output_path = tmp_dir / "output.pdf"
+
+        apply_ocr(sample_pdf, output_path, ["eng"])
+
+        assert "pages" not in mock_ocrmypdf.ocr.call_args[1]
+
+
+class TestApplyOcrCpuBudget:
+    """Tests for the CPU budget of apply_ocr()."""
+
+    @patch("pdftopdfa.ocr.HAS_OPENCV", False)
+    @patch("pdftopdfa.ocr.HAS_OCR", True)
+    @patch("pdftopdfa.ocr.ocrmypdf")
+    def test_jobs_follow_cpu_limit(
+        self, mock_ocrmypdf: MagicMock, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """ocrmypdf gets one job per CPU in the budget."""
+        with cpu_limit(3):
+            apply_ocr(sample_pdf, tmp_dir / "output.pdf", ["eng"])
+
+        assert mock_ocrmypdf.ocr.call_args[1]["jobs"] == 3
+
+    @patch("pdftopdfa.ocr.HAS_OPENCV", False)
+    @patch("pdftopdfa.ocr.HAS_OCR", True)
+    @patch("pdftopdfa.ocr.ocrmypdf")
+    def test_jobs_limited_to_selected_pages(
+        self, mock_ocrmypdf: MagicMock, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """No more jobs are requested than there are pages to OCR."""
+        with cpu_limit(8):
+            apply_ocr(sample_pdf, tmp_dir / "output.pdf", ["eng"], pages=[0, 4])
+
+        assert mock_ocrmypdf.ocr.call_args[1]["jobs"] == 2
+
+    @patch("pdftopdfa.ocr.HAS_OPENCV", False)
+    @patch("pdftopdfa.ocr.HAS_OCR", True)
+    @patch("pdftopdfa.ocr.ocrmypdf")
+    def test_tesseract_single_threaded_during_ocr(
+        self,
+        mock_ocrmypdf: MagicMock,
+        sample_pdf: Path,
+        tmp_dir: Path,
+        monkeypatch,
+    ) -> None:
+        """OMP_THREAD_LIMIT is 1 while ocrmypdf runs and restored after."""
+        monkeypatch.setenv("OMP_THREAD_LIMIT", "16")
+        seen: list[str | None] = []
+        mock_ocrmypdf.ocr.side_effect = lambda *args, **kwargs: seen.append(
+            os.environ.get("OMP_THREAD_LIMIT")
+        )
+
+        apply_ocr(sample_pdf, tmp_dir / "output.pdf", ["eng"])
+
+        assert seen == ["1"]
+        assert os.environ["OMP_THREAD_LIMIT"] == "16"
+
+
 class TestOpenCVPlugin:
     """Tests for OpenCV preprocessing plugin integration."""
 
@@ -884,7 +991,7 @@ class TestOpenCVPlugin:
     def test_apply_ocr_fast_no_plugin(
         self, mock_ocrmypdf: MagicMock, sample_pdf: Path, tmp_dir: Path
     ) -> None:
-        """FAST quality never uses the OpenCV plugin."""
+        """FAST quality does not use the OpenCV plugin by default."""
         output_path = tmp_dir / "output.pdf"
 
         apply_ocr(sample_pdf, output_path, ["eng"], quality=OcrQuality.FAST)
@@ -910,6 +1017,70 @@ class TestOpenCVPlugin:
 
         assert "OpenCV not available" in caplog.text
 
+    @patch("pdftopdfa.ocr.HAS_OPENCV", True)
+    @patch("pdftopdfa.ocr.HAS_OCR", True)
+    @patch("pdftopdfa.ocr.ocrmypdf")
+    def test_apply_ocr_passes_preprocess_mode(
+        self, mock_ocrmypdf: MagicMock, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """The mode reaches the plugin as its ocrmypdf option."""
+        apply_ocr(sample_pdf, tmp_dir / "output.pdf", ["eng"])
+        assert mock_ocrmypdf.ocr.call_args[1]["pdftopdfa_preprocess"] == "auto"
+
+        apply_ocr(
+            sample_pdf,
+            tmp_dir / "output.pdf",
+            ["eng"],
+            quality=OcrQuality.FAST,
+            preprocess=OcrPreprocess.NLMEANS,
+        )
+        call_kwargs = mock_ocrmypdf.ocr.call_args[1]
+        assert call_kwargs["plugins"] == ["pdftopdfa.ocr_preprocess"]
+        assert call_kwargs["pdftopdfa_preprocess"] == "nlmeans"
+
+    @patch("pdftopdfa.ocr.HAS_OPENCV", True)
+    @patch("pdftopdfa.ocr.HAS_OCR", True)
+    @patch("pdftopdfa.ocr.ocrmypdf")
+    def test_apply_ocr_preprocess_none_no_plugin(
+        self, mock_ocrmypdf: MagicMock, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """NONE skips the plugin even for DEFAULT quality."""
+        apply_ocr(
+            sample_pdf,
+            tmp_dir / "output.pdf",
+            ["eng"],
+            preprocess=OcrPreprocess.NONE,
+        )
+
+        call_kwargs = mock_ocrmypdf.ocr.call_args[1]
+        assert "plugins" not in call_kwargs
+        assert "pdftopdfa_preprocess" not in call_kwargs
+
+
+class TestGetOcrPreprocess:
+    """Tests for get_ocr_preprocess and ocr_preprocess."""
+
+    @pytest.fixture(autouse=True)
+    def _no_env(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.delenv(OCR_PREPROCESS_ENV, raising=False)
+
+    def test_defaults_per_quality(self) -> None:
+        assert get_ocr_preprocess(OcrQuality.FAST) is OcrPreprocess.NONE
+        assert get_ocr_preprocess(OcrQuality.DEFAULT) is OcrPreprocess.AUTO
+        assert get_ocr_preprocess(OcrQuality.BEST) is OcrPreprocess.AUTO
+
+    def test_environment_variable(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv(OCR_PREPROCESS_ENV, "Median")
+        assert get_ocr_preprocess(OcrQuality.FAST) is OcrPreprocess.MEDIAN
+
+    def test_invalid_environment_variable(
+        self, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        monkeypatch.setenv(OCR_PREPROCESS_ENV, "bilateral")
+        with caplog.at_level(logging.WARNING, logger="pdftopdfa.ocr"):
+            assert get_ocr_preprocess() is OcrPreprocess.AUTO
+        assert OCR_PREPROCESS_ENV in caplog.text
+
 
 class TestFilterOcrImage:
     """Tests for the filter_ocr_image plugin hook."""
@@ -949,3 +1120,67 @@ class TestFilterOcrImage:
         pixels = np.array(result)
         unique_values = set(np.unique(pixels))
         assert unique_values <= {0, 255}
+
+
+def _noisy_page(sigma: float) -> Image.Image:
+    """Grayscale page with a few text lines and Gaussian noise."""
+    import numpy as np
+
+    image = Image.new("L", (600, 800), 235)
+    draw = ImageDraw.Draw(image)
+    for y in range(50, 750, 40):
+        draw.text((50, y), "The quick brown fox jumps over the lazy dog", fill=20)
+    noise = np.random.default_rng(0).normal(0, sigma, (800, 600))
+    return Image.fromarray(np.clip(np.array(image) + noise, 0, 255).astype("uint8"))
+
+
+@pytest.mark.skipif(not (HAS_OCR and HAS_OPENCV), reason="ocrmypdf and OpenCV required")
+class TestPreprocessModes:
+    """Tests for the preprocessing modes of the filter_ocr_image hook."""
+
+    @pytest.mark.parametrize("sigma", [0, 3, 10])
+    def test_estimate_noise(self, sigma: float) -> None:
+        import numpy as np
+
+        from pdftopdfa.ocr_preprocess import estimate_noise
+
+        estimate = estimate_noise(np.array(_noisy_page(sigma)))
+
+        assert estimate == pytest.approx(sigma, abs=1.0)
+
+    @pytest.mark.parametrize(
+        ("sigma", "expected"),
+        [(0, "none"), (3, "median"), (10, "nlmeans")],
+    )
+    def test_auto_denoises_as_needed(self, sigma: float, expected: str) -> None:
+        import numpy as np
+
+        from pdftopdfa.ocr_preprocess import _denoise
+
+        _, label = _denoise(np.array(_noisy_page(sigma)), "auto")
+
+        assert label.startswith(expected)
+
+    @pytest.mark.parametrize("mode", ["median", "nlmeans", "auto"])
+    def test_modes_binarize(self, mode: str) -> None:
+        import numpy as np
+
+        from pdftopdfa.ocr_preprocess import filter_ocr_image
+
+        page = MagicMock(pageno=0)
+        page.options.pdftopdfa_preprocess = mode
+        result = filter_ocr_image(page=page, image=_noisy_page(3).convert("RGB"))
+
+        assert result.mode == "L"
+        assert set(np.unique(np.array(result))) <= {0, 255}
+
+    def test_logs_time_per_page(self, caplog: pytest.LogCaptureFixture) -> None:
+        from pdftopdfa.ocr_preprocess import filter_ocr_image
+
+        page = MagicMock(pageno=4)
+        page.options.pdftopdfa_preprocess = "median"
+        with caplog.at_level(logging.DEBUG, logger="pdftopdfa.ocr_preprocess"):
+            filter_ocr_image(page=page, image=_noisy_page(0))
+
+        assert "Preprocessed page 5 in" in caplog.text
+        assert "(median)" in caplog.text
@@ -466,10 +466,10 @@ class TestOcrAnnotationIntegration:
 
     @patch("pdftopdfa.ocr.apply_ocr")
     @patch("pdftopdfa.ocr.is_ocr_available", return_value=True)
-    @patch("pdftopdfa.ocr.needs_ocr", return_value=True)
+    @patch("pdftopdfa.ocr.pages_needing_ocr", return_value=[0])
     def test_ocr_preserves_annotations(
         self,
-        mock_needs_ocr: MagicMock,
+        mock_pages_needing_ocr: MagicMock,
         mock_is_available: MagicMock,
         mock_apply_ocr: MagicMock,
         tmp_dir: Path,
@@ -499,10 +499,10 @@ class TestOcrAnnotationIntegration:
 
     @patch("pdftopdfa.ocr.apply_ocr")
     @patch("pdftopdfa.ocr.is_ocr_available", return_value=True)
-    @patch("pdftopdfa.ocr.needs_ocr", return_value=True)
+    @patch("pdftopdfa.ocr.pages_needing_ocr", return_value=[0])
     def test_no_annotations_no_overhead(
         self,
-        mock_needs_ocr: MagicMock,
+        mock_pages_needing_ocr: MagicMock,
         mock_is_available: MagicMock,
         mock_apply_ocr: MagicMock,
         tmp_dir: Path,
@@ -528,10 +528,10 @@ class TestOcrAnnotationIntegration:
 
     @patch("pdftopdfa.ocr.apply_ocr")
     @patch("pdftopdfa.ocr.is_ocr_available", return_value=True)
-    @patch("pdftopdfa.ocr.needs_ocr", return_value=True)
+    @patch("pdftopdfa.ocr.pages_needing_ocr", return_value=[0])
     def test_warning_message_includes_count(
         self,
-        mock_needs_ocr: MagicMock,
+        mock_pages_needing_ocr: MagicMock,
         mock_is_available: MagicMock,
         mock_apply_ocr: MagicMock,
         tmp_dir: Path,
@@ -558,10 +558,10 @@ class TestOcrAnnotationIntegration:
 
     @patch("pdftopdfa.ocr.apply_ocr")
     @patch("pdftopdfa.ocr.is_ocr_available", return_value=True)
-    @patch("pdftopdfa.ocr.needs_ocr", return_value=True)
+    @patch("pdftopdfa.ocr.pages_needing_ocr", return_value=[0])
     def test_temp_files_cleaned_up(
         self,
-        mock_needs_ocr: MagicMock,
+        mock_pages_needing_ocr: MagicMock,
         mock_is_available: MagicMock,
         mock_apply_ocr: MagicMock,
         tmp_dir: Path,
@@ -0,0 +1,197 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Tests for the pool of warm OCR worker processes."""
+
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from PIL import Image, ImageDraw
+
+from pdftopdfa import cpu_budget
+from pdftopdfa.exceptions import OCRError
+from pdftopdfa.ocr import (
+    HAS_OCR,
+    OCR_PREPROCESS_ENV,
+    OcrPreprocess,
+    OcrQuality,
+    apply_ocr,
+)
+from pdftopdfa.ocr_service import OcrService, get_ocr_service
+
+
+def _die_holding_token() -> None:
+    with cpu_budget.task_token():
+        os._exit(3)
+
+
+def _with_token() -> int:
+    with cpu_budget.task_token():
+        return os.getpid()
+
+
+class TestOcrService:
+    """Tests for OcrService."""
+
+    def test_invalid_worker_count(self) -> None:
+        with pytest.raises(ValueError):
+            OcrService(workers=0)
+
+    def test_active_while_open(self) -> None:
+        assert get_ocr_service() is None
+        with OcrService(warm_up=False) as outer:
+            assert get_ocr_service() is outer
+            with OcrService(warm_up=False) as inner:
+                assert get_ocr_service() is inner
+            assert get_ocr_service() is outer
+        assert get_ocr_service() is None
+
+    def test_workers_reused_per_language_set(self) -> None:
+        with OcrService(warm_up=False) as service:
+            service.start(["eng"])
+            eng = {service._pool(["eng"]).submit(os.getpid).result() for _ in range(3)}
+            deu = service._pool(["deu"]).submit(os.getpid).result()
+
+        assert len(eng) == 1
+        assert os.getpid() not in eng
+        assert deu not in eng
+
+    def test_dead_workers_return_their_tokens(
+        self, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """Workers that die holding CPU tokens do not starve the service."""
+        errors: list[str] = []
+        pids: list[int] = []
+
+        def run() -> None:
+            with cpu_budget.cpu_limit(1), OcrService(warm_up=False) as service:
+                with patch.object(
+                    service,
+                    "submit",
+                    side_effect=lambda *args, **kwargs: service._pool(["eng"]).submit(
+                        _die_holding_token
+                    ),
+                ):
+                    for _ in range(2):
+                        try:
+                            service.ocr(sample_pdf, tmp_dir / "output.pdf", ["eng"])
+                        except OCRError as e:
+                            errors.append(str(e))
+                pids.append(service._pool(["eng"]).submit(_with_token).result())
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(60)
+
+        assert not thread.is_alive(), "service hung on leaked CPU tokens"
+        assert len(errors) == 2
+        assert all("exited unexpectedly" in error for error in errors)
+        assert pids and pids[0] != os.getpid()
+
+    def test_closed_service_rejects_work(self, sample_pdf: Path, tmp_dir: Path) -> None:
+        service = OcrService(warm_up=False)
+        service.close()
+
+        with pytest.raises(OCRError, match="closed"):
+            service.ocr(sample_pdf, tmp_dir / "output.pdf", ["eng"])
+
+    @patch("pdftopdfa.ocr.HAS_OCR", True)
+    def test_apply_ocr_delegates_to_open_service(
+        self, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """apply_ocr() hands its arguments to the open service."""
+        output_path = tmp_dir / "output.pdf"
+        service = MagicMock()
+        service.ocr.return_value = output_path
+
+        with patch("pdftopdfa.ocr_service.get_ocr_service", return_value=service):
+            result = apply_ocr(
+                sample_pdf,
+                output_path,
+                ["deu"],
+                quality=OcrQuality.FAST,
+                pages=[1],
+            )
+
+        assert result == output_path
+        service.ocr.assert_called_once_with(
+            sample_pdf,
+            output_path,
+            ["deu"],
+            quality=OcrQuality.FAST,
+            force=False,
+            pages=[1],
+            preprocess=None,
+        )
+
+    def test_preprocess_mode_resolved_in_parent(
+        self, sample_pdf: Path, tmp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """The mode of this process's environment reaches the worker."""
+        monkeypatch.setenv(OCR_PREPROCESS_ENV, "median")
+        service = OcrService(warm_up=False)
+        pool = MagicMock()
+        with patch.object(service, "_pool", return_value=pool):
+            service.submit(sample_pdf, tmp_dir / "output.pdf", ["eng"])
+        service.close()
+
+        assert pool.submit.call_args[0][-1] is OcrPreprocess.MEDIAN
+
+    @pytest.mark.skipif(HAS_OCR, reason="needs an environment without ocrmypdf")
+    @patch("pdftopdfa.ocr.HAS_OCR", True)
+    def test_worker_errors_reach_the_caller(
+        self, sample_pdf: Path, tmp_dir: Path
+    ) -> None:
+        """An OCRError raised in a worker is raised by apply_ocr()."""
+        with OcrService(warm_up=False):
+            with pytest.raises(OCRError, match="OCR not available"):
+                apply_ocr(sample_pdf, tmp_dir / "output.pdf", ["eng"])
+
+
+def _scan(path: Path) -> Path:
+    """Writes a one-page 300 dpi scan of a few lines of text."""
+    image = Image.new("L", (2480, 1000), 255)
+    draw = ImageDraw.Draw(image)
+    for line in range(5):
+        draw.text((200, 150 + line * 150), "The quick brown fox jumps", fill=0)
+    image.save(path, "PDF", resolution=300)
+    return path
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(
+    not HAS_OCR or shutil.which("tesseract") is None,
+    reason="ocrmypdf and tesseract required",
+)
+def test_benchmark_warm_pool_latency(tmp_dir: Path) -> None:
+    """Per-file latency of 1-page scans: one-off apply_ocr() vs. the service.
+
+    The service's start-up is timed separately; it is paid once per
+    language set and not per file.
+    """
+    scans = [_scan(tmp_dir / f"scan{i}.pdf") for i in range(5)]
+
+    def latency(run) -> float:
+        start = time.perf_counter()
+        for i, scan in enumerate(scans):
+            run(scan, tmp_dir / f"out{i}.pdf")
+        return (time.perf_counter() - start) / len(scans)
+
+    cold = latency(lambda src, dst: apply_ocr(src, dst, ["eng"]))
+    with OcrService() as service:
+        start = time.perf_counter()
+        service.start(["eng"])
+        startup = time.perf_counter() - start
+        warm = latency(lambda src, dst: apply_ocr(src, dst, ["eng"]))
+
+    print(
+        f"\nper-file OCR latency: one-off {cold:.2f}s, warm service {warm:.2f}s "
+        f"(service start-up {startup:.2f}s)"
+    )
+    assert all((tmp_dir / f"out{i}.pdf").exists() for i in range(len(scans)))
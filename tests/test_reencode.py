@@ -0,0 +1,147 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Tests for bounded-memory stream re-encoding."""
+
+import random
+import zlib
+
+import pikepdf
+import pytest
+from pikepdf import Dictionary, Name, Stream
+
+from pdftopdfa.reencode import (
+    DEFAULT_MEMORY_LIMIT,
+    MEMORY_LIMIT_ENV,
+    FlateStripWriter,
+    get_memory_limit,
+    iter_decoded_strips,
+    iter_row_strips,
+    memory_limit,
+    reencode_to_flate,
+)
+
+_DATA = random.Random(0).randbytes(5000) * 4
+
+
+def _flate_stream(pdf: pikepdf.Pdf, data: bytes = _DATA) -> Stream:
+    stream = Stream(pdf, zlib.compress(data))
+    stream[Name.Filter] = Name.FlateDecode
+    return stream
+
+
+class TestMemoryLimit:
+    """Tests for get_memory_limit() and memory_limit()."""
+
+    def test_default(self, monkeypatch) -> None:
+        monkeypatch.delenv(MEMORY_LIMIT_ENV, raising=False)
+        assert get_memory_limit() == DEFAULT_MEMORY_LIMIT
+
+    def test_environment_in_mib(self, monkeypatch) -> None:
+        monkeypatch.setenv(MEMORY_LIMIT_ENV, "64")
+        assert get_memory_limit() == 64 * 1024 * 1024
+
+    @pytest.mark.parametrize("value", ["lots", "0", "-5"])
+    def test_invalid_environment_ignored(self, monkeypatch, value) -> None:
+        monkeypatch.setenv(MEMORY_LIMIT_ENV, value)
+        assert get_memory_limit() == DEFAULT_MEMORY_LIMIT
+
+    def test_context_overrides_and_restores(self, monkeypatch) -> None:
+        monkeypatch.setenv(MEMORY_LIMIT_ENV, "64")
+        with memory_limit(1000):
+            assert get_memory_limit() == 1000
+        assert get_memory_limit() == 64 * 1024 * 1024
+
+    def test_rejects_non_positive(self) -> None:
+        with pytest.raises(ValueError):
+            with memory_limit(0):
+                pass
+
+
+class TestDecodedStrips:
+    """Tests for iter_decoded_strips() and iter_row_strips()."""
+
+    def test_flate_inflated_in_bounded_strips(self) -> None:
+        pdf = pikepdf.new()
+        strips = list(iter_decoded_strips(_flate_stream(pdf), strip_size=777))
+
+        assert max(len(strip) for strip in strips) <= 777
+        assert b"".join(strips) == _DATA
+
+    def test_predictor_decoded_by_qpdf(self) -> None:
+        pdf = pikepdf.new()
+        # PNG predictor "None" tag before each 4-byte row
+        rows = [bytes([0]) + bytes([i] * 4) for i in range(50)]
+        stream = _flate_stream(pdf, b"".join(rows))
+        stream[Name.DecodeParms] = Dictionary(Predictor=10, Columns=4)
+
+        strips = list(iter_decoded_strips(stream, strip_size=64))
+
+        assert b"".join(strips) == b"".join(row[1:] for row in rows)
+
+    def test_unfiltered(self) -> None:
+        pdf = pikepdf.new()
+        strips = list(iter_decoded_strips(Stream(pdf, _DATA), strip_size=4096))
+        assert b"".join(strips) == _DATA
+
+    def test_row_strips_hold_whole_rows(self) -> None:
+        pdf = pikepdf.new()
+        strips = list(
+            iter_row_strips(_flate_stream(pdf), row_size=30, rows=600, strip_size=100)
+        )
+
+        assert all(len(strip) == 90 for strip in strips[:-1])
+        assert b"".join(strips) == _DATA[: 30 * 600]
+
+    def test_row_strips_stop_at_short_data(self) -> None:
+        pdf = pikepdf.new()
+        strips = list(iter_row_strips(Stream(pdf, b"x" * 95), row_size=10, rows=20))
+        assert b"".join(strips) == b"x" * 90
+
+
+class TestReencodeToFlate:
+    """Tests for FlateStripWriter and reencode_to_flate()."""
+
+    def test_replaces_filter(self) -> None:
+        pdf = pikepdf.new()
+        stream = Stream(pdf, _DATA.hex().encode() + b">")
+        stream[Name.Filter] = Name.ASCIIHexDecode
+
+        reencode_to_flate(stream)
+
+        assert stream[Name.Filter] == Name.FlateDecode
+        assert stream.read_bytes() == _DATA
+
+    def test_removes_decode_parms(self) -> None:
+        pdf = pikepdf.new()
+        stream = _flate_stream(pdf, bytes(5) * 20)
+        stream[Name.DecodeParms] = Dictionary(Predictor=10, Columns=4)
+
+        reencode_to_flate(stream)
+
+        assert stream.get("/DecodeParms") is None
+        assert stream.read_bytes() == bytes(16) * 5
+
+    def test_spools_past_memory_limit(self) -> None:
+        pdf = pikepdf.new()
+        stream = Stream(pdf, b"")
+        data = random.Random(1).randbytes(200_000)
+        with memory_limit(1024):
+            writer = FlateStripWriter()
+        writer.write(data)
+        assert writer.size > 1024
+
+        writer.replace_stream_data(stream)
+
+        assert stream.read_bytes() == data
+
+    def test_decoding_failure_leaves_stream_unchanged(self) -> None:
+        pdf = pikepdf.new()
+        stream = Stream(pdf, b"not flate data")
+        stream[Name.Filter] = Name.FlateDecode
+
+        with pytest.raises(zlib.error):
+            reencode_to_flate(stream)
+
+        assert stream.read_raw_bytes() == b"not flate data"
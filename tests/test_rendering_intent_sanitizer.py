@@ -9,6 +9,7 @@ import pytest
 from conftest import new_pdf
 from pikepdf import Array, Dictionary, Name, Pdf
 
+from pdftopdfa.resource_graph import resource_graph
 from pdftopdfa.sanitizers.extgstate import sanitize_extgstate
 from pdftopdfa.sanitizers.rendering_intent import (
     sanitize_rendering_intent,
@@ -239,6 +240,32 @@ class TestFormXObjectRiOperator:
 
         assert result["ri_operators_fixed"] == 2
 
+    def test_ri_in_form_from_inherited_page_resources(self):
+        """Forms named only by inherited page resources are sanitized."""
+        pdf = new_pdf()
+
+        form = pdf.make_stream(b"/BadInherited ri")
+        form[Name.Type] = Name.XObject
+        form[Name.Subtype] = Name.Form
+        form[Name.BBox] = Array([0, 0, 50, 50])
+
+        page = pikepdf.Page(
+            Dictionary(Type=Name.Page, MediaBox=Array([0, 0, 612, 792]))
+        )
+        pdf.pages.append(page)
+        pdf.Root.Pages[Name.Resources] = Dictionary(
+            XObject=Dictionary(X0=form),
+        )
+
+        with resource_graph(pdf) as graph:
+            # Recorded while the page still inherits its resources
+            assert len(graph.page_nodes(pdf.pages[0])) == 1
+            result = sanitize_rendering_intent(pdf)
+
+        # The page and the form both get explicit /Resources
+        assert result["resources_dictionaries_added"] == 2
+        assert result["ri_operators_fixed"] == 1
+
 
 # --- Annotation AP stream ri operator ---
 
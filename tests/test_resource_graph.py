@@ -0,0 +1,158 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Tests for the shared page resource graph."""
+
+import pikepdf
+from conftest import new_pdf
+from pikepdf import Array, Dictionary, Name, Pdf, Stream
+
+from pdftopdfa.resource_graph import (
+    APPEARANCE,
+    FORM,
+    PAGE,
+    PATTERN,
+    TYPE3_FONT,
+    ResourceGraph,
+    get_resource_graph,
+    resource_graph,
+)
+
+
+def _form(pdf: Pdf, resources: Dictionary | None = None) -> Stream:
+    form = Stream(pdf, b"", Dictionary(Type=Name.XObject, Subtype=Name.Form))
+    if resources is not None:
+        form.Resources = resources
+    return pdf.make_indirect(form)
+
+
+def _add_page(pdf: Pdf, resources: Dictionary) -> pikepdf.Page:
+    pdf.pages.append(
+        pikepdf.Page(
+            Dictionary(
+                Type=Name.Page,
+                MediaBox=Array([0, 0, 612, 792]),
+                Resources=resources,
+            )
+        )
+    )
+    return pdf.pages[-1]
+
+
+def _kinds(nodes) -> list[str]:
+    return [node.kind for node in nodes]
+
+
+class TestPageNodes:
+    """Tests for the nodes recorded for a page."""
+
+    def test_depth_first_order_and_kinds(self) -> None:
+        pdf = new_pdf()
+        inner = _form(pdf, Dictionary())
+        outer = _form(pdf, Dictionary(XObject=Dictionary(Fm2=inner)))
+        pattern = pdf.make_indirect(
+            Stream(pdf, b"", Dictionary(PatternType=1, Resources=Dictionary()))
+        )
+        type3 = pdf.make_indirect(
+            Dictionary(Type=Name.Font, Subtype=Name.Type3, Resources=Dictionary())
+        )
+        resources = Dictionary(
+            Font=Dictionary(T3=type3),
+            XObject=Dictionary(Fm1=outer),
+            Pattern=Dictionary(P1=pattern),
+        )
+        page = _add_page(pdf, resources)
+        appearance = _form(pdf, Dictionary())
+        annot = pdf.make_indirect(
+            Dictionary(Type=Name.Annot, AP=Dictionary(N=appearance))
+        )
+        page.Annots = Array([annot])
+
+        nodes = ResourceGraph(pdf).page_nodes(page)
+
+        assert _kinds(nodes) == [PAGE, TYPE3_FONT, FORM, FORM, PATTERN, APPEARANCE]
+        assert nodes[3].owner.objgen == inner.objgen
+        assert nodes[3].parent is nodes[2]
+        assert nodes[-1].parent is None
+
+    def test_inherited_resources(self) -> None:
+        pdf = new_pdf()
+        form = _form(pdf)
+        page = _add_page(pdf, Dictionary(XObject=Dictionary(Fm1=form)))
+
+        page_node, form_node = ResourceGraph(pdf).page_nodes(page)
+
+        assert form_node.own_resources is None
+        assert form_node.resources.objgen == page_node.resources.objgen
+
+    def test_cycle_visits_each_form_once(self) -> None:
+        pdf = new_pdf()
+        form_a = _form(pdf, Dictionary(XObject=Dictionary()))
+        form_b = _form(pdf, Dictionary(XObject=Dictionary(FmA=form_a)))
+        form_a.Resources.XObject.FmB = form_b
+        page = _add_page(pdf, Dictionary(XObject=Dictionary(FmA=form_a)))
+
+        nodes = ResourceGraph(pdf).page_nodes(page)
+
+        assert _kinds(nodes) == [PAGE, FORM, FORM]
+
+
+class TestCaching:
+    """Tests for reuse and rebuilding of the recorded structure."""
+
+    def test_nodes_reused_until_objects_added(self) -> None:
+        pdf = new_pdf()
+        page = _add_page(pdf, Dictionary(XObject=Dictionary()))
+        graph = ResourceGraph(pdf)
+
+        first = graph.page_nodes(page)
+        assert graph.page_nodes(page) is first
+
+        page.Resources.XObject.Fm1 = _form(pdf, Dictionary())
+        rebuilt = graph.page_nodes(page)
+
+        assert rebuilt is not first
+        assert _kinds(rebuilt) == [PAGE, FORM]
+
+    def test_invalidate_forgets_pages(self) -> None:
+        pdf = new_pdf()
+        form = _form(pdf, Dictionary())
+        page = _add_page(pdf, Dictionary(XObject=Dictionary()))
+        graph = ResourceGraph(pdf)
+        graph.page_nodes(page)
+
+        page.Resources.XObject.Fm1 = form
+        graph.invalidate()
+
+        assert _kinds(graph.page_nodes(page)) == [PAGE, FORM]
+
+    def test_scope_shares_graph(self) -> None:
+        pdf = new_pdf()
+        _add_page(pdf, Dictionary())
+
+        with resource_graph(pdf) as graph:
+            assert get_resource_graph(pdf) is graph
+            assert get_resource_graph(pdf.pages[0]) is graph
+            with resource_graph(pdf) as nested:
+                assert nested is graph
+
+        assert get_resource_graph(pdf) is not graph
+
+    def test_uncached_outside_scope(self) -> None:
+        pdf = new_pdf()
+        page = _add_page(pdf, Dictionary())
+        graph = get_resource_graph(page)
+
+        assert graph.page_nodes(page) is not graph.page_nodes(page)
+
+    def test_iter_nodes_yields_shared_objects_once(self) -> None:
+        pdf = new_pdf()
+        form = _form(pdf, Dictionary())
+        _add_page(pdf, Dictionary(XObject=Dictionary(Fm1=form)))
+        _add_page(pdf, Dictionary(XObject=Dictionary(Fm1=form)))
+
+        graph = ResourceGraph(pdf)
+
+        assert _kinds(graph.iter_nodes()) == [PAGE, FORM, PAGE]
+        assert _kinds(graph.iter_nodes(FORM)) == [FORM]
@@ -0,0 +1,208 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Tests for the content-addressed conversion result cache."""
+
+import os
+import pickle
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from pdftopdfa.converter import _result_cache_key, convert_files, convert_to_pdfa
+from pdftopdfa.exceptions import ConversionError, UnsupportedPDFError
+from pdftopdfa.result_cache import _MIN_RESCAN_STORES, ResultCache
+
+
+def _add_entry(cache: ResultCache, tmp_dir: Path, name: str, size: int) -> str:
+    source = tmp_dir / f"{name}.pdf"
+    source.write_bytes(name.encode() * size)
+    key = cache.key(source, "3b")
+    cache.store(key, source, {"name": name})
+    return key
+
+
+def _default_key(cache: ResultCache, input_path: Path) -> str:
+    """Key of a convert_to_pdfa() call with default options."""
+    return _result_cache_key(
+        cache,
+        input_path,
+        "3b",
+        validate=False,
+        ocr_languages=None,
+        ocr_quality=None,
+        ocr_preprocess=None,
+        ocr_force=False,
+        convert_calibrated=True,
+        compress_structure=False,
+        compression=None,
+    )
+
+
+class TestResultCache:
+    """Tests for ResultCache."""
+
+    def test_store_and_fetch(self, tmp_dir: Path, sample_pdf: Path) -> None:
+        cache = ResultCache(tmp_dir / "cache")
+        key = cache.key(sample_pdf, "3b", validate=False)
+        destination = tmp_dir / "copy.pdf"
+
+        assert cache.fetch(key, destination) is None
+        cache.store(key, sample_pdf, {"level": "3b"})
+
+        assert cache.fetch(key, destination) == {"level": "3b"}
+        assert destination.read_bytes() == sample_pdf.read_bytes()
+        assert len(cache) == 1
+
+    def test_key_depends_on_content_and_options(
+        self, tmp_dir: Path, sample_pdf: Path, sample_pdf_bytes: bytes
+    ) -> None:
+        cache = ResultCache(tmp_dir / "cache")
+        copy = tmp_dir / "copy.pdf"
+        copy.write_bytes(sample_pdf_bytes)
+        key = cache.key(sample_pdf, "3b", validate=False)
+
+        assert cache.key(copy, "3b", validate=False) == key
+        assert cache.key(sample_pdf, "2b", validate=False) != key
+        assert cache.key(sample_pdf, "3b", validate=True) != key
+        with patch("pdftopdfa.result_cache._library_version", return_value="0"):
+            assert cache.key(sample_pdf, "3b", validate=False) != key
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_dir: Path) -> None:
+        cache = ResultCache(tmp_dir / "cache", max_bytes=250)
+        first = _add_entry(cache, tmp_dir, "a", 100)
+        second = _add_entry(cache, tmp_dir, "b", 100)
+
+        # Make the first entry the most recently used one
+        meta = cache.directory / second[:2] / f"{second}.json"
+        os.utime(meta, (0, 0))
+        assert cache.fetch(first, tmp_dir / "out.pdf") is not None
+
+        _add_entry(cache, tmp_dir, "c", 100)
+
+        assert cache.fetch(first, tmp_dir / "out.pdf") is not None
+        assert cache.fetch(second, tmp_dir / "out.pdf") is None
+        assert cache.size() <= 250
+
+    def test_stores_do_not_scan_the_cache_each_time(self, tmp_dir: Path) -> None:
+        cache = ResultCache(tmp_dir / "cache", max_bytes=50 * 120)
+        original = ResultCache._scan
+        scans = []
+
+        def counting(self):
+            scans.append(1)
+            return original(self)
+
+        with patch.object(ResultCache, "_scan", counting):
+            keys = [_add_entry(cache, tmp_dir, f"e{i}", 100) for i in range(200)]
+
+            assert len(cache) <= 50
+            assert cache.size() <= 50 * 120
+        assert len(scans) <= 200 // _MIN_RESCAN_STORES + 1
+        assert cache.size() == ResultCache(tmp_dir / "cache").size()
+        assert cache.fetch(keys[0], tmp_dir / "out.pdf") is None
+        assert cache.fetch(keys[-1], tmp_dir / "out.pdf") is not None
+
+    def test_index_is_not_pickled(self, tmp_dir: Path) -> None:
+        cache = ResultCache(tmp_dir / "cache")
+        _add_entry(cache, tmp_dir, "a", 100)
+
+        clone = pickle.loads(pickle.dumps(cache))
+        _add_entry(clone, tmp_dir, "b", 100)
+
+        assert clone._index is not None and len(clone) == 2
+        assert len(cache) == 1
+        assert cache.evict() == 0 and len(cache) == 2
+
+    def test_hardlinked_entries(self, tmp_dir: Path, sample_pdf: Path) -> None:
+        cache = ResultCache(tmp_dir / "cache", hardlink=True)
+        key = cache.key(sample_pdf, "3b")
+        cache.store(key, sample_pdf, {})
+        destination = tmp_dir / "link.pdf"
+        destination.write_bytes(b"old")
+
+        assert cache.fetch(key, destination) == {}
+        assert destination.stat().st_ino == sample_pdf.stat().st_ino
+
+    def test_negative_size_limit(self, tmp_dir: Path) -> None:
+        with pytest.raises(ValueError):
+            ResultCache(tmp_dir / "cache", max_bytes=-1)
+
+
+class TestConvertWithCache:
+    """convert_to_pdfa() serves repeated inputs from the cache."""
+
+    def test_repeat_conversion_is_copied(self, tmp_dir: Path, sample_pdf: Path) -> None:
+        cache = ResultCache(tmp_dir / "cache")
+        first = convert_to_pdfa(sample_pdf, tmp_dir / "first.pdf", cache=cache)
+
+        with patch("pdftopdfa.converter._make_pdfa") as mock_make:
+            second = convert_to_pdfa(sample_pdf, tmp_dir / "second.pdf", cache=cache)
+
+        mock_make.assert_not_called()
+        assert second.success
+        assert second.output_path == tmp_dir / "second.pdf"
+        assert second.level == first.level
+        assert second.warnings == first.warnings
+        assert (tmp_dir / "second.pdf").read_bytes() == (
+            tmp_dir / "first.pdf"
+        ).read_bytes()
+
+    def test_encrypted_input_rejected_despite_cache_entry(
+        self, tmp_dir: Path, sample_pdf: Path, encrypted_pdf: Path
+    ) -> None:
+        cache = ResultCache(tmp_dir / "cache")
+        key = _default_key(cache, encrypted_pdf)
+        cache.store(
+            key,
+            sample_pdf,
+            {"level": "3b", "warnings": [], "validation_failed": False},
+        )
+
+        with pytest.raises(UnsupportedPDFError, match="encrypted"):
+            convert_to_pdfa(encrypted_pdf, tmp_dir / "out.pdf", cache=cache)
+        assert not (tmp_dir / "out.pdf").exists()
+
+    def test_invalid_input_rejected_despite_cache_entry(
+        self, tmp_dir: Path, sample_pdf: Path
+    ) -> None:
+        cache = ResultCache(tmp_dir / "cache")
+        broken = tmp_dir / "broken.pdf"
+        broken.write_bytes(b"not a pdf")
+        key = _default_key(cache, broken)
+        cache.store(
+            key,
+            sample_pdf,
+            {"level": "3b", "warnings": [], "validation_failed": False},
+        )
+
+        with pytest.raises(ConversionError):
+            convert_to_pdfa(broken, tmp_dir / "out.pdf", cache=cache)
+        assert not (tmp_dir / "out.pdf").exists()
+
+    def test_different_options_are_converted(
+        self, tmp_dir: Path, sample_pdf: Path
+    ) -> None:
+        cache = ResultCache(tmp_dir / "cache")
+        convert_to_pdfa(sample_pdf, tmp_dir / "3b.pdf", level="3b", cache=cache)
+        result = convert_to_pdfa(
+            sample_pdf, tmp_dir / "2b.pdf", level="2b", cache=cache
+        )
+
+        assert result.level == "2b"
+        assert len(cache) == 2
+
+    def test_workers_share_cache(self, tmp_dir: Path, sample_pdf_bytes: bytes) -> None:
+        cache = ResultCache(tmp_dir / "cache")
+        pairs = []
+        for i in range(3):
+            in_path = tmp_dir / f"in{i}.pdf"
+            in_path.write_bytes(sample_pdf_bytes)
+            pairs.append((in_path, tmp_dir / f"out{i}.pdf"))
+
+        results = convert_files(pairs, workers=2, cache=cache)
+
+        assert all(r.success for r in results)
+        assert len(cache) == 1
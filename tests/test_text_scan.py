@@ -0,0 +1,91 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Tests for the text operator scanner."""
+
+import pytest
+
+from pdftopdfa.text_scan import has_text_operators
+
+
+class TestHasTextOperators:
+    """Tests for has_text_operators()."""
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            b"BT /F1 12 Tf 100 700 Td (Hello) Tj ET",
+            b"BT [(A) -20 (B)] TJ ET",
+            b"BT (line)' ET",
+            b'BT 1 2 (line) " ET',
+            b"BT (a)Tj ET",
+            b"BT <48656C6C6F>Tj ET",
+            b"/Span <</MCID 0>> BDC BT (x) Tj ET EMC",
+            b"q Q\nBT\r(x)\tTj\x0cET",
+        ],
+    )
+    def test_text_operators_found(self, data: bytes) -> None:
+        assert has_text_operators(data) is True
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            b"",
+            b"q 100 0 0 100 0 0 cm /Im0 Do Q",
+            b"0 0 m 100 100 l S",
+            # Operator names inside strings
+            b"/Span <</ActualText (Tj and TJ)>> BDC EMC",
+            b"(nested (Tj) parens) pop",
+            b"(escaped \\) Tj \\( TJ) pop",
+            b"(backslash at end \\\\) 1 w",
+            # ... hex strings, comments and names
+            b"<546A> 1 w",
+            b"% Tj in a comment\n1 w",
+            b"/Tj gs /TJ cs",
+            # ... and longer tokens
+            b"xTj TJx Tj1 1 w",
+        ],
+    )
+    def test_no_text_operators(self, data: bytes) -> None:
+        assert has_text_operators(data) is False
+
+
+class TestInlineImages:
+    """Tests for skipping inline image data."""
+
+    def test_binary_data_with_operator_bytes(self) -> None:
+        data = b"BI /W 8 /H 1 /BPC 8 /CS /G ID  (x) Tj EI Q"
+        assert has_text_operators(data) is False
+
+    def test_text_after_image(self) -> None:
+        data = b"BI /W 2 /H 1 /BPC 8 /CS /G ID \x00\xff EI BT (x) Tj ET"
+        assert has_text_operators(data) is True
+
+    def test_exact_length_skips_ei_inside_data(self) -> None:
+        # 3 rows of 4 bytes; the data contains " EI " followed by text
+        payload = b"\x00 EI (x) Tj "
+        assert len(payload) == 12
+        data = (
+            b"BI /Width 4 /Height 3 /BitsPerComponent 8 /ColorSpace /DeviceGray ID "
+            + payload
+            + b"\nEI Q"
+        )
+        assert has_text_operators(data) is False
+
+    def test_image_mask_length(self) -> None:
+        # 16 x 2 mask: 2 bytes per row
+        data = b"BI /IM true /W 16 /H 2 ID  Tj\nEI Q"
+        assert has_text_operators(data) is False
+
+    def test_filtered_image_uses_following_bytes(self) -> None:
+        # The first EI is followed by binary data, so it is part of the image
+        data = b"BI /W 4 /H 4 /F /DCT ID \xff\xd8 EI \x00\x93 Tj \xff\xd9\nEI Q"
+        assert has_text_operators(data) is False
+
+    def test_filtered_image_followed_by_text(self) -> None:
+        data = b"BI /W 4 /H 4 /F /AHx ID 00ff> EI BT (x) Tj ET"
+        assert has_text_operators(data) is True
+
+    def test_unterminated_image(self) -> None:
+        assert has_text_operators(b"BI /W 4 /H 4 /F /DCT ID \x00 Tj") is False
@@ -46,6 +46,7 @@ from pdftopdfa.utils import (
     get_required_pdf_version,
     is_pdf_encrypted,
     setup_logging,
+    stream_fingerprint,
     validate_pdfa_level,
 )
 from pdftopdfa.utils import (
@@ -265,6 +266,29 @@ class TestResolveIndirect:
         assert result is obj
 
 
+class TestStreamFingerprint:
+    """Tests for stream_fingerprint."""
+
+    def test_same_bytes_and_filter_match(self) -> None:
+        pdf = new_pdf()
+        first = pdf.make_stream(b"0 0 m 1 1 l S")
+        second = pdf.make_stream(b"0 0 m 1 1 l S")
+
+        assert stream_fingerprint(first) == stream_fingerprint(second)
+
+    def test_changes_with_bytes_and_filter(self) -> None:
+        pdf = new_pdf()
+        stream = pdf.make_stream(b"0 0 m 1 1 l S")
+        before = stream_fingerprint(stream)
+
+        stream.write(b"0 0 m 2 2 l S")
+        after_write = stream_fingerprint(stream)
+        stream[Name.Filter] = Name.FlateDecode
+
+        assert after_write != before
+        assert stream_fingerprint(stream) != after_write
+
+
 class TestRemoveJavascript:
     """Tests for remove_javascript."""
 
@@ -4,10 +4,17 @@
 
 """Tests for sanitizers/xobjects.py."""
 
+import random
+import zlib
+from unittest.mock import patch
+
 import pikepdf
+import pytest
 from pikepdf import Array, Dictionary, Name, Stream
 
+from pdftopdfa.sanitizers import xobjects
 from pdftopdfa.sanitizers.xobjects import (
+    _reencode_image_stream,
     fix_bits_per_component,
     fix_image_interpolate,
     remove_forbidden_xobjects,
@@ -221,6 +228,46 @@ class TestRemoveForbiddenXobjects:
         result = remove_forbidden_xobjects(pdf)
         assert result >= 2
 
+    def test_removes_forbidden_xobject_in_tiling_pattern(self, make_pdf_with_page):
+        """Forbidden XObjects in tiling pattern resources are removed."""
+        pdf = make_pdf_with_page()
+        ps_stream = pdf.make_stream(b"% PS")
+        ps_stream[Name.Type] = Name.XObject
+        ps_stream[Name.Subtype] = Name("/PS")
+        pattern = pdf.make_stream(b"/PS1 Do")
+        pattern[Name.PatternType] = 1
+        pattern[Name.PaintType] = 1
+        pattern[Name.TilingType] = 1
+        pattern[Name.BBox] = Array([0, 0, 10, 10])
+        pattern[Name.XStep] = 10
+        pattern[Name.YStep] = 10
+        pattern[Name.Resources] = Dictionary(XObject=Dictionary(PS1=ps_stream))
+        pdf.pages[0]["/Resources"] = Dictionary(Pattern=Dictionary(P0=pattern))
+
+        result = remove_forbidden_xobjects(pdf)
+
+        assert result == 1
+        assert "/PS1" not in pattern.Resources.XObject
+
+    def test_shared_forbidden_xobject_removed_everywhere(self, make_pdf_with_page):
+        """A forbidden XObject named by two dictionaries is removed from both."""
+        pdf = make_pdf_with_page()
+        ps_stream = pdf.make_stream(b"% PS")
+        ps_stream[Name.Type] = Name.XObject
+        ps_stream[Name.Subtype] = Name("/PS")
+        form = _make_form_xobject(
+            pdf,
+            resources=Dictionary(XObject=Dictionary(PS1=ps_stream)),
+        )
+        pdf.pages[0]["/Resources"] = Dictionary(
+            XObject=Dictionary(Fm0=form, PS1=ps_stream)
+        )
+
+        remove_forbidden_xobjects(pdf)
+
+        assert "/PS1" not in pdf.pages[0].Resources.XObject
+        assert "/PS1" not in form.Resources.XObject
+
 
 class TestFixImageInterpolate:
     """Tests for fix_image_interpolate()."""
@@ -845,3 +892,101 @@ class TestBpcReencoding:
         img = pdf.pages[0].Resources.XObject["/Im0"]
         data = img.read_bytes()
         assert len(data) == 4 * 3 * 1  # W * H * 1 component (DeviceGray)
+
+
+class TestBpcReencodingNumpy:
+    """The numpy re-encoding path produces the pure-Python output."""
+
+    @pytest.fixture(autouse=True)
+    def _require_numpy(self):
+        pytest.importorskip("numpy")
+
+    @staticmethod
+    def _random_rows(bpc, width, height, num_components, seed=0):
+        bytes_per_row = (width * num_components * bpc + 7) // 8
+        return random.Random(seed).randbytes(bytes_per_row * height)
+
+    @staticmethod
+    def _reencode(data, bpc, target_bpc, width, height, num_components, use_numpy):
+        pdf = pikepdf.new()
+        image = Stream(pdf, data)
+        image[Name.Width] = width
+        image[Name.Height] = height
+        image[Name.BitsPerComponent] = bpc
+        if target_bpc == 1:
+            image[Name.ImageMask] = True
+        else:
+            image[Name.ColorSpace] = {
+                1: Name.DeviceGray,
+                3: Name.DeviceRGB,
+                4: Name.DeviceCMYK,
+            }[num_components]
+        with patch.object(xobjects, "HAS_NUMPY", use_numpy):
+            if not _reencode_image_stream(image, bpc, target_bpc):
+                return None
+        assert int(image[Name.BitsPerComponent]) == target_bpc
+        return image.read_bytes()
+
+    def _assert_equivalent(self, data, bpc, target_bpc, width, height, nc=1):
+        expected = self._reencode(data, bpc, target_bpc, width, height, nc, False)
+        actual = self._reencode(data, bpc, target_bpc, width, height, nc, True)
+        assert actual == expected
+
+    @pytest.mark.parametrize("bpc", range(1, 17))
+    @pytest.mark.parametrize("num_components", [1, 3, 4])
+    @pytest.mark.parametrize("width", [1, 3, 7, 16])
+    def test_to_8bit_matches_pure_python(self, bpc, num_components, width):
+        data = self._random_rows(bpc, width, 5, num_components)
+        self._assert_equivalent(data, bpc, 8, width, 5, num_components)
+
+    @pytest.mark.parametrize("bpc", range(2, 17))
+    @pytest.mark.parametrize("width", [1, 5, 8, 13])
+    def test_mask_to_1bit_matches_pure_python(self, bpc, width):
+        data = self._random_rows(bpc, width, 4, 1)
+        self._assert_equivalent(data, bpc, 1, width, 4)
+
+    def test_every_12bit_value_matches(self):
+        data = bytearray()
+        for a in range(0, 4096, 2):
+            b = a + 1
+            data += bytes([a >> 4, ((a & 0xF) << 4) | (b >> 8), b & 0xFF])
+        self._assert_equivalent(bytes(data), 12, 8, 4096, 1)
+
+    def test_banded_rows_match(self, monkeypatch):
+        monkeypatch.setattr(xobjects, "_BPC_BAND_BYTES", 7)
+        data = self._random_rows(3, 9, 11, 3, seed=1)
+        self._assert_equivalent(data, 3, 8, 9, 11, 3)
+
+    def test_trailing_data_ignored(self):
+        data = self._random_rows(5, 3, 2, 1) + b"\xff\xff"
+        self._assert_equivalent(data, 5, 8, 3, 2)
+
+    def test_short_data_rejected(self):
+        data = self._random_rows(5, 3, 2, 1)[:-1]
+        assert self._reencode(data, 5, 8, 3, 2, 1, True) is None
+        assert self._reencode(data, 5, 8, 3, 2, 1, False) is None
+
+    def test_flate_source_streamed(self, monkeypatch):
+        monkeypatch.setattr(xobjects, "_BPC_BAND_BYTES", 16)
+        data = self._random_rows(6, 40, 30, 3, seed=2)
+        pdf = pikepdf.new()
+        image = Stream(pdf, zlib.compress(data))
+        image[Name.Filter] = Name.FlateDecode
+        image[Name.Width] = 40
+        image[Name.Height] = 30
+        image[Name.BitsPerComponent] = 6
+        image[Name.ColorSpace] = Name.DeviceRGB
+
+        assert _reencode_image_stream(image, 6, 8)
+
+        assert image[Name.Filter] == Name.FlateDecode
+        assert image.read_bytes() == self._reencode(data, 6, 8, 40, 30, 3, False)
+
+    def test_fallback_without_numpy(self, make_pdf_with_page, monkeypatch):
+        monkeypatch.setattr(xobjects, "HAS_NUMPY", False)
+        pdf = make_pdf_with_page()
+        image = _make_image_xobject_with_bpc(pdf, 3, width=4, height=3)
+        pdf.pages[0]["/Resources"] = Dictionary(XObject=Dictionary(Im0=image))
+        result = fix_bits_per_component(pdf)
+        assert result["invalid_bpc_fixed"] == 1
+        assert len(pdf.pages[0].Resources.XObject["/Im0"].read_bytes()) == 12